@@ -98,3 +98,17 @@ def test_log_messages(view, qtbot):
     
     view.clear_log()
     assert view.log_area.toPlainText() == ""
+
+def test_log_is_bounded_and_filtered(view, qtbot):
+    log = view.log_area
+    for i in range(log.MAX_LOG_LINES + 100):
+        view.log_message(f"ffmpeg {i}", "FFMPEG")
+    view.log_message("aviso final", "AVISO")
+    log.flush()
+    assert log.document().blockCount() == log.MAX_LOG_LINES
+    assert log.toPlainText().endswith("aviso final")
+
+    log.set_level_visible("FFMPEG", False)
+    assert log.toPlainText() == "aviso final"
+    log.set_level_visible("FFMPEG", True)
+    assert "ffmpeg 5099" in log.toPlainText()
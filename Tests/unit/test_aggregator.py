@@ -0,0 +1,46 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from aggregator import SignalAggregator
+
+
+def _collector():
+    calls = []
+    aggregator = SignalAggregator(
+        lambda job_id, message, level: calls.append(('status', job_id, message)),
+        lambda job_id, percent, eta: calls.append(('progress', job_id, percent)),
+        lambda job_id, stats: calls.append(('stats', job_id, stats['speed'])))
+    return aggregator, calls
+
+def test_flush_preserves_status_order_and_coalesces_progress(qtbot):
+    aggregator, calls = _collector()
+    aggregator.post_status("a", "um", "INFO")
+    aggregator.post_progress("a", 10, "ETA: 00:10")
+    aggregator.post_status("b", "dois", "INFO")
+    aggregator.post_progress("a", 20, "ETA: 00:08")
+    aggregator.post_stats("a", {'speed': 2.0})
+    aggregator.post_status("a", "três", "AVISO")
+    aggregator.flush()
+    assert calls == [('status', "a", "um"), ('status', "b", "dois"), ('status', "a", "três"),
+                     ('progress', "a", 20), ('stats', "a", 2.0)]
+    aggregator.flush()
+    assert len(calls) == 5
+
+def test_posts_from_worker_threads_are_delivered_by_timer(qtbot):
+    aggregator, calls = _collector()
+    aggregator.start()
+
+    def worker(job_id):
+        for i in range(100):
+            aggregator.post_status(job_id, str(i), "INFO")
+
+    threads = [threading.Thread(target=worker, args=(j,)) for j in ("a", "b")]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    qtbot.waitUntil(lambda: len(calls) == 200, timeout=2000)
+    aggregator.stop()
+    for job_id in ("a", "b"):
+        assert [c[2] for c in calls if c[1] == job_id] == [str(i) for i in range(100)]
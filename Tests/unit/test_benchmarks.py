@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+sys.path.append(str(Path(__file__).parent.parent.parent / "benchmarks"))
+
+from bench_encode import build_cases, compare_results
+from fake_ffmpeg import probe_banner, progress_block
+from probe import BANNER_STREAM_RE
+from progress import ProgressParser, parse_max_rss_kb
+
+
+def _case(**overrides):
+    case = {'return_code': 0, 'fps': 100.0, 'realtime': 10.0, 'cpu_seconds': 2.0, 'peak_rss_mb': 100.0,
+            'bytes_out': 1000000, 'command': "ffmpeg -i {entrada} -c:v libx264 {saida}"}
+    case.update(overrides)
+    return case
+
+
+def test_build_cases_skips_upscaling():
+    cases = build_cases(inputs=["ruido_480p"], codecs=["h264"], qualities=["media"])
+    assert [case.resolution for case in cases] == ["480p", "original"]
+    assert cases[0].case_id == "ruido_480p/h264/media/480p"
+
+
+def test_compare_tolerates_noise_and_flags_regressions():
+    baseline = {'cases': {'a': _case(), 'b': _case(), 'c': _case(), 'novo': None}}
+    current = {'cases': {
+        'a': _case(fps=95.0, cpu_seconds=2.1),
+        'b': _case(fps=70.0, bytes_out=900000),
+        'c': _case(command="ffmpeg -i {entrada} -c:v libx264 -crf 40 {saida}"),
+        'novo': _case(),
+    }}
+    regressions = compare_results(current, baseline)
+    assert {(r['case'], r['metric']) for r in regressions} == {
+        ('b', 'fps'), ('b', 'bytes_out'), ('c', 'command')}
+
+
+def test_parse_max_rss_from_benchmark_line():
+    assert parse_max_rss_kb("bench: maxrss=13440KiB") == 13440
+    assert parse_max_rss_kb("bench: maxrss=2048kB") == 2048
+    assert parse_max_rss_kb("frame=  10 fps=0.0") is None
+
+
+def test_fake_ffmpeg_output_matches_parsers():
+    parser = ProgressParser()
+    snapshots = [parser.feed(line) for line in progress_block(900, 30.0, 3750000, 12.0, True).splitlines()]
+    snapshot = snapshots[-1]
+    assert snapshot.finished and snapshot.frame == 900 and snapshot.out_seconds == 30.0
+    streams = [match.group(3) for match in BANNER_STREAM_RE.finditer(probe_banner("video.mp4", 60.0))]
+    assert streams == ["Video", "Audio"]
+    assert "Duration: 00:01:00.00," in probe_banner("video.mp4", 60.0)
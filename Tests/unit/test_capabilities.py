@@ -0,0 +1,90 @@
+import os
+import sys
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.append(str(ROOT / "src"))
+
+import capabilities
+from capabilities import CapabilitiesCache, discover_ffmpeg, parse_encoders, parse_filters
+from engine import HeadlessEncoder
+
+ENCODERS_OUTPUT = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ V....D libvpx-vp9           libvpx VP9 (codec vp9)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+FILTERS_OUTPUT = """Filters:
+  T.. = Timeline support
+  | = Source or sink filter
+ TS. ssim              VV->V      Calculate the SSIM between two video streams.
+ ... libvmaf           VV->V      Calculate the VMAF between two video streams.
+"""
+
+
+def _install_fake_ffmpeg(directory):
+    for name in ("ffmpeg", "ffprobe"):
+        shutil.copy(ROOT / "benchmarks" / "fake_ffmpeg.py", directory / name)
+        os.chmod(directory / name, 0o755)
+    return directory / "ffmpeg"
+
+
+def test_parse_listings():
+    assert parse_encoders(ENCODERS_OUTPUT) == ["libx264", "libvpx-vp9", "aac"]
+    assert parse_filters(FILTERS_OUTPUT) == ["ssim", "libvmaf"]
+
+
+def test_discovery_pairs_ffprobe_and_filters_codecs(tmp_path, monkeypatch):
+    monkeypatch.setenv("COMPRESSOR_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("FAKE_FFMPEG_ENCODERS", "libx264,libvpx-vp9")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    ffmpeg = _install_fake_ffmpeg(bin_dir)
+
+    found = discover_ffmpeg(str(ffmpeg), cache=CapabilitiesCache(str(tmp_path)))
+    assert found.ffmpeg_path == str(ffmpeg)
+    assert found.ffprobe_path == str(bin_dir / "ffprobe")
+    assert found.version.startswith("ffmpeg version")
+    assert found.available_codecs() == ["H.264 (AVC)", "VP9"]
+    assert found.has_filter("ssim") and not found.has_filter("libvmaf")
+    assert (tmp_path / capabilities.CAPABILITIES_CACHE_FILE).exists()
+
+
+def test_capabilities_cached_until_binary_changes(tmp_path):
+    ffmpeg = _install_fake_ffmpeg(tmp_path)
+    real_query = capabilities.query_capabilities
+    with patch("capabilities.query_capabilities", side_effect=real_query) as query:
+        first = capabilities.ffmpeg_capabilities(str(ffmpeg), CapabilitiesCache(str(tmp_path)))
+        # Nova instância do cache: vem do JSON, sem rodar o FFmpeg de novo
+        again = capabilities.ffmpeg_capabilities(str(ffmpeg), CapabilitiesCache(str(tmp_path)))
+        assert query.call_count == 1
+        assert again == first
+
+        stat = os.stat(ffmpeg)
+        os.utime(ffmpeg, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        capabilities.ffmpeg_capabilities(str(ffmpeg), CapabilitiesCache(str(tmp_path)))
+        assert query.call_count == 2
+
+    assert capabilities.ffmpeg_capabilities(str(tmp_path / "nao_existe")) is None
+
+
+def test_missing_codec_finishes_job_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_FFMPEG_ENCODERS", "libx264")
+    monkeypatch.setattr(capabilities, "_DEFAULT_CACHE", CapabilitiesCache(str(tmp_path)))
+    ffmpeg = _install_fake_ffmpeg(tmp_path)
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\0" * 1024)
+
+    encoder = HeadlessEncoder(str(ffmpeg), str(video), str(tmp_path / "saida.mp4"), codec="VP9")
+    finished, errors = [], []
+    encoder.finished.connect(lambda *args: finished.append(args[0]))
+    encoder.error_occurred.connect(lambda title, message: errors.append(title))
+    encoder.run()
+    assert errors == ["Codec Indisponível"]
+    assert finished == [1]
@@ -0,0 +1,53 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from checkpoint import CheckpointManifest, ResumeRegistry, SegmentEntry, parts_dir
+from segmented import partial_path
+
+
+def make_manifest(tmp_path):
+    directory = parts_dir(str(tmp_path / "saida.mp4"))
+    os.makedirs(directory)
+    manifest = CheckpointManifest(directory=directory, input_file="entrada.mkv",
+                                  output_file=str(tmp_path / "saida.mp4"), signature="abc",
+                                  job={'input_file': "entrada.mkv"})
+    manifest.segments = [SegmentEntry("seg000.mkv", "enc000.mkv", 60.0),
+                         SegmentEntry("seg001.mkv", "enc001.mkv", 35.0)]
+    return manifest
+
+
+def test_manifest_round_trip_and_done_segments(tmp_path):
+    manifest = make_manifest(tmp_path)
+    assert manifest.directory.endswith("saida.mp4.parts")
+    manifest.segments[0].done = True
+    (Path(manifest.directory) / "enc000.mkv").write_bytes(b"x")
+    manifest.save()
+
+    loaded = CheckpointManifest.load(manifest.directory)
+    assert loaded.signature == "abc" and loaded.job == {'input_file': "entrada.mkv"}
+    assert loaded.is_segment_done(0) and not loaded.is_segment_done(1)
+    assert loaded.done_count() == 1 and loaded.done_seconds() == 60.0
+    # Trecho marcado como feito mas sem arquivo não conta
+    (Path(manifest.directory) / "enc000.mkv").unlink()
+    assert loaded.done_count() == 0
+
+def test_registry_prunes_missing_and_discards(tmp_path):
+    registry = ResumeRegistry(base_path=str(tmp_path))
+    manifest = make_manifest(tmp_path)
+    manifest.save()
+    registry.add(manifest.directory)
+    registry.add(str(tmp_path / "sumiu.mp4.parts"))
+
+    orphans = registry.orphans()
+    assert [m.directory for m in orphans] == [manifest.directory]
+    assert registry._read() == [manifest.directory]
+
+    registry.discard(orphans[0])
+    assert not os.path.exists(manifest.directory)
+    assert registry.orphans() == []
+
+def test_partial_path_keeps_extension():
+    assert partial_path(os.path.join("dir", "enc001.mkv")) == os.path.join("dir", "enc001.partial.mkv")
@@ -0,0 +1,44 @@
+import sys
+import subprocess
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent.parent / "src"
+sys.path.append(str(SRC_DIR))
+
+import pytest
+from cli import build_parser, build_jobs, parse_resolution, aggregate_exit_code, main
+
+
+def test_cli_does_not_import_qt():
+    code = "import sys, cli; sys.exit(any(m.startswith('PySide6') for m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=str(SRC_DIR))
+    assert result.returncode == 0
+
+def test_parse_resolution():
+    assert parse_resolution("720p") == ("720p (HD)", None)
+    assert parse_resolution("640x360") == ("Personalizado...", (640, 360))
+    with pytest.raises(Exception):
+        parse_resolution("grande")
+
+def test_build_jobs_maps_options(tmp_path):
+    args = build_parser().parse_args([
+        "a.mp4", "b/a.mp4", "-o", str(tmp_path), "-q", "media", "-c", "vp9", "-r", "480p", "--crf", "30"
+    ])
+    jobs = build_jobs(args)
+    assert [Path(j.output_file).name for j in jobs] == ["a_comprimido.mp4", "a_comprimido_1.mp4"]
+    assert jobs[0].quality_preset == "Média (Balanceado)"
+    assert jobs[0].codec == "VP9"
+    assert jobs[0].resolution == "480p (SD)"
+    assert jobs[0].crf == 30
+
+def test_aggregate_exit_code():
+    assert aggregate_exit_code([0, 0]) == 0
+    assert aggregate_exit_code([0, -1]) == -1
+    assert aggregate_exit_code([-1, 1, 0]) == 1
+
+def test_main_reports_missing_input(tmp_path, capsys):
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.write_text("")
+    exit_code = main([str(tmp_path / "nao_existe.mp4"), "--ffmpeg", str(fake_ffmpeg), "-j", "1"])
+    assert exit_code == 1
+    assert capsys.readouterr().out.count('"event": "finished"') == 1
@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.append(str(ROOT / "src"))
+
+from concurrency import ConcurrencyController, LoadSample, LoadSampler, RAISE, LOWER, HOLD, COOLDOWN_SAMPLES
+
+PARENT_PID = 100
+
+
+def _write_proc(root, busy, total, available_kb, children):
+    """/proc mínimo: CPU (busy/total jiffies), memória e filhos {pid: (comm, rss_kb, cpu_jiffies)}."""
+    idle = total - busy
+    (root / "stat").write_text(f"cpu  {busy} 0 0 {idle} 0 0 0 0 0 0\ncpu0 0 0 0 0\n")
+    (root / "meminfo").write_text(f"MemTotal:       8388608 kB\nMemFree:  1 kB\nMemAvailable:   {available_kb} kB\n")
+    task = root / str(PARENT_PID) / "task" / str(PARENT_PID)
+    task.mkdir(parents=True, exist_ok=True)
+    (task / "children").write_text(" ".join(str(pid) for pid in children))
+    for pid, (comm, rss_kb, ticks) in children.items():
+        (root / str(pid)).mkdir(exist_ok=True)
+        fields = ["S", str(PARENT_PID)] + ["0"] * 9 + [str(ticks), "0"] + ["0"] * 10
+        (root / str(pid) / "stat").write_text(f"{pid} ({comm}) {' '.join(fields)}\n")
+        (root / str(pid) / "status").write_text(f"Name:\t{comm}\nVmRSS:\t{rss_kb} kB\n")
+
+
+def _sample(cpu, available_mb, ffmpeg_cpu=None, rss_mb=400.0):
+    return LoadSample(cpu_percent=cpu, ffmpeg_cpu_percent=cpu if ffmpeg_cpu is None else ffmpeg_cpu,
+                      mem_available_mb=available_mb, mem_total_mb=8192, ffmpeg_rss_mb=rss_mb, ffmpeg_processes=2)
+
+
+def test_sampler_reads_cpu_memory_and_ffmpeg_children(tmp_path):
+    _write_proc(tmp_path, busy=1000, total=4000, available_kb=4 * 1024 * 1024,
+                children={201: ("ffmpeg", 300 * 1024, 500), 202: ("python", 999 * 1024, 0)})
+    sampler = LoadSampler(str(tmp_path), parent_pid=PARENT_PID)
+    assert sampler.sample() is None  # primeira leitura só marca o início do intervalo
+
+    _write_proc(tmp_path, busy=1800, total=5000, available_kb=3 * 1024 * 1024,
+                children={201: ("ffmpeg", 600 * 1024, 1100), 202: ("python", 999 * 1024, 0)})
+    sample = sampler.sample()
+    assert sample.cpu_percent == 80.0
+    assert sample.ffmpeg_cpu_percent == 60.0
+    assert (sample.mem_available_mb, sample.mem_total_mb) == (3072, 8192)
+    assert (sample.ffmpeg_rss_mb, sample.ffmpeg_processes) == (600, 1)
+
+
+def test_controller_raises_lowers_and_pauses():
+    controller = ConcurrencyController(initial=2, max_jobs=8, sampler=None)
+
+    # CPU ociosa com a fila cheia: sobe só na segunda amostra seguida
+    assert controller.decide(_sample(40, 6000), running=2, pending=5).action == HOLD
+    decision = controller.decide(_sample(40, 6000), running=2, pending=5)
+    assert (decision.action, decision.limit, decision.changed) == (RAISE, 3, True)
+    # Depois de mudar, espera os jobs novos acelerarem
+    for _ in range(COOLDOWN_SAMPLES):
+        assert controller.decide(_sample(40, 6000), running=3, pending=4).limit == 3
+
+    # Sem memória para mais um job (RSS médio 2 GB), não sobe
+    controller.decide(_sample(40, 3000, rss_mb=6000), running=3, pending=4)
+    assert controller.decide(_sample(40, 3000, rss_mb=6000), running=3, pending=4).limit == 3
+
+    # Memória abaixo da reserva: admissão pausada na hora, retomada quando volta
+    decision = controller.decide(_sample(60, 1100), running=3, pending=4)
+    assert decision.paused and decision.changed and decision.limit == 3
+    decision = controller.decide(_sample(60, 5000), running=3, pending=4)
+    assert not decision.paused and decision.changed
+
+    # CPU saturada por outros programas: desce; saturada pelos nossos FFmpeg: mantém
+    controller.decide(_sample(100, 5000, ffmpeg_cpu=40), running=3, pending=4)
+    decision = controller.decide(_sample(100, 5000, ffmpeg_cpu=40), running=3, pending=4)
+    assert (decision.action, decision.limit) == (LOWER, 2)
+    for _ in range(COOLDOWN_SAMPLES + 2):
+        assert controller.decide(_sample(100, 5000), running=2, pending=4).limit == 2
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from encoding import resolve_settings
+from crf_search import (CrfSearch, CrfTrialCache, TrialResult, CRF_CANDIDATES,
+                        choose_crf, sample_positions)
+
+
+def test_sample_positions_spread_over_video():
+    assert sample_positions(3.0) == [0.0]
+    positions = sample_positions(100.0, count=3, sample_seconds=4.0)
+    assert positions == [24.0, 48.0, 72.0]
+
+def test_choose_crf_picks_highest_passing():
+    trials = [TrialResult(18, 0.99, 45.0), TrialResult(24, 0.975, 41.0), TrialResult(30, 0.95, 37.0)]
+    assert choose_crf(trials, "ssim", 0.97) == (24, True)
+    assert choose_crf(trials, "psnr", 36.0) == (30, True)
+    assert choose_crf(trials, "ssim", 0.999) == (18, False)
+
+def test_search_reuses_cached_trials(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"0" * 10)
+    settings = resolve_settings("Média (Balanceado)", "H.264 (AVC)", "Original", None, None, 30.0)
+    cache = CrfTrialCache(base_path=str(tmp_path))
+    key = cache.key(str(video), settings)
+    cache.put(key, [TrialResult(crf, 1.0 - crf / 1000, 60.0 - crf) for crf in CRF_CANDIDATES["libx264"]])
+
+    with patch('subprocess.Popen') as mock_popen:
+        search = CrfSearch("ffmpeg", str(video), settings, 60.0, metric="psnr", floor=30.0,
+                           cache=CrfTrialCache(base_path=str(tmp_path)))
+        assert search.run() == 30
+        search.floor = 40.0
+        assert search.run() == 18
+    assert not mock_popen.called
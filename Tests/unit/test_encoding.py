@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from encoding import resolve_settings, format_eta
+
+
+def test_resolve_settings_from_quality_preset():
+    settings = resolve_settings("Alta (Melhor Qualidade)", "H.265 (HEVC)", "720p (HD)", None, None, 30.0)
+    assert settings.codec == "libx265"
+    assert settings.crf == "20"
+    assert settings.preset == "medium"
+    assert settings.audio_bitrate == "160k"
+    assert settings.output_fps == 30.0
+    assert settings.video_filter == "scale=-2:720,fps=30.0"
+    assert settings.video_args()[-2:] == ['-x265-params', 'log-level=error']
+
+def test_resolve_settings_custom_crf_and_resolution():
+    settings = resolve_settings("Agressiva (Menor Arquivo)", "VP9", "Personalizado...", (640, 360), 31, 60.0)
+    assert settings.codec == "libvpx-vp9"
+    assert settings.crf == "31"
+    assert settings.output_fps == 20.0
+    assert settings.scale_filter == "scale=640:360:flags=lanczos"
+    assert '-cpu-used' in settings.video_args()
+
+def test_resolve_settings_unknown_values_fall_back():
+    settings = resolve_settings("???", "???", "Original", None, None, 0.5)
+    assert settings.codec == "libx264"
+    assert settings.crf == "23"
+    assert settings.output_fps == 1.0
+    assert settings.video_filter == "fps=1.0"
+    assert settings.audio_args() == ['-c:a', 'aac', '-b:a', '128k']
+
+def test_format_eta():
+    assert format_eta(float('inf')) == "ETA: ..."
+    assert format_eta(75) == "ETA: 01:15"
@@ -0,0 +1,80 @@
+import sys
+import math
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from eta import EtaEstimator, plan_batch_seconds, output_height
+from encoding import format_eta, resolve_settings
+from job_store import JobStore
+
+
+def _summary(height=720, wall=10.0, mode="single", preset="veryfast"):
+    return {'input_file': "a.mp4", 'output_file': "a_comprimido.mp4", 'codec': "libx264", 'crf': 28,
+            'preset': preset, 'mode': mode, 'duration_seconds': 60.0, 'original_mb': 10.0,
+            'final_mb': 4.0, 'wall_seconds': wall, 'cpu_seconds': 20.0, 'speed': 60.0 / wall,
+            'output_height': height, 'output_fps': 30.0, 'finished_at': time.time()}
+
+
+def test_estimator_without_prior_converges():
+    eta = EtaEstimator()
+    assert math.isinf(eta.update(0.0, 0.0))
+    # 1% por segundo, constante: o ETA deve ser o tempo restante exato
+    for second in range(1, 11):
+        remaining = eta.update(float(second), second / 100)
+    assert abs(remaining - 90.0) < 1e-6
+
+
+def test_estimator_smooths_speed_spikes():
+    eta = EtaEstimator()
+    for second in range(0, 21):
+        eta.update(float(second), second / 100)
+    # Uma cena estática dobra a velocidade por um segundo; o ETA muda pouco
+    remaining = eta.update(21.0, 0.22)
+    assert 70.0 < remaining < 78.0
+
+
+def test_prior_dominates_early_and_fades():
+    # Histórico diz 1% por segundo; o job real anda a 2% por segundo
+    eta = EtaEstimator(prior_rate=0.01)
+    assert abs(eta.update(0.0, 0.0) - 100.0) < 1e-6
+    early = eta.update(1.0, 0.02)
+    assert early > 60.0
+    for second in range(2, 41):
+        late = eta.update(float(second), second * 0.02)
+    # Faltam 10 s de verdade (20 s pelo histórico); a observação já pesa mais
+    assert 10.0 < late < 13.0
+
+
+def test_format_eta_over_an_hour():
+    assert format_eta(3723) == "ETA: 1:02:03"
+    assert format_eta(75) == "ETA: 01:15"
+    assert format_eta(float('inf')) == "ETA: ..."
+
+
+def test_plan_batch_seconds_fills_free_slots():
+    assert plan_batch_seconds([60.0, 30.0, 30.0, 30.0], 2) == (90.0, 0)
+    assert plan_batch_seconds([60.0, None, 10.0], 1) == (70.0, 1)
+    assert plan_batch_seconds([], 4) == (0.0, 0)
+
+
+def test_output_height_from_scale_filter():
+    settings = resolve_settings("Média (Balanceado)", "H.264 (AVC)", "720p (HD)", None, None, 30.0)
+    assert output_height(settings, 1080) == 720
+    settings = resolve_settings("Média (Balanceado)", "H.264 (AVC)", "Original", None, None, 30.0)
+    assert output_height(settings, 1080) == 1080
+
+
+def test_speed_prior_is_median_of_similar_jobs(tmp_path):
+    store = JobStore(str(tmp_path))
+    for wall in (10.0, 20.0, 90.0):
+        store.record_result(None, _summary(wall=wall))
+    store.record_result(None, _summary(height=1080, wall=1.0))
+    store.record_result(None, _summary(preset="medium", wall=1.0))
+    store.flush()
+    # 60 s a 30 fps = 1800 quadros; mediana do tempo é 20 s
+    rate, samples = store.speed_prior("libx264", "veryfast", 720, "single")
+    assert samples == 3 and rate == 90.0
+    assert store.speed_prior("libx264", "veryfast", 720, "segmented") is None
+    store.close()
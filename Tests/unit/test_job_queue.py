@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from job_queue import JobQueue, JobSettings, JobState, CompressionJob, default_concurrency, MAX_JOB_LOG_LINES
+
+
+def _settings(name="a"):
+    return JobSettings(input_file=f"/videos/{name}.mp4", output_file=f"/saida/{name}_comprimido.mp4",
+                       codec="VP9", resolution="Personalizado...", custom_res=(640, 360), crf=30)
+
+
+def test_add_and_next_pending(tmp_path):
+    queue = JobQueue(base_path=str(tmp_path))
+    first = queue.add(_settings("a"))
+    queue.add(_settings("b"))
+    assert len(queue) == 2
+    assert queue.next_pending() is first
+    first.mark_running()
+    assert queue.next_pending().name == "b.mp4"
+    assert queue.running() == [first]
+
+def test_mark_finished_states():
+    job = CompressionJob(settings=_settings())
+    job.mark_finished(0, 100.0, 30.0)
+    assert job.state == JobState.DONE and job.progress == 100
+    job.mark_finished(-1, 100.0, 0.0)
+    assert job.state == JobState.CANCELLED
+    job.mark_finished(1, 100.0, 0.0)
+    assert job.state == JobState.FAILED
+
+def test_queue_persists_and_resets_running(tmp_path):
+    queue = JobQueue(base_path=str(tmp_path))
+    job = queue.add(_settings())
+    job.mark_running()
+    job.add_log("linha", "INFO")
+    queue.record_event(job.job_id, "linha", "INFO")
+    queue.save()
+
+    restored = JobQueue(base_path=str(tmp_path))
+    restored.load()
+    loaded = restored.get(job.job_id)
+    assert loaded.state == JobState.PENDING
+    assert loaded.settings.custom_res == (640, 360)
+    assert loaded.settings.worker_kwargs()['crf'] == 30
+    assert loaded.log == [("linha", "INFO")]
+
+def test_remove_refuses_running_job(tmp_path):
+    queue = JobQueue(base_path=str(tmp_path))
+    job = queue.add(_settings())
+    job.mark_running()
+    assert not queue.remove(job.job_id)
+    job.mark_finished(0, 1.0, 0.5)
+    assert queue.remove(job.job_id)
+    assert len(queue) == 0
+
+def test_corrupted_queue_file_is_ignored(tmp_path):
+    (tmp_path / "job_queue.json").write_text("{invalid", encoding="utf-8")
+    queue = JobQueue(base_path=str(tmp_path))
+    queue.load()
+    assert len(queue) == 0
+
+def test_job_log_is_bounded():
+    job = CompressionJob(settings=_settings())
+    for i in range(MAX_JOB_LOG_LINES + 10):
+        job.add_log(str(i), "INFO")
+    assert len(job.log) == MAX_JOB_LOG_LINES
+    assert job.log[-1][0] == str(MAX_JOB_LOG_LINES + 9)
+
+def test_default_concurrency_is_positive():
+    assert default_concurrency() >= 1
@@ -0,0 +1,98 @@
+import sys
+import json
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from job_store import JobStore
+from job_queue import JobQueue, JobSettings, JobState
+from progress import parse_cpu_seconds
+
+
+def _summary(codec="libx264", mode="single", wall=10.0, finished_at=None):
+    return {'input_file': "a.mp4", 'output_file': "a_comprimido.mp4", 'codec': codec, 'crf': 28,
+            'preset': "veryfast", 'mode': mode, 'duration_seconds': 95.0, 'original_mb': 10.0,
+            'final_mb': 4.0, 'wall_seconds': wall, 'cpu_seconds': 20.0, 'speed': 95.0 / wall,
+            'finished_at': finished_at or time.time()}
+
+
+def test_events_are_batched_until_flush(tmp_path):
+    store = JobStore(str(tmp_path), flush_interval=60)
+    for i in range(200):
+        store.record_event("job1", 'status', f"linha {i}", "INFO")
+    # Nada no disco antes do flush: uma única transação grava o lote inteiro
+    other = JobStore(str(tmp_path), flush_interval=60)
+    assert other.events("job1") == []
+    store.flush()
+    assert len(other.events("job1")) == 200
+    store.close()
+    other.close()
+
+def test_throughput_reports(tmp_path):
+    store = JobStore(str(tmp_path))
+    old = time.time() - 10 * 86400
+    store.record_result("a", _summary(finished_at=old))
+    store.record_result("b", _summary(wall=5.0))
+    store.record_result(None, _summary(codec="libx265", mode="remux", wall=5.0))
+    recent = store.throughput(since=time.time() - 86400)
+    assert recent['jobs'] == 2 and recent['saved_mb'] == 12.0
+    assert recent['speed'] == 19.0
+    by_codec = {row['grp']: row['jobs'] for row in store.throughput_by('codec')}
+    assert by_codec == {"libx264": 2, "libx265": 1}
+    assert store.recent_results(1)[0]['mode'] == "remux"
+    store.close()
+
+def test_queue_records_state_transitions_and_migrates_json(tmp_path):
+    legacy = {'jobs': [{'settings': {'input_file': "/v/a.mp4", 'output_file': "/s/a.mp4"},
+                        'job_id': "abc", 'state': JobState.RUNNING}]}
+    (tmp_path / "job_queue.json").write_text(json.dumps(legacy), encoding="utf-8")
+    queue = JobQueue(base_path=str(tmp_path))
+    queue.load()
+    assert queue.get("abc").state == JobState.PENDING
+    assert (tmp_path / "job_queue.json.migrated").exists()
+
+    job = queue.get("abc")
+    job.mark_running()
+    queue.save()
+    job.mark_finished(0, 10.0, 4.0)
+    queue.save()
+    states = [event['message'] for event in queue.store.events("abc", kind='state')]
+    assert states == [JobState.RUNNING, JobState.DONE]
+
+    queue.remove("abc")
+    restored = JobQueue(base_path=str(tmp_path))
+    restored.load()
+    assert len(restored) == 0
+    # O histórico continua depois que o job sai da fila
+    assert len(restored.store.events("abc", kind='state')) == 2
+    queue.close()
+    restored.close()
+
+def test_parse_cpu_seconds():
+    assert parse_cpu_seconds("bench: utime=1.500s stime=0.250s rtime=0.900s") == 1.75
+    assert parse_cpu_seconds("bench: maxrss=36180KiB") is None
+
+def test_queue_rewrites_only_changed_jobs_without_log(tmp_path):
+    queue = JobQueue(base_path=str(tmp_path))
+    jobs = [queue.add(JobSettings(input_file=f"/v/{i}.mp4", output_file=f"/s/{i}.mp4")) for i in range(5)]
+    jobs[0].add_log("linha", "INFO")
+    queue.record_event(jobs[0].job_id, "linha", "INFO")
+
+    with patch.object(queue.store, 'save_job', wraps=queue.store.save_job) as save_job:
+        jobs[0].mark_running()
+        queue.save(jobs[0].job_id)
+        jobs[1].quality = {'ssim': 0.98}
+        queue.save(jobs[1].job_id)
+        queue.save()
+    assert [c.args[0] for c in save_job.call_args_list] == [jobs[0].job_id, jobs[1].job_id]
+
+    row = queue.store._query("SELECT data FROM jobs WHERE job_id = ?", (jobs[0].job_id,))[0]
+    assert 'log' not in json.loads(row['data'])
+    restored = JobQueue(base_path=str(tmp_path))
+    restored.load()
+    assert restored.get(jobs[0].job_id).log == [("linha", "INFO")]
+    assert restored.get(jobs[1].job_id).quality == {'ssim': 0.98}
+    queue.close()
+    restored.close()
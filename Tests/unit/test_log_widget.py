@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from view import LogWidget
+
+
+def test_warnings_filter_keeps_english_levels(qtbot):
+    log = LogWidget()
+    qtbot.addWidget(log)
+    log.set_hidden_levels([LogWidget.INFO, LogWidget.CMD, LogWidget.FFMPEG])
+    log.append_message("iniciando", "INFO")
+    log.append_message("falhou", "ERROR")
+    log.append_message("cuidado", "WARN")
+    log.append_message("comando", LogWidget.CMD)
+    log.append_message("estranho", "DEBUG")
+    log.flush()
+    assert log.toPlainText().splitlines() == ["falhou", "cuidado"]
+
+    cursor = log.document().find("falhou")
+    assert cursor.charFormat().foreground().color().name() == LogWidget.LOG_COLORS[LogWidget.ERROR].lower()
@@ -0,0 +1,63 @@
+import sys
+import urllib.request
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from engine import CallbackSignal
+from metrics import MetricsRegistry, MetricsServer
+
+
+class _FakeEncoder:
+    def __init__(self):
+        self.stats_updated = CallbackSignal()
+        self.result_ready = CallbackSignal()
+        self.finished = CallbackSignal()
+
+
+def _samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if line and not line.startswith("#"))
+
+
+def test_registry_follows_worker_signals():
+    registry = MetricsRegistry(buckets=(10, 60))
+    registry.set_queued(3)
+    encoder = _FakeEncoder()
+    registry.observe("abc", encoder, 'vídeo "1".mp4')
+    registry.add_queued(-1)
+    encoder.stats_updated.emit({'fps': 48.5, 'speed': 1.6, 'percent': 40})
+
+    samples = _samples(registry.render())
+    labels = '{job="abc",input="vídeo \\"1\\".mp4"}'
+    assert samples["compressor_jobs_queued"] == "2"
+    assert samples["compressor_jobs_running"] == "1"
+    assert samples[f"compressor_job_fps{labels}"] == "48.5"
+    assert samples[f"compressor_job_speed_ratio{labels}"] == "1.6"
+
+    encoder.result_ready.emit({'wall_seconds': 30.0, 'cpu_seconds': 95.5})
+    encoder.finished.emit(0, "saida.mp4", 2.0, 1.0)
+
+    samples = _samples(registry.render())
+    assert samples["compressor_jobs_running"] == "0"
+    assert f"compressor_job_fps{labels}" not in samples
+    assert samples['compressor_jobs_finished_total{result="done"}'] == "1"
+    assert samples['compressor_jobs_finished_total{result="failed"}'] == "0"
+    assert samples["compressor_input_bytes_total"] == str(2 * 1024 * 1024)
+    assert samples["compressor_output_bytes_total"] == str(1024 * 1024)
+    assert samples["compressor_cpu_seconds_total"] == "95.5"
+    assert samples['compressor_encode_duration_seconds_bucket{le="10"}'] == "0"
+    assert samples['compressor_encode_duration_seconds_bucket{le="60"}'] == "1"
+    assert samples['compressor_encode_duration_seconds_bucket{le="+Inf"}'] == "1"
+
+
+def test_server_exposes_metrics_on_localhost():
+    registry = MetricsRegistry()
+    server = MetricsServer(registry, 0).start()
+    try:
+        assert server.url.startswith("http://127.0.0.1:")
+        with urllib.request.urlopen(server.url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE compressor_jobs_running gauge" in body
+    finally:
+        server.stop()
@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from encoding import resolve_settings
+from probe import MediaInfo, StreamInfo
+from planner import plan_remux, plan_streams, remux_video_args
+
+
+def make_info(codec="h264", bit_rate=400_000, width=640, height=360):
+    video = StreamInfo(index=0, codec_type="video", codec_name=codec, bit_rate=bit_rate,
+                       width=width, height=height, fps=30.0)
+    return MediaInfo(path="video.mp4", duration=95.0, streams=[video])
+
+
+def test_low_bitrate_source_in_target_codec_is_remuxed():
+    settings = resolve_settings("Alta (Melhor Qualidade)", "H.264 (AVC)", "Original", None, None, 30.0)
+    plan = plan_remux(make_info(), settings, 95.0)
+    assert plan.remux and plan.estimated_cpu_seconds > 0
+    assert remux_video_args(make_info()) == ['-c:v', 'copy']
+    assert remux_video_args(make_info(codec="hevc"))[-2:] == ['-tag:v', 'hvc1']
+
+def test_reencode_when_codec_resolution_or_bitrate_require_it():
+    h264 = resolve_settings("Alta (Melhor Qualidade)", "H.264 (AVC)", "Original", None, None, 30.0)
+    assert not plan_remux(make_info(codec="mpeg4"), h264, 95.0).remux
+    assert not plan_remux(make_info(bit_rate=5_000_000), h264, 95.0).remux
+    assert not plan_remux(None, h264, 95.0).remux
+    downscale = resolve_settings("Alta (Melhor Qualidade)", "H.264 (AVC)", "480p (SD)", None, None, 30.0)
+    assert not plan_remux(make_info(width=1920, height=1080, bit_rate=300_000), downscale, 95.0).remux
+    assert plan_remux(make_info(width=640, height=360), downscale, 95.0).remux
+    # 'Agressiva' usa um terço dos quadros da fonte: copiar manteria todos
+    fewer_frames = resolve_settings("Agressiva (Menor Arquivo)", "H.264 (AVC)", "Original", None, None, 30.0)
+    assert not plan_remux(make_info(bit_rate=100_000), fewer_frames, 95.0).remux
+
+def test_target_size_bitrate_drives_decision():
+    settings = resolve_settings("Alta (Melhor Qualidade)", "H.264 (AVC)", "Original", None, None, 30.0)
+    settings.video_bitrate_kbps = 300
+    assert not plan_remux(make_info(bit_rate=400_000), settings, 95.0).remux
+    settings.video_bitrate_kbps = 500
+    assert plan_remux(make_info(bit_rate=400_000), settings, 95.0).remux
+
+def test_stream_plan_copies_fitting_audio_and_keeps_extra_tracks():
+    info = make_info()
+    info.streams += [
+        StreamInfo(index=1, codec_type="audio", codec_name="aac", bit_rate=96_000),
+        StreamInfo(index=2, codec_type="audio", codec_name="ac3", bit_rate=192_000),
+        StreamInfo(index=3, codec_type="audio", codec_name="opus", bit_rate=256_000),
+        StreamInfo(index=4, codec_type="subtitle", codec_name="subrip"),
+        StreamInfo(index=5, codec_type="subtitle", codec_name="hdmv_pgs_subtitle"),
+    ]
+    plan = plan_streams(info, "128k", "saida.mp4")
+    assert plan.map_args() == ['-map', '0:0', '-map', '0:1', '-map', '0:2', '-map', '0:3', '-map', '0:4']
+    assert plan.audio_codec_args("128k") == ['-c:a:0', 'copy', '-c:a:1', 'aac', '-b:a:1', '128k',
+                                             '-c:a:2', 'aac', '-b:a:2', '128k']
+    assert plan.subtitle_codec_args() == ['-c:s', 'mov_text']
+    assert plan.audio_kbps("128k") == 96 + 128 + 128
+    assert len(plan_streams(info, "128k", "saida.mkv").subtitles) == 2
@@ -0,0 +1,75 @@
+import sys
+import json
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from probe import MediaInfo, ProbeCache, parse_rate, probe, file_identity
+
+FFPROBE_OUTPUT = {
+    "streams": [
+        {"index": 0, "codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080,
+         "pix_fmt": "yuv420p", "avg_frame_rate": "30000/1001", "r_frame_rate": "60/1",
+         "nb_frames": "2700", "disposition": {"default": 1}},
+        {"index": 1, "codec_type": "audio", "codec_name": "aac", "bit_rate": "128000",
+         "sample_rate": "48000", "channels": 2, "channel_layout": "stereo",
+         "tags": {"language": "por"}},
+        {"index": 2, "codec_type": "video", "codec_name": "mjpeg", "disposition": {"attached_pic": 1}}
+    ],
+    "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "90.090000",
+               "size": "12000000", "bit_rate": "1065600"}
+}
+
+
+def test_parse_rate():
+    assert parse_rate("25/1") == 25.0
+    assert abs(parse_rate("30000/1001") - 29.97) < 0.01
+    assert parse_rate("0/0") is None
+    assert parse_rate(None) is None
+
+def test_media_info_from_ffprobe():
+    info = MediaInfo.from_ffprobe("video.mp4", FFPROBE_OUTPUT)
+    assert info.duration == 90.09
+    assert info.video.codec_name == "h264"
+    assert info.video.nb_frames == 2700
+    assert info.video.is_vfr
+    assert info.audio_streams[0].channel_layout == "stereo"
+    assert info.audio_streams[0].language == "por"
+    assert info.video_bit_rate == 1065600 - 128000
+    assert MediaInfo.from_dict(info.to_dict()) == info
+
+def test_probe_uses_disk_cache(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"0" * 10)
+    cache = ProbeCache(base_path=str(tmp_path))
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value = MagicMock(returncode=0, stdout=json.dumps(FFPROBE_OUTPUT), stderr="")
+        first = probe(str(video), ffprobe_path="ffprobe", cache=cache)
+        second = probe(str(video), ffprobe_path="ffprobe", cache=ProbeCache(base_path=str(tmp_path)))
+    assert mock_run.call_count == 1
+    assert first == second
+    assert mock_run.call_args[0][0][:5] == ["ffprobe", "-v", "error", "-print_format", "json"]
+
+def test_file_identity_changes_with_content(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"0" * 10)
+    before = file_identity(str(video))
+    video.write_bytes(b"0" * 20)
+    assert file_identity(str(video)) != before
+    assert file_identity(str(tmp_path / "missing.mp4")) is None
+
+def test_banner_fallback_lists_every_stream(tmp_path):
+    video = tmp_path / "video.mkv"
+    video.write_bytes(b"0" * 10)
+    banner = ("  Duration: 00:01:35.00, start: 0.000000, bitrate: 580 kb/s\n"
+              "  Stream #0:0: Video: h264 (High), yuv420p(progressive), 640x360 [SAR 1:1 DAR 16:9], 30 fps, 30 tbr, 1k tbn (default)\n"
+              "  Stream #0:1[0x2](eng): Audio: ac3, 48000 Hz, stereo, fltp, 192 kb/s (default)\n"
+              "  Stream #0:2(por): Subtitle: subrip (srt)\n")
+    with patch('subprocess.run') as mock_run, patch('probe.find_ffprobe', return_value=None):
+        mock_run.return_value = MagicMock(returncode=1, stdout="", stderr=banner)
+        info = probe(str(video), ffmpeg_path="ffmpeg", use_cache=False)
+    assert [s.codec_type for s in info.streams] == ["video", "audio", "subtitle"]
+    assert (info.video.width, info.video.height, info.video.fps) == (640, 360, 30.0)
+    assert info.audio_streams[0].bit_rate == 192000 and info.audio_streams[0].language == "eng"
+    assert info.subtitle_streams[0].codec_name == "subrip" and info.size == 10
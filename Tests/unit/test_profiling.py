@@ -0,0 +1,70 @@
+import os
+import sys
+import json
+import shutil
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.append(str(ROOT / "src"))
+
+from profiling import JobProfile, TraceRecorder, format_breakdown
+from engine import HeadlessEncoder
+
+
+def test_profile_sums_repeated_phases_and_switches():
+    profile = JobProfile()
+    for _ in range(2):
+        with profile.phase("encode"):
+            pass
+    profile.begin("encode")
+    profile.switch("encode", "faststart")
+    profile.switch("encode", "faststart")  # já trocada: ignorada
+    profile.end("faststart")
+    profile.end("faststart")
+    breakdown = profile.breakdown()
+    assert set(breakdown) == {"encode", "faststart", "other"}
+    assert all(seconds >= 0 for seconds in breakdown.values())
+    assert format_breakdown({'encode': 2.0, 'probe': 0.5, 'other': 0.1}).startswith("probe 0.50s | encode 2.00s")
+
+
+def test_trace_export_has_one_track_per_key(tmp_path):
+    tracer = TraceRecorder()
+    first = JobProfile(tracer, ('slot', 0), "Vaga 1")
+    second = JobProfile(tracer, ('slot', 0), "Vaga 1")
+    with first.phase("probe"):
+        pass
+    with second.phase("encode", mode="single"):
+        pass
+    tracer.counter("jobs", {'executando': 1})
+    path = tracer.export(str(tmp_path / "trace.json"))
+
+    events = json.loads(Path(path).read_text(encoding="utf-8"))['traceEvents']
+    phases = [e for e in events if e['ph'] == 'X']
+    assert [e['name'] for e in phases] == ["probe", "encode"]
+    assert phases[0]['tid'] == phases[1]['tid'] == first.tid
+    assert phases[1]['args'] == {'mode': "single"}
+    names = [e['args']['name'] for e in events if e['ph'] == 'M' and e['name'] == 'thread_name']
+    assert names == ["Vaga 1"]
+
+
+def test_encoder_reports_phase_breakdown(tmp_path, monkeypatch):
+    monkeypatch.setenv("COMPRESSOR_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("FAKE_FFMPEG_SECONDS", "0.3")
+    monkeypatch.setenv("FAKE_FFMPEG_FASTSTART_SECONDS", "0.2")
+    for name in ("ffmpeg", "ffprobe"):
+        shutil.copy(ROOT / "benchmarks" / "fake_ffmpeg.py", tmp_path / name)
+        os.chmod(tmp_path / name, 0o755)
+    source = tmp_path / "entrada.mp4"
+    source.write_bytes(b"\0" * 1024)
+
+    tracer = TraceRecorder()
+    encoder = HeadlessEncoder(str(tmp_path / "ffmpeg"), str(source), str(tmp_path / "saida.mp4"),
+                              force_reencode=True, profile=JobProfile(tracer, "job"))
+    summaries = []
+    encoder.result_ready.connect(summaries.append)
+    encoder.run()
+
+    phases = summaries[0]['phases']
+    assert {"probe", "spawn", "encode", "faststart", "verify"} <= set(phases)
+    assert phases['faststart'] >= 0.15
+    assert {e['name'] for e in tracer.events() if e['ph'] == 'X'} >= {"probe", "encode", "faststart"}
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from progress import ProgressParser
+
+BLOCK = """frame=120
+fps=59.94
+stream_0_0_q=28.0
+bitrate= 812.3kbits/s
+total_size=524288
+out_time_us=4000000
+out_time_ms=4000000
+out_time=00:00:04.000000
+dup_frames=0
+drop_frames=0
+speed=2.05x
+progress=continue
+"""
+
+
+def _feed(parser, text):
+    snapshots = []
+    for line in text.splitlines(True):
+        snapshot = parser.feed(line)
+        if snapshot is not None:
+            snapshots.append(snapshot)
+    return snapshots
+
+def test_parses_complete_block():
+    snapshots = _feed(ProgressParser(), BLOCK)
+    assert len(snapshots) == 1
+    snap = snapshots[0]
+    assert snap.frame == 120
+    assert snap.fps == 59.94
+    assert snap.out_seconds == 4.0
+    assert snap.total_size == 524288
+    assert snap.speed == 2.05
+    assert snap.bitrate_kbps == 812.3
+    assert not snap.finished
+
+def test_na_values_keep_last_known_value():
+    parser = ProgressParser()
+    _feed(parser, BLOCK)
+    snap = _feed(parser, "frame=150\nspeed=N/A\nbitrate=N/A\nprogress=end\n")[0]
+    assert snap.frame == 150
+    assert snap.speed == 2.05
+    assert snap.finished
+
+def test_partial_block_returns_nothing():
+    assert _feed(ProgressParser(), "frame=1\nfps=0.0\n") == []
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from quality import QualityScores, parse_scores, build_metric_graph
+
+FFMPEG_OUTPUT = """
+[Parsed_ssim_3 @ 0x1] SSIM Y:0.981 (17.2) U:0.990 (20.0) V:0.989 (19.6) All:0.984567 (18.1)
+[Parsed_psnr_4 @ 0x2] PSNR y:40.1 u:45.2 v:45.0 average:41.523400 min:38.0 max:44.9
+[Parsed_libvmaf_5 @ 0x3] VMAF score: 93.412345
+"""
+
+
+def test_parse_scores_with_vmaf_and_lossless_psnr():
+    scores = parse_scores(FFMPEG_OUTPUT)
+    assert scores == QualityScores(ssim=0.984567, psnr=41.5234, vmaf=93.412345)
+    lossless = parse_scores("SSIM Y:1 All:1.000000 (inf)\nPSNR y:inf average:inf min:inf")
+    assert lossless.psnr == 100.0 and lossless.vmaf is None
+    assert parse_scores("sem métricas") is None
+
+def test_build_metric_graph_subsamples_both_inputs():
+    graph = build_metric_graph("scale=640:360:flags=bicubic", 5, with_vmaf=False)
+    assert graph.count("select='not(mod(n\\,5))'") == 2
+    assert "[d0][r0]ssim;[d1][r1]psnr" in graph and "libvmaf" not in graph
+    assert build_metric_graph("null", 1, with_vmaf=True).endswith("split=3[r0][r1][r2];[d0][r0]ssim;[d1][r1]psnr;[d2][r2]libvmaf")
+
+def test_scores_round_trip_and_summary():
+    scores = QualityScores(ssim=0.95, psnr=38.456, vmaf=88.04)
+    assert QualityScores.from_dict(scores.to_dict()) == scores
+    assert scores.summary() == "SSIM 0.9500 | PSNR 38.46 dB | VMAF 88.0"
@@ -0,0 +1,99 @@
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from encoding import resolve_settings
+from segmented import SegmentedEncoder
+
+SPLIT_LIST = "src_00000.mkv,0.000000,40.040000\nsrc_00001.mkv,40.040000,80.080000\n\nsrc_00002.mkv,80.080000,120.000000\n"
+
+
+class FakeFFmpeg:
+    """Substitui SegmentedEncoder._run_ffmpeg: grava as saídas esperadas e registra os comandos."""
+
+    def __init__(self, segment_codes=None, on_segment=None):
+        self.commands = []
+        self.segment_codes = segment_codes or {}
+        self.on_segment = on_segment
+
+    def __call__(self, command, on_time=None):
+        self.commands.append(command)
+        if '-segment_list' in command:
+            Path(command[command.index('-segment_list') + 1]).write_text(SPLIT_LIST)
+            return 0, []
+        if on_time is not None:
+            index = int(Path(command[command.index('-i') + 1]).stem.split('_')[1])
+            if self.on_segment:
+                self.on_segment(index)
+            code = self.segment_codes.get(index, 0)
+            if code != 0:
+                return code, ["Conversion failed!"]
+        Path(command[-1]).write_bytes(b"x")
+        return 0, []
+
+    def kind(self, kind):
+        checks = {'audio': lambda c: '-vn' in c, 'concat': lambda c: 'concat' in c,
+                  'segment': lambda c: c[c.index('-i') + 1].endswith(".mkv")}
+        return [c for c in self.commands if checks[kind](c)]
+
+
+def make_encoder(tmp_path, **kwargs):
+    settings = resolve_settings("Média (Balanceado)", "H.264 (AVC)", "Original", None, None, 30.0)
+    return SegmentedEncoder("ffmpeg", str(tmp_path / "entrada.mp4"), str(tmp_path / "saida.mp4"),
+                            settings, 120.0, max_workers=2, **kwargs)
+
+
+def test_split_list_csv_becomes_segments(tmp_path):
+    encoder = make_encoder(tmp_path)
+    with patch.object(encoder, "_run_ffmpeg", FakeFFmpeg()):
+        segments = encoder._split(str(tmp_path))
+
+    assert segments == [(str(tmp_path / f"src_{i:05d}.mkv"), str(tmp_path / f"enc_{i:05d}.mkv")) for i in range(3)]
+    assert [round(encoder._segment_length[i], 2) for i in range(3)] == [40.04, 40.04, 39.92]
+
+
+def test_concat_list_escapes_quotes(tmp_path):
+    encoder = make_encoder(tmp_path)
+    fake = FakeFFmpeg()
+    with patch.object(encoder, "_run_ffmpeg", fake):
+        assert encoder._concat(str(tmp_path), ["/v/it's.mkv", "/v/b.mkv"], None) == 0
+
+    assert (tmp_path / "concat.txt").read_text() == "file '/v/it'\\''s.mkv'\nfile '/v/b.mkv'\n"
+    assert fake.commands[0][-1] == str(tmp_path / "saida.partial.mp4")
+    assert (tmp_path / "saida.mp4").exists()
+
+
+def test_audio_is_encoded_once_for_all_segments(tmp_path):
+    encoder = make_encoder(tmp_path)
+    fake = FakeFFmpeg()
+    with patch.object(encoder, "_run_ffmpeg", fake):
+        assert encoder.run() == 0
+
+    assert len(fake.kind('segment')) == 3
+    assert len(fake.kind('audio')) == 1
+    concat = fake.kind('concat')[0]
+    assert concat[concat.index('-map') + 3] == '1:a:0'
+    assert (tmp_path / "saida.mp4").exists()
+    assert not list(tmp_path.glob(".segments_*"))
+
+
+def test_cancel_and_failure_return_codes(tmp_path):
+    cancelled = {'value': False}
+    encoder = make_encoder(tmp_path, is_running=lambda: not cancelled['value'])
+    fake = FakeFFmpeg(segment_codes={0: 255}, on_segment=lambda index: cancelled.update(value=True))
+    with patch.object(encoder, "_run_ffmpeg", fake):
+        assert encoder.run() == -1
+    assert not fake.kind('concat')
+
+    messages = []
+    encoder = make_encoder(tmp_path, status_callback=lambda message, level: messages.append(message))
+    fake = FakeFFmpeg(segment_codes={1: 1})
+    with patch.object(encoder, "_run_ffmpeg", fake):
+        assert encoder.run() == 1
+    assert not fake.kind('concat')
+    assert any("Falha ao codificar o trecho 2" in message for message in messages)
+    assert not os.path.exists(tmp_path / "saida.mp4")
+    assert not list(tmp_path.glob(".segments_*"))
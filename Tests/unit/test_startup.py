@@ -0,0 +1,40 @@
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.append(str(ROOT / "src"))
+
+from config import check_config_paths
+from startup import (StartupTimer, FIRST_PAINT_BUDGET_MS, STARTUP_CHECK_ENV, MARK_IMPORTS,
+                     MARK_WINDOW, MARK_FIRST_PAINT, MARK_CONTROLLER, MARK_CHECKS)
+
+
+def test_timer_report_and_path_checks(tmp_path):
+    timer = StartupTimer()
+    timer.mark(MARK_IMPORTS)
+    timer.mark(MARK_FIRST_PAINT)
+    assert list(timer.marks()) == [MARK_IMPORTS, MARK_FIRST_PAINT]
+    assert timer.report().startswith(f"Inicialização: {MARK_IMPORTS} ")
+    assert "(+" in timer.report()
+    assert not timer.over_budget()
+
+    existing = tmp_path / "video.mp4"
+    existing.write_bytes(b"\0")
+    checked = check_config_paths({'ffmpeg_path': str(tmp_path / "ffmpeg"),
+                                  'recent_files': [str(existing), str(tmp_path / "sumiu.mp4")]})
+    assert checked == {'ffmpeg_path': None, 'recent_files': [str(existing)]}
+
+
+def test_first_paint_within_budget(tmp_path):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", COMPRESSOR_DATA_DIR=str(tmp_path))
+    env[STARTUP_CHECK_ENV] = "1"
+    result = subprocess.run([sys.executable, str(ROOT / "src" / "main.py")], env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    marks = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert list(marks) == [MARK_IMPORTS, MARK_WINDOW, MARK_FIRST_PAINT, MARK_CONTROLLER, MARK_CHECKS]
+    assert marks[MARK_FIRST_PAINT] <= FIRST_PAINT_BUDGET_MS, marks
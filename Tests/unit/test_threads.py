@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.append(str(ROOT / "src"))
+
+import threads
+from threads import cgroup_cpu_limit, plan_threads, thread_budget
+from encoding import resolve_settings
+from eta import output_size
+
+
+def test_cgroup_limits_usable_cores(tmp_path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert cgroup_cpu_limit(str(tmp_path)) is None
+    (tmp_path / "cpu.max").write_text("250000 100000\n")
+    assert cgroup_cpu_limit(str(tmp_path)) == 2.5
+
+    v1 = tmp_path / "v1"
+    (v1 / "cpu").mkdir(parents=True)
+    (v1 / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    (v1 / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert cgroup_cpu_limit(str(v1)) is None
+
+    with patch("threads.cgroup_cpu_limit", return_value=2.5), \
+            patch("threads.os.sched_getaffinity", return_value=set(range(16)), create=True):
+        assert threads.usable_cores() == 3
+    assert thread_budget(3, cores=16) == 5
+    assert thread_budget(32, cores=16) == 1
+
+
+def test_plans_per_codec_and_resolution():
+    x264 = plan_threads("libx264", 854, 480, 32)
+    assert x264.args() == ['-threads', '15']
+    assert plan_threads("libx264", 1920, 1080, 8).args() == ['-threads', '8']
+
+    x265 = plan_threads("libx265", 3840, 2160, 16)
+    assert (x265.x265_pools, x265.x265_frame_threads) == (16, 5)
+    assert x265.args() == []
+    settings = resolve_settings("Média (Balanceado)", "H.265 (HEVC)", "Original", None, None, 30.0)
+    settings.threads = plan_threads(settings.codec, 640, 360, 4)
+    args = settings.video_args()
+    assert args[args.index('-x265-params') + 1] == "log-level=error:pools=4:frame-threads=2"
+    assert '-threads' not in settings.video_args(with_threads=False)
+
+    # 1920 px: no máximo 4 colunas de 256 px; as outras threads vão para linhas
+    vp9 = plan_threads("libvpx-vp9", 1920, 1080, 8)
+    assert vp9.args() == ['-threads', '8', '-row-mt', '1', '-tile-columns', '2', '-tile-rows', '1']
+    # 640 px comportam só 2 colunas
+    small = plan_threads("libvpx-vp9", 640, 360, 8)
+    assert (small.tile_columns, small.tile_rows) == (1, 2)
+    assert plan_threads("libvpx-vp9", 1920, 1080, 1).args()[:4] == ['-threads', '1', '-row-mt', '0']
+
+    # Trechos paralelos dividem a cota do job
+    assert vp9.split(4).threads == 2
+
+
+def test_output_size_follows_scale_filter():
+    settings = resolve_settings("Média (Balanceado)", "VP9", "720p (HD)", None, None, 30.0)
+    assert output_size(settings, 3840, 2160) == (1280, 720)
+    custom = resolve_settings("Média (Balanceado)", "VP9", "Personalizado...", (800, 600), None, 30.0)
+    assert output_size(custom, 1920, 1080) == (800, 600)
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QImage
+
+from thumbnails import ThumbnailCache
+
+
+def _image():
+    image = QImage(64, 36, QImage.Format.Format_RGB32)
+    image.fill(0)
+    return image
+
+def test_cache_evicts_least_recently_used(qtbot):
+    cache = ThumbnailCache(max_entries=2)
+    cache.put("a", _image())
+    cache.put("b", _image())
+    assert cache.get("a") is not None
+    cache.put("c", _image())
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert len(cache) == 2
+
+def test_scaled_pixmap_is_reused_until_size_changes(qtbot):
+    cache = ThumbnailCache()
+    entry = cache.put("a", _image(), duration=12.0)
+    first = cache.scaled(entry, QSize(32, 32))
+    assert cache.scaled(entry, QSize(32, 32)) is first
+    assert first.width() == 32
+    bigger = cache.scaled(entry, QSize(128, 128))
+    assert bigger is not first
+    assert bigger.width() == 128
@@ -0,0 +1,106 @@
+import os
+import shutil
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from encoding import resolve_settings, parse_bitrate_kbps
+from twopass import FirstPassCache, TargetSizeError, compute_video_bitrate, pass_args, x265_stats_path
+from engine import HeadlessEncoder
+
+
+def test_parse_bitrate_kbps():
+    assert parse_bitrate_kbps("128k") == 128
+    assert parse_bitrate_kbps("1.5M") == 1500
+    assert parse_bitrate_kbps("96000") == 96
+
+def test_compute_video_bitrate_subtracts_audio():
+    with_audio = compute_video_bitrate(10, 100, "128k")
+    without_audio = compute_video_bitrate(10, 100, "128k", has_audio=False)
+    assert without_audio - with_audio == 128
+    assert (with_audio + 128) * 100 / 8 / 1024 < 10 * 1.024
+
+def test_compute_video_bitrate_rejects_impossible_target():
+    with pytest.raises(TargetSizeError):
+        compute_video_bitrate(1, 600, "128k")
+    with pytest.raises(TargetSizeError):
+        compute_video_bitrate(10, 0, "128k")
+
+def test_bitrate_replaces_crf_in_video_args():
+    settings = resolve_settings("Média (Balanceado)", "H.264 (AVC)", "Original", None, None, 30.0)
+    settings.video_bitrate_kbps = 850
+    args = settings.video_args()
+    assert args[args.index('-b:v') + 1] == "850k"
+    assert '-crf' not in args
+    assert pass_args(2, "/tmp/x") == ['-pass', '2', '-passlogfile', '/tmp/x']
+
+def test_first_pass_cache_key_and_prune(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"0" * 10)
+    cache = FirstPassCache(base_path=str(tmp_path), max_entries=1)
+    settings = resolve_settings("Média (Balanceado)", "H.264 (AVC)", "Original", None, None, 30.0)
+    key = cache.key(str(video), settings)
+    settings_720 = resolve_settings("Média (Balanceado)", "H.264 (AVC)", "720p (HD)", None, None, 30.0)
+    assert cache.key(str(video), settings_720) != key
+
+    settings.video_bitrate_kbps = 500
+    assert cache.key(str(video), settings) == key
+    assert not cache.has_stats(key)
+    Path(cache.passlog_prefix(key) + "-0.log").write_text("stats")
+    cache.mark_done(key)
+    assert cache.has_stats(key)
+
+    other = cache.key(str(video), settings_720)
+    Path(cache.passlog_prefix(other) + "-0.log").write_text("stats")
+    cache.mark_done(other)
+    assert cache.has_stats(other)
+    assert len(list(Path(cache.directory).glob("*.done"))) == 1
+
+
+def test_x265_passes_go_in_x265_params(tmp_path):
+    encoder = HeadlessEncoder("ffmpeg", "in.mp4", "out.mp4", codec="H.265 (HEVC)")
+    settings = resolve_settings("Média (Balanceado)", "H.265 (HEVC)", "Original", None, None, 30.0)
+    settings.video_bitrate_kbps = 900
+    prefix = str(tmp_path / "chave")
+    first, second = encoder._two_pass_commands(settings, prefix)
+
+    stats = x265_stats_path(prefix).replace(':', '\\:')
+    assert first[first.index('-x265-params') + 1] == f"log-level=error:pass=1:stats={stats}"
+    assert second[second.index('-x265-params') + 1] == f"log-level=error:pass=2:stats={stats}"
+    assert '-pass' not in first and '-passlogfile' not in second
+    assert first[-3:] == ['-f', 'null', '-'] and second[-1] == "out.mp4"
+    assert first[first.index('-b:v') + 1] == second[second.index('-b:v') + 1] == "900k"
+
+    # O '-0.log' vazio que o FFmpeg deixa para o libx265 não conta como análise
+    cache = FirstPassCache(base_path=str(tmp_path))
+    key = cache.key(__file__, settings)
+    Path(cache.passlog_prefix(key) + "-0.log").write_text("")
+    cache.mark_done(key)
+    assert not cache.has_stats(key, "libx265") and not cache.has_stats(key)
+    Path(x265_stats_path(cache.passlog_prefix(key))).write_text("#options: ...")
+    assert cache.has_stats(key, "libx265")
+
+    x264 = resolve_settings("Média (Balanceado)", "H.264 (AVC)", "Original", None, None, 30.0)
+    first, _ = encoder._two_pass_commands(x264, prefix)
+    assert first[first.index('-pass'):first.index('-pass') + 4] == ['-pass', '1', '-passlogfile', prefix]
+
+
+def test_impossible_target_finishes_job_once(tmp_path, monkeypatch):
+    import capabilities
+    for name in ("ffmpeg", "ffprobe"):
+        shutil.copy(Path(__file__).parent.parent.parent / "benchmarks" / "fake_ffmpeg.py", tmp_path / name)
+        os.chmod(tmp_path / name, 0o755)
+    monkeypatch.setattr(capabilities, "_DEFAULT_CACHE", capabilities.CapabilitiesCache(str(tmp_path)))
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\0" * 1024)
+
+    # 60 s de mídia: só o áudio já passa de 0,5 MB
+    encoder = HeadlessEncoder(str(tmp_path / "ffmpeg"), str(video), str(tmp_path / "saida.mp4"), target_size_mb=0.5)
+    finished, errors = [], []
+    encoder.finished.connect(lambda *args: finished.append(args[0]))
+    encoder.error_occurred.connect(lambda title, message: errors.append(title))
+    encoder.run()
+    assert errors == ["Tamanho Alvo Inválido"]
+    assert finished == [1]
@@ -0,0 +1,77 @@
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from cli import JsonEventWriter
+from watcher import (FolderProfile, InotifySource, PollingSource, ProcessedStore,
+                     StabilityTracker, WatchDaemon, file_signature)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_profile_mirrors_subfolders(tmp_path):
+    profile = FolderProfile.from_dict({'path': str(tmp_path / "in"), 'output': str(tmp_path / "out"),
+                                       'quality': "media", 'codec': "h265", 'resolution': "640x360"})
+    settings = profile.job_settings(str(tmp_path / "in" / "sala1" / "cam.mkv"))
+    assert settings.output_file == str(tmp_path / "out" / "sala1" / "cam_comprimido.mp4")
+    assert settings.codec == "H.265 (HEVC)" and settings.custom_res == (640, 360)
+    with pytest.raises(ValueError):
+        FolderProfile.from_dict({'path': "a", 'output': "b", 'codec': "mpeg2"})
+
+def test_tracker_waits_for_stable_size(tmp_path):
+    clock = FakeClock()
+    tracker = StabilityTracker(settle_seconds=5, clock=clock)
+    video = tmp_path / "cam.mp4"
+    video.write_bytes(b"x" * 10)
+    tracker.observe(str(video))
+    clock.now = 4
+    assert tracker.pop_stable() == []
+    with open(video, 'ab') as f:
+        f.write(b"y")
+    clock.now = 8
+    assert tracker.pop_stable() == []
+    clock.now = 13
+    assert tracker.pop_stable() == [str(video)]
+    assert len(tracker) == 0
+
+def test_processed_store_survives_restart_until_file_changes(tmp_path):
+    video = tmp_path / "cam.mp4"
+    video.write_bytes(b"x" * 10)
+    ProcessedStore(str(tmp_path)).record(str(video), file_signature(str(video)), "saida.mp4", 0)
+    assert ProcessedStore(str(tmp_path)).is_processed(str(video))
+    video.write_bytes(b"x" * 20)
+    assert not ProcessedStore(str(tmp_path)).is_processed(str(video))
+
+def test_daemon_skips_outputs_and_non_videos(tmp_path):
+    profile = FolderProfile.from_dict({'path': str(tmp_path), 'output': str(tmp_path / "out")})
+    daemon = WatchDaemon("ffmpeg", [profile], 1, JsonEventWriter(stream=io.StringIO()),
+                         store=ProcessedStore(str(tmp_path / "state")), source=PollingSource())
+    assert daemon.is_candidate(str(tmp_path / "sala" / "cam.MKV"))
+    assert not daemon.is_candidate(str(tmp_path / "notas.txt"))
+    assert not daemon.is_candidate(str(tmp_path / "out" / "cam_comprimido.mp4"))
+    assert not daemon.is_candidate(str(tmp_path / "cam.partial.mp4"))
+    assert not daemon.is_candidate(str(tmp_path / "x.mp4.parts" / "seg000.mkv"))
+
+@pytest.mark.skipif(not InotifySource.available(), reason="inotify só existe no Linux")
+def test_inotify_reports_files_in_new_subfolders(tmp_path):
+    source = InotifySource([str(tmp_path)])
+    try:
+        (tmp_path / "nova").mkdir()
+        seen = source.wait(1.0)
+        (tmp_path / "nova" / "cam.mp4").write_bytes(b"x")
+        deadline = time.monotonic() + 2
+        while str(tmp_path / "nova" / "cam.mp4") not in seen and time.monotonic() < deadline:
+            seen += source.wait(0.2)
+        assert str(tmp_path / "nova" / "cam.mp4") in seen
+    finally:
+        source.close()
@@ -56,15 +56,22 @@ def test_worker_stop_with_kill(worker):
 def test_run_successful(mock_get_info, mock_popen, mock_isfile, worker):
     mock_get_info.return_value = (10, 1920, 1080, 30)
     mock_proc = MagicMock()
-    mock_proc.stderr.readline.side_effect = ["time=00:00:01.00", "time=00:00:02.00", ""]
+    mock_proc.stderr.readline.side_effect = ["frame=25 fps=25 time=00:00:01.00", ""]
+    mock_proc.stdout.readline.side_effect = ["out_time_us=1000000\n", "progress=continue\n",
+                                             "out_time_us=2000000\n", "progress=end\n", ""]
     mock_proc.poll.return_value = 0
     mock_proc.returncode = 0  # Adicionado para simular sucesso
     mock_popen.return_value = mock_proc
 
+    progress = []
+    worker.progress_updated.connect(lambda percent, eta: progress.append(percent))
     worker.run()
     assert mock_popen.called
     assert worker.process == mock_proc
     mock_proc.stderr.readline.assert_called()
+    command = mock_popen.call_args[0][0]
+    assert command[command.index('-progress') + 1] == 'pipe:1'
+    assert progress[-1] == 100
 
 @patch('os.path.isfile', return_value=True)
 @patch('subprocess.Popen')
@@ -82,6 +89,7 @@ def test_run_with_ffmpeg_error(mock_get_info, mock_popen, mock_isfile, worker):
     mock_get_info.return_value = (10, 1920, 1080, 30)
     mock_proc = MagicMock()
     mock_proc.stderr.readline.side_effect = ["time=00:00:01.00", "[error] Something went wrong", ""]
+    mock_proc.stdout.readline.side_effect = ["out_time_us=1000000\n", "progress=continue\n", ""]
     mock_proc.poll.return_value = 1
     mock_proc.returncode = 1  # Adicionado para simular erro
     mock_popen.return_value = mock_proc
@@ -106,6 +114,7 @@ def test_run_with_size_comparison(mock_get_info, mock_popen, mock_isfile, mock_g
     mock_get_info.return_value = (30, 1920, 1080, 30)
     mock_proc = MagicMock()
     mock_proc.stderr.readline.side_effect = ["time=00:00:01.00", ""]
+    mock_proc.stdout.readline.side_effect = ["out_time_us=1000000\n", "progress=end\n", ""]
     mock_proc.poll.return_value = 0
     mock_proc.returncode = 0  # Garante que o processo terminou com sucesso
     mock_popen.return_value = mock_proc
@@ -132,7 +141,7 @@ def test_run_with_size_comparison(mock_get_info, mock_popen, mock_isfile, mock_g
     assert mock_getsize.call_args_list[1][0][0] == worker.output_file
 
 def test_get_video_info_success(worker):
-    with patch('subprocess.run') as mock_run:
+    with patch('probe.find_ffprobe', return_value=None), patch('subprocess.run') as mock_run:
         mock_run.return_value.stderr = (
             "Duration: 00:01:30.50\n"
             "Stream #0:0: Video: h264, 1280x720, 25 fps\n"
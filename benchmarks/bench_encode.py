@@ -0,0 +1,317 @@
+"""Benchmark de throughput de codificação, reproduzível e sem arquivos externos.
+
+Gera entradas sintéticas com as fontes 'lavfi' do FFmpeg (movimento, ruído, slides
+estáticos; resoluções e durações variadas), roda cada combinação de codec x preset de
+qualidade x resolução que o CompressionWorker oferece e grava fps, fator de tempo
+real, tempo de CPU, pico de memória e bytes de saída num JSON.
+
+Uso, a partir da raiz do repositório:
+    python benchmarks/bench_encode.py --ffmpeg /caminho/ffmpeg
+    python benchmarks/bench_encode.py --codec h264 --quality agressiva --save-baseline
+    python benchmarks/bench_encode.py --compare benchmarks/baseline.json
+
+Com --compare, casos mais lentos, mais pesados, com tamanho diferente ou com comando
+FFmpeg diferente do baseline são listados e o código de saída é 1. Tempos só são
+comparáveis na mesma máquina e com a mesma versão do FFmpeg.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from cli import CODEC_CHOICES, QUALITY_CHOICES, RESOLUTION_CHOICES, resolve_ffmpeg_path
+from encoding import RESOLUTION_FILTERS
+from engine import HeadlessEncoder
+
+BENCH_DIR = Path(__file__).resolve().parent
+INPUTS_DIR = BENCH_DIR / "inputs"
+RESULTS_DIR = BENCH_DIR / "results"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+RESULTS_VERSION = 1
+
+# Tolerâncias da comparação: tempo varia com a carga da máquina; tamanho de saída
+# só muda se o comando (ou o FFmpeg) mudar
+DEFAULT_TIME_TOLERANCE = 0.15
+DEFAULT_RSS_TOLERANCE = 0.25
+DEFAULT_SIZE_TOLERANCE = 0.02
+
+
+@dataclass
+class BenchInput:
+    """Entrada sintética: grafo lavfi de vídeo, dimensões e duração."""
+    name: str
+    graph: str
+    height: int
+    duration: int
+
+    @property
+    def path(self) -> Path:
+        return INPUTS_DIR / f"{self.name}.mp4"
+
+
+BENCH_INPUTS = [
+    # Movimento contínuo, caso típico de gravação de tela/câmera
+    BenchInput("movimento_720p", "testsrc2=s=1280x720:r=30", 720, 10),
+    # Ruído temporal: pior caso para o encoder (quase nada se repete entre quadros)
+    BenchInput("ruido_480p", "testsrc2=s=854x480:r=30,noise=alls=60:allf=t+u", 480, 8),
+    # Slides: imagem parada que troca a cada 2 s
+    BenchInput("slides_1080p", "testsrc=s=1920x1080:r=0.5,fps=30", 1080, 12),
+    BenchInput("curto_360p", "testsrc2=s=640x360:r=30", 360, 4),
+]
+
+
+@dataclass
+class BenchCase:
+    input: BenchInput
+    codec: str
+    quality: str
+    resolution: str
+
+    @property
+    def case_id(self) -> str:
+        return f"{self.input.name}/{self.codec}/{self.quality}/{self.resolution}"
+
+
+def _resolution_height(resolution_key: str) -> Optional[int]:
+    scale = RESOLUTION_FILTERS.get(RESOLUTION_CHOICES[resolution_key], "")
+    return int(scale.rsplit(':', 1)[1]) if scale else None
+
+
+def build_cases(inputs=None, codecs=None, qualities=None, resolutions=None) -> List[BenchCase]:
+    """Matriz de casos; resoluções acima da da entrada (que só ampliariam) ficam de fora."""
+    cases = []
+    for bench_input in BENCH_INPUTS:
+        if inputs and bench_input.name not in inputs:
+            continue
+        for codec in sorted(codecs or CODEC_CHOICES):
+            for quality in sorted(qualities or QUALITY_CHOICES):
+                for resolution in sorted(resolutions or RESOLUTION_CHOICES):
+                    height = _resolution_height(resolution)
+                    if height is not None and height > bench_input.height:
+                        continue
+                    cases.append(BenchCase(bench_input, codec, quality, resolution))
+    return cases
+
+
+def ffmpeg_version(ffmpeg_path: str) -> str:
+    try:
+        output = subprocess.run([ffmpeg_path, '-hide_banner', '-version'], capture_output=True,
+                                text=True, timeout=10).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return "desconhecida"
+    return output.splitlines()[0] if output else "desconhecida"
+
+
+def generate_input(ffmpeg_path: str, bench_input: BenchInput) -> Path:
+    """Gera a entrada (H.264 quase sem perdas + AAC) uma vez; reaproveita nas execuções seguintes."""
+    if bench_input.path.exists():
+        return bench_input.path
+    INPUTS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = bench_input.path.with_suffix(".tmp.mp4")
+    command = [
+        ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-y',
+        '-f', 'lavfi', '-i', bench_input.graph,
+        '-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=48000',
+        '-t', str(bench_input.duration),
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '12', '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-b:a', '192k', str(tmp_path)
+    ]
+    subprocess.run(command, check=True)
+    os.replace(tmp_path, bench_input.path)
+    return bench_input.path
+
+
+def _normalize_command(command: str, input_file: str, output_file: str, ffmpeg_path: str) -> str:
+    return command.replace(output_file, "{saida}").replace(input_file, "{entrada}").replace(ffmpeg_path, "ffmpeg")
+
+
+def run_once(ffmpeg_path: str, case: BenchCase, work_dir: str) -> Dict:
+    input_file = str(case.input.path)
+    output_file = os.path.join(work_dir, f"{case.case_id.replace('/', '_')}.mp4")
+    encoder = HeadlessEncoder(ffmpeg_path, input_file, output_file,
+                              quality_preset=QUALITY_CHOICES[case.quality],
+                              codec=CODEC_CHOICES[case.codec],
+                              resolution=RESOLUTION_CHOICES[case.resolution],
+                              force_reencode=True)
+    outcome = {'commands': [], 'errors': []}
+    encoder.status_message.connect(
+        lambda message, level: outcome['commands'].append(message.split(": ", 1)[1])
+        if level == HeadlessEncoder.CMD else None)
+    encoder.error_occurred.connect(lambda title, message: outcome['errors'].append(f"{title}: {message}"))
+    encoder.result_ready.connect(lambda summary: outcome.update(summary=summary))
+    encoder.finished.connect(lambda code, *_: outcome.update(return_code=code))
+
+    start = time.perf_counter()
+    encoder.run()
+    wall_seconds = time.perf_counter() - start
+
+    return_code = outcome.get('return_code', 1)
+    summary = outcome.get('summary') or {}
+    if return_code != 0 or not summary:
+        return {'return_code': return_code, 'errors': outcome['errors']}
+    frames = summary['duration_seconds'] * summary['output_fps']
+    result = {
+        'return_code': 0,
+        'wall_seconds': round(wall_seconds, 3),
+        'fps': round(frames / wall_seconds, 2),
+        'realtime': round(summary['duration_seconds'] / wall_seconds, 3),
+        'cpu_seconds': summary['cpu_seconds'],
+        'peak_rss_mb': summary['peak_rss_mb'],
+        'bytes_out': os.path.getsize(output_file),
+        'command': " && ".join(_normalize_command(c, input_file, output_file, ffmpeg_path)
+                               for c in outcome['commands']),
+    }
+    os.remove(output_file)
+    return result
+
+
+def run_case(ffmpeg_path: str, case: BenchCase, repeat: int, work_dir: str) -> Dict:
+    """Roda o caso 'repeat' vezes e fica com a execução de tempo mediano."""
+    runs = []
+    for _ in range(max(1, repeat)):
+        result = run_once(ffmpeg_path, case, work_dir)
+        if result['return_code'] != 0:
+            return result
+        runs.append(result)
+    median_wall = statistics.median_low(run['wall_seconds'] for run in runs)
+    chosen = next(run for run in runs if run['wall_seconds'] == median_wall)
+    chosen['repeat'] = len(runs)
+    return chosen
+
+
+def compare_results(current: Dict, baseline: Dict, time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+                    rss_tolerance: float = DEFAULT_RSS_TOLERANCE,
+                    size_tolerance: float = DEFAULT_SIZE_TOLERANCE) -> List[Dict]:
+    """Regressões de 'current' em relação a 'baseline' (mesmo formato do JSON de resultados)."""
+    regressions = []
+
+    def _check(case_id, metric, base, now, tolerance, higher_is_better=False, both_ways=False):
+        if not base:
+            return
+        change = (now - base) / base
+        worse = -change if higher_is_better else change
+        if worse > tolerance or (both_ways and abs(change) > tolerance):
+            regressions.append({'case': case_id, 'metric': metric, 'baseline': base,
+                                'current': now, 'change': round(change, 4)})
+
+    for case_id, now in current.get('cases', {}).items():
+        base = baseline.get('cases', {}).get(case_id)
+        if not base or base.get('return_code') != 0:
+            continue
+        if now.get('return_code') != 0:
+            regressions.append({'case': case_id, 'metric': 'return_code', 'baseline': 0,
+                                'current': now.get('return_code'), 'change': None})
+            continue
+        if now['command'] != base['command']:
+            regressions.append({'case': case_id, 'metric': 'command', 'baseline': base['command'],
+                                'current': now['command'], 'change': None})
+        _check(case_id, 'fps', base['fps'], now['fps'], time_tolerance, higher_is_better=True)
+        _check(case_id, 'cpu_seconds', base['cpu_seconds'], now['cpu_seconds'], time_tolerance)
+        _check(case_id, 'peak_rss_mb', base['peak_rss_mb'], now['peak_rss_mb'], rss_tolerance)
+        # Arquivo menor também é suspeito: pode ser perda de qualidade por comando errado
+        _check(case_id, 'bytes_out', base['bytes_out'], now['bytes_out'], size_tolerance, both_ways=True)
+    return regressions
+
+
+def format_regression(regression: Dict) -> str:
+    if regression['change'] is None:
+        return (f"{regression['case']}: {regression['metric']} mudou\n"
+                f"    antes:  {regression['baseline']}\n    agora:  {regression['current']}")
+    return (f"{regression['case']}: {regression['metric']} {regression['baseline']} -> "
+            f"{regression['current']} ({regression['change'] * 100:+.1f}%)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark de throughput de codificação")
+    parser.add_argument('--ffmpeg', help="Caminho do executável FFmpeg")
+    parser.add_argument('--input', action='append', choices=[i.name for i in BENCH_INPUTS],
+                        help="Só estas entradas (pode repetir)")
+    parser.add_argument('--codec', action='append', choices=sorted(CODEC_CHOICES))
+    parser.add_argument('--quality', action='append', choices=sorted(QUALITY_CHOICES))
+    parser.add_argument('--resolution', action='append', choices=sorted(RESOLUTION_CHOICES))
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="Execuções por caso; vale a de tempo mediano")
+    parser.add_argument('-o', '--output', help="Arquivo JSON de resultados (padrão: benchmarks/results/)")
+    parser.add_argument('--compare', nargs='?', const=str(DEFAULT_BASELINE), metavar='BASELINE',
+                        help="Compara com um baseline (padrão: benchmarks/baseline.json)")
+    parser.add_argument('--save-baseline', nargs='?', const=str(DEFAULT_BASELINE), metavar='ARQUIVO',
+                        help="Grava os resultados também como baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TIME_TOLERANCE,
+                        help="Piora tolerada em fps e tempo de CPU (fração)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    ffmpeg_path = resolve_ffmpeg_path(args.ffmpeg)
+    if not ffmpeg_path:
+        print("FFmpeg não encontrado. Use --ffmpeg.", file=sys.stderr)
+        return 2
+
+    cases = build_cases(args.input, args.codec, args.quality, args.resolution)
+    results = {
+        'version': RESULTS_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'ffmpeg': ffmpeg_version(ffmpeg_path),
+        'machine': {'platform': platform.platform(), 'processor': platform.processor(),
+                    'cpu_count': os.cpu_count(), 'python': platform.python_version()},
+        'cases': {},
+    }
+    for bench_input in {case.input.name: case.input for case in cases}.values():
+        generate_input(ffmpeg_path, bench_input)
+
+    work_dir = tempfile.mkdtemp(prefix="bench_encode_")
+    try:
+        for number, case in enumerate(cases, 1):
+            result = run_case(ffmpeg_path, case, args.repeat, work_dir)
+            results['cases'][case.case_id] = result
+            if result['return_code'] == 0:
+                print(f"[{number}/{len(cases)}] {case.case_id}: {result['fps']:.1f} fps, "
+                      f"{result['realtime']:.2f}x, CPU {result['cpu_seconds']:.2f}s, "
+                      f"{result['peak_rss_mb']:.0f} MB, {result['bytes_out']} bytes", flush=True)
+            else:
+                print(f"[{number}/{len(cases)}] {case.case_id}: FALHOU ({result['return_code']}) "
+                      f"{'; '.join(result.get('errors', []))}", flush=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"Resultados: {output}")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"Baseline gravado: {args.save_baseline}")
+
+    exit_code = 0 if all(r['return_code'] == 0 for r in results['cases'].values()) else 1
+    if args.compare:
+        try:
+            baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Baseline ilegível ({args.compare}): {e}", file=sys.stderr)
+            return 2
+        if baseline.get('ffmpeg') != results['ffmpeg']:
+            print(f"Aviso: baseline gerado com outro FFmpeg ({baseline.get('ffmpeg')}).")
+        regressions = compare_results(results, baseline, time_tolerance=args.tolerance)
+        for regression in regressions:
+            print(format_regression(regression))
+        compared = len(set(results['cases']) & set(baseline.get('cases', {})))
+        print(f"{compared} caso(s) comparado(s), {len(regressions)} regressão(ões).")
+        if regressions:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""FFmpeg de mentira para testes de carga: não codifica nada, só imita a saída.
+
+Entende o suficiente da linha de comando que o app monta:
+    ffmpeg -i ARQUIVO                  cabeçalho de análise no stderr (como o probe espera)
+    ffmpeg ... -progress pipe:1 SAIDA  blocos de '-progress' no stdout, linhas de log no
+                                       stderr e, com -benchmark, as linhas 'bench:' no fim
+    ffprobe ... ARQUIVO                JSON no formato do '-print_format json' (se chamado
+                                       por um link/cópia com nome 'ffprobe')
+    ffmpeg -version/-encoders/-filters listagens no formato do FFmpeg
+
+O ritmo é configurado por variáveis de ambiente:
+    FAKE_FFMPEG_SECONDS        duração real de cada "codificação" (padrão 5)
+    FAKE_FFMPEG_PROGRESS_HZ    blocos de progresso por segundo (padrão 2, como o FFmpeg)
+    FAKE_FFMPEG_STDERR_HZ      linhas de log por segundo durante a codificação (padrão 10)
+    FAKE_FFMPEG_MEDIA_SECONDS  duração da mídia informada no probe (padrão 60)
+    FAKE_FFMPEG_FAIL           1 = termina com código 1 depois de metade do tempo
+    FAKE_FFMPEG_FASTSTART_SECONDS  com '+faststart', tempo da reescrita do moov no fim (padrão 0)
+    FAKE_FFMPEG_ENCODERS       codificadores de vídeo listados, separados por vírgula
+                               (padrão libx264,libx265,libvpx-vp9)
+"""
+import os
+import sys
+import json
+import time
+
+FPS = 30.0
+WIDTH, HEIGHT = 1920, 1080
+VIDEO_KBPS = 8000
+AUDIO_KBPS = 192
+
+INPUT_BANNER = """Input #0, mov,mp4,m4a,3gp,3g2,mj2, from '{path}':
+  Metadata:
+    major_brand     : isom
+    minor_version   : 512
+    compatible_brands: isomiso2avc1mp41
+    encoder         : Lavf61.1.100
+  Duration: {duration}, start: 0.000000, bitrate: {total_kbps} kb/s
+  Stream #0:0[0x1](und): Video: h264 (High) (avc1 / 0x31637661), yuv420p(progressive), {width}x{height} [SAR 1:1 DAR 16:9], {video_kbps} kb/s, 30 fps, 30 tbr, 15360 tbn (default)
+      Metadata:
+        handler_name    : VideoHandler
+        vendor_id       : [0][0][0][0]
+  Stream #0:1[0x2](und): Audio: aac (LC) (mp4a / 0x6134706D), 48000 Hz, stereo, fltp, {audio_kbps} kb/s (default)
+      Metadata:
+        handler_name    : SoundHandler
+        vendor_id       : [0][0][0][0]"""
+
+ENCODE_HEADER = """Stream mapping:
+  Stream #0:0 -> #0:0 (h264 (native) -> h264 (libx264))
+  Stream #0:1 -> #0:1 (aac (native) -> aac (native))
+[libx264 @ 0x55d0c3a1e2c0] using SAR=1/1
+[libx264 @ 0x55d0c3a1e2c0] using cpu capabilities: MMX2 SSE2Fast SSSE3 SSE4.2 AVX FMA3 BMI2 AVX2
+[libx264 @ 0x55d0c3a1e2c0] profile High, level 4.0, 4:2:0, 8-bit
+[libx264 @ 0x55d0c3a1e2c0] 264 - core 164 r3191 4613ac3 - H.264/MPEG-4 AVC codec - Copyleft 2003-2024 - http://www.videolan.org/x264.html - options: cabac=1 ref=1 deblock=1:0:0 analyse=0x3:0x113 me=hex subme=2 psy=1 psy_rd=1.00:0.00 mixed_ref=0 me_range=16 chroma_me=1 trellis=0 8x8dct=1 cqm=0 deadzone=21,11 fast_pskip=1 chroma_qp_offset=0 threads=12 lookahead_threads=2 sliced_threads=0 nr=0 decimate=1 interlaced=0 bluray_compat=0 constrained_intra=0 bframes=3 b_pyramid=2 b_adapt=1 b_bias=0 direct=1 weightb=1 open_gop=0 weightp=1 keyint=250 keyint_min=25 scenecut=40 intra_refresh=0 rc_lookahead=10 rc=crf mbtree=1 crf=28.0 qcomp=0.60 qpmin=0 qpmax=69 qpstep=4 ip_ratio=1.40 aq=1:1.00
+Output #0, mp4, to '{path}':
+  Metadata:
+    encoder         : Lavf61.1.100
+  Stream #0:0(und): Video: h264 (avc1 / 0x31637661), yuv420p(progressive), {width}x{height}, q=2-31, 30 fps, 15360 tbn (default)
+  Stream #0:1(und): Audio: aac (LC) (mp4a / 0x6134706D), 48000 Hz, stereo, fltp, 128 kb/s (default)"""
+
+ENCODERS_HEADER = """Encoders:
+ V..... = Video
+ A..... = Audio
+ S..... = Subtitle
+ .F.... = Frame-level multithreading
+ ..S... = Slice-level multithreading
+ ...X.. = Codec is experimental
+ ....B. = Supports draw_horiz_band
+ .....D = Supports direct rendering method 1
+ ------"""
+
+FILTERS_LISTING = """Filters:
+  T.. = Timeline support
+  .S. = Slice threading
+  ..C = Command support
+  A = Audio input/output
+  V = Video input/output
+  N = Dynamic number and/or type of input/output
+  | = Source or sink filter
+ ... null              V->V       Pass the source unchanged to the output.
+ TS. scale             V->V       Scale the input video size and/or convert the image format.
+ ... select            V->N       Select video frames to pass in output.
+ ... settb             V->V       Set timebase for the video output link.
+ ... setpts            V->V       Set PTS for the output video frame.
+ ... split             V->N       Pass on the input to N video outputs.
+ TS. ssim              VV->V      Calculate the SSIM between two video streams.
+ TS. psnr              VV->V      Calculate the PSNR between two video streams."""
+
+# Avisos que decodificadores reais soltam no meio da codificação
+RUNNING_LINES = [
+    "[h264 @ 0x55d0c3a4b100] mmco: unref short failure",
+    "[mp4 @ 0x55d0c3a1c9c0] Non-monotonic DTS; previous: 1234, current: 1200; changing to 1235.",
+    "Past duration 0.999992 too large",
+    "[aac @ 0x55d0c3a30e80] Queue input is backward in time",
+]
+
+ENCODE_SUMMARY = """[out#0/mp4 @ 0x55d0c3a1c9c0] video:{video_kb}KiB audio:{audio_kb}KiB subtitle:0KiB other streams:0KiB global headers:0KiB muxing overhead: 0.412345%
+frame={frames} fps={fps:.0f} q=-1.0 Lsize={size_kb}KiB time={time} bitrate={kbps:.1f}kbits/s speed={speed:.2f}x
+[libx264 @ 0x55d0c3a1e2c0] frame I:12    Avg QP:22.41  size: 48212
+[libx264 @ 0x55d0c3a1e2c0] frame P:520   Avg QP:25.10  size:  9421
+[libx264 @ 0x55d0c3a1e2c0] frame B:1268  Avg QP:27.88  size:  2210
+[libx264 @ 0x55d0c3a1e2c0] kb/s:1021.42
+[aac @ 0x55d0c3a30e80] Qavg: 512.331"""
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _timestamp(seconds):
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:09.6f}"
+
+
+def _option(argv, name):
+    if name in argv:
+        index = argv.index(name)
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return None
+
+
+def probe_banner(path, media_seconds):
+    return INPUT_BANNER.format(path=path, duration=_timestamp(media_seconds)[:11],
+                               total_kbps=VIDEO_KBPS + AUDIO_KBPS, width=WIDTH, height=HEIGHT,
+                               video_kbps=VIDEO_KBPS, audio_kbps=AUDIO_KBPS)
+
+
+def ffprobe_json(path, media_seconds):
+    return json.dumps({
+        'format': {'filename': path, 'duration': str(media_seconds),
+                   'bit_rate': str((VIDEO_KBPS + AUDIO_KBPS) * 1000), 'format_name': 'mov,mp4,m4a,3gp,3g2,mj2'},
+        'streams': [
+            {'index': 0, 'codec_type': 'video', 'codec_name': 'h264', 'width': WIDTH, 'height': HEIGHT,
+             'pix_fmt': 'yuv420p', 'avg_frame_rate': '30/1', 'r_frame_rate': '30/1',
+             'nb_frames': str(int(media_seconds * FPS)), 'bit_rate': str(VIDEO_KBPS * 1000),
+             'disposition': {'default': 1, 'attached_pic': 0}},
+            {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac', 'sample_rate': '48000', 'channels': 2,
+             'channel_layout': 'stereo', 'bit_rate': str(AUDIO_KBPS * 1000),
+             'disposition': {'default': 1, 'attached_pic': 0}},
+        ],
+    })
+
+
+def progress_block(frame, out_seconds, total_bytes, speed, finished):
+    return (f"frame={frame}\nfps={FPS:.2f}\nstream_0_0_q=28.0\n"
+            f"bitrate={total_bytes * 8 / 1000 / max(out_seconds, 0.001):.1f}kbits/s\n"
+            f"total_size={total_bytes}\nout_time_us={int(out_seconds * 1e6)}\n"
+            f"out_time_ms={int(out_seconds * 1e6)}\nout_time={_timestamp(out_seconds)}\n"
+            f"dup_frames=0\ndrop_frames=0\nspeed={speed:.3g}x\n"
+            f"progress={'end' if finished else 'continue'}\n")
+
+
+def encode(argv, media_seconds):
+    wall_seconds = max(0.01, _env_float('FAKE_FFMPEG_SECONDS', 5.0))
+    progress_hz = max(0.1, _env_float('FAKE_FFMPEG_PROGRESS_HZ', 2.0))
+    stderr_hz = max(0.0, _env_float('FAKE_FFMPEG_STDERR_HZ', 10.0))
+    fail = os.environ.get('FAKE_FFMPEG_FAIL') == '1'
+    output = argv[-1]
+    progress_out = sys.stdout if _option(argv, '-progress') == 'pipe:1' else None
+    speed = media_seconds / wall_seconds
+    bytes_per_media_second = 1000 * 1000 / 8
+
+    sys.stderr.write(ENCODE_HEADER.format(path=output, width=WIDTH, height=HEIGHT) + "\n")
+    sys.stderr.flush()
+    start = time.monotonic()
+    next_progress = next_stderr = 0.0
+    line_index = 0
+    while True:
+        elapsed = time.monotonic() - start
+        if fail and elapsed >= wall_seconds / 2:
+            sys.stderr.write("Error while encoding: Invalid data found when processing input\n")
+            return 1
+        if elapsed >= wall_seconds:
+            break
+        if progress_out and elapsed >= next_progress:
+            out_seconds = media_seconds * elapsed / wall_seconds
+            progress_out.write(progress_block(int(out_seconds * FPS), out_seconds,
+                                              int(out_seconds * bytes_per_media_second), speed, False))
+            progress_out.flush()
+            next_progress += 1 / progress_hz
+        if stderr_hz and elapsed >= next_stderr:
+            sys.stderr.write(RUNNING_LINES[line_index % len(RUNNING_LINES)] + "\n")
+            sys.stderr.flush()
+            line_index += 1
+            next_stderr += 1 / stderr_hz
+        waits = [next_progress if progress_out else wall_seconds, next_stderr if stderr_hz else wall_seconds,
+                 wall_seconds]
+        time.sleep(max(0.0, min(waits) - (time.monotonic() - start)))
+
+    total_bytes = int(media_seconds * bytes_per_media_second)
+    with open(output, 'wb') as f:
+        f.write(b"\0" * min(total_bytes, 64 * 1024))
+    if '+faststart' in argv:
+        # O muxer MP4 reescreve o arquivo antes do relatório final, como no FFmpeg real
+        sys.stderr.write("[mp4 @ 0x55d0c3a1c9c0] Starting second pass: moving the moov atom to the beginning of the file\n")
+        sys.stderr.flush()
+        time.sleep(max(0.0, _env_float('FAKE_FFMPEG_FASTSTART_SECONDS', 0.0)))
+    if progress_out:
+        progress_out.write(progress_block(int(media_seconds * FPS), media_seconds, total_bytes, speed, True))
+        progress_out.flush()
+    sys.stderr.write(ENCODE_SUMMARY.format(video_kb=total_bytes // 1024 - 1500, audio_kb=1500,
+                                           frames=int(media_seconds * FPS), fps=media_seconds * FPS / wall_seconds,
+                                           size_kb=total_bytes // 1024, time=_timestamp(media_seconds)[:11],
+                                           kbps=total_bytes * 8 / 1000 / media_seconds, speed=speed) + "\n")
+    if '-benchmark' in argv:
+        cpu = time.process_time()
+        sys.stderr.write(f"bench: utime={cpu:.3f}s stime=0.000s rtime={wall_seconds:.3f}s\n"
+                         f"bench: maxrss={_max_rss_kb()}KiB\n")
+    return 0
+
+
+def _max_rss_kb():
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return 0
+
+
+def main(argv):
+    media_seconds = max(1.0, _env_float('FAKE_FFMPEG_MEDIA_SECONDS', 60.0))
+    if os.path.basename(sys.argv[0]).lower().startswith('ffprobe'):
+        sys.stdout.write(ffprobe_json(argv[-1], media_seconds) + "\n")
+        return 0
+    if '-version' in argv:
+        sys.stdout.write("ffmpeg version 7.0-fake Copyright (c) 2000-2024 the FFmpeg developers\n")
+        return 0
+    if '-encoders' in argv:
+        names = os.environ.get('FAKE_FFMPEG_ENCODERS', "libx264,libx265,libvpx-vp9").split(',')
+        lines = [f" V....D {name:<20} fake {name}" for name in names if name]
+        sys.stdout.write("\n".join([ENCODERS_HEADER, *lines, " A....D aac                  AAC (Advanced Audio Coding)"]) + "\n")
+        return 0
+    if '-filters' in argv:
+        sys.stdout.write(FILTERS_LISTING + "\n")
+        return 0
+    if '-i' in argv and not [a for a in argv[argv.index('-i') + 2:] if a != '-hide_banner']:
+        # Só a entrada, sem saída (análise): cabeçalho e o erro de sempre
+        sys.stderr.write(probe_banner(_option(argv, '-i'), media_seconds) + "\n")
+        sys.stderr.write("At least one output file must be specified\n")
+        return 1
+    return encode(argv, media_seconds)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,310 @@
+"""Teste de carga do próprio app (sem FFmpeg de verdade).
+
+Leva 1, 10 e 100 jobs simultâneos pelo caminho real controller -> scheduler ->
+worker -> view, usando o benchmarks/fake_ffmpeg.py no lugar do FFmpeg, e mede:
+
+- latência do loop de eventos da GUI (atraso de um timer de 10 ms: p50/p95/p99/máx);
+- custo por linha dos caminhos quentes (parser de '-progress', leitura do stderr,
+  LogWidget.append_message, handlers do controller, load_config/save_config);
+- crescimento de memória (RSS e objetos Python) a cada cenário.
+
+Uso, a partir da raiz do repositório:
+    python benchmarks/load_harness.py
+    python benchmarks/load_harness.py --jobs 1 10 --seconds 3 --stderr-hz 200 -o carga.json
+
+Roda com QT_QPA_PLATFORM=offscreen por padrão e num diretório de dados temporário
+(COMPRESSOR_DATA_DIR), sem tocar na fila ou na configuração do usuário.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from collections import deque
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+FAKE_FFMPEG = BENCH_DIR / "fake_ffmpeg.py"
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+DEFAULT_JOB_COUNTS = (1, 10, 100)
+LATENCY_INTERVAL_MS = 10
+SCENARIO_TIMEOUT_SECONDS = 600
+
+
+def rss_mb():
+    """Memória residente atual do processo (MB); pico, onde /proc não existe."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            return 0.0
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def install_fake_ffmpeg(bin_dir):
+    """Copia o FFmpeg falso como 'ffmpeg' e 'ffprobe' num diretório só dele."""
+    paths = []
+    for name in ("ffmpeg", "ffprobe"):
+        target = os.path.join(bin_dir, name)
+        shutil.copy(FAKE_FFMPEG, target)
+        os.chmod(target, 0o755)
+        paths.append(target)
+    return paths[0]
+
+
+class LatencyProbe:
+    """Timer periódico que mede quanto cada disparo atrasou em relação ao previsto."""
+
+    def __init__(self, interval_ms=LATENCY_INTERVAL_MS):
+        from PySide6.QtCore import QTimer, Qt
+        self.interval = interval_ms / 1000
+        self.delays_ms = []
+        self._last = None
+        self._timer = QTimer()
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+
+    def _tick(self):
+        now = time.perf_counter()
+        if self._last is not None:
+            self.delays_ms.append(max(0.0, (now - self._last - self.interval) * 1000))
+        self._last = now
+
+    def start(self):
+        self._last = None
+        self.delays_ms = []
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        return {
+            'samples': len(self.delays_ms),
+            'p50_ms': round(percentile(self.delays_ms, 0.50), 2),
+            'p95_ms': round(percentile(self.delays_ms, 0.95), 2),
+            'p99_ms': round(percentile(self.delays_ms, 0.99), 2),
+            'max_ms': round(max(self.delays_ms, default=0.0), 2),
+        }
+
+
+def has_emit_refcount_bug():
+    """Algumas versões do PySide6 (ex.: 6.12.0) decrementam a contagem de True a cada
+    Signal.emit(); com milhares de sinais o Python aborta ('bool_dealloc'). O app fixa
+    uma versão sem o bug (requirements.txt). Retorna True se o bug foi detectado.
+    """
+    from PySide6.QtCore import QObject, Signal
+
+    class _Probe(QObject):
+        fired = Signal()
+
+    probe = _Probe()
+    probe.fired.connect(lambda: None)
+    before = sys.getrefcount(True)
+    for _ in range(10):
+        probe.fired.emit()
+    return sys.getrefcount(True) < before
+
+
+def per_call_us(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def micro_benchmarks(app, view, controller, ffmpeg_path, work_dir, calls=20000):
+    """Custo por chamada (µs) dos caminhos que recebem uma linha/evento por vez."""
+    import fake_ffmpeg
+    from config import load_config, save_config, clear_cache
+    from engine import HeadlessEncoder
+    from progress import ProgressParser
+
+    results = {}
+    block = fake_ffmpeg.progress_block(900, 30.0, 3750000, 12.0, False).splitlines()
+    parser = ProgressParser()
+    lines = iter(block * (calls // len(block) + 1))
+    results['progress_parse_line'] = per_call_us(lambda: parser.feed(next(lines)), calls)
+
+    encoder = HeadlessEncoder(ffmpeg_path, os.path.join(work_dir, "micro.mp4"),
+                              os.path.join(work_dir, "micro_out.mp4"))
+    tail = deque(maxlen=20)
+    stderr_lines = iter(fake_ffmpeg.RUNNING_LINES * (calls // len(fake_ffmpeg.RUNNING_LINES) + 1))
+    results['stderr_line'] = per_call_us(lambda: encoder._handle_ffmpeg_stderr(next(stderr_lines), tail), calls)
+
+    log = view.log_area
+    results['log_append_message'] = per_call_us(
+        lambda: log.append_message("[video.mp4] Past duration 0.999992 too large", "FFMPEG"), calls)
+    start = time.perf_counter()
+    log.flush()
+    app.processEvents()
+    results['log_flush_ms'] = (time.perf_counter() - start) * 1000
+
+    job = next(iter(controller.job_queue), None)
+    if job is not None:
+        results['controller_job_progress'] = per_call_us(
+            lambda: controller._handle_job_progress(job.job_id, 42, "ETA: 01:15"), calls // 10)
+        results['controller_job_status'] = per_call_us(
+            lambda: controller._handle_job_status(job.job_id, "Past duration 0.999992 too large", "FFMPEG"),
+            calls // 10)
+        log.flush()
+
+    config = dict(load_config())
+
+    def _load():
+        clear_cache()
+        load_config()
+    results['config_load'] = per_call_us(_load, calls // 100)
+    results['config_save'] = per_call_us(lambda: save_config(config), calls // 100)
+    return {name: round(value, 2) for name, value in results.items()}
+
+
+def run_scenario(app, controller, ffmpeg_path, job_count, work_dir):
+    """Enfileira 'job_count' jobs com concorrência igual e espera a fila terminar."""
+    from PySide6.QtCore import QEventLoop, QTimer
+    from job_queue import JobState
+
+    for job in list(controller.job_queue):
+        controller.remove_job(job.job_id)
+    controller.view.log_area.clear_log()
+    gc.collect()
+    rss_before, objects_before = rss_mb(), len(gc.get_objects())
+
+    input_dir = os.path.join(work_dir, f"entrada_{job_count}")
+    os.makedirs(input_dir, exist_ok=True)
+    enqueue_start = time.perf_counter()
+    for index in range(job_count):
+        input_file = os.path.join(input_dir, f"video_{index:03d}.mp4")
+        with open(input_file, 'wb') as f:
+            f.write(b"\0" * 4096)
+        controller.enqueue_job(ffmpeg_path, input_file, os.path.join(work_dir, f"saida_{job_count}",
+                                                                      f"video_{index:03d}_comprimido.mp4"))
+    enqueue_seconds = time.perf_counter() - enqueue_start
+    controller.set_max_concurrent_jobs(job_count)
+
+    loop = QEventLoop()
+    controller.scheduler.queue_finished.connect(loop.quit)
+    QTimer.singleShot(SCENARIO_TIMEOUT_SECONDS * 1000, loop.quit)
+    latency = LatencyProbe()
+    latency.start()
+    start = time.perf_counter()
+    controller.start_queue()
+    if controller.scheduler.is_running():
+        loop.exec()
+    wall_seconds = time.perf_counter() - start
+    event_loop = latency.stop()
+    controller.scheduler.queue_finished.disconnect(loop.quit)
+
+    # Deixa os deleteLater dos threads/workers acontecerem antes de medir a memória
+    for _ in range(5):
+        app.processEvents()
+        time.sleep(0.05)
+    gc.collect()
+    states = [job.state for job in controller.job_queue]
+    return {
+        'jobs': job_count,
+        'done': sum(1 for state in states if state == JobState.DONE),
+        'wall_seconds': round(wall_seconds, 2),
+        'enqueue_ms_per_job': round(enqueue_seconds / job_count * 1000, 2),
+        'event_loop': event_loop,
+        'rss_mb_before': round(rss_before, 1),
+        'rss_mb_after': round(rss_mb(), 1),
+        'rss_growth_mb': round(rss_mb() - rss_before, 1),
+        'python_objects_growth': len(gc.get_objects()) - objects_before,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Teste de carga do app com FFmpeg falso")
+    parser.add_argument('--jobs', type=int, nargs='+', default=list(DEFAULT_JOB_COUNTS),
+                        help="Quantidades de jobs simultâneos (um cenário por valor)")
+    parser.add_argument('--seconds', type=float, default=5.0, help="Duração de cada codificação falsa")
+    parser.add_argument('--progress-hz', type=float, default=2.0, help="Blocos de progresso por segundo")
+    parser.add_argument('--stderr-hz', type=float, default=10.0, help="Linhas de stderr por segundo")
+    parser.add_argument('--media-seconds', type=float, default=60.0, help="Duração da mídia falsa")
+    parser.add_argument('--no-micro', action='store_true', help="Pula os microbenchmarks")
+    parser.add_argument('-o', '--output', help="Grava o relatório em JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    work_dir = tempfile.mkdtemp(prefix="load_harness_")
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    os.environ['COMPRESSOR_DATA_DIR'] = os.path.join(work_dir, "dados")
+    os.makedirs(os.environ['COMPRESSOR_DATA_DIR'])
+    os.environ['FAKE_FFMPEG_SECONDS'] = str(args.seconds)
+    os.environ['FAKE_FFMPEG_PROGRESS_HZ'] = str(args.progress_hz)
+    os.environ['FAKE_FFMPEG_STDERR_HZ'] = str(args.stderr_hz)
+    os.environ['FAKE_FFMPEG_MEDIA_SECONDS'] = str(args.media_seconds)
+    sys.path.insert(0, str(BENCH_DIR))
+
+    from PySide6.QtWidgets import QApplication
+    from view import CompressorView
+    from controller import CompressionController
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    if has_emit_refcount_bug():
+        import PySide6
+        print(f"Erro: PySide6 {PySide6.__version__} perde referências de True em Signal.emit(); "
+              f"a carga não pode ser medida. Use a versão do requirements.txt.", flush=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return 1
+    bin_dir = os.path.join(work_dir, "bin")
+    os.makedirs(bin_dir)
+    ffmpeg_path = install_fake_ffmpeg(bin_dir)
+
+    view = CompressorView()
+    view.ask_resume = lambda description: 'later'
+    controller = CompressionController(view)
+    controller.ffmpeg_path = ffmpeg_path
+    app.processEvents()
+
+    report = {'settings': vars(args), 'scenarios': [], 'micro_us': {}}
+    try:
+        for job_count in args.jobs:
+            scenario = run_scenario(app, controller, ffmpeg_path, job_count, work_dir)
+            report['scenarios'].append(scenario)
+            latency = scenario['event_loop']
+            print(f"{job_count:>4} job(s): {scenario['done']}/{job_count} concluído(s) em {scenario['wall_seconds']:.1f}s | "
+                  f"loop de eventos p50 {latency['p50_ms']:.1f} ms, p95 {latency['p95_ms']:.1f} ms, "
+                  f"p99 {latency['p99_ms']:.1f} ms, máx {latency['max_ms']:.1f} ms | "
+                  f"RSS {scenario['rss_growth_mb']:+.1f} MB, objetos {scenario['python_objects_growth']:+d}",
+                  flush=True)
+        if not args.no_micro:
+            report['micro_us'] = micro_benchmarks(app, view, controller, ffmpeg_path, work_dir)
+            for name, value in report['micro_us'].items():
+                unit = "ms" if name.endswith("_ms") else "µs/chamada"
+                print(f"  {name:<26} {value:>10.2f} {unit}")
+    finally:
+        controller.job_queue.close()
+        # Destrói os widgets com o QApplication ainda vivo (senão o PySide falha ao finalizar)
+        view.deleteLater()
+        app.processEvents()
+        del controller, view
+        gc.collect()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"Relatório: {args.output}")
+    failed = any(s['done'] != s['jobs'] for s in report['scenarios'])
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QTimer
+
+UI_REFRESH_MS = 100
+
+
+class SignalAggregator(QObject):
+    """Junta status e progresso vindos das threads dos workers e entrega em lotes na GUI.
+
+    Os métodos post_* podem ser chamados de qualquer thread (conectados com
+    DirectConnection) e só acumulam em memória. Um QTimer na thread da GUI chama
+    flush() a cada UI_REFRESH_MS: as mensagens de status saem na ordem em que
+    chegaram e, para progresso/estatísticas, vale apenas o valor mais recente de
+    cada job. Antes de tratar um erro ou o fim de um job, chame flush() para que
+    nada fique fora de ordem.
+    """
+
+    def __init__(self, on_status, on_progress, on_stats=None, interval_ms=UI_REFRESH_MS, parent=None):
+        super().__init__(parent)
+        self._on_status = on_status
+        self._on_progress = on_progress
+        self._on_stats = on_stats
+        self._lock = threading.Lock()
+        self._statuses = []
+        self._progress = OrderedDict()
+        self._stats = OrderedDict()
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def start(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self.flush()
+
+    def is_active(self):
+        return self._timer.isActive()
+
+    def post_status(self, job_id, message, level):
+        with self._lock:
+            self._statuses.append((job_id, message, level))
+
+    def post_progress(self, job_id, percent, eta_str):
+        with self._lock:
+            self._progress[job_id] = (percent, eta_str)
+
+    def post_stats(self, job_id, stats):
+        with self._lock:
+            self._stats[job_id] = stats
+
+    def flush(self):
+        with self._lock:
+            if not (self._statuses or self._progress or self._stats):
+                return
+            statuses, self._statuses = self._statuses, []
+            progress, self._progress = self._progress, OrderedDict()
+            stats, self._stats = self._stats, OrderedDict()
+
+        for job_id, message, level in statuses:
+            self._on_status(job_id, message, level)
+        for job_id, (percent, eta_str) in progress.items():
+            self._on_progress(job_id, percent, eta_str)
+        if self._on_stats:
+            for job_id, job_stats in stats.items():
+                self._on_stats(job_id, job_stats)
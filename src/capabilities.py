@@ -0,0 +1,249 @@
+"""Descoberta do FFmpeg (local configurado, pasta do aplicativo e PATH) e das suas capacidades.
+
+'-version', '-encoders' e '-filters' rodam uma vez por binário: o resultado fica em
+ffmpeg_capabilities.json, chaveado por caminho + mtime, e só é refeito quando o
+binário muda (uma atualização do FFmpeg, por exemplo).
+"""
+import os
+import sys
+import json
+import shutil
+import logging
+import subprocess
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+from config import get_base_path
+from encoding import CODEC_MAP, subprocess_window_kwargs
+from probe import find_ffprobe
+
+logger = logging.getLogger(__name__)
+
+CAPABILITIES_CACHE_FILE = 'ffmpeg_capabilities.json'
+# Incrementar quando o formato ou a análise mudar: entradas antigas deixam de ser usadas
+CAPABILITIES_CACHE_VERSION = 1
+CAPABILITIES_TIMEOUT = 15
+
+# Pastas onde instaladores e gerenciadores de pacotes costumam deixar o FFmpeg (fora do PATH)
+COMMON_LOCATIONS = {
+    'win32': [r"C:\ffmpeg\bin", os.path.join(os.environ.get('ProgramFiles', r"C:\Program Files"), "ffmpeg", "bin")],
+    'darwin': ["/opt/homebrew/bin", "/usr/local/bin", "/opt/local/bin"],
+    'linux': ["/usr/bin", "/usr/local/bin", "/snap/bin"],
+}
+
+
+@dataclass
+class FFmpegCapabilities:
+    ffmpeg_path: str
+    ffprobe_path: Optional[str] = None
+    version: str = ""
+    encoders: List[str] = field(default_factory=list)
+    filters: List[str] = field(default_factory=list)
+
+    def has_encoder(self, name: str) -> bool:
+        """Sem lista de codificadores (saída não reconhecida), assume que existe."""
+        return not self.encoders or name in self.encoders
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+
+    def available_codecs(self) -> List[str]:
+        """Opções de codec da interface (chaves de CODEC_MAP) que este FFmpeg consegue codificar."""
+        return [label for label, encoder in CODEC_MAP.items() if self.has_encoder(encoder)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FFmpegCapabilities':
+        return cls(**data)
+
+
+def executable_name(tool: str) -> str:
+    return f"{tool}.exe" if os.name == 'nt' else tool
+
+
+def candidate_paths(configured_path: Optional[str] = None) -> List[str]:
+    """Caminhos a testar, em ordem: configurado, pasta do aplicativo, PATH e pastas comuns."""
+    name = executable_name("ffmpeg")
+    base = get_base_path()
+    candidates = [configured_path] if configured_path else []
+    if getattr(sys, 'frozen', False):
+        candidates.append(os.path.join(base, "_internal", name))
+    candidates.append(os.path.join(base, name))
+    candidates.append(shutil.which("ffmpeg"))
+    platform = 'linux' if sys.platform.startswith('linux') else sys.platform
+    candidates.extend(os.path.join(directory, name) for directory in COMMON_LOCATIONS.get(platform, []))
+
+    unique, seen = [], set()
+    for path in candidates:
+        if not path:
+            continue
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen:
+            seen.add(key)
+            unique.append(os.path.abspath(path))
+    return unique
+
+
+def find_ffmpeg(configured_path: Optional[str] = None) -> Optional[str]:
+    """Primeiro FFmpeg executável entre os candidatos (sem rodá-lo)."""
+    for path in candidate_paths(configured_path):
+        if os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
+    return None
+
+
+def parse_encoders(output: str) -> List[str]:
+    """Nomes da listagem de 'ffmpeg -encoders' (' V....D libx264  descrição')."""
+    names = []
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in 'VAS' and parts[1] != '=':
+            names.append(parts[1])
+    return names
+
+
+def parse_filters(output: str) -> List[str]:
+    """Nomes da listagem de 'ffmpeg -filters' (' TSC ssim  VV->V  descrição')."""
+    return [parts[1] for parts in (line.split() for line in output.splitlines())
+            if len(parts) >= 3 and '->' in parts[2]]
+
+
+def _run(ffmpeg_path: str, option: str) -> str:
+    result = subprocess.run([ffmpeg_path, '-hide_banner', option], capture_output=True, text=True,
+                            encoding='utf-8', errors='replace', check=False, timeout=CAPABILITIES_TIMEOUT,
+                            **subprocess_window_kwargs())
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, option, result.stdout, result.stderr)
+    return result.stdout
+
+
+def query_capabilities(ffmpeg_path: str) -> FFmpegCapabilities:
+    """Roda '-version', '-encoders' e '-filters'; levanta OSError ou subprocess.SubprocessError."""
+    version_lines = _run(ffmpeg_path, '-version').splitlines()
+    capabilities = FFmpegCapabilities(ffmpeg_path=ffmpeg_path, ffprobe_path=find_ffprobe(ffmpeg_path),
+                                      version=version_lines[0].strip() if version_lines else "")
+    for option, parser, attribute in (('-encoders', parse_encoders, 'encoders'),
+                                      ('-filters', parse_filters, 'filters')):
+        try:
+            setattr(capabilities, attribute, parser(_run(ffmpeg_path, option)))
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"'{ffmpeg_path} {option}' falhou ({e.returncode}); listagem ignorada")
+    return capabilities
+
+
+def binary_identity(path: str) -> Optional[str]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"v{CAPABILITIES_CACHE_VERSION}|{os.path.abspath(path)}|{st.st_mtime_ns}"
+
+
+class CapabilitiesCache:
+    """Capacidades por binário, em memória e em JSON (thread-safe)."""
+
+    def __init__(self, base_path: Optional[str] = None):
+        self.base_path = base_path if base_path is not None else get_base_path()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def cache_path(self) -> str:
+        return os.path.join(self.base_path, CAPABILITIES_CACHE_FILE)
+
+    def _load(self) -> None:
+        self._loaded = True
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._entries = data
+        except Exception as e:
+            logger.warning(f"Cache de capacidades do FFmpeg ignorado: {e}")
+
+    def get(self, key: str) -> Optional[FFmpegCapabilities]:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            data = self._entries.get(key)
+        if data is None:
+            return None
+        try:
+            return FFmpegCapabilities.from_dict(data)
+        except TypeError:
+            return None
+
+    def put(self, key: str, capabilities: FFmpegCapabilities) -> None:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            path = os.path.abspath(capabilities.ffmpeg_path)
+            # Uma entrada por binário: a do mtime antigo sai
+            self._entries = {k: v for k, v in self._entries.items() if v.get('ffmpeg_path') != path}
+            self._entries[key] = {**capabilities.to_dict(), 'ffmpeg_path': path}
+            self._save()
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(self.base_path, exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.error(f"Erro ao salvar cache de capacidades do FFmpeg: {e}")
+
+
+_DEFAULT_CACHE: Optional[CapabilitiesCache] = None
+_QUERY_LOCK = threading.Lock()
+
+
+def get_capabilities_cache() -> CapabilitiesCache:
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = CapabilitiesCache()
+    return _DEFAULT_CACHE
+
+
+def ffmpeg_capabilities(ffmpeg_path: Optional[str],
+                        cache: Optional[CapabilitiesCache] = None) -> Optional[FFmpegCapabilities]:
+    """Capacidades de 'ffmpeg_path' (do cache, se o binário não mudou); None se ele não roda."""
+    key = binary_identity(ffmpeg_path) if ffmpeg_path else None
+    if key is None:
+        return None
+    cache = cache or get_capabilities_cache()
+    # Um único '-encoders' por binário, mesmo com vários jobs começando juntos
+    with _QUERY_LOCK:
+        capabilities = cache.get(key)
+        if capabilities is not None:
+            return capabilities
+        try:
+            capabilities = query_capabilities(ffmpeg_path)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"FFmpeg inutilizável em {ffmpeg_path}: {e}")
+            return None
+        cache.put(key, capabilities)
+    return capabilities
+
+
+def discover_ffmpeg(configured_path: Optional[str] = None,
+                    cache: Optional[CapabilitiesCache] = None) -> Optional[FFmpegCapabilities]:
+    """Primeiro FFmpeg que realmente roda entre os candidatos, já pareado com o ffprobe."""
+    for path in candidate_paths(configured_path):
+        if os.path.isfile(path) and os.access(path, os.X_OK):
+            capabilities = ffmpeg_capabilities(path, cache)
+            if capabilities is not None:
+                return capabilities
+    return None
+
+
+def missing_encoder(ffmpeg_path: Optional[str], encoder: str) -> bool:
+    """True só quando o FFmpeg foi consultado e comprovadamente não tem 'encoder'."""
+    capabilities = ffmpeg_capabilities(ffmpeg_path)
+    return capabilities is not None and not capabilities.has_encoder(encoder)
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+from config import get_base_path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+PARTS_SUFFIX = '.parts'
+RESUME_REGISTRY_FILE = 'resumable_jobs.json'
+MANIFEST_VERSION = 1
+# Trechos curtos limitam o que se perde numa queda (no máximo um trecho por processo)
+CHECKPOINT_SEGMENT_SECONDS = 60
+
+
+def parts_dir(output_file: str) -> str:
+    """Diretório de trabalho persistente ao lado da saída: '<saída>.parts'."""
+    return f"{os.path.abspath(output_file)}{PARTS_SUFFIX}"
+
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+@dataclass
+class SegmentEntry:
+    source: str
+    encoded: str
+    length: float
+    done: bool = False
+
+
+@dataclass
+class CheckpointManifest:
+    """Estado de uma codificação retomável, gravado a cada trecho concluído.
+
+    'signature' identifica entrada + parâmetros; se mudar, os trechos salvos não
+    servem mais. 'job' guarda os argumentos do worker para retomar após reiniciar o app.
+    """
+    directory: str
+    input_file: str
+    output_file: str
+    signature: str
+    job: Dict[str, Any] = field(default_factory=dict)
+    segments: List[SegmentEntry] = field(default_factory=list)
+    # None = ainda não gerado; True/False = arquivo auxiliar com áudio/legendas existe ou não
+    streams_done: Optional[bool] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    version: int = MANIFEST_VERSION
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional['CheckpointManifest']:
+        try:
+            with open(os.path.join(directory, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != MANIFEST_VERSION:
+                return None
+            data['segments'] = [SegmentEntry(**entry) for entry in data.get('segments', [])]
+            data['directory'] = directory
+            return cls(**data)
+        except (OSError, json.JSONDecodeError, TypeError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Manifesto de retomada inválido em {directory}: {e}")
+            return None
+
+    def save(self) -> None:
+        self.updated_at = time.time()
+        data = asdict(self)
+        data.pop('directory')
+        _write_json_atomic(self.path, data)
+
+    def has_split(self) -> bool:
+        return bool(self.segments) and all(
+            os.path.exists(os.path.join(self.directory, entry.source)) for entry in self.segments)
+
+    def is_segment_done(self, index: int) -> bool:
+        entry = self.segments[index]
+        return entry.done and os.path.exists(os.path.join(self.directory, entry.encoded))
+
+    def done_count(self) -> int:
+        return sum(1 for index in range(len(self.segments)) if self.is_segment_done(index))
+
+    def done_seconds(self) -> float:
+        return sum(entry.length for index, entry in enumerate(self.segments) if self.is_segment_done(index))
+
+
+class ResumeRegistry:
+    """Lista (em JSON) os diretórios '.parts' de jobs retomáveis ainda não concluídos."""
+
+    def __init__(self, base_path: Optional[str] = None):
+        self.base_path = base_path if base_path is not None else get_base_path()
+        self._lock = threading.Lock()
+
+    @property
+    def registry_path(self) -> str:
+        return os.path.join(self.base_path, RESUME_REGISTRY_FILE)
+
+    def _read(self) -> List[str]:
+        try:
+            with open(self.registry_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return [path for path in data if isinstance(path, str)] if isinstance(data, list) else []
+        except (OSError, json.JSONDecodeError):
+            return []
+
+    def _write(self, paths: List[str]) -> None:
+        try:
+            os.makedirs(self.base_path, exist_ok=True)
+            _write_json_atomic(self.registry_path, paths)
+        except OSError as e:
+            logger.error(f"Erro ao salvar lista de jobs retomáveis: {e}")
+
+    def add(self, directory: str) -> None:
+        with self._lock:
+            paths = self._read()
+            if directory not in paths:
+                paths.append(directory)
+                self._write(paths)
+
+    def remove(self, directory: str) -> None:
+        with self._lock:
+            paths = self._read()
+            if directory in paths:
+                paths.remove(directory)
+                self._write(paths)
+
+    def orphans(self) -> List[CheckpointManifest]:
+        """Manifestos ainda existentes; entradas cujo diretório sumiu são esquecidas."""
+        with self._lock:
+            paths = self._read()
+            manifests = [(path, CheckpointManifest.load(path)) for path in paths]
+            alive = [path for path, manifest in manifests if manifest is not None]
+            if alive != paths:
+                self._write(alive)
+        return [manifest for _, manifest in manifests if manifest is not None]
+
+    def discard(self, manifest: CheckpointManifest) -> None:
+        shutil.rmtree(manifest.directory, ignore_errors=True)
+        self.remove(manifest.directory)
@@ -0,0 +1,331 @@
+"""Compressor sem interface gráfica (não importa Qt).
+
+Uso, com src/ no PYTHONPATH (ou a partir de src/):
+    python -m cli video1.mp4 video2.mkv --codec h265 --quality media --jobs 4
+
+Cada evento é impresso em stdout como uma linha JSON. O código de saída segue os
+códigos de retorno do worker: 0 (sucesso), 1 (falha) e -1 (cancelado; 255 no POSIX).
+"""
+import os
+import sys
+import json
+import time
+import subprocess
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from capabilities import find_ffmpeg, missing_encoder
+from config import load_config
+from encoding import CODEC_MAP
+from engine import HeadlessEncoder
+from eta import predict_job, plan_batch_seconds
+from job_queue import JobSettings, suggest_output_path, default_concurrency
+from job_store import JobStore
+from probe import probe, ProbeError
+from quality import QualityCheck
+from profiling import JobProfile, TraceRecorder, PHASE_VERIFY
+from metrics import MetricsRegistry, MetricsServer
+
+QUALITY_CHOICES = {
+    'alta': "Alta (Melhor Qualidade)",
+    'media': "Média (Balanceado)",
+    'agressiva': "Agressiva (Menor Arquivo)"
+}
+
+CODEC_CHOICES = {
+    'h264': "H.264 (AVC)",
+    'h265': "H.265 (HEVC)",
+    'vp9': "VP9"
+}
+
+RESOLUTION_CHOICES = {
+    'original': "Original",
+    '1080p': "1080p (Full HD)",
+    '720p': "720p (HD)",
+    '480p': "480p (SD)"
+}
+
+# Prefixo das threads que rodam jobs ('job_0', 'job_1'...); cada uma é uma linha no trace
+JOB_THREAD_PREFIX = "job"
+
+QUIET_LEVELS = (HeadlessEncoder.INFO, HeadlessEncoder.CMD, HeadlessEncoder.FFMPEG)
+
+
+class JsonEventWriter:
+    """Escreve eventos como JSON Lines de forma segura entre threads."""
+
+    def __init__(self, stream=None, quiet=False):
+        self.stream = stream or sys.stdout
+        self.quiet = quiet
+        self._lock = threading.Lock()
+
+    def write(self, event, **fields):
+        if self.quiet and event == 'status' and fields.get('level') in QUIET_LEVELS:
+            return
+        record = {'event': event, 'ts': round(time.time(), 3), **fields}
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def parse_resolution(value):
+    """Aceita 'original', '1080p', '720p', '480p' ou 'LARGURAxALTURA'."""
+    key = value.lower()
+    if key in RESOLUTION_CHOICES:
+        return RESOLUTION_CHOICES[key], None
+    try:
+        width, height = (int(part) for part in key.split('x'))
+        return "Personalizado...", (width, height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Resolução inválida: {value}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli", description="Compressor de vídeo (modo headless).")
+    parser.add_argument('inputs', nargs='+', help="Arquivos de vídeo de entrada")
+    parser.add_argument('-o', '--output-dir', help="Diretório de saída (padrão: o mesmo da entrada)")
+    parser.add_argument('-q', '--quality', choices=sorted(QUALITY_CHOICES), default='agressiva')
+    parser.add_argument('-c', '--codec', choices=sorted(CODEC_CHOICES), default='h264')
+    parser.add_argument('-r', '--resolution', type=parse_resolution, default=("Original", None),
+                        help="original, 1080p, 720p, 480p ou LARGURAxALTURA")
+    parser.add_argument('--crf', type=int, help="CRF explícito (substitui o do preset)")
+    parser.add_argument('--target-size', type=float, metavar='MB',
+                        help="Tamanho alvo do arquivo em MB (codificação em duas passagens)")
+    parser.add_argument('--quality-floor', type=float, metavar='VALOR',
+                        help="Busca o maior CRF cuja qualidade medida fica acima deste piso "
+                             "(ex.: 0.97 para SSIM, 40 para PSNR)")
+    parser.add_argument('--quality-metric', choices=['ssim', 'psnr'], default='ssim',
+                        help="Métrica usada com --quality-floor")
+    parser.add_argument('--force-reencode', action='store_true',
+                        help="Sempre recodifica, mesmo quando copiar o vídeo (remux) bastaria")
+    parser.add_argument('--resumable', action='store_true',
+                        help="Codifica em trechos com checkpoint; rodar de novo continua de onde parou")
+    parser.add_argument('--verify', action='store_true',
+                        help="Mede SSIM/PSNR (e VMAF, se disponível) de cada saída em segundo plano")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="Compressões simultâneas (0 = automático pelos núcleos)")
+    parser.add_argument('--segment-parallel', action='store_true',
+                        help="Divide cada vídeo em trechos e codifica em paralelo")
+    parser.add_argument('--ffmpeg', help="Caminho do executável FFmpeg")
+    parser.add_argument('--history', action='store_true',
+                        help="Registra os resultados no banco de histórico (o mesmo da interface gráfica)")
+    parser.add_argument('--plan', action='store_true',
+                        help="Só prevê o tempo de cada job e da fila pelo histórico, sem codificar")
+    parser.add_argument('--trace', metavar='ARQUIVO',
+                        help="Grava a linha do tempo das fases de cada job (Chrome Trace/Perfetto) em ARQUIVO")
+    parser.add_argument('--metrics-port', type=int, default=0, metavar='PORTA',
+                        help="Serve métricas no formato do Prometheus em http://127.0.0.1:PORTA/metrics")
+    parser.add_argument('--quiet', action='store_true', help="Só emite progresso, avisos, erros e resultados")
+    return parser
+
+
+def build_jobs(args):
+    resolution, custom_res = args.resolution
+    jobs = []
+    taken = set()
+    for input_file in args.inputs:
+        output_file = suggest_output_path(input_file, args.output_dir, taken)
+        taken.add(output_file)
+        jobs.append(JobSettings(
+            input_file=input_file,
+            output_file=output_file,
+            quality_preset=QUALITY_CHOICES[args.quality],
+            codec=CODEC_CHOICES[args.codec],
+            resolution=resolution,
+            custom_res=custom_res,
+            crf=args.crf,
+            segment_parallel=args.segment_parallel,
+            target_size_mb=args.target_size,
+            quality_floor=args.quality_floor,
+            quality_metric=args.quality_metric,
+            force_reencode=args.force_reencode,
+            resumable=args.resumable,
+            verify_quality=args.verify
+        ))
+    return jobs
+
+
+def resolve_ffmpeg_path(explicit_path=None):
+    if explicit_path:
+        return explicit_path
+    return find_ffmpeg(load_config().get('ffmpeg_path'))
+
+
+def aggregate_exit_code(return_codes):
+    if any(code not in (0, -1) for code in return_codes):
+        return 1
+    if any(code == -1 for code in return_codes):
+        return -1
+    return 0
+
+
+def _verify_job(index, check, writer, tracer=None):
+    started = tracer.now_us() if tracer else None
+    try:
+        scores = check.run()
+    except Exception as e:
+        scores = None
+        writer.write('status', job=index, level=HeadlessEncoder.WARN,
+                     message=f"Erro na verificação de qualidade: {e.__class__.__name__}: {e}")
+    if tracer:
+        tracer.complete(f"{PHASE_VERIFY}: job {index}", tracer.track(PHASE_VERIFY, "Verificação de qualidade"),
+                        started, tracer.now_us(), category="phase", args={'job': index, 'ok': bool(scores)})
+    if scores:
+        writer.write('quality', job=index, output=check.output_file, **scores.to_dict())
+
+
+def run_job(index, ffmpeg_path, settings, writer, encoders, verifier=None, checks=None, history=None,
+            tracer=None, metrics=None, concurrent_jobs=1):
+    profile = None
+    if tracer:
+        # Uma linha do trace por thread do pool, como as vagas do JobScheduler
+        thread_name = threading.current_thread().name
+        slot = thread_name.rsplit('_', 1)[-1]
+        profile = JobProfile(tracer, thread_name, f"Vaga {int(slot) + 1}" if slot.isdigit() else thread_name)
+        job_started = tracer.now_us()
+    encoder = HeadlessEncoder(ffmpeg_path, settings.input_file, settings.output_file,
+                              history=history, profile=profile, concurrent_jobs=concurrent_jobs,
+                              **settings.worker_kwargs())
+    encoders[index] = encoder
+    result = {}
+    summary = {}
+    if metrics is not None:
+        metrics.add_queued(-1)
+        metrics.observe(str(index), encoder, os.path.basename(settings.input_file))
+
+    def on_finished(return_code, output_file, original_mb, final_mb):
+        result['code'] = return_code
+        writer.write('finished', job=index, input=settings.input_file, output=output_file,
+                     return_code=return_code, original_mb=round(original_mb, 3),
+                     final_mb=round(final_mb, 3), phases=summary.get('phases'))
+
+    encoder.progress_updated.connect(
+        lambda percent, eta: writer.write('progress', job=index, percent=percent, eta=eta))
+    encoder.stats_updated.connect(
+        lambda stats: writer.write('stats', job=index, **stats))
+    encoder.status_message.connect(
+        lambda message, level: writer.write('status', job=index, level=level, message=message))
+    encoder.error_occurred.connect(
+        lambda title, message: writer.write('error', job=index, title=title, message=message))
+    encoder.finished.connect(on_finished)
+    encoder.result_ready.connect(summary.update)
+    if history is not None:
+        encoder.result_ready.connect(lambda summary: history.record_result(None, summary))
+
+    writer.write('started', job=index, input=settings.input_file, output=settings.output_file)
+    encoder.run()
+    code = result.get('code', 1)
+    if tracer:
+        tracer.complete(os.path.basename(settings.input_file), profile.tid, job_started,
+                        tracer.now_us(), args={'job': index, 'return_code': code})
+    if code == 0 and settings.verify_quality and verifier is not None:
+        # Pool próprio de um processo: a verificação não ocupa vaga de codificação
+        check = QualityCheck(ffmpeg_path, settings.input_file, settings.output_file)
+        checks.append((check, verifier.submit(_verify_job, index, check, writer, tracer)))
+    return code
+
+
+def run_jobs(ffmpeg_path, jobs, concurrency, writer, history=None, tracer=None, metrics=None):
+    """Roda os jobs com até 'concurrency' processos FFmpeg simultâneos. Retorna os códigos."""
+    encoders = {}
+    checks = []
+    if metrics is not None:
+        metrics.set_queued(len(jobs))
+    with ThreadPoolExecutor(max_workers=1) as verifier, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=JOB_THREAD_PREFIX) as pool:
+        futures = [pool.submit(run_job, i, ffmpeg_path, job, writer, encoders, verifier, checks, history,
+                               tracer, metrics, min(concurrency, len(jobs)))
+                   for i, job in enumerate(jobs)]
+        try:
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, timeout=0.5)
+            pending = {future for _, future in checks}
+            while pending:
+                _, pending = wait(pending, timeout=0.5)
+        except KeyboardInterrupt:
+            writer.write('status', level=HeadlessEncoder.WARN, message="Interrompido; parando todos os jobs...")
+            for future in futures:
+                future.cancel()
+            if metrics is not None:
+                metrics.set_queued(0)
+            for encoder in list(encoders.values()):
+                encoder.stop()
+            wait(futures)
+            for check, future in checks:
+                future.cancel()
+                check.stop()
+    return [f.result() if not f.cancelled() else -1 for f in futures]
+
+
+def plan_jobs(ffmpeg_path, jobs, concurrency, writer, history):
+    """Emite a duração prevista de cada job e o tempo total da fila, sem codificar."""
+    predictions = []
+    for index, job in enumerate(jobs):
+        try:
+            info = probe(job.input_file, ffmpeg_path=ffmpeg_path)
+        except (ProbeError, OSError, subprocess.TimeoutExpired) as e:
+            writer.write('status', job=index, level=HeadlessEncoder.WARN,
+                         message=f"Previsão: não foi possível analisar a entrada: {e}")
+            info = None
+        seconds = predict_job(history, job, info)
+        predictions.append(seconds)
+        writer.write('plan', job=index, input=job.input_file,
+                     predicted_seconds=round(seconds, 1) if seconds is not None else None)
+    total, unknown = plan_batch_seconds(predictions, concurrency)
+    writer.write('plan_total', predicted_seconds=round(total, 1), concurrency=concurrency, unknown=unknown)
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    writer = JsonEventWriter(quiet=args.quiet)
+
+    ffmpeg_path = resolve_ffmpeg_path(args.ffmpeg)
+    if not ffmpeg_path:
+        writer.write('error', title="Erro de Configuração", message="FFmpeg não encontrado. Use --ffmpeg.")
+        return 1
+
+    encoder = CODEC_MAP[CODEC_CHOICES[args.codec]]
+    if missing_encoder(ffmpeg_path, encoder):
+        writer.write('error', title="Codec Indisponível",
+                     message=f"O FFmpeg em {ffmpeg_path} não tem o codificador {encoder}.")
+        return 1
+
+    jobs = build_jobs(args)
+    concurrency = args.jobs if args.jobs > 0 else default_concurrency()
+    writer.write('queue', jobs=len(jobs), concurrency=concurrency, ffmpeg=ffmpeg_path)
+    history = JobStore() if args.history or args.plan else None
+    if args.plan:
+        try:
+            return plan_jobs(ffmpeg_path, jobs, concurrency, writer, history)
+        finally:
+            history.close()
+    tracer = TraceRecorder() if args.trace else None
+    metrics, metrics_server = None, None
+    if args.metrics_port:
+        metrics = MetricsRegistry()
+        try:
+            metrics_server = MetricsServer(metrics, args.metrics_port).start()
+        except OSError as e:
+            writer.write('error', title="Erro de Métricas", message=f"Porta {args.metrics_port} indisponível: {e}")
+            return 1
+        writer.write('metrics', url=metrics_server.url)
+    try:
+        return_codes = run_jobs(ffmpeg_path, jobs, concurrency, writer, history, tracer, metrics)
+    finally:
+        if history is not None:
+            history.close()
+        if metrics_server is not None:
+            metrics_server.stop()
+        if tracer is not None:
+            writer.write('trace', path=tracer.export(args.trace))
+    exit_code = aggregate_exit_code(return_codes)
+    writer.write('done', exit_code=exit_code, return_codes=return_codes)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""Número de jobs simultâneos ajustado pela carga da máquina (modo 'Auto' da fila).
+
+A cada amostra são lidos /proc/stat (uso total de CPU), /proc/meminfo (memória
+disponível) e, dos processos FFmpeg filhos deste processo, a memória residente e o
+tempo de CPU. A política:
+
+- memória disponível abaixo da reserva: a admissão de jobs fica pausada (os que já
+  rodam continuam); abaixo da metade da reserva, o limite também cai;
+- CPU abaixo do alvo, todas as vagas ocupadas, jobs pendentes e memória para mais um
+  job (pelo RSS médio dos FFmpeg em execução): o limite sobe um;
+- CPU saturada por outros programas (não pelos nossos FFmpeg): o limite desce um.
+
+Mudanças só acontecem com a mesma indicação em amostras seguidas e depois de um
+intervalo desde a última mudança, para os jobs novos terem tempo de acelerar. Toda
+decisão vai para o log; mudanças também são devolvidas para a interface.
+
+Sem /proc (Windows, macOS) não há amostras e o limite inicial fica fixo.
+"""
+import os
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROC_ROOT = '/proc'
+SAMPLE_INTERVAL_MS = 2000
+# Uso total de CPU (% da máquina) que o controle tenta manter
+CPU_TARGET = 90.0
+# Abaixo de CPU_TARGET - CPU_BAND há núcleos sobrando; acima de CPU_HIGH a máquina está saturada
+CPU_BAND = 15.0
+CPU_HIGH = 97.0
+# Parte da CPU usada por outros programas a partir da qual a saturação é atribuída a eles
+FOREIGN_CPU = 25.0
+# Memória disponível mínima: fração da total ou MEMORY_HEADROOM_MIN_MB, o que for maior
+MEMORY_HEADROOM = 0.15
+MEMORY_HEADROOM_MIN_MB = 1024
+# Estimativa de memória de um job novo quando nenhum FFmpeg está rodando
+DEFAULT_JOB_RSS_MB = 512
+# Amostras seguidas com a mesma indicação antes de mudar, e amostras de espera após uma mudança
+STABLE_SAMPLES = 2
+COOLDOWN_SAMPLES = 3
+
+HOLD = "manter"
+RAISE = "subir"
+LOWER = "descer"
+
+
+def read_cpu_times(proc_root: str = PROC_ROOT) -> Optional[Tuple[int, int]]:
+    """(jiffies ocupados, jiffies totais) da linha 'cpu' de /proc/stat."""
+    try:
+        with open(os.path.join(proc_root, 'stat'), 'r', encoding='utf-8') as f:
+            fields = f.readline().split()
+    except OSError:
+        return None
+    if not fields or fields[0] != 'cpu':
+        return None
+    values = [int(value) for value in fields[1:9]]
+    # idle + iowait
+    idle = values[3] + (values[4] if len(values) > 4 else 0)
+    return sum(values) - idle, sum(values)
+
+
+def read_meminfo(proc_root: str = PROC_ROOT) -> Optional[Tuple[float, float]]:
+    """(MB disponíveis, MB totais) de /proc/meminfo."""
+    values: Dict[str, int] = {}
+    try:
+        with open(os.path.join(proc_root, 'meminfo'), 'r', encoding='utf-8') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in ('MemTotal', 'MemAvailable'):
+                    values[name] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    if 'MemTotal' not in values or 'MemAvailable' not in values:
+        return None
+    return values['MemAvailable'] / 1024, values['MemTotal'] / 1024
+
+
+def _child_pids(proc_root: str, parent_pid: int) -> List[int]:
+    """Filhos diretos de parent_pid: pelos arquivos 'children' das threads ou varrendo /proc."""
+    task_dir = os.path.join(proc_root, str(parent_pid), 'task')
+    pids: List[int] = []
+    found_children_file = False
+    try:
+        for tid in os.listdir(task_dir):
+            try:
+                with open(os.path.join(task_dir, tid, 'children'), 'r', encoding='utf-8') as f:
+                    pids.extend(int(pid) for pid in f.read().split())
+                found_children_file = True
+            except OSError:
+                continue
+    except OSError:
+        pass
+    if found_children_file:
+        return pids
+    for entry in os.listdir(proc_root):
+        if entry.isdigit():
+            stat = _read_pid_stat(proc_root, int(entry))
+            if stat and stat[1] == parent_pid:
+                pids.append(int(entry))
+    return pids
+
+
+def _read_pid_stat(proc_root: str, pid: int) -> Optional[Tuple[str, int, int]]:
+    """(comm, ppid, jiffies de CPU utime + stime) de /proc/<pid>/stat."""
+    try:
+        with open(os.path.join(proc_root, str(pid), 'stat'), 'r', encoding='utf-8') as f:
+            raw = f.read()
+    except OSError:
+        return None
+    # 'comm' vem entre parênteses e pode conter espaços
+    start, end = raw.find('('), raw.rfind(')')
+    fields = raw[end + 2:].split()
+    try:
+        return raw[start + 1:end], int(fields[1]), int(fields[11]) + int(fields[12])
+    except (IndexError, ValueError):
+        return None
+
+
+def _read_rss_kb(proc_root: str, pid: int) -> int:
+    try:
+        with open(os.path.join(proc_root, str(pid), 'status'), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def ffmpeg_children(proc_root: str = PROC_ROOT, parent_pid: Optional[int] = None) -> Dict[int, Tuple[int, int]]:
+    """{pid: (RSS em KiB, jiffies de CPU)} dos processos FFmpeg filhos de parent_pid."""
+    parent_pid = parent_pid if parent_pid is not None else os.getpid()
+    children = {}
+    for pid in _child_pids(proc_root, parent_pid):
+        stat = _read_pid_stat(proc_root, pid)
+        if stat and stat[0].lower().startswith('ffmpeg'):
+            children[pid] = (_read_rss_kb(proc_root, pid), stat[2])
+    return children
+
+
+@dataclass
+class LoadSample:
+    cpu_percent: float
+    ffmpeg_cpu_percent: float
+    mem_available_mb: float
+    mem_total_mb: float
+    ffmpeg_rss_mb: float
+    ffmpeg_processes: int
+
+    @property
+    def headroom_mb(self) -> float:
+        return max(self.mem_total_mb * MEMORY_HEADROOM, MEMORY_HEADROOM_MIN_MB)
+
+    def describe(self) -> str:
+        return (f"CPU {self.cpu_percent:.0f}% (FFmpeg {self.ffmpeg_cpu_percent:.0f}%), "
+                f"memória disponível {self.mem_available_mb:.0f}/{self.mem_total_mb:.0f} MB, "
+                f"FFmpeg {self.ffmpeg_rss_mb:.0f} MB em {self.ffmpeg_processes} processo(s)")
+
+
+class LoadSampler:
+    """Amostras de carga a partir de /proc; o uso de CPU é a diferença desde a amostra anterior."""
+
+    def __init__(self, proc_root: str = PROC_ROOT, parent_pid: Optional[int] = None):
+        self.proc_root = proc_root
+        self.parent_pid = parent_pid
+        self._last_cpu: Optional[Tuple[int, int]] = None
+        self._last_children: Dict[int, Tuple[int, int]] = {}
+
+    def sample(self) -> Optional[LoadSample]:
+        """None na primeira chamada (sem intervalo para medir a CPU) ou sem /proc."""
+        cpu = read_cpu_times(self.proc_root)
+        memory = read_meminfo(self.proc_root)
+        if cpu is None or memory is None:
+            return None
+        children = ffmpeg_children(self.proc_root, self.parent_pid)
+        last_cpu, last_children = self._last_cpu, self._last_children
+        self._last_cpu, self._last_children = cpu, children
+        if last_cpu is None or cpu[1] <= last_cpu[1]:
+            return None
+
+        total = cpu[1] - last_cpu[1]
+        # Só processos presentes nas duas amostras: os que começaram agora não têm intervalo
+        ffmpeg_ticks = sum(ticks - last_children[pid][1] for pid, (_, ticks) in children.items()
+                           if pid in last_children)
+        return LoadSample(
+            cpu_percent=100.0 * (cpu[0] - last_cpu[0]) / total,
+            ffmpeg_cpu_percent=min(100.0, 100.0 * max(0, ffmpeg_ticks) / total),
+            mem_available_mb=memory[0],
+            mem_total_mb=memory[1],
+            ffmpeg_rss_mb=sum(rss for rss, _ in children.values()) / 1024,
+            ffmpeg_processes=len(children),
+        )
+
+
+@dataclass
+class Decision:
+    limit: int
+    paused: bool
+    action: str
+    reason: str
+    changed: bool = False
+
+    def describe(self) -> str:
+        pause = ", admissão pausada" if self.paused else ""
+        return f"{self.action} em {self.limit} job(s){pause}: {self.reason}"
+
+
+class ConcurrencyController:
+    """Decide o limite de jobs simultâneos e a pausa de admissão a partir das amostras de carga."""
+
+    def __init__(self, initial: int, max_jobs: int, min_jobs: int = 1, sampler: Optional[LoadSampler] = None):
+        self.min_jobs = max(1, min_jobs)
+        self.max_jobs = max(self.min_jobs, max_jobs)
+        self.limit = min(max(initial, self.min_jobs), self.max_jobs)
+        self.paused = False
+        self.sampler = sampler or LoadSampler()
+        self._streak_action = HOLD
+        self._streak = 0
+        self._cooldown = 0
+
+    def update(self, running: int, pending: int) -> Optional[Decision]:
+        """Lê uma amostra e aplica a decisão; None quando ainda não há amostra."""
+        sample = self.sampler.sample()
+        if sample is None:
+            return None
+        decision = self.decide(sample, running, pending)
+        logger.info(f"Concorrência: {sample.describe()}; {running} rodando, {pending} pendente(s) -> "
+                    f"{decision.describe()}")
+        return decision
+
+    def decide(self, sample: LoadSample, running: int, pending: int) -> Decision:
+        headroom = sample.headroom_mb
+        per_job_mb = sample.ffmpeg_rss_mb / running if running and sample.ffmpeg_rss_mb else DEFAULT_JOB_RSS_MB
+        was_paused = self.paused
+        self.paused = sample.mem_available_mb < headroom
+
+        if sample.mem_available_mb < headroom / 2:
+            action, reason = LOWER, (f"memória disponível ({sample.mem_available_mb:.0f} MB) abaixo da metade "
+                                     f"da reserva ({headroom:.0f} MB)")
+        elif self.paused:
+            action, reason = HOLD, f"memória disponível ({sample.mem_available_mb:.0f} MB) abaixo da reserva ({headroom:.0f} MB)"
+        elif (sample.cpu_percent > CPU_HIGH
+              and sample.cpu_percent - sample.ffmpeg_cpu_percent > FOREIGN_CPU):
+            action, reason = LOWER, (f"CPU saturada ({sample.cpu_percent:.0f}%) com "
+                                     f"{sample.cpu_percent - sample.ffmpeg_cpu_percent:.0f}% de outros programas")
+        elif sample.cpu_percent < CPU_TARGET - CPU_BAND and pending and running >= self.limit:
+            if sample.mem_available_mb - per_job_mb < headroom:
+                action, reason = HOLD, (f"CPU em {sample.cpu_percent:.0f}%, mas mais um job (~{per_job_mb:.0f} MB) "
+                                        f"passaria da reserva de memória")
+            else:
+                action, reason = RAISE, f"CPU em {sample.cpu_percent:.0f}% (alvo {CPU_TARGET:.0f}%)"
+        else:
+            action, reason = HOLD, f"CPU em {sample.cpu_percent:.0f}% (alvo {CPU_TARGET:.0f}%)"
+
+        # A pausa vale na hora; mudar o limite espera amostras seguidas e o intervalo desde a última mudança
+        if action == self._streak_action:
+            self._streak += 1
+        else:
+            self._streak_action, self._streak = action, 1
+
+        target = self.limit
+        if action == RAISE:
+            target = min(self.limit + 1, self.max_jobs)
+        elif action == LOWER:
+            target = max(min(self.limit, max(running, self.min_jobs)) - 1, self.min_jobs)
+        if target != self.limit and (self._streak < STABLE_SAMPLES or self._cooldown):
+            reason += " (aguardando confirmação)"
+            target = self.limit
+        limit_changed = target != self.limit
+        if limit_changed:
+            self.limit = target
+            self._cooldown = COOLDOWN_SAMPLES
+            self._streak = 0
+        else:
+            action = HOLD
+            self._cooldown = max(0, self._cooldown - 1)
+        return Decision(self.limit, self.paused, action, reason, changed=limit_changed or self.paused != was_paused)
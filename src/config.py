@@ -9,6 +9,8 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 CONFIG_FILE = 'ffmpeg_config.json'
+# Diretório de dados alternativo (configuração, fila, caches); usado por testes e benchmarks
+DATA_DIR_ENV = 'COMPRESSOR_DATA_DIR'
 _CONFIG_CACHE = None 
 
 DEFAULT_CONFIG: Dict[str, Any] = {
@@ -18,11 +20,15 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     'last_resolution': 'Original',
     'advanced_options': False,
     'recent_files': [],  
-    'window_geometry': None  # Para lembrar tamanho/posição da janela
+    'window_geometry': None,  # Para lembrar tamanho/posição da janela
+    'max_concurrent_jobs': 0,  # 0 = automático (baseado nos núcleos)
+    'metrics_port': 0  # Porta local das métricas (Prometheus); 0 = desligado
 }
 
 def get_base_path() -> str:
     """Obtém o caminho base do aplicativo, funcionando para executáveis frozen e desenvolvimento."""
+    if os.environ.get(DATA_DIR_ENV):
+        return os.environ[DATA_DIR_ENV]
     if getattr(sys, 'frozen', False):
         return os.path.dirname(sys.executable)
     return os.path.dirname(os.path.abspath(__file__))
@@ -36,7 +42,8 @@ def _validate_config(config: Dict[str, Any]) -> Dict[str, Any]:
         for key, value in config.items():
             if key in DEFAULT_CONFIG:
                 expected_type = type(DEFAULT_CONFIG[key])
-                if isinstance(value, expected_type):
+                # Padrão None (caminho do FFmpeg, geometria): qualquer valor salvo vale
+                if DEFAULT_CONFIG[key] is None or isinstance(value, expected_type):
                     validated[key] = value
                 else:
                     logger.warning(f"Tipo inválido para {key}. Esperado {expected_type}, obtido {type(value)}")
@@ -49,14 +56,18 @@ def _validate_config(config: Dict[str, Any]) -> Dict[str, Any]:
                     except (ValueError, AttributeError):
                         logger.error(f"Falha ao converter {key} para {expected_type}")
     
-    # Validações específicas
-    if validated['ffmpeg_path'] and not os.path.isfile(validated['ffmpeg_path']):
-        logger.warning(f"Caminho do FFmpeg inválido: {validated['ffmpeg_path']}")
-        validated['ffmpeg_path'] = None
-    
+    # Validações específicas (sem acesso ao disco; caminhos são conferidos em check_config_paths)
     if validated['default_crf'] < 0 or validated['default_crf'] > 51:
         logger.warning(f"Valor CRF inválido: {validated['default_crf']}")
         validated['default_crf'] = DEFAULT_CONFIG['default_crf']
+
+    if validated['max_concurrent_jobs'] < 0:
+        logger.warning(f"Número de jobs simultâneos inválido: {validated['max_concurrent_jobs']}")
+        validated['max_concurrent_jobs'] = DEFAULT_CONFIG['max_concurrent_jobs']
+
+    if not 0 <= validated['metrics_port'] <= 65535:
+        logger.warning(f"Porta de métricas inválida: {validated['metrics_port']}")
+        validated['metrics_port'] = DEFAULT_CONFIG['metrics_port']
     
     return validated
 
@@ -83,7 +94,7 @@ def load_config(base_path: Optional[str] = None) -> Dict[str, Any]:
                 if 'recent_files' in file_config and isinstance(file_config['recent_files'], list):
                     loaded_config['recent_files'] = [
                         f for f in file_config['recent_files'] 
-                        if isinstance(f, str) and os.path.exists(f)
+                        if isinstance(f, str)
                     ][:10]  # Limita a 10 arquivos recentes
                 
         except json.JSONDecodeError as e:
@@ -103,6 +114,22 @@ def load_config(base_path: Optional[str] = None) -> Dict[str, Any]:
     _CONFIG_CACHE = _validate_config(loaded_config)
     return _CONFIG_CACHE
 
+def check_config_paths(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Confere no disco o FFmpeg e os arquivos recentes guardados na configuração.
+
+    Pode demorar em compartilhamentos de rede inacessíveis, por isso fica fora de
+    load_config: a interface chama esta função numa thread depois de aparecer.
+    Retorna só as chaves corrigidas ('ffmpeg_path' e 'recent_files').
+    """
+    if config is None:
+        config = load_config()
+    ffmpeg_path = config.get('ffmpeg_path')
+    if ffmpeg_path and not os.path.isfile(ffmpeg_path):
+        logger.warning(f"Caminho do FFmpeg inválido: {ffmpeg_path}")
+        ffmpeg_path = None
+    recent_files = [f for f in config.get('recent_files', []) if os.path.exists(f)]
+    return {'ffmpeg_path': ffmpeg_path, 'recent_files': recent_files}
+
 def save_config(config: Dict[str, Any], base_path: Optional[str] = None) -> bool:
     """Salva a configuração no arquivo e atualiza o cache."""
     global _CONFIG_CACHE
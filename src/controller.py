@@ -1,28 +1,108 @@
 from PySide6 import QtCore
 import os
-import sys
 import time
 import subprocess
-from PySide6.QtCore import QObject, QThread, Signal, Slot, Qt
+from functools import partial
+from PySide6.QtCore import QObject, QRunnable, QThread, QThreadPool, Signal, Slot, Qt
 from PySide6.QtWidgets import QFileDialog, QMessageBox
 
-from view import CompressorView, PathSelector
+from view import CompressorView, PathSelector, format_stats
 from worker import CompressionWorker
 from config import load_config, save_config, get_base_path
+from job_queue import JobQueue, JobSettings, JobState, suggest_output_path
+from scheduler import JobScheduler
+from aggregator import SignalAggregator
+from quality import QualityScores
+from verifier import QualityVerifier
+from checkpoint import ResumeRegistry
+from encoding import CODEC_MAP, format_duration
+from eta import predict_job, plan_batch_seconds
+from probe import probe, ProbeError
+from profiling import JobProfile, TRACE_ENV, tracer_from_env
+from metrics import MetricsRegistry, MetricsServer
+from capabilities import FFmpegCapabilities, ffmpeg_capabilities
+from startup import StartupTimer, StartupCheckTask, MARK_CONTROLLER, MARK_CHECKS, FIRST_PAINT_BUDGET_MS
+
+class _PredictionSignals(QObject):
+    # (job_id, segundos previstos ou -1 sem previsão)
+    finished = Signal(str, float)
+
+
+class _PredictionTask(QRunnable):
+    """Analisa a entrada (ffprobe) e prevê a duração do job fora da thread da GUI."""
+
+    def __init__(self, job_id, settings, ffmpeg_path, history):
+        super().__init__()
+        self.job_id = job_id
+        self.settings = settings
+        self.ffmpeg_path = ffmpeg_path
+        self.history = history
+        self.signals = _PredictionSignals()
+
+    def run(self):
+        try:
+            info = probe(self.settings.input_file, ffmpeg_path=self.ffmpeg_path)
+            seconds = predict_job(self.history, self.settings, info)
+        except (ProbeError, OSError, subprocess.TimeoutExpired):
+            seconds = None
+        self.signals.finished.emit(self.job_id, seconds if seconds is not None else -1.0)
+
 
 class CompressionController(QObject):
+    # Chave do modo de arquivo único no QualityVerifier (jobs da fila usam o job_id)
+    SINGLE_JOB_KEY = "single"
+    # Emitido quando as verificações adiadas da inicialização terminam
+    startup_checked = Signal()
 
-    def __init__(self, view: CompressorView, parent=None):
+    def __init__(self, view: CompressorView, startup: StartupTimer = None, parent=None):
         super().__init__(parent)
         self.view = view
+        self.startup = startup
         self.compression_thread = None
         self.compression_worker = None
         self.ffmpeg_path = None
+        self.capabilities = None
         self.input_file = None
         self.output_file = None
+        self.job_queue = JobQueue()
+        self.job_queue.load()
+        # Grava o que ainda estiver no lote do banco antes de o processo terminar
+        QtCore.QCoreApplication.instance().aboutToQuit.connect(self.job_queue.close)
+        self.verifier = QualityVerifier(parent=self)
+        self._single_verification = None
+        # Previsões de duração em andamento (mantidas vivas até o sinal chegar)
+        self._prediction_tasks = {}
+        # Linha do tempo (Chrome Trace) só quando COMPRESSOR_TRACE aponta para um arquivo
+        self.tracer = tracer_from_env()
+        # Endpoint de métricas local, só com 'metrics_port' configurada
+        self.metrics_port = load_config().get('metrics_port', 0)
+        self.metrics = MetricsRegistry() if self.metrics_port else None
+        self.metrics_server = None
+        self.scheduler = JobScheduler(self.job_queue,
+                                      max_concurrent=load_config().get('max_concurrent_jobs', 0),
+                                      verifier=self.verifier,
+                                      tracer=self.tracer,
+                                      metrics=self.metrics,
+                                      parent=self)
+        # Status/progresso do modo de arquivo único chegam em lotes pela GUI
+        self.aggregator = SignalAggregator(
+            lambda _job_id, message, level: self._handle_status(message, level),
+            lambda _job_id, percent, eta_str: self._handle_progress(percent, eta_str),
+            lambda _job_id, stats: self._handle_stats(stats),
+            parent=self
+        )
         self._connect_signals()
-        self._load_initial_ffmpeg_path()
+        self._start_metrics_server()
+        self._populate_queue_view()
         self.view.set_ui_busy(False)
+        if self.startup:
+            self.startup.mark(MARK_CONTROLLER)
+        # Caminhos da configuração e procura do FFmpeg podem demorar (rede): ficam fora da thread da GUI
+        self._startup_check = StartupCheckTask(load_config())
+        self._startup_check.signals.finished.connect(self._handle_startup_check)
+        QThreadPool.globalInstance().start(self._startup_check)
+        # Depois que a janela aparecer, oferece retomar compressões interrompidas
+        QtCore.QTimer.singleShot(0, self._offer_resume)
 
     def _connect_signals(self):
         self.view.select_ffmpeg_signal.connect(self.select_ffmpeg_executable)
@@ -30,35 +110,80 @@ class CompressionController(QObject):
         self.view.select_output_signal.connect(self.select_output_location)
         self.view.start_compression_signal.connect(self.start_compression)
         self.view.stop_compression_signal.connect(self.stop_compression)
+        self.view.add_to_queue_signal.connect(self.enqueue_job)
+        self.view.start_queue_signal.connect(self.start_queue)
+        self.view.stop_queue_signal.connect(self.stop_queue)
+        self.view.remove_job_signal.connect(self.remove_job)
+        self.view.concurrency_changed_signal.connect(self.set_max_concurrent_jobs)
         self.view.closing.connect(self.handle_window_close)
 
-    def _load_initial_ffmpeg_path(self):
-        config = load_config()
-        loaded_path = config.get('ffmpeg_path')
-        
-        if not loaded_path:
-            base = get_base_path()
-            potential_paths = []
-            if getattr(sys, 'frozen', False):
-                potential_paths.append(os.path.join(base, "_internal", "ffmpeg.exe"))
-                potential_paths.append(os.path.join(base, "ffmpeg.exe"))
-            else:
-                potential_paths.append(os.path.join(base, "ffmpeg.exe"))
-
-            for path in potential_paths:
-                if os.path.isfile(path):
-                    loaded_path = path
-                    self.view.log_message(f"FFmpeg encontrado automaticamente: {loaded_path}", "INFO")
-                    save_config({'ffmpeg_path': loaded_path})
-                    break
-
-        if loaded_path and os.path.isfile(loaded_path):
-            self.ffmpeg_path = loaded_path
+        self.scheduler.job_started.connect(self._handle_job_started)
+        self.scheduler.job_progress.connect(self._handle_job_progress)
+        self.scheduler.job_stats.connect(self._handle_job_stats)
+        self.scheduler.job_status.connect(self._handle_job_status)
+        self.scheduler.job_error.connect(self._handle_job_error)
+        self.scheduler.job_finished.connect(self._handle_job_finished)
+        self.scheduler.job_quality.connect(self._handle_job_quality)
+        self.scheduler.queue_finished.connect(self._handle_queue_finished)
+        self.scheduler.concurrency_changed.connect(self._handle_concurrency_changed)
+        self.verifier.scores_ready.connect(self._handle_quality_scores)
+        self.verifier.check_failed.connect(self._handle_quality_failed)
+
+    def _start_metrics_server(self):
+        if self.metrics is None:
+            return
+        self.scheduler.update_queued_metric()
+        try:
+            self.metrics_server = MetricsServer(self.metrics, self.metrics_port).start()
+        except OSError as e:
+            self.view.log_message(f"Não foi possível abrir as métricas na porta {self.metrics_port}: {e}", "WARN")
+            return
+        QtCore.QCoreApplication.instance().aboutToQuit.connect(self.metrics_server.stop)
+        self.view.log_message(f"Métricas disponíveis em {self.metrics_server.url}", "INFO")
+
+    @Slot(dict)
+    def _handle_startup_check(self, result):
+        self._startup_check = None
+        # A configuração fica só com os arquivos recentes que ainda existem
+        if result['recent_files'] != load_config()['recent_files']:
+            save_config({**load_config(), 'recent_files': result['recent_files']})
+        # Se o usuário escolheu um FFmpeg enquanto a verificação rodava, mantém a escolha
+        if not self.ffmpeg_path and result['ffmpeg_path']:
+            self.ffmpeg_path = result['ffmpeg_path']
+            if result['ffmpeg_auto']:
+                self.view.log_message(f"FFmpeg encontrado automaticamente: {self.ffmpeg_path}", "INFO")
+                save_config({**load_config(), 'ffmpeg_path': self.ffmpeg_path})
             self.view.set_ffmpeg_path(self.ffmpeg_path)
+            self.view.set_ui_busy(self.compression_thread is not None)
             self.view.log_message(f"Usando FFmpeg de: {self.ffmpeg_path}", "INFO")
-        else:
-            self.ffmpeg_path = None
+            self._apply_capabilities(FFmpegCapabilities.from_dict(result['capabilities']))
+        elif not self.ffmpeg_path:
             self.view.log_message("FFmpeg não configurado. Selecione o executável.", "WARN")
+        self._log_startup_report()
+        self.startup_checked.emit()
+
+    def _apply_capabilities(self, capabilities):
+        """Mostra a versão do FFmpeg e deixa no combo só os codecs que ele tem."""
+        self.capabilities = capabilities
+        if capabilities is None:
+            return
+        if capabilities.version:
+            self.view.log_message(capabilities.version, "INFO")
+        if not capabilities.ffprobe_path:
+            self.view.log_message("ffprobe não encontrado; a análise usará o cabeçalho do FFmpeg.", "WARN")
+        codecs = capabilities.available_codecs()
+        missing = [label for label in CODEC_MAP if label not in codecs]
+        if missing:
+            self.view.log_message(f"Codecs indisponíveis neste FFmpeg: {', '.join(missing)}", "WARN")
+        self.view.set_available_codecs(codecs)
+
+    def _log_startup_report(self):
+        if self.startup is None:
+            return
+        self.startup.mark(MARK_CHECKS)
+        self.view.log_message(self.startup.report(), "INFO")
+        if self.startup.over_budget():
+            self.view.log_message(f"A janela levou mais de {FIRST_PAINT_BUDGET_MS} ms para aparecer.", "WARN")
 
     @Slot()
     def select_ffmpeg_executable(self):
@@ -76,11 +201,16 @@ class CompressionController(QObject):
         is_valid_ffmpeg = (selected_path and os.path.isfile(selected_path) and
                            'ffmpeg' in os.path.basename(selected_path).lower())
 
-        if is_valid_ffmpeg:
+        capabilities = ffmpeg_capabilities(selected_path) if is_valid_ffmpeg else None
+
+        if is_valid_ffmpeg and capabilities is None:
+            self.view.show_error_message("Seleção Inválida", f"O FFmpeg selecionado não pôde ser executado:\n{selected_path}")
+        elif is_valid_ffmpeg:
             self.ffmpeg_path = selected_path
             self.view.set_ffmpeg_path(self.ffmpeg_path)
-            save_config({'ffmpeg_path': self.ffmpeg_path})
+            save_config({**load_config(), 'ffmpeg_path': self.ffmpeg_path})
             self.view.log_message(f"FFmpeg definido para: {self.ffmpeg_path}", "INFO")
+            self._apply_capabilities(capabilities)
         elif selected_path:
              self.view.show_error_message("Seleção Inválida", f"Arquivo selecionado não parece ser um executável FFmpeg válido:\n{selected_path}")
         else:
@@ -116,17 +246,7 @@ class CompressionController(QObject):
     def _suggest_output_filename(self):
         if not self.input_file: return
 
-        input_dir = os.path.dirname(self.input_file)
-        base_name = os.path.splitext(os.path.basename(self.input_file))[0]
-        default_output_name = f"{base_name}_comprimido.mp4"
-        suggested_path = os.path.join(input_dir, default_output_name)
-        count = 1
-        final_path = suggested_path
-
-        while os.path.exists(final_path):
-            final_path = os.path.join(input_dir, f"{base_name}_comprimido_{count}.mp4")
-            count += 1
-
+        final_path = suggest_output_path(self.input_file)
         self.output_file = final_path
         self.view.set_output_path(final_path)
         self.view.log_message(f"Nome de arquivo de saída sugerido: {os.path.basename(final_path)}", "INFO")
@@ -158,70 +278,106 @@ class CompressionController(QObject):
 
         self.view.set_ui_busy(False)
 
-    @Slot(str, str, str)
-    def start_compression(self, ffmpeg_path_view, input_file_view, output_file_view):
-        self.view.log_message("Botão 'Iniciar Compressão' clicado.", "INFO")
-
-        self.ffmpeg_path = ffmpeg_path_view
-        self.input_file = input_file_view
-        self.output_file = output_file_view
-
-        if not self.ffmpeg_path or not os.path.isfile(self.ffmpeg_path):
+    def _validate_job_paths(self, ffmpeg_path, input_file, output_file):
+        if not ffmpeg_path or not os.path.isfile(ffmpeg_path):
             self.view.show_error_message("Erro de Configuração", "Caminho para o FFmpeg inválido ou não definido.")
-            return
-        if not self.input_file or not os.path.isfile(self.input_file):
+            return False
+        if not input_file or not os.path.isfile(input_file):
             self.view.show_error_message("Erro de Entrada", "Arquivo de vídeo de entrada inválido ou não selecionado.")
-            return
-        if not self.output_file:
+            return False
+        if not output_file:
             self.view.show_error_message("Erro de Saída", "Local para salvar o arquivo de saída não selecionado.")
-            return
+            return False
         try:
-             if os.path.abspath(self.input_file) == os.path.abspath(self.output_file):
+             if os.path.abspath(input_file) == os.path.abspath(output_file):
                   self.view.show_error_message("Erro de Saída", "O arquivo de saída não pode ser o mesmo que o arquivo de entrada.")
-                  return
+                  return False
         except Exception as e:
              self.view.show_error_message("Erro de Path", f"Erro ao comparar caminhos de entrada e saída: {e}")
-             return
+             return False
 
-        output_dir = os.path.dirname(self.output_file)
-        if not os.path.isdir(output_dir):
+        output_dir = os.path.dirname(output_file)
+        if output_dir and not os.path.isdir(output_dir):
               try:
                   os.makedirs(output_dir, exist_ok=True)
                   self.view.log_message(f"Diretório de saída criado: {output_dir}", "INFO")
               except Exception as e:
                   self.view.show_error_message("Erro de Saída", f"Não foi possível criar o diretório de saída:\n{output_dir}\n{e}")
-                  return
+                  return False
+        return True
 
-        # Get all compression parameters from view
-        selected_quality = self.view.get_selected_quality()
-        codec = self.view.get_selected_codec()
+    def _collect_job_settings(self, input_file, output_file):
         resolution = self.view.get_selected_resolution()
-        custom_res = self.view.get_custom_resolution() if resolution == "Personalizado..." else None
-        crf = self.view.get_crf_value() if self.view.advanced_toggle.isChecked() else None
+        advanced = self.view.advanced_toggle.isChecked()
+        quality_metric, quality_floor = self.view.get_quality_target() if advanced else (None, None)
+        return JobSettings(
+            input_file=input_file,
+            output_file=output_file,
+            quality_preset=self.view.get_selected_quality(),
+            codec=self.view.get_selected_codec(),
+            resolution=resolution,
+            custom_res=self.view.get_custom_resolution() if resolution == "Personalizado..." else None,
+            crf=self.view.get_crf_value() if self.view.advanced_toggle.isChecked() else None,
+            segment_parallel=self.view.advanced_toggle.isChecked() and self.view.get_segment_parallel(),
+            target_size_mb=self.view.get_target_size_mb() if advanced else None,
+            quality_floor=quality_floor,
+            quality_metric=quality_metric or "ssim",
+            force_reencode=self.view.get_force_reencode(),
+            resumable=self.view.get_resumable(),
+            verify_quality=self.view.get_verify_quality()
+        )
+
+    @Slot(str, str, str)
+    def start_compression(self, ffmpeg_path_view, input_file_view, output_file_view):
+        self.view.log_message("Botão 'Iniciar Compressão' clicado.", "INFO")
+
+        self.ffmpeg_path = ffmpeg_path_view
+        self.input_file = input_file_view
+        self.output_file = output_file_view
+
+        if not self._validate_job_paths(self.ffmpeg_path, self.input_file, self.output_file):
+            return
 
-        self.view.log_message(f"Configurações: Qualidade={selected_quality}, Codec={codec}, Resolução={resolution}", "INFO")
-        if crf:
-            self.view.log_message(f"Parâmetros avançados: CRF={crf}", "INFO")
+        # Get all compression parameters from view
+        settings = self._collect_job_settings(self.input_file, self.output_file)
+
+        self.view.log_message(f"Configurações: Qualidade={settings.quality_preset}, Codec={settings.codec}, Resolução={settings.resolution}", "INFO")
+        if settings.crf:
+            self.view.log_message(f"Parâmetros avançados: CRF={settings.crf}", "INFO")
+        if settings.segment_parallel:
+            self.view.log_message("Parâmetros avançados: codificação paralela por trechos", "INFO")
+        if settings.quality_floor:
+            self.view.log_message(f"Parâmetros avançados: CRF automático com {settings.quality_metric.upper()} ≥ {settings.quality_floor:g}", "INFO")
+        if settings.target_size_mb:
+            self.view.log_message(f"Parâmetros avançados: tamanho alvo de {settings.target_size_mb:.1f} MB (duas passagens)", "INFO")
+        if settings.resumable:
+            self.view.log_message("Parâmetros avançados: retomável (checkpoint por trecho)", "INFO")
 
         self.view.clear_log()
         self.view.reset_progress()
         self.view.set_ui_busy(True)
+        self._single_verification = (self.input_file, self.output_file) if settings.verify_quality else None
 
         self.compression_thread = QThread(self)
         self.compression_worker = CompressionWorker(
             self.ffmpeg_path,
             self.input_file,
             self.output_file,
-            quality_preset=selected_quality,
-            codec=codec,
-            resolution=resolution,
-            custom_res=custom_res,
-            crf=crf
+            history=self.job_queue.store,
+            profile=JobProfile(self.tracer, self.SINGLE_JOB_KEY, "Arquivo único") if self.tracer else None,
+            # Divide os núcleos com os jobs da fila que estiverem rodando
+            concurrent_jobs=1 + len(self.scheduler.active_job_ids()),
+            **settings.worker_kwargs()
         )
         self.compression_worker.moveToThread(self.compression_thread)
-
-        self.compression_worker.progress_updated.connect(self._handle_progress)
-        self.compression_worker.status_message.connect(self._handle_status)
+        if self.metrics:
+            self.metrics.observe(self.SINGLE_JOB_KEY, self.compression_worker, os.path.basename(self.input_file))
+
+        direct = Qt.ConnectionType.DirectConnection
+        self.compression_worker.progress_updated.connect(partial(self.aggregator.post_progress, None), direct)
+        self.compression_worker.stats_updated.connect(partial(self.aggregator.post_stats, None), direct)
+        self.compression_worker.status_message.connect(partial(self.aggregator.post_status, None), direct)
+        self.compression_worker.result_ready.connect(self._handle_result)
         self.compression_worker.finished.connect(self._handle_finished)
         self.compression_worker.error_occurred.connect(self._handle_error)
 
@@ -232,6 +388,7 @@ class CompressionController(QObject):
         self.compression_thread.finished.connect(self._cleanup_references)
 
         self.view.log_message("Iniciando thread de compressão...", "INFO")
+        self.aggregator.start()
         self.compression_thread.start()
 
     @Slot()
@@ -247,19 +404,31 @@ class CompressionController(QObject):
     def _handle_progress(self, percent, eta_str):
         self.view.update_progress(percent, eta_str)
 
+    @Slot(dict)
+    def _handle_stats(self, stats):
+        self.view.update_stats(stats)
+
     @Slot(str, str)
     def _handle_status(self, message, level):
         self.view.log_message(message, level)
 
+    @Slot(dict)
+    def _handle_result(self, summary):
+        # Modo de arquivo único não tem job na fila; o resultado entra só no histórico
+        self.job_queue.record_result(None, summary)
+
     @Slot(str, str)
     def _handle_error(self, title, message):
+        self.aggregator.flush()
         self.view.show_error_message(title, message)
 
     @Slot(int, str, float, float)
     def _handle_finished(self, return_code, output_file, original_mb, final_mb):
+        self.aggregator.stop()
         self.view.log_message(f"Thread de compressão finalizada com código: {return_code}", "INFO")
         self.view.set_ui_busy(False)
         self.view.reset_progress()
+        self._export_trace()
 
         if return_code == 0:
             reduction_str = ""
@@ -277,22 +446,236 @@ class CompressionController(QObject):
             # Update size comparison chart
             self.view.size_chart.update_sizes(original_mb, final_mb)
 
+            if self._single_verification:
+                input_file, output_file = self._single_verification
+                self._single_verification = None
+                self.view.log_message("Calculando métricas de qualidade em segundo plano...", "INFO")
+                self.verifier.submit(self.SINGLE_JOB_KEY, self.ffmpeg_path, input_file, output_file)
+
         elif return_code == -1:
              self.view.show_warning_message("Cancelado", "A operação de compressão foi cancelada.")
              self.view.log_message("Operação cancelada pelo usuário.", "WARN")
         else:
              self.view.log_message(f"Compressão falhou. Verifique os logs acima.", "ERROR")
 
+    @Slot(str, dict)
+    def _handle_quality_scores(self, key, scores):
+        if key != self.SINGLE_JOB_KEY:
+            return
+        self.view.log_message(f"Qualidade da saída: {QualityScores.from_dict(scores).summary()}", "INFO")
+        self.view.size_chart.update_quality(scores)
+
+    @Slot(str, str)
+    def _handle_quality_failed(self, key, message):
+        if key == self.SINGLE_JOB_KEY:
+            self.view.log_message(f"Verificação de qualidade não concluída: {message}", "WARN")
+
     @Slot()
     def _cleanup_references(self):
         self.compression_thread = None
         self.compression_worker = None
         self.view.log_message("Referências internas da thread limpas.", "INFO")
 
+    def _populate_queue_view(self):
+        for job in self.job_queue:
+            self.view.add_queue_job(job.job_id, job.name, job.state)
+            self.view.update_queue_job(job.job_id, percent=job.progress, result=self._job_result_text(job))
+        if len(self.job_queue):
+            self.view.log_message(f"Fila restaurada com {len(self.job_queue.pending())} job(s) pendente(s).", "INFO")
+
+    @Slot()
+    def _offer_resume(self):
+        registry = ResumeRegistry()
+        queued = {job.settings.output_file for job in self.job_queue.pending() + self.job_queue.running()}
+        manifests = [m for m in registry.orphans() if m.job and m.output_file not in queued]
+        if not manifests:
+            return
+        description = "\n".join(
+            f"• {os.path.basename(m.input_file)}: {m.done_count()} de {len(m.segments) or '?'} trecho(s) salvos"
+            for m in manifests)
+        choice = self.view.ask_resume(description)
+        if choice == 'discard':
+            for manifest in manifests:
+                registry.discard(manifest)
+            self.view.log_message(f"{len(manifests)} compressão(ões) interrompida(s) descartada(s).", "INFO")
+            return
+        if choice != 'resume':
+            return
+        for manifest in manifests:
+            job_args = dict(manifest.job)
+            job_args['custom_res'] = tuple(job_args['custom_res']) if job_args.get('custom_res') else None
+            job_args['resumable'] = True
+            job = self.job_queue.add(JobSettings(**job_args))
+            self.view.add_queue_job(job.job_id, job.name, job.state)
+        self.view.log_message(f"{len(manifests)} compressão(ões) interrompida(s) adicionada(s) à fila.", "INFO")
+        self.start_queue()
+
+    def _job_result_text(self, job):
+        if job.state == JobState.DONE and job.original_mb > 0 and job.final_mb > 0:
+            reduction = 100 - (job.final_mb / job.original_mb * 100)
+            text = f"{job.final_mb:.2f} MB ({reduction:.1f}% menor)"
+            if job.quality:
+                text += f" | {QualityScores.from_dict(job.quality).summary()}"
+            return text
+        if job.state == JobState.FAILED:
+            return f"Código {job.return_code}"
+        if job.state == JobState.PENDING and job.predicted_seconds:
+            return f"Previsto: {format_duration(job.predicted_seconds)}"
+        return ""
+
+    def _predict_job_seconds(self, job):
+        """Previsão em segundo plano: o ffprobe de arquivos na rede não trava a janela."""
+        task = _PredictionTask(job.job_id, job.settings, self.ffmpeg_path, self.job_queue.store)
+        task.signals.finished.connect(self._handle_prediction)
+        self._prediction_tasks[job.job_id] = task
+        QThreadPool.globalInstance().start(task)
+
+    @Slot(str, float)
+    def _handle_prediction(self, job_id, seconds):
+        self._prediction_tasks.pop(job_id, None)
+        job = self.job_queue.get(job_id)
+        if job is None or seconds < 0 or job.state != JobState.PENDING:
+            return
+        job.predicted_seconds = seconds
+        self.job_queue.save(job_id)
+        self.view.update_queue_job(job_id, result=self._job_result_text(job))
+
+    @Slot(str, str, str)
+    def enqueue_job(self, ffmpeg_path_view, input_file_view, output_file_view):
+        if not self._validate_job_paths(ffmpeg_path_view, input_file_view, output_file_view):
+            return
+        self.ffmpeg_path = ffmpeg_path_view
+        settings = self._collect_job_settings(input_file_view, output_file_view)
+        job = self.job_queue.add(settings)
+        self.view.add_queue_job(job.job_id, job.name, job.state)
+        self._predict_job_seconds(job)
+        self.scheduler.update_queued_metric()
+        self.view.log_message(f"Adicionado à fila: {job.name} -> {os.path.basename(settings.output_file)}", "INFO")
+
+    @Slot()
+    def start_queue(self):
+        if not self.ffmpeg_path or not os.path.isfile(self.ffmpeg_path):
+            self.view.show_error_message("Erro de Configuração", "Caminho para o FFmpeg inválido ou não definido.")
+            return
+        if not self.job_queue.pending():
+            self.view.log_message("Nenhum job pendente na fila.", "INFO")
+            return
+        self.scheduler.ffmpeg_path = self.ffmpeg_path
+        self.view.log_message(f"Iniciando fila: {len(self.job_queue.pending())} job(s), até {self.scheduler.max_concurrent} simultâneo(s).", "INFO")
+        total, unknown = plan_batch_seconds([job.predicted_seconds for job in self.job_queue.pending()],
+                                            self.scheduler.max_concurrent)
+        if total > 0:
+            note = f" ({unknown} job(s) sem histórico semelhante)" if unknown else ""
+            self.view.log_message(f"Tempo previsto da fila: {format_duration(total)}{note}", "INFO")
+        self.view.set_queue_busy(True)
+        self.scheduler.start()
+
+    @Slot()
+    def stop_queue(self):
+        if self.scheduler.is_running():
+            self.view.log_message("Parando todos os jobs da fila...", "WARN")
+            self.scheduler.stop_all()
+        else:
+            self.view.log_message("Nenhum job da fila em execução.", "INFO")
+
+    @Slot(str)
+    def remove_job(self, job_id):
+        if self.job_queue.remove(job_id):
+            self.view.remove_queue_job(job_id)
+            self.scheduler.update_queued_metric()
+        else:
+            self.view.log_message("Não é possível remover um job em execução.", "WARN")
+
+    @Slot(int)
+    def set_max_concurrent_jobs(self, value):
+        self.scheduler.set_max_concurrent(value)
+        if self.scheduler.adaptive:
+            self.view.log_message(f"Compressões simultâneas: Auto (ajustadas pela carga de CPU e memória, "
+                                  f"agora {self.scheduler.max_concurrent})", "INFO")
+        else:
+            self.view.log_message(f"Compressões simultâneas: {self.scheduler.max_concurrent}", "INFO")
+
+    @Slot(int, bool, str)
+    def _handle_concurrency_changed(self, limit, paused, message):
+        self.view.log_message(message, "WARN" if paused else "INFO")
+
+    def _job_name(self, job_id):
+        job = self.job_queue.get(job_id)
+        return job.name if job else job_id
+
+    @Slot(str)
+    def _handle_job_started(self, job_id):
+        self.view.update_queue_job(job_id, state=JobState.RUNNING, percent=0, result="")
+
+    @Slot(str, int, str)
+    def _handle_job_progress(self, job_id, percent, eta_str):
+        self.view.update_queue_job(job_id, percent=percent, result=eta_str)
+
+    @Slot(str, dict)
+    def _handle_job_stats(self, job_id, stats):
+        if stats.get('percent') is not None:
+            self.view.update_queue_job(job_id, percent=stats['percent'])
+        self.view.update_queue_job(job_id, result=f"{stats.get('eta', '')} | {format_stats(stats)}")
+
+    @Slot(str, str, str)
+    def _handle_job_status(self, job_id, message, level):
+        self.view.log_message(f"[{self._job_name(job_id)}] {message}", level)
+
+    @Slot(str, str, str)
+    def _handle_job_error(self, job_id, title, message):
+        self.view.log_message(f"[{self._job_name(job_id)}] {title}: {message}", "ERROR")
+
+    @Slot(str, int, str, float, float)
+    def _handle_job_finished(self, job_id, return_code, output_file, original_mb, final_mb):
+        job = self.job_queue.get(job_id)
+        if job is None:
+            return
+        self.view.update_queue_job(job_id, state=job.state, percent=job.progress,
+                                   result=self._job_result_text(job))
+        if return_code == 0:
+            self.view.size_chart.update_sizes(original_mb, final_mb)
+
+    @Slot(str, dict)
+    def _handle_job_quality(self, job_id, scores):
+        job = self.job_queue.get(job_id)
+        if job is None:
+            return
+        self.view.update_queue_job(job_id, result=self._job_result_text(job))
+        self.view.size_chart.update_sizes(job.original_mb, job.final_mb)
+        self.view.size_chart.update_quality(scores)
+
+    @Slot()
+    def _handle_queue_finished(self):
+        self.view.set_queue_busy(False)
+        done = sum(1 for j in self.job_queue if j.state == JobState.DONE)
+        failed = sum(1 for j in self.job_queue if j.state == JobState.FAILED)
+        self.view.log_message(f"Fila finalizada: {done} concluído(s), {failed} com falha.", "INFO")
+        self._export_trace()
+
+    def _export_trace(self):
+        if self.tracer is None:
+            return
+        try:
+            path = self.tracer.export(os.environ[TRACE_ENV])
+            self.view.log_message(f"Linha do tempo (Chrome Trace) salva em: {path}", "INFO")
+        except (OSError, KeyError) as e:
+            self.view.log_message(f"Não foi possível salvar a linha do tempo: {e}", "WARN")
+
     @Slot()
     def handle_window_close(self):
+        # As verificações de qualidade em segundo plano só param se o fechamento for confirmado
+        if self.scheduler.is_running():
+            if self.view.confirm_exit_dialog():
+                self.verifier.stop_all()
+                self.view.log_message("Parando a fila para fechar a janela...", "WARN")
+                self.scheduler.queue_finished.connect(self.view.close, Qt.ConnectionType.SingleShotConnection)
+                self.scheduler.stop_all()
+            else:
+                self.view.log_message("Fechamento da janela cancelado pelo usuário.", "INFO")
+            return
         if self.compression_thread and self.compression_thread.isRunning():
             if self.view.confirm_exit_dialog():
+                self.verifier.stop_all()
                 self.view.log_message("Parando compressão para fechar a janela...", "WARN")
                 self.stop_compression()
                 if self.compression_worker:
@@ -302,4 +685,5 @@ class CompressionController(QObject):
             else:
                 self.view.log_message("Fechamento da janela cancelado pelo usuário.", "INFO")
         else:
+            self.verifier.stop_all()
             self.view.close()
@@ -0,0 +1,257 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+from config import get_base_path
+from encoding import EncodeSettings, format_command, subprocess_window_kwargs
+from probe import file_identity
+from quality import parse_scores
+from threads import usable_cores
+
+logger = logging.getLogger(__name__)
+
+CRF_TRIALS_FILE = 'crf_trials.json'
+MAX_CACHED_FILES = 200
+SAMPLE_COUNT = 3
+SAMPLE_SECONDS = 4.0
+
+# CRFs testados por codec, do melhor para o pior (a escala do VP9 é diferente)
+CRF_CANDIDATES = {
+    "libx264": [18, 21, 24, 27, 30, 33],
+    "libx265": [20, 23, 26, 29, 32, 35],
+    "libvpx-vp9": [24, 28, 32, 36, 40, 44],
+}
+
+QUALITY_METRICS = ("ssim", "psnr")
+DEFAULT_QUALITY_FLOOR = {"ssim": 0.97, "psnr": 40.0}
+
+
+@dataclass
+class TrialResult:
+    crf: int
+    ssim: float
+    psnr: float
+
+    def score(self, metric: str) -> float:
+        return self.ssim if metric == "ssim" else self.psnr
+
+
+def sample_positions(duration_seconds: float, count: int = SAMPLE_COUNT,
+                     sample_seconds: float = SAMPLE_SECONDS) -> List[float]:
+    """Inícios de 'count' trechos espalhados pelo vídeo (evitando o começo e o fim)."""
+    if duration_seconds <= sample_seconds * 1.5:
+        return [0.0]
+    usable = duration_seconds - sample_seconds
+    return [round(usable * (i + 1) / (count + 1), 3) for i in range(count)]
+
+
+def choose_crf(trials: List[TrialResult], metric: str, floor: float) -> Tuple[int, bool]:
+    """Maior CRF cuja pior amostra atinge o piso. Retorna (crf, atingiu_o_piso)."""
+    ordered = sorted(trials, key=lambda t: t.crf)
+    passing = [t for t in ordered if t.score(metric) >= floor]
+    if passing:
+        return passing[-1].crf, True
+    return ordered[0].crf, False
+
+
+class CrfTrialCache:
+    """Resultados das amostras por arquivo (identidade + codec + preset + filtros), em JSON.
+
+    Mudar o piso de qualidade não refaz a busca: as medições por CRF são reaproveitadas.
+    """
+
+    def __init__(self, base_path: Optional[str] = None, max_files: int = MAX_CACHED_FILES):
+        self.base_path = base_path if base_path is not None else get_base_path()
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    @property
+    def cache_path(self) -> str:
+        return os.path.join(self.base_path, CRF_TRIALS_FILE)
+
+    @staticmethod
+    def key(input_file: str, settings: EncodeSettings) -> Optional[str]:
+        identity = file_identity(input_file)
+        if identity is None:
+            return None
+        raw = "|".join([identity, settings.codec, settings.preset, settings.video_filter])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+    def _read(self) -> Dict[str, Dict[str, List[float]]]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def get(self, key: str) -> Dict[int, TrialResult]:
+        with self._lock:
+            entry = self._read().get(key, {})
+        return {int(crf): TrialResult(int(crf), values[0], values[1]) for crf, values in entry.items()}
+
+    def put(self, key: str, trials: List[TrialResult]) -> None:
+        with self._lock:
+            data = self._read()
+            entry = data.pop(key, {})
+            entry.update({str(t.crf): [t.ssim, t.psnr] for t in trials})
+            data[key] = entry
+            while len(data) > self.max_files:
+                data.pop(next(iter(data)))
+            try:
+                os.makedirs(self.base_path, exist_ok=True)
+                tmp_path = f"{self.cache_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.cache_path)
+            except OSError as e:
+                logger.error(f"Erro ao salvar cache da busca de CRF: {e}")
+
+
+class CrfSearch:
+    """Escolhe o CRF por título: codifica amostras curtas em vários CRFs em paralelo,
+    mede SSIM/PSNR com os filtros do próprio FFmpeg e fica com o maior CRF que
+    atinge o piso de qualidade na pior amostra.
+    """
+
+    INFO = "INFO"; WARN = "AVISO"; CMD = "CMD"
+
+    def __init__(self, ffmpeg_path, input_file, settings: EncodeSettings, duration_seconds,
+                 metric="ssim", floor=None, max_workers=0, status_callback=None,
+                 is_running=None, cache: Optional[CrfTrialCache] = None):
+        self.ffmpeg_path = ffmpeg_path
+        self.input_file = input_file
+        self.duration_seconds = duration_seconds
+        self.metric = metric if metric in QUALITY_METRICS else "ssim"
+        self.floor = floor if floor is not None else DEFAULT_QUALITY_FLOOR[self.metric]
+        self.max_workers = max_workers if max_workers > 0 else max(2, usable_cores() // 2)
+        # As threads do job são divididas entre as amostras codificadas ao mesmo tempo
+        if settings.threads is not None:
+            settings = replace(settings, threads=settings.threads.split(self.max_workers))
+        self.settings = settings
+        self.cache = cache or CrfTrialCache()
+        self._status = status_callback or (lambda message, level: None)
+        self._is_running = is_running or (lambda: True)
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+
+    def stop(self):
+        self._stopped.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            if process.poll() is None:
+                try:
+                    process.terminate()
+                except Exception:
+                    pass
+
+    def _should_stop(self):
+        return self._stopped.is_set() or not self._is_running()
+
+    def run(self) -> Optional[int]:
+        """Retorna o CRF escolhido, ou None se a busca falhou ou foi cancelada."""
+        candidates = CRF_CANDIDATES.get(self.settings.codec, CRF_CANDIDATES["libx264"])
+        key = self.cache.key(self.input_file, self.settings)
+        known = self.cache.get(key) if key else {}
+        missing = [crf for crf in candidates if crf not in known]
+
+        if missing:
+            positions = sample_positions(self.duration_seconds)
+            self._status(f"Busca de CRF: {len(positions)} amostra(s) de {SAMPLE_SECONDS:.0f}s × "
+                         f"{len(missing)} CRF(s), até {self.max_workers} processos.", self.INFO)
+            measured = self._measure(missing, positions)
+            if measured is None:
+                return None
+            if key:
+                self.cache.put(key, measured)
+            known.update({t.crf: t for t in measured})
+        else:
+            self._status("Busca de CRF: medições reaproveitadas do cache.", self.INFO)
+
+        trials = [known[crf] for crf in candidates]
+        for trial in trials:
+            self._status(f"  CRF {trial.crf}: SSIM {trial.ssim:.4f} | PSNR {trial.psnr:.2f} dB", self.INFO)
+        crf, reached = choose_crf(trials, self.metric, self.floor)
+        if reached:
+            self._status(f"CRF escolhido: {crf} ({self.metric.upper()} ≥ {self.floor:g}).", self.INFO)
+        else:
+            self._status(f"Nenhum CRF atingiu {self.metric.upper()} ≥ {self.floor:g}; usando o de maior qualidade ({crf}).", self.WARN)
+        return crf
+
+    def _measure(self, crfs, positions) -> Optional[List[TrialResult]]:
+        workdir = tempfile.mkdtemp(prefix="crf_search_")
+        try:
+            tasks = [(crf, index, start) for crf in crfs for index, start in enumerate(positions)]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                scores = list(pool.map(lambda task: self._trial(workdir, *task), tasks))
+            if self._should_stop() or any(score is None for score in scores):
+                return None
+            results = []
+            for crf in crfs:
+                sample_scores = [score for (task_crf, _, _), score in zip(tasks, scores) if task_crf == crf]
+                # A pior amostra decide: o piso precisa valer para o vídeo inteiro
+                results.append(TrialResult(crf, min(s[0] for s in sample_scores),
+                                           min(s[1] for s in sample_scores)))
+            return results
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _trial(self, workdir, crf, index, start) -> Optional[Tuple[float, float]]:
+        if self._should_stop():
+            return None
+        encoded = os.path.join(workdir, f"crf{crf}_s{index}.mkv")
+        trial_settings = EncodeSettings(**{**self.settings.__dict__, 'crf': str(crf), 'video_bitrate_kbps': None})
+        encode_command = [
+            self.ffmpeg_path, '-hide_banner', '-nostats', '-y',
+            '-ss', f"{start:.3f}", '-t', f"{SAMPLE_SECONDS:.3f}", '-i', self.input_file,
+            '-map', '0:v:0', *trial_settings.video_args(), '-an', encoded
+        ]
+        return_code, output = self._run(encode_command)
+        if return_code != 0:
+            if not self._should_stop():
+                self._status(f"Falha na amostra {index + 1} com CRF {crf} (Código: {return_code}).", self.WARN)
+                self._status(f"Comando: {format_command(encode_command)}", self.CMD)
+            return None
+
+        graph = (f"[0:v]setpts=PTS-STARTPTS,split[d1][d2];"
+                 f"[1:v]{self.settings.video_filter},setpts=PTS-STARTPTS,split[r1][r2];"
+                 f"[d1][r1]ssim;[d2][r2]psnr")
+        metric_command = [
+            self.ffmpeg_path, '-hide_banner', '-nostats',
+            '-i', encoded,
+            '-ss', f"{start:.3f}", '-t', f"{SAMPLE_SECONDS:.3f}", '-i', self.input_file,
+            '-lavfi', graph, '-f', 'null', '-'
+        ]
+        return_code, output = self._run(metric_command)
+        scores = parse_scores(output)
+        if return_code != 0 or scores is None:
+            if not self._should_stop():
+                self._status(f"Não foi possível medir a amostra {index + 1} com CRF {crf}.", self.WARN)
+            return None
+        return scores.ssim, scores.psnr
+
+    def _run(self, command) -> Tuple[int, str]:
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                       stdin=subprocess.DEVNULL, text=True, encoding='utf-8',
+                                       errors='replace', **subprocess_window_kwargs())
+        except Exception as e:
+            return 1, f"{e.__class__.__name__}: {e}"
+        with self._lock:
+            self._processes.add(process)
+        try:
+            _, stderr = process.communicate()
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+        return process.returncode, stderr or ""
@@ -0,0 +1,170 @@
+import os
+import subprocess
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from threads import ThreadPlan
+
+# Tabelas de parâmetros por preset de qualidade (compartilhadas por todos os modos de codificação)
+CODEC_MAP = {
+    "H.264 (AVC)": "libx264",
+    "H.265 (HEVC)": "libx265",
+    "VP9": "libvpx-vp9"
+}
+
+CRF_BY_QUALITY = {
+    "Alta (Melhor Qualidade)": "20",
+    "Média (Balanceado)": "24",
+    "Agressiva (Menor Arquivo)": "28"
+}
+
+PRESET_BY_QUALITY = {
+    "Alta (Melhor Qualidade)": "medium",
+    "Média (Balanceado)": "fast",
+    "Agressiva (Menor Arquivo)": "veryfast"
+}
+
+SKIP_FRAMES_BY_QUALITY = {
+    "Alta (Melhor Qualidade)": 0,
+    "Média (Balanceado)": 1,
+    "Agressiva (Menor Arquivo)": 2
+}
+
+AUDIO_BITRATE_BY_QUALITY = {
+    "Alta (Melhor Qualidade)": "160k",
+    "Média (Balanceado)": "128k",
+    "Agressiva (Menor Arquivo)": "96k"
+}
+
+RESOLUTION_FILTERS = {
+    "1080p (Full HD)": "scale=-2:1080",
+    "720p (HD)": "scale=-2:720",
+    "480p (SD)": "scale=-2:480"
+}
+
+
+@dataclass
+class EncodeSettings:
+    """Parâmetros finais de uma codificação, já resolvidos a partir das escolhas da UI."""
+    codec: str
+    crf: str
+    preset: str
+    audio_bitrate: str
+    output_fps: float
+    scale_filter: str = ""
+    video_bitrate_kbps: Optional[int] = None
+    # Opções de threads do processo (None = padrão do codificador)
+    threads: Optional[ThreadPlan] = None
+
+    @property
+    def video_filter(self) -> str:
+        if self.scale_filter:
+            return f"{self.scale_filter},fps={self.output_fps}"
+        return f"fps={self.output_fps}"
+
+    def video_args(self, with_threads: bool = True,
+                   x265_pass: Optional[Tuple[int, str]] = None) -> List[str]:
+        """Argumentos de codificação de vídeo (codec, qualidade, filtros e opções do codec).
+
+        with_threads=False omite as opções de threads, que não mudam o resultado
+        (chaves de checkpoint continuam valendo com outro número de jobs).
+        x265_pass=(passagem, arquivo de estatísticas): o libx265 não usa '-pass' do
+        FFmpeg, a passagem vai em -x265-params.
+        """
+        threads = self.threads if with_threads else None
+        # Com bitrate definido (modo tamanho alvo) o controle é por ABR, não por CRF
+        rate_args = ['-b:v', f"{self.video_bitrate_kbps}k"] if self.video_bitrate_kbps else ['-crf', self.crf]
+        args = [
+            '-c:v', self.codec,
+            *rate_args,
+            '-preset', self.preset,
+            '-vf', self.video_filter
+        ]
+        if self.codec == "libx265":
+            x265_params = ['log-level=error', *(threads.x265_params() if threads else [])]
+            if x265_pass:
+                x265_params.extend([f"pass={x265_pass[0]}", f"stats={escape_option_value(x265_pass[1])}"])
+            args.extend(['-x265-params', ':'.join(x265_params)])
+        elif self.codec == "libvpx-vp9":
+            args.extend(['-quality', 'good', '-cpu-used', '4'])
+        if threads:
+            args.extend(threads.args())
+        return args
+
+    def audio_args(self) -> List[str]:
+        return ['-c:a', 'aac', '-b:a', self.audio_bitrate]
+
+
+def resolve_settings(quality_preset: str, codec: str, resolution: str,
+                     custom_res: Optional[Tuple[int, int]], crf: Optional[int],
+                     source_fps: float) -> EncodeSettings:
+    """Converte as opções escolhidas pelo usuário em parâmetros concretos do FFmpeg."""
+    target_codec = CODEC_MAP.get(codec, "libx264")
+    target_crf = str(crf) if crf is not None else CRF_BY_QUALITY.get(quality_preset, "23")
+    target_preset = PRESET_BY_QUALITY.get(quality_preset, "fast")
+    skip_frames = SKIP_FRAMES_BY_QUALITY.get(quality_preset, 1)
+    target_audio_bitrate = AUDIO_BITRATE_BY_QUALITY.get(quality_preset, "128k")
+    output_fps = max(1.0, source_fps / (skip_frames + 1))
+
+    scale_filter = ""
+    if resolution != "Original":
+        if resolution == "Personalizado..." and custom_res:
+            scale_filter = f"scale={custom_res[0]}:{custom_res[1]}:flags=lanczos"
+        else:
+            scale_filter = RESOLUTION_FILTERS.get(resolution, "")
+
+    return EncodeSettings(
+        codec=target_codec,
+        crf=target_crf,
+        preset=target_preset,
+        audio_bitrate=target_audio_bitrate,
+        output_fps=output_fps,
+        scale_filter=scale_filter
+    )
+
+
+def escape_option_value(value: str) -> str:
+    """Escapa ':' e '\\' para um valor dentro de '-x265-params chave=valor:...' (caminhos do Windows)."""
+    return value.replace('\\', '\\\\').replace(':', '\\:').replace("'", "\\'")
+
+
+def parse_bitrate_kbps(value: str) -> int:
+    """Converte '128k', '1.5M' ou '96000' em kbit/s."""
+    text = str(value).strip().lower()
+    if text.endswith('k'):
+        return int(float(text[:-1]))
+    if text.endswith('m'):
+        return int(float(text[:-1]) * 1000)
+    return int(float(text) / 1000)
+
+
+def format_command(command: List[str]) -> str:
+    return ' '.join(f'"{c}"' if ' ' in c else c for c in command)
+
+
+def subprocess_window_kwargs() -> dict:
+    """startupinfo/creationflags que escondem a janela de console do FFmpeg no Windows."""
+    startupinfo = None
+    creationflags = 0
+    if os.name == 'nt':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        startupinfo.wShowWindow = subprocess.SW_HIDE
+        creationflags = subprocess.CREATE_NO_WINDOW
+    return {'startupinfo': startupinfo, 'creationflags': creationflags}
+
+
+def format_duration(seconds: float) -> str:
+    """'MM:SS' abaixo de uma hora, 'H:MM:SS' acima (sem dar a volta a cada hora)."""
+    total = max(0, int(round(seconds)))
+    hours, rest = divmod(total, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def format_eta(eta_seconds: float) -> str:
+    if eta_seconds == float('inf') or eta_seconds != eta_seconds:
+        return "ETA: ..."
+    return f"ETA: {format_duration(eta_seconds)}"
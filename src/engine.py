@@ -0,0 +1,710 @@
+import os
+import json
+import shutil
+import hashlib
+import subprocess
+import time
+import threading
+import traceback
+from collections import deque
+
+from encoding import resolve_settings, format_command, format_eta, format_duration, subprocess_window_kwargs
+from progress import PROGRESS_ARGS, ProgressParser, drain_lines, parse_cpu_seconds, parse_max_rss_kb
+from segmented import SegmentedEncoder
+from probe import probe, file_identity
+from crf_search import CrfSearch
+from twopass import FirstPassCache, TargetSizeError, compute_video_bitrate, pass_video_args
+from planner import plan_remux, plan_streams, remux_video_args
+from eta import EtaEstimator, encode_mode, output_height, output_size, predict_seconds
+from capabilities import missing_encoder
+from threads import plan_threads, thread_budget, usable_cores
+from checkpoint import CheckpointManifest, ResumeRegistry, CHECKPOINT_SEGMENT_SECONDS, parts_dir
+from profiling import (JobProfile, format_breakdown, FASTSTART_MARKER, PHASE_PROBE, PHASE_CRF_SEARCH,
+                       PHASE_SPAWN, PHASE_ENCODE, PHASE_FASTSTART, PHASE_VERIFY)
+
+STDERR_TAIL_LINES = 15
+
+
+class CallbackSignal:
+    """Substituto mínimo de Signal do Qt (connect/disconnect/emit) para uso sem Qt."""
+
+    def __init__(self):
+        self._slots = []
+        self._lock = threading.Lock()
+
+    def connect(self, slot):
+        with self._lock:
+            self._slots.append(slot)
+
+    def disconnect(self, slot=None):
+        with self._lock:
+            if slot is None:
+                self._slots.clear()
+            elif slot in self._slots:
+                self._slots.remove(slot)
+
+    def emit(self, *args):
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            slot(*args)
+
+
+class EncoderCore:
+    """Lógica de codificação compartilhada pelo CompressionWorker (Qt) e pelo HeadlessEncoder (CLI).
+
+    As subclasses fornecem os sinais progress_updated, stats_updated, status_message,
+    result_ready, finished e error_occurred.
+    """
+
+    INFO = "INFO"; WARN = "AVISO"; ERROR = "ERRO"; CMD = "CMD"; FFMPEG = "FFMPEG"
+
+    def _init_job(self, ffmpeg_path, input_file, output_file,
+                  quality_preset="Agressiva (Menor Arquivo)",
+                  codec="H.264 (AVC)", resolution="Original",
+                  custom_res=None, crf=None, segment_parallel=False,
+                  segment_workers=0, target_size_mb=None, quality_floor=None,
+                  quality_metric="ssim", force_reencode=False, resumable=False, history=None,
+                  profile=None, concurrent_jobs=1):
+        self.ffmpeg_path = ffmpeg_path
+        self.input_file = input_file
+        self.output_file = output_file
+        self.quality_preset = quality_preset
+        self.codec = codec
+        self.resolution = resolution
+        self.custom_res = custom_res
+        self.crf = crf
+        self.segment_parallel = segment_parallel
+        self.segment_workers = segment_workers
+        self.target_size_mb = target_size_mb
+        self.quality_floor = quality_floor
+        self.quality_metric = quality_metric
+        self.force_reencode = force_reencode
+        self.resumable = resumable
+        # Jobs codificando ao mesmo tempo (este incluso): os núcleos são divididos entre eles
+        self.concurrent_jobs = max(1, concurrent_jobs)
+        # JobStore com os resultados anteriores, usado para prever a duração (opcional)
+        self.history = history
+        # Tempo por fase do job; com um TraceRecorder, as fases também vão para o trace
+        self.profile = profile or JobProfile()
+        self.eta = EtaEstimator()
+        self._is_running = True
+        self.process = None
+        self.segmented_encoder = None
+        self.crf_search = None
+        self.source_frames = None
+        self.media_info = None
+        self.stream_plan = None
+        # CPU (usuário + sistema) dos processos FFmpeg do job, lida de '-benchmark'
+        self.cpu_seconds = 0.0
+        # Maior pico de memória entre os processos FFmpeg do job (KiB)
+        self.peak_rss_kb = 0
+        self.encode_mode = None
+
+    def stop(self):
+        self.status_message.emit("Tentativa de parada solicitada...", self.WARN)
+        self._is_running = False
+        if self.segmented_encoder:
+            self.segmented_encoder.stop()
+        if self.crf_search:
+            self.crf_search.stop()
+        if self.process and self.process.poll() is None:
+            try:
+                self.status_message.emit("Tentando parar o processo FFmpeg (terminate)...", self.WARN)
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=1.0)
+                    if self.process.poll() is not None:
+                       self.status_message.emit("Processo FFmpeg parado via terminate.", self.WARN)
+                       return
+                except subprocess.TimeoutExpired:
+                    pass
+
+                if self.process.poll() is None:
+                    self.status_message.emit("Processo FFmpeg não parou, forçando (kill)...", self.WARN)
+                    self.process.kill()
+                    self.process.wait()
+                    self.status_message.emit("Processo FFmpeg forçado a parar.", self.WARN)
+            except Exception as e:
+                msg = f"Erro ao tentar parar FFmpeg: {e}"
+                self.status_message.emit(msg, self.ERROR)
+                self.error_occurred.emit("Erro ao Parar", msg)
+
+    def run(self):
+        start_time = time.time()
+        original_file_size_mb = 0
+        final_file_size_mb = 0
+        return_code = 1
+
+        try:
+            if not self._is_running:
+                self.status_message.emit("Execução cancelada antes de iniciar.", self.WARN)
+                return_code = -1
+                return
+
+            self.status_message.emit(f"Iniciando processamento: {os.path.basename(self.input_file)}", self.INFO)
+
+            if not os.path.isfile(self.ffmpeg_path):
+                msg = f"FFmpeg não encontrado em: {self.ffmpeg_path}"
+                self.status_message.emit(msg, self.ERROR)
+                self.error_occurred.emit("Erro Crítico de Configuração", msg)
+                return_code = 1
+                return
+            
+            if not os.path.isfile(self.input_file):
+                msg = f"Arquivo de entrada não encontrado: {self.input_file}"
+                self.status_message.emit(msg, self.ERROR)
+                self.error_occurred.emit("Erro de Entrada", msg)
+                return_code = 1
+                return
+            
+            try:
+                file_size_bytes = os.path.getsize(self.input_file)
+                original_file_size_mb = file_size_bytes / (1024 * 1024)
+                self.status_message.emit(f"Tamanho original: {original_file_size_mb:.2f} MB", self.INFO)
+            except Exception as e:
+                msg = f"Não foi possível obter o tamanho do arquivo de entrada: {e}"
+                self.status_message.emit(msg, self.WARN)
+
+            duration_seconds, width, height, fps = self._get_video_info()
+            if duration_seconds is None:
+                 return_code = 1
+                 return
+
+            settings = resolve_settings(self.quality_preset, self.codec, self.resolution,
+                                        self.custom_res, self.crf, fps)
+            if missing_encoder(self.ffmpeg_path, settings.codec):
+                msg = (f"O FFmpeg em {self.ffmpeg_path} não tem o codificador {settings.codec}. "
+                       f"Escolha outro codec ou outro FFmpeg.")
+                self.status_message.emit(msg, self.ERROR)
+                self.error_occurred.emit("Codec Indisponível", msg)
+                return_code = 1
+                return
+            settings.threads = self._plan_threads(settings, width, height)
+            if self.media_info:
+                self.stream_plan = plan_streams(self.media_info, settings.audio_bitrate, self.output_file)
+                for note in self.stream_plan.notes:
+                    self.status_message.emit(note, self.INFO)
+            if self.quality_floor and self.target_size_mb:
+                self.status_message.emit("Tamanho alvo definido; busca automática de CRF ignorada.", self.WARN)
+            elif self.quality_floor and duration_seconds > 0:
+                chosen_crf = self._run_crf_search(settings, duration_seconds)
+                if not self._is_running:
+                    self.status_message.emit("Compressão cancelada pelo usuário.", self.WARN)
+                    return_code = -1
+                    return
+                if chosen_crf is None:
+                    self.status_message.emit(f"Busca de CRF falhou; usando CRF {settings.crf} do preset.", self.WARN)
+                else:
+                    settings.crf = str(chosen_crf)
+            elif self.quality_floor:
+                self.status_message.emit("Duração desconhecida; busca automática de CRF ignorada.", self.WARN)
+
+            if self.target_size_mb:
+                # O orçamento de áudio considera todas as trilhas, copiadas ou recodificadas
+                audio_bitrate, has_audio = settings.audio_bitrate, True
+                if self.stream_plan:
+                    audio_bitrate = f"{self.stream_plan.audio_kbps(settings.audio_bitrate)}k"
+                    has_audio = bool(self.stream_plan.audio)
+                try:
+                    settings.video_bitrate_kbps = compute_video_bitrate(
+                        self.target_size_mb, duration_seconds, audio_bitrate, has_audio)
+                except TargetSizeError as e:
+                    self.status_message.emit(str(e), self.ERROR)
+                    self.error_occurred.emit("Tamanho Alvo Inválido", str(e))
+                    return_code = 1
+                    return
+            target_codec = settings.codec
+            target_crf = settings.crf
+            target_preset = settings.preset
+            output_fps = settings.output_fps
+
+            # Montar comando FFmpeg
+            compress_command = [
+                self.ffmpeg_path, '-hide_banner', *PROGRESS_ARGS, '-y',
+                '-i', self.input_file,
+                *settings.video_args(),
+                '-movflags', '+faststart',
+                *self._stream_args(settings),
+                self.output_file
+            ]
+
+            if settings.video_bitrate_kbps:
+                self.status_message.emit(f"Configurações: Codec={target_codec}, Tamanho alvo={self.target_size_mb:.1f} MB "
+                                         f"(vídeo {settings.video_bitrate_kbps} kbit/s, duas passagens), Preset={target_preset}", self.INFO)
+            else:
+                self.status_message.emit(f"Configurações: Codec={target_codec}, CRF={target_crf}, Preset={target_preset}", self.INFO)
+            self.status_message.emit(f"Resolução: {self.resolution}, FPS Saída: {output_fps:.1f}", self.INFO)
+            self.status_message.emit("Iniciando compressão FFmpeg...", self.INFO)
+
+            remux_plan = None
+            if not self.force_reencode and not self.quality_floor:
+                remux_plan = plan_remux(self.media_info, settings, duration_seconds)
+                if not remux_plan.remux:
+                    self.status_message.emit(f"Recodificação necessária: {remux_plan.reason}.", self.INFO)
+
+            self.encode_mode = encode_mode(self, settings, bool(remux_plan and remux_plan.remux), duration_seconds)
+            self._predict_duration(settings, duration_seconds, height)
+            if remux_plan and remux_plan.remux:
+                result = self._run_remux(remux_plan, settings, duration_seconds, fps, start_time)
+            elif settings.video_bitrate_kbps:
+                if self.segment_parallel or self.resumable:
+                    self.status_message.emit("Tamanho alvo usa duas passagens; modo por trechos ignorado.", self.WARN)
+                result = self._run_two_pass(settings, duration_seconds, fps, start_time)
+            elif self.resumable and duration_seconds > 0:
+                result = (self._run_resumable(settings, duration_seconds), "")
+            elif self.segment_parallel and duration_seconds > 0:
+                result = (self._run_segmented(settings, duration_seconds), "")
+            else:
+                if self.segment_parallel or self.resumable:
+                    self.status_message.emit("Duração desconhecida; usando codificação em passagem única.", self.WARN)
+                self.status_message.emit(f"Comando: {format_command(compress_command)}", self.CMD)
+                result = self._run_encode_pass(compress_command, duration_seconds, fps, output_fps, start_time)
+
+            if result is None:
+                return_code = 1
+                return
+            return_code, ffmpeg_output = result
+
+            if not self._is_running and return_code != 0:
+                 self.status_message.emit("Compressão cancelada pelo usuário.", self.WARN)
+                 return_code = -1
+                 return
+
+            if return_code == 0:
+                 self.progress_updated.emit(100, "ETA: 00:00")
+
+            if return_code == 0:
+                 try:
+                     with self.profile.phase(PHASE_VERIFY):
+                         output_ok = os.path.exists(self.output_file) and os.path.getsize(self.output_file) > 0
+                         if output_ok:
+                             final_file_size_mb = os.path.getsize(self.output_file) / (1024 * 1024)
+                     if output_ok:
+                         self.status_message.emit(f"✓ Compressão concluída: {os.path.basename(self.output_file)}", self.INFO)
+                         self.status_message.emit(f"Tamanho final: {final_file_size_mb:.2f} MB", self.INFO)
+                         if original_file_size_mb > 0:
+                             reduction = 100 - (final_file_size_mb / original_file_size_mb * 100)
+                             self.status_message.emit(f"Redução de: {reduction:.1f}%", self.INFO)
+                         total_time = time.time() - start_time
+                         self.status_message.emit(f"Tempo total: {time.strftime('%H:%M:%S', time.gmtime(total_time))}", self.INFO)
+                         self.status_message.emit(f"Tempo por fase: {format_breakdown(self.profile.breakdown())}", self.INFO)
+                         self.result_ready.emit(self._result_summary(settings, duration_seconds, height, total_time,
+                                                                     original_file_size_mb, final_file_size_mb))
+                     else:
+                         msg = f"✗ Erro Pós-Compressão: Arquivo de saída '{os.path.basename(self.output_file)}' não encontrado ou vazio, apesar do FFmpeg retornar 0."
+                         self.status_message.emit(msg, self.ERROR)
+                         self.error_occurred.emit("Erro Pós-Compressão", msg)
+                         return_code = 1
+                 except Exception as e:
+                     msg = f"✗ Erro ao verificar arquivo de saída: {str(e)}"
+                     self.status_message.emit(msg, self.ERROR)
+                     self.error_occurred.emit("Erro Pós-Compressão", msg)
+                     return_code = 1
+            else:
+                 msg = f"✗ Erro na compressão com FFmpeg (Código: {return_code})."
+                 self.status_message.emit(msg, self.ERROR)
+                 if ffmpeg_output:
+                     self.status_message.emit(f"--- Últimas linhas do FFmpeg (stderr) ---", self.FFMPEG)
+                     self.status_message.emit(ffmpeg_output, self.FFMPEG)
+                     self.status_message.emit(f"------------------------------------", self.FFMPEG)
+                 self.error_occurred.emit("Erro FFmpeg", f"FFmpeg falhou (código {return_code}). Verifique os logs na janela principal.")
+
+        except Exception as e:
+            msg = f"Erro inesperado no worker: {e.__class__.__name__}: {e}"
+            try:
+                msg += f"\nTraceback:\n{traceback.format_exc()}"
+            except ImportError: pass
+            self.status_message.emit(msg, self.ERROR)
+            self.error_occurred.emit("Erro Interno do Worker", msg)
+            return_code = 1
+        finally:
+            self.profile.close_all()
+            if not self._is_running and return_code == 0:
+                 self.finished.emit(-1, self.output_file, original_file_size_mb, final_file_size_mb)
+            else:
+                 self.finished.emit(return_code, self.output_file, original_file_size_mb, final_file_size_mb)
+
+    def _run_encode_pass(self, command, duration_seconds, source_fps, output_fps, start_time, span=(0.0, 1.0),
+                         expected_size_mb=None):
+        """Executa uma passagem do FFmpeg lendo o stream '-progress'.
+
+        'span' (início, fração) posiciona esta passagem no progresso total do job.
+        'expected_size_mb' estima o progresso pelo tamanho escrito (útil na cópia de streams).
+        Retorna (código, últimas linhas do stderr) ou None se o processo não iniciou.
+        """
+        try:
+            with self.profile.phase(PHASE_SPAWN):
+                self.process = subprocess.Popen(
+                    command,
+                    stderr=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stdin=subprocess.DEVNULL,
+                    text=True, encoding='utf-8', errors='replace', bufsize=1,
+                    **subprocess_window_kwargs()
+                )
+        except FileNotFoundError:
+            msg = f"Erro Crítico: FFmpeg não pôde ser executado:\n{self.ffmpeg_path}"
+            self.status_message.emit(msg, self.ERROR)
+            self.error_occurred.emit("Erro ao Executar FFmpeg", msg)
+            return None
+        except Exception as e:
+             msg = f"Erro Crítico ao iniciar processo FFmpeg: {e}"
+             self.status_message.emit(msg, self.ERROR)
+             self.error_occurred.emit("Erro Crítico FFmpeg", msg)
+             return None
+
+        self.profile.begin(PHASE_ENCODE)
+        stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+        stderr_thread = None
+        if self.process.stderr:
+            stderr_thread = drain_lines(self.process.stderr,
+                                        lambda line: self._handle_ffmpeg_stderr(line, stderr_tail))
+
+        parser = ProgressParser()
+        expected_frames = self._expected_output_frames(source_fps, output_fps, duration_seconds)
+        last_progress_update_time = 0
+
+        if self.process.stdout:
+            for line in iter(self.process.stdout.readline, ''):
+                if not self._is_running:
+                    self.status_message.emit("Parada detectada durante processamento.", self.WARN)
+                    break
+                snapshot = parser.feed(line)
+                if snapshot is None:
+                    continue
+                current_time = time.time()
+                if current_time - last_progress_update_time >= 0.5 or snapshot.finished:
+                    self._emit_progress(snapshot, duration_seconds, expected_frames,
+                                        current_time - start_time, span, expected_size_mb)
+                    last_progress_update_time = current_time
+            self.process.stdout.close()
+
+        self.process.wait()
+        if stderr_thread:
+            stderr_thread.join(timeout=5)
+        self.profile.end(PHASE_ENCODE)
+        self.profile.end(PHASE_FASTSTART)
+        return self.process.returncode, "\n".join(stderr_tail)
+
+    def _run_remux(self, plan, settings, duration_seconds, source_fps, start_time):
+        """Copia o vídeo sem recodificar e move o índice para o início do MP4."""
+        self.status_message.emit(f"Remux rápido: {plan.reason}. Copiando o vídeo sem recodificar.", self.INFO)
+        command = [
+            self.ffmpeg_path, '-hide_banner', *PROGRESS_ARGS, '-y',
+            '-i', self.input_file,
+            *remux_video_args(self.media_info),
+            '-movflags', '+faststart',
+            *self._stream_args(settings),
+            self.output_file
+        ]
+        self.status_message.emit(f"Comando: {format_command(command)}", self.CMD)
+        remux_start = time.time()
+        expected_size_mb = self.media_info.size / (1024 * 1024) if self.media_info and self.media_info.size else None
+        result = self._run_encode_pass(command, duration_seconds, source_fps, source_fps, start_time,
+                                       expected_size_mb=expected_size_mb)
+        if result is not None and result[0] == 0 and self._is_running:
+            elapsed = time.time() - remux_start
+            saved = max(0.0, plan.estimated_cpu_seconds - elapsed)
+            self.status_message.emit(f"Remux concluído em {elapsed:.1f}s; economia estimada de "
+                                     f"~{saved:.0f}s de CPU em relação à recodificação.", self.INFO)
+        return result
+
+    def _run_two_pass(self, settings, duration_seconds, source_fps, start_time):
+        """Codificação em duas passagens para o bitrate de settings.video_bitrate_kbps.
+
+        As estatísticas da 1ª passagem ficam no FirstPassCache; se já existem para esta
+        entrada/codec/resolução/fps, só a 2ª passagem é executada.
+        """
+        cache = FirstPassCache()
+        key = cache.key(self.input_file, settings)
+        first_command, second_command = self._two_pass_commands(settings, cache.passlog_prefix(key))
+        second_span = (0.0, 1.0)
+
+        if cache.has_stats(key, settings.codec):
+            self.status_message.emit("Análise da 1ª passagem reaproveitada do cache; executando só a 2ª passagem.", self.INFO)
+        else:
+            self.status_message.emit("Passagem 1/2: analisando o vídeo...", self.INFO)
+            self.status_message.emit(f"Comando: {format_command(first_command)}", self.CMD)
+            result = self._run_encode_pass(first_command, duration_seconds, source_fps,
+                                           settings.output_fps, start_time, span=(0.0, 0.5))
+            if result is None or result[0] != 0 or not self._is_running:
+                cache.discard(key)
+                return result
+            cache.mark_done(key)
+            second_span = (0.5, 0.5)
+
+        self.status_message.emit("Passagem 2/2: codificando com o bitrate alvo...", self.INFO)
+        self.status_message.emit(f"Comando: {format_command(second_command)}", self.CMD)
+        return self._run_encode_pass(second_command, duration_seconds, source_fps,
+                                     settings.output_fps, start_time, span=second_span)
+
+    def _two_pass_commands(self, settings, prefix):
+        """Comandos da 1ª passagem (só análise, sem saída) e da 2ª, com as estatísticas em 'prefix'."""
+        base_command = [self.ffmpeg_path, '-hide_banner', *PROGRESS_ARGS, '-y', '-i', self.input_file]
+        first_command = [*base_command, *pass_video_args(settings, 1, prefix), '-an', '-f', 'null', '-']
+        second_command = [*base_command, *pass_video_args(settings, 2, prefix), '-movflags', '+faststart',
+                          *self._stream_args(settings), self.output_file]
+        return first_command, second_command
+
+    def _stream_args(self, settings):
+        """-map e codecs de áudio/legendas pelo StreamPlan; sem probe, só o áudio padrão em AAC."""
+        if self.stream_plan is None:
+            return settings.audio_args()
+        return self.stream_plan.output_args(settings.audio_bitrate)
+
+    def _handle_ffmpeg_stderr(self, line, tail):
+        stripped = line.strip()
+        if not stripped:
+            return
+        tail.append(stripped)
+        cpu_seconds = parse_cpu_seconds(stripped)
+        if cpu_seconds is not None:
+            self.cpu_seconds += cpu_seconds
+            return
+        rss_kb = parse_max_rss_kb(stripped)
+        if rss_kb is not None:
+            self.peak_rss_kb = max(self.peak_rss_kb, rss_kb)
+            return
+        if FASTSTART_MARKER in stripped:
+            # A codificação acabou; daqui até o fim do processo o muxer reescreve o MP4
+            self.profile.switch(PHASE_ENCODE, PHASE_FASTSTART)
+            return
+        lowered = stripped.lower()
+        if "error" in lowered or "invalid" in lowered:
+            self.status_message.emit(f"[FFmpeg]: {stripped}", self.WARN)
+
+    def _predict_duration(self, settings, duration_seconds, source_height):
+        """Previsão pelo histórico de jobs semelhantes; vira o ponto de partida do ETA."""
+        try:
+            prediction = predict_seconds(self.history, settings, self.encode_mode, duration_seconds, source_height)
+        except Exception as e:
+            self.status_message.emit(f"Previsão de duração indisponível: {e}", self.WARN)
+            prediction = None
+        if prediction is None:
+            return
+        seconds, samples = prediction
+        self.eta = EtaEstimator(prior_rate=1 / seconds if seconds > 0 else None)
+        self.status_message.emit(f"Tempo previsto: {format_duration(seconds)} "
+                                 f"(mediana de {samples} job(s) semelhante(s) nesta máquina).", self.INFO)
+        self.progress_updated.emit(0, format_eta(seconds))
+
+    def _result_summary(self, settings, duration_seconds, source_height, wall_seconds, original_mb, final_mb):
+        """Resumo de um job concluído, para o histórico (JobStore)."""
+        return {
+            'input_file': self.input_file,
+            'output_file': self.output_file,
+            'codec': settings.codec,
+            'crf': None if settings.video_bitrate_kbps else int(settings.crf),
+            'preset': settings.preset,
+            'mode': self.encode_mode,
+            'duration_seconds': round(duration_seconds or 0.0, 3),
+            'original_mb': round(original_mb, 3),
+            'final_mb': round(final_mb, 3),
+            'wall_seconds': round(wall_seconds, 3),
+            'cpu_seconds': round(self.cpu_seconds, 3),
+            'peak_rss_mb': round(self.peak_rss_kb / 1024, 1),
+            'speed': round(duration_seconds / wall_seconds, 3) if duration_seconds and wall_seconds > 0 else 0.0,
+            'output_height': output_height(settings, source_height),
+            'output_fps': round(settings.output_fps, 3),
+            'phases': self.profile.breakdown(),
+        }
+
+    def _expected_output_frames(self, source_fps, output_fps, duration_seconds=0):
+        if self.source_frames and source_fps:
+            return int(self.source_frames * output_fps / source_fps)
+        if duration_seconds > 0 and output_fps:
+            return int(duration_seconds * output_fps)
+        return None
+
+    def _emit_progress(self, snapshot, duration_seconds, expected_frames, elapsed_time, span=(0.0, 1.0),
+                       expected_size_mb=None):
+        # Com legendas mapeadas o FFmpeg congela out_time no fim da última legenda;
+        # quadros e tamanho escrito continuam avançando, então vale a maior estimativa.
+        estimates = []
+        if duration_seconds > 0:
+            estimates.append(snapshot.out_seconds / duration_seconds)
+        if expected_frames and snapshot.frame:
+            estimates.append(snapshot.frame / expected_frames)
+        if expected_size_mb and snapshot.total_size_mb:
+            estimates.append(snapshot.total_size_mb / expected_size_mb)
+        fraction = max(estimates) if estimates else None
+        offset, scale = span
+        percent = None
+        eta_seconds = float('inf')
+        if fraction is not None:
+            overall = offset + scale * max(0.0, min(1.0, fraction))
+            percent = int(100 * overall)
+            eta_seconds = self.eta.update(elapsed_time, overall)
+        eta_str = format_eta(eta_seconds)
+        if percent is not None:
+            self.progress_updated.emit(percent, eta_str)
+        stats = snapshot.to_dict()
+        stats['percent'] = percent
+        stats['eta'] = eta_str
+        self.stats_updated.emit(stats)
+
+    def _run_crf_search(self, settings, duration_seconds):
+        self.status_message.emit(f"Buscando o maior CRF com {self.quality_metric.upper()} ≥ {self.quality_floor:g}...", self.INFO)
+        self.crf_search = CrfSearch(
+            self.ffmpeg_path, self.input_file, settings, duration_seconds,
+            metric=self.quality_metric, floor=self.quality_floor,
+            status_callback=self.status_message.emit,
+            is_running=lambda: self._is_running
+        )
+        try:
+            with self.profile.phase(PHASE_CRF_SEARCH):
+                return self.crf_search.run()
+        finally:
+            self.crf_search = None
+
+    def _run_segmented(self, settings, duration_seconds):
+        self.status_message.emit("Modo paralelo por trechos ativado.", self.INFO)
+        self.segmented_encoder = SegmentedEncoder(
+            self.ffmpeg_path, self.input_file, self.output_file, settings, duration_seconds,
+            max_workers=self.segment_workers,
+            stream_plan=self.stream_plan,
+            status_callback=self.status_message.emit,
+            progress_callback=self.progress_updated.emit,
+            is_running=lambda: self._is_running,
+            eta=self.eta
+        )
+        try:
+            with self.profile.phase(PHASE_ENCODE, mode="segmented"):
+                return self.segmented_encoder.run()
+        finally:
+            self.cpu_seconds += self.segmented_encoder.cpu_seconds
+            self.peak_rss_kb = max(self.peak_rss_kb, self.segmented_encoder.peak_rss_kb)
+            self.segmented_encoder = None
+
+    def _run_resumable(self, settings, duration_seconds):
+        """Codificação por trechos com checkpoint em '<saída>.parts'; retoma o que já existe."""
+        directory = parts_dir(self.output_file)
+        signature = self._checkpoint_signature(settings)
+        manifest = CheckpointManifest.load(directory)
+        if manifest is not None and manifest.signature != signature:
+            self.status_message.emit("Trechos salvos foram gerados com outra entrada ou configuração; recomeçando.", self.WARN)
+            shutil.rmtree(directory, ignore_errors=True)
+            manifest = None
+        if manifest is None:
+            os.makedirs(directory, exist_ok=True)
+            manifest = CheckpointManifest(directory, self.input_file, self.output_file, signature,
+                                          job=self.job_kwargs())
+            manifest.save()
+        registry = ResumeRegistry()
+        registry.add(directory)
+
+        self.status_message.emit(f"Modo retomável: progresso salvo em {directory}", self.INFO)
+        self.segmented_encoder = SegmentedEncoder(
+            self.ffmpeg_path, self.input_file, self.output_file, settings, duration_seconds,
+            max_workers=self.segment_workers if self.segment_parallel else 1,
+            status_callback=self.status_message.emit,
+            progress_callback=self.progress_updated.emit,
+            is_running=lambda: self._is_running,
+            stream_plan=self.stream_plan,
+            manifest=manifest,
+            max_segment_seconds=CHECKPOINT_SEGMENT_SECONDS,
+            eta=self.eta
+        )
+        try:
+            with self.profile.phase(PHASE_ENCODE, mode="resumable"):
+                return_code = self.segmented_encoder.run()
+        finally:
+            self.cpu_seconds += self.segmented_encoder.cpu_seconds
+            self.peak_rss_kb = max(self.peak_rss_kb, self.segmented_encoder.peak_rss_kb)
+            self.segmented_encoder = None
+        if return_code == 0:
+            registry.remove(directory)
+        else:
+            self.status_message.emit(f"{manifest.done_count()} de {len(manifest.segments)} trechos salvos; "
+                                     "a próxima execução continua de onde parou.", self.INFO)
+        return return_code
+
+    def _plan_threads(self, settings, source_width, source_height):
+        """Threads do codificador para a resolução de saída e a parte dos núcleos que cabe a este job."""
+        cores = usable_cores()
+        width, height = output_size(settings, source_width, source_height)
+        plan = plan_threads(settings.codec, width, height, thread_budget(self.concurrent_jobs, cores))
+        self.status_message.emit(f"Threads: {plan.describe()} ({cores} núcleos utilizáveis, "
+                                 f"{self.concurrent_jobs} job(s) simultâneo(s))", self.INFO)
+        return plan
+
+    def _checkpoint_signature(self, settings):
+        # Sem as opções de threads: retomar com outro número de jobs simultâneos reaproveita os trechos
+        raw = json.dumps([file_identity(self.input_file), settings.video_args(with_threads=False),
+                          self._stream_args(settings)])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+    def job_kwargs(self):
+        """Argumentos para recriar este job (mesmos campos de JobSettings)."""
+        return {
+            'input_file': self.input_file,
+            'output_file': self.output_file,
+            'quality_preset': self.quality_preset,
+            'codec': self.codec,
+            'resolution': self.resolution,
+            'custom_res': list(self.custom_res) if self.custom_res else None,
+            'crf': self.crf,
+            'segment_parallel': self.segment_parallel,
+            'target_size_mb': self.target_size_mb,
+            'quality_floor': self.quality_floor,
+            'quality_metric': self.quality_metric,
+            'force_reencode': self.force_reencode,
+            'resumable': self.resumable,
+        }
+
+    def _get_video_info(self):
+        self.status_message.emit("Obtendo informações do vídeo...", self.INFO)
+        try:
+            with self.profile.phase(PHASE_PROBE):
+                info = probe(self.input_file, ffmpeg_path=self.ffmpeg_path)
+        except subprocess.TimeoutExpired:
+             msg = "Erro: FFmpeg demorou demais para responder ao obter informações do vídeo."
+             self.status_message.emit(msg, self.ERROR)
+             self.error_occurred.emit("Erro FFmpeg", msg)
+             return None, None, None, None
+        except FileNotFoundError:
+             msg = f"Erro Crítico: FFmpeg não pôde ser executado para obter info:\n{self.ffmpeg_path}"
+             self.status_message.emit(msg, self.ERROR)
+             self.error_occurred.emit("Erro ao Executar FFmpeg", msg)
+             return None, None, None, None
+        except Exception as e:
+             msg = f"Erro inesperado ao obter informações do vídeo: {e.__class__.__name__}: {e}"
+             self.status_message.emit(msg, self.ERROR)
+             self.error_occurred.emit("Erro de Análise", msg)
+             return None, None, None, None
+
+        self.media_info = info
+        video = info.video
+        duration_seconds = info.duration
+        if duration_seconds > 0:
+            self.status_message.emit(f"Duração detectada: {time.strftime('%H:%M:%S', time.gmtime(duration_seconds))}", self.INFO)
+        else:
+            self.status_message.emit("Aviso: Não foi possível detectar a duração do vídeo. Progresso será impreciso.", self.WARN)
+        width, height = 1920, 1080
+        if video and video.width and video.height:
+            width, height = video.width, video.height
+        else:
+            self.status_message.emit("Aviso: Não foi possível detectar a resolução. Usando fallback 1920x1080.", self.WARN)
+        fps = 30.0
+        if video and video.fps:
+            fps = video.fps
+        else:
+            self.status_message.emit(f"Aviso: Não foi possível detectar o FPS. Usando fallback {fps:.1f} fps.", self.WARN)
+        if video and video.is_vfr:
+            self.status_message.emit(f"Vídeo com taxa de quadros variável; usando a média de {fps:.2f} fps.", self.INFO)
+        if video and video.nb_frames:
+            self.source_frames = video.nb_frames
+        return duration_seconds, width, height, fps
+
+class HeadlessEncoder(EncoderCore):
+    """Executa a mesma codificação do CompressionWorker sem importar Qt."""
+
+    def __init__(self, ffmpeg_path, input_file, output_file, **kwargs):
+        self.progress_updated = CallbackSignal()
+        self.stats_updated = CallbackSignal()
+        self.status_message = CallbackSignal()
+        self.result_ready = CallbackSignal()
+        self.finished = CallbackSignal()
+        self.error_occurred = CallbackSignal()
+        self._init_job(ffmpeg_path, input_file, output_file, **kwargs)
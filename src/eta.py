@@ -0,0 +1,145 @@
+import math
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from encoding import EncodeSettings, resolve_settings
+from planner import plan_remux
+
+# Constante de tempo da média exponencial da velocidade instantânea: mudanças de cena
+# mexem no ETA em segundos, não a cada amostra
+EWMA_TAU_SECONDS = 10.0
+MIN_SAMPLE_SECONDS = 0.25
+# Segundos de codificação observada com o mesmo peso da previsão do histórico
+PRIOR_WEIGHT_SECONDS = 20.0
+# Jobs semelhantes considerados na previsão (os mais recentes)
+PRIOR_SAMPLES = 20
+
+SCALE_HEIGHT_RE = re.compile(r'scale=-?\d+:(\d+)')
+SCALE_WIDTH_RE = re.compile(r'scale=(\d+):')
+
+
+def output_height(settings: EncodeSettings, source_height: int) -> int:
+    """Altura do vídeo de saída, lida do filtro de escala (ou a da fonte, sem escala)."""
+    match = SCALE_HEIGHT_RE.search(settings.scale_filter or "")
+    return int(match.group(1)) if match else source_height
+
+
+def output_size(settings: EncodeSettings, source_width: int, source_height: int) -> Tuple[int, int]:
+    """(largura, altura) do vídeo de saída; com 'scale=-2:N' a largura segue a proporção da fonte."""
+    height = output_height(settings, source_height)
+    match = SCALE_WIDTH_RE.search(settings.scale_filter or "")
+    if match:
+        return int(match.group(1)), height
+    return round(source_width * height / source_height) if source_height else source_width, height
+
+
+class EtaEstimator:
+    """ETA a partir da velocidade instantânea suavizada (EWMA) e de uma velocidade prevista.
+
+    Trabalha com a fração concluída do job (0 a 1). A previsão do histórico ('prior_rate',
+    em fração por segundo) domina no começo, quando a média ainda não existe ou oscila, e
+    perde peso conforme o job avança: peso = k / (k + segundos observados).
+    """
+
+    def __init__(self, prior_rate: Optional[float] = None, tau_seconds: float = EWMA_TAU_SECONDS,
+                 prior_weight_seconds: float = PRIOR_WEIGHT_SECONDS):
+        self.prior_rate = prior_rate if prior_rate and prior_rate > 0 else None
+        self.tau_seconds = tau_seconds
+        self.prior_weight_seconds = prior_weight_seconds
+        self.rate: Optional[float] = None
+        self._first_elapsed: Optional[float] = None
+        self._last: Optional[Tuple[float, float]] = None
+
+    def blended_rate(self, elapsed: float) -> Optional[float]:
+        if self.prior_rate is None:
+            return self.rate
+        if self.rate is None:
+            return self.prior_rate
+        observed = max(0.0, elapsed - (self._first_elapsed or 0.0))
+        weight = self.prior_weight_seconds / (self.prior_weight_seconds + observed)
+        return weight * self.prior_rate + (1 - weight) * self.rate
+
+    def update(self, elapsed: float, fraction: float) -> float:
+        """Registra o progresso no instante 'elapsed' e retorna o ETA em segundos (inf se desconhecido)."""
+        fraction = max(0.0, min(1.0, fraction))
+        if self._last is None:
+            self._first_elapsed = elapsed
+            self._last = (elapsed, fraction)
+        else:
+            last_elapsed, last_fraction = self._last
+            dt = elapsed - last_elapsed
+            if dt >= MIN_SAMPLE_SECONDS:
+                instant = max(0.0, fraction - last_fraction) / dt
+                if self.rate is None:
+                    self.rate = instant
+                else:
+                    # Peso da amostra proporcional ao intervalo, para amostras irregulares
+                    alpha = 1 - math.exp(-dt / self.tau_seconds)
+                    self.rate = alpha * instant + (1 - alpha) * self.rate
+                self._last = (elapsed, fraction)
+        rate = self.blended_rate(elapsed)
+        if not rate or rate <= 0:
+            return float('inf')
+        return (1 - fraction) / rate
+
+
+def encode_mode(job_settings, settings: EncodeSettings, remux: bool, duration_seconds: float) -> str:
+    """Mesmo critério do EncoderCore para escolher o modo de codificação."""
+    if remux:
+        return "remux"
+    if settings.video_bitrate_kbps or job_settings.target_size_mb:
+        return "two_pass"
+    if job_settings.resumable and duration_seconds > 0:
+        return "resumable"
+    if job_settings.segment_parallel and duration_seconds > 0:
+        return "segmented"
+    return "single"
+
+
+def predict_seconds(history, settings: EncodeSettings, mode: str, duration_seconds: float,
+                    source_height: int) -> Optional[Tuple[float, int]]:
+    """Duração prevista pelo histórico: (segundos, jobs usados) ou None sem jobs semelhantes.
+
+    Usa a mediana de quadros de saída por segundo de jobs com o mesmo codec, preset,
+    altura de saída e modo nesta máquina.
+    """
+    if history is None or duration_seconds <= 0:
+        return None
+    prior = history.speed_prior(settings.codec, settings.preset, output_height(settings, source_height),
+                                mode, limit=PRIOR_SAMPLES)
+    if prior is None:
+        return None
+    frames_per_second, samples = prior
+    frames = duration_seconds * settings.output_fps
+    return frames / frames_per_second, samples
+
+
+def predict_job(history, job_settings, info) -> Optional[float]:
+    """Duração prevista de um JobSettings a partir do MediaInfo da entrada (antes de começar)."""
+    video = info.video if info else None
+    if history is None or video is None or not video.height or not info.duration:
+        return None
+    settings = resolve_settings(job_settings.quality_preset, job_settings.codec, job_settings.resolution,
+                                job_settings.custom_res, job_settings.crf, video.fps or 30.0)
+    remux = not job_settings.force_reencode and not job_settings.quality_floor \
+        and not job_settings.target_size_mb and plan_remux(info, settings, info.duration).remux
+    mode = encode_mode(job_settings, settings, remux, info.duration)
+    prediction = predict_seconds(history, settings, mode, info.duration, video.height)
+    return prediction[0] if prediction else None
+
+
+def plan_batch_seconds(predictions: Iterable[Optional[float]], concurrency: int) -> Tuple[float, int]:
+    """Tempo total de uma fila rodando 'concurrency' jobs por vez, na ordem da fila.
+
+    Cada job vai para a primeira vaga livre (como o JobScheduler). Retorna (segundos,
+    jobs sem previsão), que ficam de fora da soma.
+    """
+    slots: List[float] = [0.0] * max(1, concurrency)
+    unknown = 0
+    for seconds in predictions:
+        if seconds is None:
+            unknown += 1
+            continue
+        index = slots.index(min(slots))
+        slots[index] += seconds
+    return max(slots), unknown
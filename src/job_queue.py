@@ -0,0 +1,319 @@
+import os
+import json
+import time
+import uuid
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import get_base_path
+from job_store import JobStore
+from threads import usable_cores
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_FILE = 'job_queue.json'
+MAX_JOB_LOG_LINES = 1000
+
+
+class JobState:
+    PENDING = "PENDENTE"
+    RUNNING = "EXECUTANDO"
+    DONE = "CONCLUÍDO"
+    FAILED = "FALHOU"
+    CANCELLED = "CANCELADO"
+
+    FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+
+@dataclass
+class JobSettings:
+    """Parâmetros de compressão de um job (mesmos argumentos do CompressionWorker)."""
+    input_file: str
+    output_file: str
+    quality_preset: str = "Agressiva (Menor Arquivo)"
+    codec: str = "H.264 (AVC)"
+    resolution: str = "Original"
+    custom_res: Optional[Tuple[int, int]] = None
+    crf: Optional[int] = None
+    segment_parallel: bool = False
+    target_size_mb: Optional[float] = None
+    quality_floor: Optional[float] = None
+    quality_metric: str = "ssim"
+    force_reencode: bool = False
+    resumable: bool = False
+    # Verificação pós-compressão: feita pelo QualityVerifier, não passa para o worker
+    verify_quality: bool = False
+
+    def worker_kwargs(self) -> Dict[str, Any]:
+        return {
+            'quality_preset': self.quality_preset,
+            'codec': self.codec,
+            'resolution': self.resolution,
+            'custom_res': tuple(self.custom_res) if self.custom_res else None,
+            'crf': self.crf,
+            'segment_parallel': self.segment_parallel,
+            'target_size_mb': self.target_size_mb,
+            'quality_floor': self.quality_floor,
+            'quality_metric': self.quality_metric,
+            'force_reencode': self.force_reencode,
+            'resumable': self.resumable,
+        }
+
+
+@dataclass
+class CompressionJob:
+    """Um item da fila, com seu próprio progresso, log e resultado."""
+    settings: JobSettings
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    state: str = JobState.PENDING
+    progress: int = 0
+    eta: str = ""
+    return_code: Optional[int] = None
+    original_mb: float = 0.0
+    final_mb: float = 0.0
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    quality: Optional[Dict[str, Any]] = None
+    # Duração prevista pelo histórico (segundos), calculada ao entrar na fila
+    predicted_seconds: Optional[float] = None
+    # Segundos por fase (probe, encode, faststart...) do resumo do worker
+    phases: Optional[Dict[str, float]] = None
+    log: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.settings.input_file)
+
+    def add_log(self, message: str, level: str) -> None:
+        self.log.append((message, level))
+        if len(self.log) > MAX_JOB_LOG_LINES:
+            del self.log[:len(self.log) - MAX_JOB_LOG_LINES]
+
+    def mark_running(self) -> None:
+        self.state = JobState.RUNNING
+        self.progress = 0
+        self.eta = ""
+        self.return_code = None
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def mark_finished(self, return_code: int, original_mb: float, final_mb: float) -> None:
+        self.return_code = return_code
+        self.original_mb = original_mb
+        self.final_mb = final_mb
+        self.finished_at = time.time()
+        if return_code == 0:
+            self.state = JobState.DONE
+            self.progress = 100
+        elif return_code == -1:
+            self.state = JobState.CANCELLED
+        else:
+            self.state = JobState.FAILED
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Campos persistidos; o log fica de fora (cada linha já vai para job_events)."""
+        data = asdict(self)
+        del data['log']
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CompressionJob':
+        settings = JobSettings(**data['settings'])
+        if settings.custom_res:
+            settings.custom_res = tuple(settings.custom_res)
+        job = cls(settings=settings)
+        for key in ('job_id', 'state', 'progress', 'eta', 'return_code', 'original_mb',
+                    'final_mb', 'created_at', 'started_at', 'finished_at', 'quality',
+                    'predicted_seconds', 'phases'):
+            if key in data:
+                setattr(job, key, data[key])
+        job.log = [tuple(entry) for entry in data.get('log', [])]
+        return job
+
+
+def suggest_output_path(input_file: str, output_dir: Optional[str] = None, taken=()) -> str:
+    """Sugere '<nome>_comprimido.mp4' (com sufixo numérico se já existir ou estiver em 'taken')."""
+    target_dir = output_dir or os.path.dirname(input_file)
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    final_path = os.path.join(target_dir, f"{base_name}_comprimido.mp4")
+    count = 1
+    while os.path.exists(final_path) or final_path in taken:
+        final_path = os.path.join(target_dir, f"{base_name}_comprimido_{count}.mp4")
+        count += 1
+    return final_path
+
+
+def default_concurrency() -> int:
+    """Número padrão de processos FFmpeg simultâneos a partir dos núcleos utilizáveis."""
+    # Cada encoder x264/x265 já usa várias threads; um job a cada 4 núcleos evita disputa.
+    return max(1, usable_cores() // 4)
+
+
+class JobQueue:
+    """Fila persistente de jobs de compressão (sem dependência de Qt).
+
+    Os jobs ficam no JobStore (SQLite), junto com o histórico de estados, as mensagens
+    de status e os resultados. Um job_queue.json de versões antigas é importado uma vez.
+    """
+
+    def __init__(self, base_path: Optional[str] = None, autosave: bool = True,
+                 store: Optional[JobStore] = None):
+        self.base_path = base_path if base_path is not None else get_base_path()
+        self.autosave = autosave
+        self._store = store
+        self._jobs: Dict[str, CompressionJob] = {}
+        # Último estado gravado de cada job, para registrar só as transições
+        self._saved_states: Dict[str, str] = {}
+        # Jobs alterados desde a última gravação (só eles são regravados)
+        self._dirty: set = set()
+
+    @property
+    def queue_path(self) -> str:
+        return os.path.join(self.base_path, JOB_QUEUE_FILE)
+
+    @property
+    def store(self) -> Optional[JobStore]:
+        """Abre o banco na primeira gravação ou leitura (nunca, com autosave desligado)."""
+        if self._store is None and self.autosave:
+            self._store = JobStore(self.base_path)
+        return self._store
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __iter__(self):
+        return iter(list(self._jobs.values()))
+
+    def get(self, job_id: str) -> Optional[CompressionJob]:
+        return self._jobs.get(job_id)
+
+    def add(self, settings: JobSettings, predicted_seconds: Optional[float] = None) -> CompressionJob:
+        job = CompressionJob(settings=settings, predicted_seconds=predicted_seconds)
+        self._jobs[job.job_id] = job
+        self.save(job.job_id)
+        return job
+
+    def remove(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.state == JobState.RUNNING:
+            return False
+        del self._jobs[job_id]
+        self._forget(job_id)
+        self.save()
+        return True
+
+    def clear_finished(self) -> None:
+        for job_id in [k for k, j in self._jobs.items() if j.state in JobState.FINAL_STATES]:
+            del self._jobs[job_id]
+            self._forget(job_id)
+        self.save()
+
+    def _forget(self, job_id: str) -> None:
+        # O histórico (eventos e resultados) continua no banco; só sai da fila
+        self._saved_states.pop(job_id, None)
+        self._dirty.discard(job_id)
+        if self.store:
+            self.store.delete_job(job_id)
+
+    def pending(self) -> List[CompressionJob]:
+        return [j for j in self._jobs.values() if j.state == JobState.PENDING]
+
+    def running(self) -> List[CompressionJob]:
+        return [j for j in self._jobs.values() if j.state == JobState.RUNNING]
+
+    def next_pending(self) -> Optional[CompressionJob]:
+        for job in self._jobs.values():
+            if job.state == JobState.PENDING:
+                return job
+        return None
+
+    def requeue(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.state == JobState.RUNNING:
+            return False
+        job.state = JobState.PENDING
+        job.progress = 0
+        job.eta = ""
+        job.return_code = None
+        self.save(job_id)
+        return True
+
+    def record_event(self, job_id: str, message: str, level: str) -> None:
+        """Mensagem de status para o histórico (gravada em lote, não a cada chamada)."""
+        if self.store:
+            self.store.record_event(job_id, 'status', message, level)
+
+    def record_result(self, job_id: Optional[str], summary: Dict[str, Any]) -> None:
+        if self.store:
+            self.store.record_result(job_id, summary)
+
+    def load(self) -> None:
+        """Carrega a fila do disco. Jobs interrompidos voltam para PENDENTE."""
+        self._jobs = {}
+        self._dirty = set()
+        items = self.store.load_jobs() if self.store else []
+        migrated = False
+        if not items and os.path.exists(self.queue_path):
+            items = self._read_legacy_queue()
+            migrated = bool(items)
+        for item in items:
+            try:
+                job = CompressionJob.from_dict(item)
+            except (KeyError, TypeError) as e:
+                logger.error(f"Job inválido na fila, ignorando: {e}")
+                continue
+            if job.state == JobState.RUNNING:
+                job.state = JobState.PENDING
+                job.progress = 0
+            self._jobs[job.job_id] = job
+            self._saved_states[job.job_id] = job.state
+        if migrated:
+            # O log das versões antigas vinha no JSON; no banco ele vive em job_events
+            for job in self._jobs.values():
+                for message, level in job.log:
+                    self.record_event(job.job_id, message, level)
+        elif self.store:
+            for job_id, log in self.store.job_logs(MAX_JOB_LOG_LINES).items():
+                if job_id in self._jobs:
+                    self._jobs[job_id].log = log
+        if migrated and self.save(*self._jobs):
+            try:
+                os.replace(self.queue_path, f"{self.queue_path}.migrated")
+            except OSError as e:
+                logger.warning(f"Não foi possível renomear a fila antiga: {e}")
+
+    def _read_legacy_queue(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.queue_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return list(data.get('jobs', []))
+        except (json.JSONDecodeError, AttributeError, TypeError) as e:
+            logger.error(f"Fila de jobs corrompida, ignorando: {e}")
+        except Exception as e:
+            logger.error(f"Erro inesperado ao carregar fila de jobs: {e}")
+        return []
+
+    def save(self, *job_ids: str) -> bool:
+        """Grava numa única transação os jobs alterados: os indicados em job_ids e os que
+        mudaram de estado desde a última gravação (registrando cada transição)."""
+        self._dirty.update(job_id for job_id in job_ids if job_id in self._jobs)
+        if not self.autosave or self.store is None:
+            return False
+        for job in self._jobs.values():
+            if self._saved_states.get(job.job_id) != job.state:
+                self.store.record_event(job.job_id, 'state', job.state)
+                self._saved_states[job.job_id] = job.state
+                self._dirty.add(job.job_id)
+        dirty, self._dirty = self._dirty, set()
+        for job_id in dirty:
+            job = self._jobs[job_id]
+            self.store.save_job(job.job_id, job.state, job.created_at, job.to_dict())
+        self.store.flush()
+        return True
+
+    def close(self) -> None:
+        if self._store is not None:
+            self._store.close()
+            self._store = None
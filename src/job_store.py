@@ -0,0 +1,295 @@
+"""Banco SQLite embutido com a fila de jobs, o histórico de estados e os resultados.
+
+Uso para relatórios, a partir de src/:
+    python -m job_store --days 7
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from typing import Any, Dict, List, Optional
+
+from config import get_base_path
+
+logger = logging.getLogger(__name__)
+
+JOB_STORE_FILE = 'compressor.db'
+SCHEMA_VERSION = 1
+# As escritas se acumulam em memória e vão ao disco numa única transação
+FLUSH_INTERVAL_SECONDS = 0.5
+MAX_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    level TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, id);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    finished_at REAL NOT NULL,
+    input_file TEXT,
+    output_file TEXT,
+    codec TEXT,
+    crf INTEGER,
+    preset TEXT,
+    mode TEXT,
+    duration_seconds REAL,
+    original_mb REAL,
+    final_mb REAL,
+    wall_seconds REAL,
+    cpu_seconds REAL,
+    speed REAL,
+    output_height INTEGER,
+    output_fps REAL
+);
+CREATE INDEX IF NOT EXISTS idx_results_finished ON results(finished_at);
+"""
+
+RESULT_COLUMNS = ('codec', 'crf', 'preset', 'mode', 'input_file', 'output_file', 'duration_seconds',
+                  'original_mb', 'final_mb', 'wall_seconds', 'cpu_seconds', 'speed',
+                  'output_height', 'output_fps')
+
+THROUGHPUT_COLUMNS = """
+       COUNT(*) AS jobs,
+       COALESCE(SUM(duration_seconds), 0) AS media_seconds,
+       COALESCE(SUM(original_mb), 0) AS original_mb,
+       COALESCE(SUM(final_mb), 0) AS final_mb,
+       COALESCE(SUM(wall_seconds), 0) AS wall_seconds,
+       COALESCE(SUM(cpu_seconds), 0) AS cpu_seconds
+"""
+
+
+def _throughput_row(row: sqlite3.Row) -> Dict[str, Any]:
+    data = {key: round(value, 3) if isinstance(value, float) else value for key, value in dict(row).items()}
+    wall = data['wall_seconds']
+    # Velocidade média ponderada: segundos de vídeo por segundo de relógio
+    data['speed'] = round(data['media_seconds'] / wall, 3) if wall else 0.0
+    data['saved_mb'] = round(data['original_mb'] - data['final_mb'], 3)
+    data['mb_per_hour'] = round(data['original_mb'] / wall * 3600, 3) if wall else 0.0
+    return data
+
+
+class JobStore:
+    """SQLite em modo WAL; gravações em lote por uma thread própria.
+
+    Atualizações de jobs são coalescidas por job_id (vale o último estado) e eventos e
+    resultados são inseridos em lote, então centenas de mensagens de status por segundo
+    viram uma transação a cada FLUSH_INTERVAL_SECONDS. Consultas esvaziam o lote antes.
+    """
+
+    def __init__(self, base_path: Optional[str] = None, flush_interval: float = FLUSH_INTERVAL_SECONDS):
+        self.base_path = base_path if base_path is not None else get_base_path()
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._pending_jobs: Dict[str, Optional[tuple]] = {}
+        self._pending_events: List[tuple] = []
+        self._pending_results: List[tuple] = []
+        os.makedirs(self.base_path, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Com WAL, NORMAL não corrompe o banco numa queda; no máximo perde o último lote
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._conn.commit()
+        self._writer = threading.Thread(target=self._writer_loop, name="JobStoreWriter", daemon=True)
+        self._writer.start()
+
+    @property
+    def db_path(self) -> str:
+        return os.path.join(self.base_path, JOB_STORE_FILE)
+
+    # --- escrita (em lote) ---
+
+    def save_job(self, job_id: str, state: str, created_at: float, data: Dict[str, Any]) -> None:
+        row = (job_id, state, created_at, time.time(), json.dumps(data, ensure_ascii=False))
+        with self._lock:
+            self._pending_jobs[job_id] = row
+        self._schedule()
+
+    def delete_job(self, job_id: str) -> None:
+        with self._lock:
+            self._pending_jobs[job_id] = None
+        self._schedule()
+
+    def record_event(self, job_id: Optional[str], kind: str, message: str, level: Optional[str] = None) -> None:
+        with self._lock:
+            self._pending_events.append((job_id, time.time(), kind, level, message))
+        self._schedule()
+
+    def record_result(self, job_id: Optional[str], summary: Dict[str, Any]) -> None:
+        row = (job_id, summary.get('finished_at', time.time()), *(summary.get(c) for c in RESULT_COLUMNS))
+        with self._lock:
+            self._pending_results.append(row)
+        self._schedule()
+
+    def _schedule(self) -> None:
+        with self._lock:
+            backlog = len(self._pending_events) + len(self._pending_results) + len(self._pending_jobs)
+        if backlog >= MAX_BATCH:
+            self._wakeup.set()
+
+    def _writer_loop(self) -> None:
+        while not self._closed.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Grava numa transação tudo o que está pendente."""
+        placeholders = ", ".join("?" * (2 + len(RESULT_COLUMNS)))
+        # _db_lock antes de esvaziar o lote: dois flush() simultâneos gravam na ordem certa
+        with self._db_lock:
+            with self._lock:
+                jobs, self._pending_jobs = self._pending_jobs, {}
+                events, self._pending_events = self._pending_events, []
+                results, self._pending_results = self._pending_results, []
+            if not (jobs or events or results):
+                return
+            upserts = [row for row in jobs.values() if row is not None]
+            deletes = [(job_id,) for job_id, row in jobs.items() if row is None]
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO jobs (job_id, state, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(job_id) DO UPDATE SET state=excluded.state, "
+                        "updated_at=excluded.updated_at, data=excluded.data", upserts)
+                    self._conn.executemany("DELETE FROM jobs WHERE job_id = ?", deletes)
+                    self._conn.executemany(
+                        "INSERT INTO job_events (job_id, ts, kind, level, message) VALUES (?, ?, ?, ?, ?)", events)
+                    self._conn.executemany(
+                        f"INSERT INTO results (job_id, finished_at, {', '.join(RESULT_COLUMNS)}) "
+                        f"VALUES ({placeholders})", results)
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao gravar no banco de jobs: {e}")
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wakeup.set()
+        self._writer.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    # --- leitura ---
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def load_jobs(self) -> List[Dict[str, Any]]:
+        """Dados dos jobs da fila, na ordem em que foram criados."""
+        rows = self._query("SELECT data FROM jobs ORDER BY created_at, rowid")
+        jobs = []
+        for row in rows:
+            try:
+                jobs.append(json.loads(row['data']))
+            except json.JSONDecodeError as e:
+                logger.error(f"Job corrompido no banco, ignorando: {e}")
+        return jobs
+
+    def events(self, job_id: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT job_id, ts, kind, level, message FROM job_events WHERE job_id = ?"
+        params = [job_id]
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        return [dict(row) for row in self._query(sql + " ORDER BY id", params)]
+
+    def job_logs(self, max_lines: int) -> Dict[str, List[tuple]]:
+        """Últimas max_lines mensagens de status [(mensagem, nível)] de cada job da fila."""
+        rows = self._query(
+            "SELECT job_id, level, message FROM ("
+            "  SELECT job_id, level, message, id, "
+            "         ROW_NUMBER() OVER (PARTITION BY job_id ORDER BY id DESC) AS recent"
+            "  FROM job_events WHERE kind = 'status' AND job_id IN (SELECT job_id FROM jobs)"
+            ") WHERE recent <= ? ORDER BY id", (max_lines,))
+        logs: Dict[str, List[tuple]] = {}
+        for row in rows:
+            logs.setdefault(row['job_id'], []).append((row['message'], row['level']))
+        return logs
+
+    def recent_results(self, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = self._query("SELECT * FROM results ORDER BY finished_at DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    def speed_prior(self, codec: str, preset: str, output_height: int, mode: Optional[str] = None,
+                    limit: int = 20) -> Optional[tuple]:
+        """Mediana de quadros de saída por segundo dos últimos jobs semelhantes: (fps, amostras).
+
+        Semelhante = mesmo codec e preset, altura de saída a ±10% e, se informado, mesmo modo.
+        """
+        sql = ("SELECT duration_seconds * output_fps / wall_seconds AS rate FROM results "
+               "WHERE codec = ? AND preset = ? AND output_height BETWEEN ? AND ? "
+               "AND wall_seconds > 0 AND duration_seconds > 0 AND output_fps > 0")
+        params = [codec, preset, int(output_height * 0.9), int(output_height * 1.1) + 1]
+        if mode:
+            sql += " AND mode = ?"
+            params.append(mode)
+        rates = sorted(row['rate'] for row in self._query(sql + " ORDER BY finished_at DESC LIMIT ?",
+                                                           params + [limit]))
+        if not rates:
+            return None
+        middle = len(rates) // 2
+        median = rates[middle] if len(rates) % 2 else (rates[middle - 1] + rates[middle]) / 2
+        return median, len(rates)
+
+    def throughput(self, since: Optional[float] = None, until: Optional[float] = None) -> Dict[str, Any]:
+        """Totais do período: jobs, MB de entrada/saída, tempo de relógio e de CPU, velocidade média."""
+        sql = f"SELECT {THROUGHPUT_COLUMNS} FROM results WHERE finished_at >= ?"
+        params = [since or 0.0]
+        if until is not None:
+            sql += " AND finished_at < ?"
+            params.append(until)
+        row = self._query(sql, params)[0]
+        return _throughput_row(row)
+
+    def throughput_by(self, group: str = 'day', since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Os mesmos totais agrupados por 'day' (data local), 'codec' ou 'mode'."""
+        keys = {'day': "date(finished_at, 'unixepoch', 'localtime')", 'codec': 'codec', 'mode': 'mode'}
+        if group not in keys:
+            raise ValueError(f"Agrupamento inválido: {group}")
+        rows = self._query(f"SELECT {keys[group]} AS grp, {THROUGHPUT_COLUMNS} FROM results "
+                           "WHERE finished_at >= ? GROUP BY grp ORDER BY grp", (since or 0.0,))
+        return [_throughput_row(row) for row in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="job_store", description="Relatório de vazão das compressões.")
+    parser.add_argument('--days', type=float, default=7, help="Período do relatório, em dias (padrão: 7)")
+    parser.add_argument('--by', choices=['day', 'codec', 'mode'], default='day')
+    args = parser.parse_args(argv)
+    store = JobStore()
+    since = time.time() - args.days * 86400
+    try:
+        print(json.dumps({'total': store.throughput(since=since),
+                          'groups': store.throughput_by(args.by, since=since)}, ensure_ascii=False, indent=2))
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,37 @@
+import time
+PROCESS_START = time.perf_counter()
+
 import sys
 import os
+import json
 from PySide6.QtWidgets import QApplication, QMessageBox
+from startup import StartupTimer, STARTUP_CHECK_ENV, MARK_IMPORTS, MARK_WINDOW, MARK_FIRST_PAINT
 from view import CompressorView
-from controller import CompressionController
+
+startup = StartupTimer(PROCESS_START)
+startup.mark(MARK_IMPORTS)
+
+
+def attach_controller(main_window):
+    """Cria o controlador depois da primeira pintura: a janela aparece antes dos imports pesados."""
+    startup.mark(MARK_FIRST_PAINT)
+    try:
+        from controller import CompressionController
+        main_window.controller = CompressionController(view=main_window, startup=startup)
+    except Exception as e:
+        print(f"ERRO CRÍTICO: Falha ao criar a instância do Controller: {e}")
+        QMessageBox.critical(None, "Erro Crítico no Controller", f"Não foi possível iniciar o controlador da aplicação:\n{e}")
+        QApplication.instance().exit(1)
+        return
+    if os.environ.get(STARTUP_CHECK_ENV):
+        main_window.controller.startup_checked.connect(report_and_quit)
+
+
+def report_and_quit():
+    """Modo de verificação (COMPRESSOR_STARTUP_CHECK): imprime os marcos em JSON e encerra."""
+    print(json.dumps(startup.marks(), ensure_ascii=False), flush=True)
+    QApplication.instance().exit(0)
+
 
 if __name__ == '__main__':
 
@@ -11,17 +40,13 @@ if __name__ == '__main__':
 
     try:
         main_window = CompressorView()
+        startup.mark(MARK_WINDOW)
     except Exception as e:
         print(f"ERRO CRÍTICO: Falha ao criar a instância da View (CompressorView): {e}")
         QMessageBox.critical(None, "Erro Crítico na UI", f"Não foi possível iniciar a interface gráfica:\n{e}")
         sys.exit(1)
 
-    try:
-        controller = CompressionController(view=main_window)
-    except Exception as e:
-        print(f"ERRO CRÍTICO: Falha ao criar a instância do Controller: {e}")
-        QMessageBox.critical(None, "Erro Crítico no Controller", f"Não foi possível iniciar o controlador da aplicação:\n{e}")
-        sys.exit(1)
+    main_window.first_painted.connect(lambda: attach_controller(main_window))
 
     try:
         main_window.show()
@@ -30,4 +55,4 @@ if __name__ == '__main__':
         sys.exit(1)
 
     exit_code = app.exec()
-    sys.exit(exit_code)
\ No newline at end of file
+    sys.exit(exit_code)
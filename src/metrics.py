@@ -0,0 +1,199 @@
+"""Métricas no formato texto do Prometheus, servidas em http://127.0.0.1:PORTA/metrics.
+
+Só usa a biblioteca padrão. Os números vêm dos mesmos sinais que o worker já emite
+(stats_updated, result_ready e finished), então a interface gráfica e a CLI
+reportam os mesmos valores.
+"""
+import threading
+import logging
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = '127.0.0.1'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Limites (segundos) do histograma de duração das compressões
+LATENCY_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+
+RESULT_DONE = "done"
+RESULT_FAILED = "failed"
+RESULT_CANCELLED = "cancelled"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def result_label(return_code: int) -> str:
+    if return_code == 0:
+        return RESULT_DONE
+    if return_code == -1:
+        return RESULT_CANCELLED
+    return RESULT_FAILED
+
+
+class MetricsRegistry:
+    """Contadores e medidores do compressor, atualizados de qualquer thread."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = tuple(sorted(buckets))
+        self._queued = 0
+        self._running: Dict[str, str] = {}
+        self._live: Dict[str, Dict[str, float]] = {}
+        self._finished = {RESULT_DONE: 0, RESULT_FAILED: 0, RESULT_CANCELLED: 0}
+        self._bytes_in = 0
+        self._bytes_out = 0
+        self._cpu_seconds = 0.0
+        self._latency_counts = [0] * len(self.buckets)
+        self._latency_sum = 0.0
+        self._latency_count = 0
+
+    def set_queued(self, count: int) -> None:
+        with self._lock:
+            self._queued = max(0, count)
+
+    def add_queued(self, delta: int) -> None:
+        with self._lock:
+            self._queued = max(0, self._queued + delta)
+
+    def observe(self, job_id: str, encoder, name: Optional[str] = None) -> None:
+        """Liga os sinais de um CompressionWorker ou HeadlessEncoder ao registro."""
+        self.job_started(job_id, name or job_id)
+        encoder.stats_updated.connect(partial(self.job_stats, job_id))
+        encoder.result_ready.connect(partial(self.job_result, job_id))
+        encoder.finished.connect(partial(self.job_finished, job_id))
+
+    def job_started(self, job_id: str, name: str) -> None:
+        with self._lock:
+            self._running[job_id] = name
+            self._live[job_id] = {}
+
+    def job_stats(self, job_id: str, stats: dict) -> None:
+        with self._lock:
+            live = self._live.get(job_id)
+            if live is None:
+                return
+            live['fps'] = stats.get('fps') or 0.0
+            live['speed'] = stats.get('speed') or 0.0
+            if stats.get('percent') is not None:
+                live['percent'] = stats['percent']
+
+    def job_result(self, job_id: str, summary: dict) -> None:
+        wall = summary.get('wall_seconds') or 0.0
+        with self._lock:
+            self._cpu_seconds += summary.get('cpu_seconds') or 0.0
+            self._latency_sum += wall
+            self._latency_count += 1
+            for index, bound in enumerate(self.buckets):
+                if wall <= bound:
+                    self._latency_counts[index] += 1
+
+    def job_finished(self, job_id: str, return_code: int, output_file: str = "",
+                     original_mb: float = 0.0, final_mb: float = 0.0) -> None:
+        with self._lock:
+            self._running.pop(job_id, None)
+            self._live.pop(job_id, None)
+            self._finished[result_label(return_code)] += 1
+            self._bytes_in += int(original_mb * 1024 * 1024)
+            if return_code == 0:
+                self._bytes_out += int(final_mb * 1024 * 1024)
+
+    def render(self) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        with self._lock:
+            lines: List[str] = []
+
+            def metric(name, kind, help_text, samples: List[Tuple[str, float]]):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{labels} {value:g}" if isinstance(value, float) else f"{name}{labels} {value}")
+
+            metric("compressor_jobs_queued", "gauge", "Jobs pendentes na fila.", [("", self._queued)])
+            metric("compressor_jobs_running", "gauge", "Jobs em execução.", [("", len(self._running))])
+            metric("compressor_jobs_finished_total", "counter", "Jobs terminados, por resultado.",
+                   [(_labels(result=result), count) for result, count in self._finished.items()])
+            metric("compressor_job_fps", "gauge", "Quadros por segundo de cada job em execução.",
+                   [(_labels(job=job_id, input=self._running[job_id]), float(live.get('fps', 0.0)))
+                    for job_id, live in self._live.items()])
+            metric("compressor_job_speed_ratio", "gauge",
+                   "Velocidade em relação ao tempo real (1 = tempo real) de cada job em execução.",
+                   [(_labels(job=job_id, input=self._running[job_id]), float(live.get('speed', 0.0)))
+                    for job_id, live in self._live.items()])
+            metric("compressor_job_progress_percent", "gauge", "Progresso de cada job em execução.",
+                   [(_labels(job=job_id, input=self._running[job_id]), float(live['percent']))
+                    for job_id, live in self._live.items() if 'percent' in live])
+            metric("compressor_input_bytes_total", "counter", "Bytes de entrada dos jobs terminados.",
+                   [("", self._bytes_in)])
+            metric("compressor_output_bytes_total", "counter", "Bytes de saída dos jobs concluídos.",
+                   [("", self._bytes_out)])
+            metric("compressor_cpu_seconds_total", "counter",
+                   "Segundos de CPU (usuário + sistema) dos processos FFmpeg dos jobs concluídos.",
+                   [("", float(self._cpu_seconds))])
+            samples = [(_labels(le=f"{bound:g}"), count) for bound, count in zip(self.buckets, self._latency_counts)]
+            samples.append((_labels(le="+Inf"), self._latency_count))
+            lines.append("# HELP compressor_encode_duration_seconds Duração (relógio) das compressões concluídas.")
+            lines.append("# TYPE compressor_encode_duration_seconds histogram")
+            lines.extend(f"compressor_encode_duration_seconds_bucket{labels} {count}" for labels, count in samples)
+            lines.append(f"compressor_encode_duration_seconds_sum {self._latency_sum:g}")
+            lines.append(f"compressor_encode_duration_seconds_count {self._latency_count}")
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = None
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics: " + format, *args)
+
+
+class MetricsServer:
+    """Servidor HTTP local (só 127.0.0.1) numa thread daemon."""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = METRICS_HOST):
+        self.registry = registry
+        handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> 'MetricsServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._server.server_close()
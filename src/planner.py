@@ -0,0 +1,200 @@
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from encoding import EncodeSettings, parse_bitrate_kbps
+from probe import MediaInfo, StreamInfo
+
+# Nome do codec no probe correspondente a cada encoder de saída
+SOURCE_CODEC_BY_ENCODER = {
+    "libx264": "h264",
+    "libx265": "hevc",
+    "libvpx-vp9": "vp9",
+}
+
+# Bits por pixel típicos de cada encoder num CRF de referência; cada +6 no CRF
+# corta o bitrate pela metade. É uma estimativa conservadora do que a recodificação
+# produziria, usada só para decidir se vale a pena recodificar.
+REFERENCE_BPP = {
+    "libx264": (23, 0.08),
+    "libx265": (28, 0.05),
+    "libvpx-vp9": (31, 0.05),
+}
+
+# Megapixels codificados por segundo de CPU (um núcleo) em cada preset, para estimar
+# o tempo economizado pelo remux
+MPIXELS_PER_CPU_SECOND = {
+    "libx264": {"veryfast": 25.0, "fast": 12.0, "medium": 8.0},
+    "libx265": {"veryfast": 6.0, "fast": 3.0, "medium": 2.0},
+    "libvpx-vp9": {"veryfast": 5.0, "fast": 5.0, "medium": 5.0},
+}
+
+# Áudio que pode ser copiado para o MP4 sem recodificar (se o bitrate couber no alvo)
+COPYABLE_AUDIO_CODECS = {"aac", "opus"}
+# Tolerância sobre o bitrate alvo: 128 kbit/s declarados costumam vir como 129-130
+AUDIO_BITRATE_TOLERANCE = 1.05
+TEXT_SUBTITLE_CODECS = {"subrip", "srt", "ass", "ssa", "webvtt", "mov_text", "text"}
+MP4_EXTENSIONS = {".mp4", ".m4v", ".mov"}
+
+SCALE_HEIGHT_RE = re.compile(r'scale=-2:(\d+)')
+SCALE_SIZE_RE = re.compile(r'scale=(\d+):(\d+)')
+
+
+@dataclass
+class RemuxPlan:
+    """Decisão do planejador: copiar o vídeo (remux) ou recodificar, com o motivo."""
+    remux: bool
+    reason: str
+    estimated_cpu_seconds: float = 0.0
+
+
+def predicted_video_kbps(settings: EncodeSettings, width: int, height: int) -> float:
+    """Bitrate de vídeo esperado da recodificação com estas configurações."""
+    if settings.video_bitrate_kbps:
+        return float(settings.video_bitrate_kbps)
+    reference_crf, bpp = REFERENCE_BPP.get(settings.codec, REFERENCE_BPP["libx264"])
+    bpp *= 2 ** ((reference_crf - float(settings.crf)) / 6)
+    return bpp * width * height * settings.output_fps / 1000
+
+
+def estimated_encode_cpu_seconds(settings: EncodeSettings, width: int, height: int,
+                                 duration_seconds: float) -> float:
+    rates = MPIXELS_PER_CPU_SECOND.get(settings.codec, MPIXELS_PER_CPU_SECOND["libx264"])
+    mpixels = width * height * settings.output_fps * duration_seconds / 1e6
+    return mpixels / rates.get(settings.preset, min(rates.values()))
+
+
+def _downscales(settings: EncodeSettings, width: int, height: int) -> bool:
+    """True se o filtro de escala reduziria (ou mudaria) a resolução da fonte."""
+    if not settings.scale_filter:
+        return False
+    match = SCALE_HEIGHT_RE.search(settings.scale_filter)
+    if match:
+        return height > int(match.group(1))
+    match = SCALE_SIZE_RE.search(settings.scale_filter)
+    if match:
+        return (width, height) != (int(match.group(1)), int(match.group(2)))
+    return True
+
+
+def plan_remux(info: Optional[MediaInfo], settings: EncodeSettings,
+               duration_seconds: float) -> RemuxPlan:
+    """Decide se copiar o stream de vídeo já atende ao alvo.
+
+    Recodificar só compensa quando a fonte está em outro codec, precisa ser reduzida
+    (resolução ou taxa de quadros) ou tem bitrate acima do que a recodificação produziria; caso contrário o
+    resultado teria o mesmo tamanho (ou maior) e gastaria CPU à toa.
+    """
+    video = info.video if info else None
+    if video is None or not video.width or not video.height:
+        return RemuxPlan(False, "sem informações do stream de vídeo")
+    expected_codec = SOURCE_CODEC_BY_ENCODER.get(settings.codec)
+    if video.codec_name != expected_codec:
+        return RemuxPlan(False, f"codec de origem {video.codec_name or '?'} difere do alvo {expected_codec}")
+    if _downscales(settings, video.width, video.height):
+        return RemuxPlan(False, "a resolução escolhida exige redimensionar")
+    if video.fps and settings.output_fps < video.fps * 0.999:
+        return RemuxPlan(False, f"o preset reduz a taxa de quadros ({video.fps:.2f} -> {settings.output_fps:.2f} fps)")
+    source_kbps = (info.video_bit_rate or 0) / 1000
+    if not source_kbps:
+        return RemuxPlan(False, "bitrate da fonte desconhecido")
+    target_kbps = predicted_video_kbps(settings, video.width, video.height)
+    if source_kbps > target_kbps:
+        return RemuxPlan(False, f"bitrate da fonte ({source_kbps:.0f} kbit/s) acima do esperado "
+                                f"na recodificação ({target_kbps:.0f} kbit/s)")
+    return RemuxPlan(
+        True,
+        f"fonte já em {video.codec_name} a {source_kbps:.0f} kbit/s "
+        f"(recodificação daria ~{target_kbps:.0f} kbit/s)",
+        estimated_encode_cpu_seconds(settings, video.width, video.height, duration_seconds)
+    )
+
+
+def remux_video_args(info: MediaInfo) -> List[str]:
+    args = ['-c:v', 'copy']
+    if info.video and info.video.codec_name == 'hevc':
+        # Tag esperada por players da Apple para HEVC em MP4
+        args.extend(['-tag:v', 'hvc1'])
+    return args
+
+
+@dataclass
+class AudioTrack:
+    stream: StreamInfo
+    copy: bool
+
+
+@dataclass
+class StreamPlan:
+    """Mapeamento de streams da saída: o vídeo principal, todas as trilhas de áudio
+    (copiadas quando já servem) e as legendas que o contêiner aceita.
+    """
+    video: Optional[StreamInfo]
+    audio: List[AudioTrack] = field(default_factory=list)
+    subtitles: List[StreamInfo] = field(default_factory=list)
+    subtitle_codec: str = "copy"
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def has_extra_streams(self) -> bool:
+        return bool(self.audio or self.subtitles)
+
+    def map_args(self, input_index: int = 0, include_video: bool = True) -> List[str]:
+        streams = ([self.video] if include_video and self.video else []) + \
+                  [track.stream for track in self.audio] + self.subtitles
+        args = []
+        for stream in streams:
+            args.extend(['-map', f"{input_index}:{stream.index}"])
+        return args
+
+    def audio_codec_args(self, audio_bitrate: str) -> List[str]:
+        args = []
+        for n, track in enumerate(self.audio):
+            if track.copy:
+                args.extend([f'-c:a:{n}', 'copy'])
+            else:
+                args.extend([f'-c:a:{n}', 'aac', f'-b:a:{n}', audio_bitrate])
+        return args
+
+    def subtitle_codec_args(self) -> List[str]:
+        return ['-c:s', self.subtitle_codec] if self.subtitles else []
+
+    def output_args(self, audio_bitrate: str) -> List[str]:
+        """Argumentos de -map e codecs de áudio/legenda (o codec de vídeo fica por conta do chamador)."""
+        return [*self.map_args(), *self.audio_codec_args(audio_bitrate), *self.subtitle_codec_args()]
+
+    def audio_kbps(self, audio_bitrate: str) -> int:
+        """Bitrate total de áudio da saída, para o orçamento do modo tamanho alvo."""
+        target = parse_bitrate_kbps(audio_bitrate)
+        return sum(int(track.stream.bit_rate / 1000) if track.copy else target for track in self.audio)
+
+
+def _can_copy_audio(stream: StreamInfo, target_kbps: int) -> bool:
+    return (stream.codec_name in COPYABLE_AUDIO_CODECS and bool(stream.bit_rate)
+            and stream.bit_rate / 1000 <= target_kbps * AUDIO_BITRATE_TOLERANCE)
+
+
+def plan_streams(info: MediaInfo, audio_bitrate: str, output_file: str) -> StreamPlan:
+    """Decide, stream a stream, o que copiar, o que recodificar e o que descartar."""
+    target_kbps = parse_bitrate_kbps(audio_bitrate)
+    plan = StreamPlan(video=info.video)
+    for stream in info.audio_streams:
+        plan.audio.append(AudioTrack(stream, _can_copy_audio(stream, target_kbps)))
+
+    is_mp4 = os.path.splitext(output_file)[1].lower() in MP4_EXTENSIONS
+    for stream in info.subtitle_streams:
+        if is_mp4 and stream.codec_name not in TEXT_SUBTITLE_CODECS:
+            plan.notes.append(f"Legenda #{stream.index} ({stream.codec_name or '?'}) é imagem e não cabe no MP4; descartada.")
+            continue
+        plan.subtitles.append(stream)
+    if is_mp4 and any(s.codec_name != "mov_text" for s in plan.subtitles):
+        plan.subtitle_codec = "mov_text"
+
+    copied = sum(1 for track in plan.audio if track.copy)
+    if plan.audio:
+        plan.notes.append(f"Áudio: {copied} trilha(s) copiada(s), {len(plan.audio) - copied} recodificada(s) em AAC {audio_bitrate}.")
+    if plan.subtitles:
+        action = "convertida(s) para mov_text" if plan.subtitle_codec == "mov_text" else "copiada(s)"
+        plan.notes.append(f"Legendas: {len(plan.subtitles)} {action}.")
+    return plan
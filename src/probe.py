@@ -0,0 +1,333 @@
+import os
+import re
+import json
+import shutil
+import logging
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional
+
+from config import get_base_path
+from encoding import subprocess_window_kwargs
+
+logger = logging.getLogger(__name__)
+
+PROBE_CACHE_FILE = 'probe_cache.json'
+# Incrementar quando o formato ou a análise mudar: entradas antigas deixam de ser usadas
+PROBE_CACHE_VERSION = 1
+MAX_PROBE_CACHE_ENTRIES = 500
+PROBE_TIMEOUT = 15
+
+
+class ProbeError(Exception):
+    """Falha ao analisar um arquivo de mídia."""
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rate(value) -> Optional[float]:
+    """Converte '30000/1001' (ou '25') em fps; '0/0' vira None."""
+    if not value:
+        return None
+    num, _, den = str(value).partition('/')
+    numerator = _to_float(num)
+    denominator = _to_float(den) if den else 1.0
+    if not numerator or not denominator:
+        return None
+    return numerator / denominator
+
+
+@dataclass
+class StreamInfo:
+    index: int
+    codec_type: str
+    codec_name: str = ""
+    bit_rate: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    pix_fmt: str = ""
+    fps: Optional[float] = None
+    nb_frames: Optional[int] = None
+    is_vfr: bool = False
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    channel_layout: str = ""
+    language: str = ""
+    is_default: bool = False
+    is_attached_pic: bool = False
+
+    @classmethod
+    def from_ffprobe(cls, data: Dict[str, Any]) -> 'StreamInfo':
+        disposition = data.get('disposition', {}) or {}
+        tags = data.get('tags', {}) or {}
+        avg_rate = parse_rate(data.get('avg_frame_rate'))
+        real_rate = parse_rate(data.get('r_frame_rate'))
+        fps = avg_rate or real_rate
+        return cls(
+            index=_to_int(data.get('index')) or 0,
+            codec_type=data.get('codec_type', ''),
+            codec_name=data.get('codec_name', ''),
+            bit_rate=_to_int(data.get('bit_rate')) or _to_int(tags.get('BPS')),
+            width=_to_int(data.get('width')),
+            height=_to_int(data.get('height')),
+            pix_fmt=data.get('pix_fmt', ''),
+            fps=fps,
+            nb_frames=_to_int(data.get('nb_frames')) or _to_int(tags.get('NUMBER_OF_FRAMES')),
+            is_vfr=bool(avg_rate and real_rate and abs(avg_rate - real_rate) > 0.01),
+            sample_rate=_to_int(data.get('sample_rate')),
+            channels=_to_int(data.get('channels')),
+            channel_layout=data.get('channel_layout', ''),
+            language=tags.get('language', ''),
+            is_default=bool(disposition.get('default')),
+            is_attached_pic=bool(disposition.get('attached_pic'))
+        )
+
+
+@dataclass
+class MediaInfo:
+    """Metadados tipados de um arquivo, no formato do 'ffprobe -print_format json'."""
+    path: str
+    format_name: str = ""
+    duration: float = 0.0
+    size: int = 0
+    bit_rate: Optional[int] = None
+    streams: List[StreamInfo] = field(default_factory=list)
+
+    @property
+    def video(self) -> Optional[StreamInfo]:
+        for stream in self.streams:
+            if stream.codec_type == 'video' and not stream.is_attached_pic:
+                return stream
+        return None
+
+    @property
+    def audio_streams(self) -> List[StreamInfo]:
+        return [s for s in self.streams if s.codec_type == 'audio']
+
+    @property
+    def subtitle_streams(self) -> List[StreamInfo]:
+        return [s for s in self.streams if s.codec_type == 'subtitle']
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.audio_streams)
+
+    @property
+    def video_bit_rate(self) -> Optional[int]:
+        """Bitrate do vídeo; estimado pelo total menos o áudio quando o stream não informa."""
+        video = self.video
+        if video is None:
+            return None
+        if video.bit_rate:
+            return video.bit_rate
+        if self.bit_rate:
+            audio = sum(s.bit_rate or 0 for s in self.audio_streams)
+            return max(0, self.bit_rate - audio) or None
+        return None
+
+    @classmethod
+    def from_ffprobe(cls, path: str, data: Dict[str, Any]) -> 'MediaInfo':
+        fmt = data.get('format', {}) or {}
+        return cls(
+            path=path,
+            format_name=fmt.get('format_name', ''),
+            duration=_to_float(fmt.get('duration')) or 0.0,
+            size=_to_int(fmt.get('size')) or 0,
+            bit_rate=_to_int(fmt.get('bit_rate')),
+            streams=[StreamInfo.from_ffprobe(s) for s in data.get('streams', [])]
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MediaInfo':
+        streams = [StreamInfo(**s) for s in data.get('streams', [])]
+        return cls(**{**data, 'streams': streams})
+
+
+def file_identity(path: str) -> Optional[str]:
+    """Chave de cache (caminho, tamanho, mtime); None se o arquivo não existe."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+
+class ProbeCache:
+    """Cache persistente de MediaInfo em JSON, com limite de entradas (thread-safe)."""
+
+    def __init__(self, base_path: Optional[str] = None, max_entries: int = MAX_PROBE_CACHE_ENTRIES):
+        self.base_path = base_path if base_path is not None else get_base_path()
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def cache_path(self) -> str:
+        return os.path.join(self.base_path, PROBE_CACHE_FILE)
+
+    def _load(self) -> None:
+        self._loaded = True
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._entries = OrderedDict(data)
+        except Exception as e:
+            logger.warning(f"Cache de análise de mídia ignorado: {e}")
+
+    def get(self, key: str) -> Optional[MediaInfo]:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            data = self._entries.get(key)
+            if data is None:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            return MediaInfo.from_dict(data)
+        except TypeError:
+            return None
+
+    def put(self, key: str, info: MediaInfo) -> None:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._entries[key] = info.to_dict()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(self.base_path, exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.error(f"Erro ao salvar cache de análise de mídia: {e}")
+
+
+_DEFAULT_CACHE: Optional[ProbeCache] = None
+
+
+def get_probe_cache() -> ProbeCache:
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = ProbeCache()
+    return _DEFAULT_CACHE
+
+
+def find_ffprobe(ffmpeg_path: Optional[str] = None) -> Optional[str]:
+    """Procura o ffprobe ao lado do ffmpeg configurado e, depois, no PATH."""
+    if ffmpeg_path:
+        directory = os.path.dirname(ffmpeg_path)
+        name = "ffprobe.exe" if ffmpeg_path.lower().endswith(".exe") else "ffprobe"
+        candidate = os.path.join(directory, name)
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which("ffprobe")
+
+
+def _run_ffprobe(ffprobe_path: str, path: str) -> MediaInfo:
+    command = [ffprobe_path, '-v', 'error', '-print_format', 'json',
+               '-show_format', '-show_streams', path]
+    result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8',
+                            errors='replace', check=False, timeout=PROBE_TIMEOUT,
+                            **subprocess_window_kwargs())
+    if result.returncode != 0:
+        raise ProbeError(result.stderr.strip() or f"ffprobe retornou {result.returncode}")
+    try:
+        return MediaInfo.from_ffprobe(path, json.loads(result.stdout))
+    except (json.JSONDecodeError, TypeError) as e:
+        raise ProbeError(f"Saída inválida do ffprobe: {e}")
+
+
+# "Stream #0:1[0x2](eng): Audio: aac (LC) (mp4a / 0x6134706D), 44100 Hz, mono, fltp, 69 kb/s (default)"
+BANNER_STREAM_RE = re.compile(
+    r'Stream #0:(\d+)(?:\[\w+\])?(?:\((\w+)\))?: (Video|Audio|Subtitle|Data|Attachment): (\w+)([^\n]*)')
+
+
+def _run_ffmpeg_banner(ffmpeg_path: str, path: str) -> MediaInfo:
+    """Alternativa quando não há ffprobe: interpreta o cabeçalho de 'ffmpeg -i'."""
+    result = subprocess.run([ffmpeg_path, '-i', path, '-hide_banner'], capture_output=True, text=True,
+                            encoding='utf-8', errors='replace', check=False, timeout=PROBE_TIMEOUT,
+                            **subprocess_window_kwargs())
+    output = result.stderr or result.stdout or ""
+    info = MediaInfo(path=path, size=os.path.getsize(path) if os.path.isfile(path) else 0)
+    duration_match = re.search(r'Duration: (\d+):(\d+):(\d+\.\d+)', output)
+    if duration_match:
+        h, m, s = duration_match.groups()
+        info.duration = int(h) * 3600 + int(m) * 60 + float(s)
+    bitrate_match = re.search(r'bitrate: (\d+) kb/s', output)
+    if bitrate_match:
+        info.bit_rate = int(bitrate_match.group(1)) * 1000
+    for match in BANNER_STREAM_RE.finditer(output):
+        index, language, kind, codec_name, details = match.groups()
+        stream = StreamInfo(index=int(index), codec_type=kind.lower(), codec_name=codec_name,
+                            language=language or "", is_default='(default)' in details,
+                            is_attached_pic='(attached pic)' in details)
+        bitrate_match = re.search(r'(\d+) kb/s', details)
+        if bitrate_match:
+            stream.bit_rate = int(bitrate_match.group(1)) * 1000
+        if stream.codec_type == 'video':
+            resolution_match = re.search(r', (\d{2,5})x(\d{2,5})', details)
+            if resolution_match:
+                stream.width, stream.height = int(resolution_match.group(1)), int(resolution_match.group(2))
+            fps_match = re.search(r'(\d+(?:\.\d+)?) fps', details) or re.search(r'(\d+(?:\.\d+)?) tbr', details)
+            if fps_match:
+                stream.fps = _to_float(fps_match.group(1))
+        elif stream.codec_type == 'audio':
+            rate_match = re.search(r'(\d+) Hz', details)
+            if rate_match:
+                stream.sample_rate = int(rate_match.group(1))
+        info.streams.append(stream)
+    return info
+
+
+def probe(path: str, ffmpeg_path: Optional[str] = None, ffprobe_path: Optional[str] = None,
+          cache: Optional[ProbeCache] = None, use_cache: bool = True) -> MediaInfo:
+    """Analisa 'path' uma única vez por (caminho, tamanho, mtime).
+
+    Levanta ProbeError, subprocess.TimeoutExpired ou FileNotFoundError em caso de falha.
+    """
+    identity = file_identity(path) if use_cache else None
+    key = f"v{PROBE_CACHE_VERSION}|{identity}" if identity else None
+    cache = cache or get_probe_cache()
+    if key:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    ffprobe_path = ffprobe_path or find_ffprobe(ffmpeg_path)
+    if ffprobe_path:
+        info = _run_ffprobe(ffprobe_path, path)
+    elif ffmpeg_path:
+        info = _run_ffmpeg_banner(ffmpeg_path, path)
+    else:
+        raise ProbeError("Nem ffprobe nem ffmpeg disponíveis para analisar o arquivo.")
+
+    if key:
+        cache.put(key, info)
+    return info
@@ -0,0 +1,177 @@
+"""Tempo por fase de cada job e exportação da linha do tempo no formato Chrome Trace.
+
+O arquivo gerado abre em chrome://tracing ou em https://ui.perfetto.dev. Cada job em
+lote ocupa uma linha (vaga do agendador), então intervalos sem job e vagas ociosas
+aparecem como buracos na linha do tempo.
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Variável de ambiente que liga o trace na interface gráfica (caminho do arquivo .json)
+TRACE_ENV = 'COMPRESSOR_TRACE'
+
+# Fases de um job, na ordem em que acontecem
+PHASE_PROBE = "probe"
+PHASE_CRF_SEARCH = "crf_search"
+PHASE_SPAWN = "spawn"
+PHASE_ENCODE = "encode"
+PHASE_FASTSTART = "faststart"
+PHASE_VERIFY = "verify"
+
+# Linha do stderr (nível info) em que o muxer MP4 começa a reescrever o arquivo para '+faststart'
+FASTSTART_MARKER = "moving the moov atom"
+
+
+class TraceRecorder:
+    """Acumula eventos do Chrome Trace (em microssegundos) de várias threads."""
+
+    def __init__(self, process_name: str = "compressor"):
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._tracks: Dict[Any, int] = {}
+        self._metadata('process_name', 0, process_name)
+
+    def now_us(self) -> float:
+        return self.to_us(time.perf_counter())
+
+    def to_us(self, perf_time: float) -> float:
+        """Converte um instante de time.perf_counter() para o relógio do trace."""
+        return (perf_time - self._origin) * 1_000_000
+
+    def track(self, key, name: Optional[str] = None) -> int:
+        """Identificador (tid) da linha 'key' na linha do tempo, criada na primeira chamada."""
+        with self._lock:
+            tid = self._tracks.get(key)
+            if tid is None:
+                tid = len(self._tracks) + 1
+                self._tracks[key] = tid
+                created = True
+            else:
+                created = False
+        if created:
+            self._metadata('thread_name', tid, name or str(key))
+            self._metadata('thread_sort_index', tid, tid)
+        return tid
+
+    def complete(self, name: str, tid: int, start_us: float, end_us: float,
+                 category: str = "job", args: Optional[Dict[str, Any]] = None) -> None:
+        event = {'name': name, 'cat': category, 'ph': 'X', 'pid': self._pid, 'tid': tid,
+                 'ts': round(start_us, 1), 'dur': round(max(0.0, end_us - start_us), 1)}
+        if args:
+            event['args'] = args
+        self._append(event)
+
+    def instant(self, name: str, tid: int, category: str = "job", args: Optional[Dict[str, Any]] = None) -> None:
+        event = {'name': name, 'cat': category, 'ph': 'i', 's': 't', 'pid': self._pid, 'tid': tid,
+                 'ts': round(self.now_us(), 1)}
+        if args:
+            event['args'] = args
+        self._append(event)
+
+    def counter(self, name: str, values: Dict[str, float]) -> None:
+        self._append({'name': name, 'ph': 'C', 'pid': self._pid, 'ts': round(self.now_us(), 1),
+                      'args': dict(values)})
+
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    def export(self, path: str) -> str:
+        """Grava o trace em 'path' (JSON do Chrome Trace) e retorna o caminho."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        data = {'traceEvents': self.events(), 'displayTimeUnit': 'ms'}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def _metadata(self, name: str, tid: int, value) -> None:
+        key = 'sort_index' if name.endswith('sort_index') else 'name'
+        self._append({'name': name, 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {key: value}})
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self._events.append(event)
+
+
+class JobProfile:
+    """Mede as fases de um job; com um TraceRecorder, cada fase vira um evento no trace.
+
+    A medição é barata (perf_counter) e sempre ligada: o resumo do job leva o total de
+    segundos por fase. Fases repetidas (as duas passagens, por exemplo) são somadas.
+    """
+
+    def __init__(self, tracer: Optional[TraceRecorder] = None, track_key=None, track_name: Optional[str] = None):
+        self.tracer = tracer
+        self.tid = tracer.track(track_key if track_key is not None else id(self), track_name) if tracer else 0
+        self._lock = threading.Lock()
+        self._totals: Dict[str, float] = {}
+        self._open: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str, **args):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name, **args)
+
+    def begin(self, name: str) -> None:
+        with self._lock:
+            self._open[name] = time.perf_counter()
+
+    def end(self, name: str, **args) -> None:
+        """Fecha a fase 'name', se aberta; chamadas repetidas são ignoradas."""
+        finished = time.perf_counter()
+        with self._lock:
+            started = self._open.pop(name, None)
+            if started is None:
+                return
+            self._totals[name] = self._totals.get(name, 0.0) + (finished - started)
+        if self.tracer:
+            self.tracer.complete(name, self.tid, self.tracer.to_us(started), self.tracer.to_us(finished),
+                                 category="phase", args=args or None)
+
+    def switch(self, current: str, following: str) -> None:
+        """Fecha 'current' e abre 'following' no mesmo instante (se 'current' estava aberta)."""
+        with self._lock:
+            is_open = current in self._open
+        if is_open:
+            self.end(current)
+            self.begin(following)
+
+    def close_all(self) -> None:
+        with self._lock:
+            names = list(self._open)
+        for name in names:
+            self.end(name)
+
+    def breakdown(self) -> Dict[str, float]:
+        """Segundos por fase, mais 'other' (o restante do tempo do job fora das fases)."""
+        with self._lock:
+            totals = dict(self._totals)
+        elapsed = time.perf_counter() - self._started
+        result = {name: round(seconds, 3) for name, seconds in totals.items()}
+        result['other'] = round(max(0.0, elapsed - sum(totals.values())), 3)
+        return result
+
+
+def format_breakdown(breakdown: Dict[str, float]) -> str:
+    """'probe 0.2s | encode 41.0s | ...' na ordem das fases."""
+    order = [PHASE_PROBE, PHASE_CRF_SEARCH, PHASE_SPAWN, PHASE_ENCODE, PHASE_FASTSTART, PHASE_VERIFY]
+    names = [n for n in order if n in breakdown] + sorted(n for n in breakdown if n not in order)
+    return " | ".join(f"{name} {breakdown[name]:.2f}s" for name in names)
+
+
+def tracer_from_env() -> Optional[TraceRecorder]:
+    """TraceRecorder se COMPRESSOR_TRACE estiver definida; senão None (trace desligado)."""
+    return TraceRecorder() if os.environ.get(TRACE_ENV) else None
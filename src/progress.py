@@ -0,0 +1,124 @@
+import re
+import threading
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any
+
+# Argumentos globais que mandam o progresso do FFmpeg como chave=valor para o stdout;
+# '-benchmark' imprime no stderr, ao final, o tempo de CPU gasto pelo processo
+PROGRESS_ARGS = ['-progress', 'pipe:1', '-nostats', '-benchmark']
+
+BENCH_RE = re.compile(r'bench: utime=(\d+(?:\.\d+)?)s stime=(\d+(?:\.\d+)?)s')
+MAXRSS_RE = re.compile(r'bench: maxrss=(\d+)\s*(?:KiB|kB)')
+
+
+def _parse_float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class ProgressSnapshot:
+    """Um bloco completo do stream '-progress' do FFmpeg."""
+    frame: int = 0
+    fps: float = 0.0
+    out_time_us: int = 0
+    total_size: int = 0
+    speed: float = 0.0
+    bitrate_kbps: float = 0.0
+    finished: bool = False
+
+    @property
+    def out_seconds(self) -> float:
+        return self.out_time_us / 1_000_000
+
+    @property
+    def total_size_mb(self) -> float:
+        return self.total_size / (1024 * 1024)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['out_seconds'] = self.out_seconds
+        data['total_size_mb'] = self.total_size_mb
+        return data
+
+
+class ProgressParser:
+    """Parser incremental do formato chave=valor de '-progress'.
+
+    feed() recebe uma linha por vez e devolve um ProgressSnapshot quando o bloco
+    termina (linha 'progress=continue' ou 'progress=end'); caso contrário, None.
+    Valores 'N/A' mantêm o último valor conhecido.
+    """
+
+    def __init__(self):
+        self.snapshot = ProgressSnapshot()
+
+    def feed(self, line: str) -> Optional[ProgressSnapshot]:
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return None
+        value = value.strip()
+        current = self.snapshot
+
+        if key == 'progress':
+            current.finished = value == 'end'
+            self.snapshot = ProgressSnapshot(**asdict(current))
+            return current
+        if value == 'N/A':
+            return None
+
+        if key == 'frame':
+            number = _parse_float(value)
+            if number is not None: current.frame = int(number)
+        elif key == 'fps':
+            number = _parse_float(value)
+            if number is not None: current.fps = number
+        elif key in ('out_time_us', 'out_time_ms'):
+            # Em versões antigas 'out_time_ms' também está em microssegundos
+            number = _parse_float(value)
+            if number is not None: current.out_time_us = int(number)
+        elif key == 'total_size':
+            number = _parse_float(value)
+            if number is not None: current.total_size = int(number)
+        elif key == 'speed':
+            number = _parse_float(value.rstrip('x'))
+            if number is not None: current.speed = number
+        elif key == 'bitrate':
+            number = _parse_float(value.replace('kbits/s', ''))
+            if number is not None: current.bitrate_kbps = number
+        return None
+
+
+def parse_cpu_seconds(line: str) -> Optional[float]:
+    """Tempo de CPU (usuário + sistema) da linha 'bench:' do FFmpeg, ou None."""
+    match = BENCH_RE.search(line)
+    if not match:
+        return None
+    return float(match.group(1)) + float(match.group(2))
+
+
+def parse_max_rss_kb(line: str) -> Optional[int]:
+    """Pico de memória residente (KiB) da linha 'bench: maxrss=' do FFmpeg, ou None."""
+    match = MAXRSS_RE.search(line)
+    return int(match.group(1)) if match else None
+
+
+def drain_lines(stream, on_line) -> threading.Thread:
+    """Lê 'stream' linha a linha numa thread daemon, chamando on_line para cada linha."""
+    def _reader():
+        try:
+            for line in iter(stream.readline, ''):
+                on_line(line)
+        except (ValueError, OSError):
+            pass
+        finally:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=_reader, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,146 @@
+import os
+import re
+import threading
+import subprocess
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional
+
+from capabilities import ffmpeg_capabilities
+from encoding import subprocess_window_kwargs
+from probe import probe
+
+# Mede um a cada N quadros: a média muda pouco e o custo cai quase na mesma proporção
+QUALITY_SUBSAMPLE = 5
+LOW_PRIORITY_NICE = 10
+
+SSIM_RE = re.compile(r'SSIM .*All:(\d+(?:\.\d+)?)')
+PSNR_RE = re.compile(r'PSNR .*average:(\d+(?:\.\d+)?|inf)')
+VMAF_RE = re.compile(r'VMAF score: (\d+(?:\.\d+)?)')
+
+
+@dataclass
+class QualityScores:
+    """Métricas objetivas da saída comparada à fonte."""
+    ssim: float
+    psnr: float
+    vmaf: Optional[float] = None
+
+    def summary(self) -> str:
+        text = f"SSIM {self.ssim:.4f} | PSNR {self.psnr:.2f} dB"
+        if self.vmaf is not None:
+            text += f" | VMAF {self.vmaf:.1f}"
+        return text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QualityScores':
+        return cls(ssim=data['ssim'], psnr=data['psnr'], vmaf=data.get('vmaf'))
+
+
+def parse_scores(output: str) -> Optional[QualityScores]:
+    ssim_match = SSIM_RE.search(output)
+    psnr_match = PSNR_RE.search(output)
+    if not ssim_match or not psnr_match:
+        return None
+    psnr = psnr_match.group(1)
+    vmaf_match = VMAF_RE.search(output)
+    return QualityScores(
+        ssim=float(ssim_match.group(1)),
+        psnr=100.0 if psnr == 'inf' else float(psnr),
+        vmaf=float(vmaf_match.group(1)) if vmaf_match else None
+    )
+
+
+def has_libvmaf(ffmpeg_path: str) -> bool:
+    capabilities = ffmpeg_capabilities(ffmpeg_path)
+    return capabilities is not None and capabilities.has_filter('libvmaf')
+
+
+def build_metric_graph(reference_filter: str, subsample: int, with_vmaf: bool) -> str:
+    """Grafo com [0:v] = saída (distorcida) e [1:v] = fonte, subamostradas igualmente.
+
+    Depois do select os dois lados são renumerados pelo índice do quadro, para que
+    ssim/psnr pareiem quadro a quadro mesmo com timebases diferentes.
+    """
+    select = f"select='not(mod(n\\,{subsample}))'" if subsample > 1 else "null"
+    outputs = 3 if with_vmaf else 2
+    distorted = "".join(f"[d{i}]" for i in range(outputs))
+    reference = "".join(f"[r{i}]" for i in range(outputs))
+    graph = (f"[0:v]{select},settb=1,setpts=N,split={outputs}{distorted};"
+             f"[1:v]{reference_filter},{select},settb=1,setpts=N,split={outputs}{reference};"
+             f"[d0][r0]ssim;[d1][r1]psnr")
+    if with_vmaf:
+        graph += ";[d2][r2]libvmaf"
+    return graph
+
+
+class QualityCheck:
+    """Compara saída e fonte (SSIM, PSNR e VMAF se houver libvmaf) num FFmpeg de baixa prioridade.
+
+    A fonte passa pelos mesmos fps e resolução da saída (lidos do probe), de modo que
+    os quadros comparados correspondem um a um.
+    """
+
+    def __init__(self, ffmpeg_path: str, source_file: str, output_file: str,
+                 subsample: int = QUALITY_SUBSAMPLE, use_vmaf: Optional[bool] = None):
+        self.ffmpeg_path = ffmpeg_path
+        self.source_file = source_file
+        self.output_file = output_file
+        self.subsample = subsample
+        self.use_vmaf = has_libvmaf(ffmpeg_path) if use_vmaf is None else use_vmaf
+        self.process = None
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.terminate()
+            except Exception:
+                pass
+
+    def command(self) -> List[str]:
+        video = probe(self.output_file, ffmpeg_path=self.ffmpeg_path).video
+        if video is None or not video.width or not video.height:
+            raise ValueError("Saída sem stream de vídeo para comparar.")
+        reference_filter = f"scale={video.width}:{video.height}:flags=bicubic"
+        if video.fps:
+            reference_filter = f"fps={video.fps:.6g},{reference_filter}"
+        return [
+            self.ffmpeg_path, '-hide_banner', '-nostats',
+            '-i', self.output_file, '-i', self.source_file,
+            '-lavfi', build_metric_graph(reference_filter, self.subsample, self.use_vmaf),
+            '-an', '-sn', '-f', 'null', '-'
+        ]
+
+    def run(self) -> Optional[QualityScores]:
+        """Retorna as métricas, ou None se cancelado ou se o FFmpeg falhar."""
+        if self._stopped.is_set():
+            return None
+        self.process = subprocess.Popen(self.command(), stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.PIPE, stdin=subprocess.DEVNULL,
+                                        text=True, encoding='utf-8', errors='replace',
+                                        **low_priority_kwargs())
+        lower_priority(self.process)
+        _, stderr = self.process.communicate()
+        if self._stopped.is_set() or self.process.returncode != 0:
+            return None
+        return parse_scores(stderr or "")
+
+
+def low_priority_kwargs() -> dict:
+    kwargs = subprocess_window_kwargs()
+    if os.name == 'nt':
+        kwargs['creationflags'] |= subprocess.BELOW_NORMAL_PRIORITY_CLASS
+    return kwargs
+
+
+def lower_priority(process) -> None:
+    """No POSIX, baixa a prioridade do processo já iniciado (sem preexec_fn, seguro com threads)."""
+    if os.name != 'nt' and hasattr(os, 'setpriority'):
+        try:
+            os.setpriority(os.PRIO_PROCESS, process.pid, LOW_PRIORITY_NICE)
+        except OSError:
+            pass
@@ -0,0 +1,327 @@
+from PySide6.QtCore import QObject, QThread, QTimer, Signal, Slot, Qt
+
+from worker import CompressionWorker
+from job_queue import JobQueue, JobState, CompressionJob, default_concurrency
+from aggregator import SignalAggregator
+from quality import QualityScores
+from verifier import QualityVerifier
+from profiling import JobProfile, PHASE_VERIFY
+from concurrency import ConcurrencyController, SAMPLE_INTERVAL_MS
+from threads import usable_cores
+
+
+class _JobRelay(QObject):
+    """Anexa o job_id aos sinais do worker.
+
+    Status, progresso e estatísticas chegam por DirectConnection (na thread do worker)
+    e vão para o SignalAggregator; erro e término seguem como sinais enfileirados.
+    """
+
+    error_occurred = Signal(str, str, str)
+    result_ready = Signal(str, dict)
+    finished = Signal(str, int, str, float, float)
+
+    def __init__(self, job_id, aggregator, parent=None):
+        super().__init__(parent)
+        self.job_id = job_id
+        self.aggregator = aggregator
+
+    @Slot(int, str)
+    def on_progress(self, percent, eta_str):
+        self.aggregator.post_progress(self.job_id, percent, eta_str)
+
+    @Slot(dict)
+    def on_stats(self, stats):
+        self.aggregator.post_stats(self.job_id, stats)
+
+    @Slot(str, str)
+    def on_status(self, message, level):
+        self.aggregator.post_status(self.job_id, message, level)
+
+    @Slot(str, str)
+    def on_error(self, title, message):
+        self.error_occurred.emit(self.job_id, title, message)
+
+    @Slot(dict)
+    def on_result(self, summary):
+        self.result_ready.emit(self.job_id, summary)
+
+    @Slot(int, str, float, float)
+    def on_finished(self, return_code, output_file, original_mb, final_mb):
+        self.finished.emit(self.job_id, return_code, output_file, original_mb, final_mb)
+
+
+class JobScheduler(QObject):
+    """Mantém até N CompressionWorkers rodando em paralelo sobre uma JobQueue.
+
+    Com max_concurrent 0 (Auto), N parte de default_concurrency() e um
+    ConcurrencyController o ajusta pela carga de CPU e memória enquanto a fila roda.
+    """
+
+    job_started = Signal(str)
+    job_progress = Signal(str, int, str)
+    job_stats = Signal(str, dict)
+    job_status = Signal(str, str, str)
+    job_error = Signal(str, str, str)
+    job_finished = Signal(str, int, str, float, float)
+    job_quality = Signal(str, dict)
+    queue_finished = Signal()
+    # (limite atual, admissão pausada, descrição) quando o modo Auto muda o limite ou pausa/retoma a admissão
+    concurrency_changed = Signal(int, bool, str)
+
+    def __init__(self, queue: JobQueue, ffmpeg_path=None, max_concurrent=0, verifier=None, tracer=None,
+                 metrics=None, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self.ffmpeg_path = ffmpeg_path
+        self._active = {}
+        self._accepting = False
+        self._adaptive = None
+        self._load_timer = QTimer(self)
+        self._load_timer.setInterval(SAMPLE_INTERVAL_MS)
+        self._load_timer.timeout.connect(self._adjust_concurrency)
+        self._max_concurrent = 0
+        self.set_max_concurrent(max_concurrent)
+        self.aggregator = SignalAggregator(self._on_status, self._on_progress, self._on_stats, parent=self)
+        # A verificação de qualidade roda num pool à parte e não ocupa vaga da fila
+        self.verifier = verifier or QualityVerifier(parent=self)
+        self.verifier.scores_ready.connect(self._on_quality)
+        self.verifier.check_failed.connect(self._on_quality_failed)
+        # TraceRecorder opcional: cada vaga vira uma linha da linha do tempo
+        self.tracer = tracer
+        self._slots = {}
+        self._trace_starts = {}
+        # MetricsRegistry opcional, alimentado pelos mesmos sinais dos workers
+        self.metrics = metrics
+
+    @property
+    def max_concurrent(self):
+        return self._max_concurrent
+
+    @property
+    def adaptive(self):
+        return self._adaptive is not None
+
+    def set_max_concurrent(self, value):
+        if value > 0:
+            self._adaptive = None
+            self._load_timer.stop()
+            self._max_concurrent = value
+        elif self._adaptive is None:
+            self._adaptive = ConcurrencyController(default_concurrency(), max_jobs=usable_cores())
+            self._max_concurrent = self._adaptive.limit
+            if self._accepting:
+                self._load_timer.start()
+        if self._accepting:
+            self._fill_slots()
+
+    def is_running(self):
+        return bool(self._active)
+
+    def active_job_ids(self):
+        return list(self._active.keys())
+
+    def worker_for(self, job_id):
+        entry = self._active.get(job_id)
+        return entry[1] if entry else None
+
+    def start(self):
+        self._accepting = True
+        self.aggregator.start()
+        if self._adaptive:
+            self._load_timer.start()
+        self._fill_slots()
+        if not self._active:
+            self._finish_queue()
+
+    def _finish_queue(self):
+        self._accepting = False
+        self._load_timer.stop()
+        self.aggregator.stop()
+        self.queue_finished.emit()
+
+    def stop_all(self):
+        """Para de admitir jobs e pede parada dos que estão em execução."""
+        self._accepting = False
+        self._load_timer.stop()
+        for job_id in list(self._active.keys()):
+            self.stop_job(job_id)
+
+    def stop_job(self, job_id):
+        entry = self._active.get(job_id)
+        if entry:
+            entry[1].stop()
+
+    def _fill_slots(self):
+        # Pausa por falta de memória só segura jobs novos enquanto há algum rodando
+        paused = self._adaptive is not None and self._adaptive.paused and self._active
+        while self._accepting and not paused and len(self._active) < self._max_concurrent:
+            job = self.queue.next_pending()
+            if job is None:
+                break
+            self._launch(job)
+
+    def _launch(self, job: CompressionJob):
+        job.mark_running()
+        self.queue.save(job.job_id)
+
+        slot = self._claim_slot(job.job_id)
+        profile = None
+        if self.tracer:
+            self._trace_starts[job.job_id] = self.tracer.now_us()
+            profile = JobProfile(self.tracer, ('slot', slot), f"Vaga {slot + 1}")
+
+        thread = QThread(self)
+        worker = CompressionWorker(
+            self.ffmpeg_path,
+            job.settings.input_file,
+            job.settings.output_file,
+            history=self.queue.store,
+            profile=profile,
+            # Este job, os que já rodam e os pendentes que vão ocupar as vagas livres
+            concurrent_jobs=min(self._max_concurrent, len(self._active) + 1 + len(self.queue.pending())),
+            **job.settings.worker_kwargs()
+        )
+        worker.moveToThread(thread)
+        if self.metrics:
+            self.metrics.observe(job.job_id, worker, job.name)
+
+        relay = _JobRelay(job.job_id, self.aggregator, self)
+        worker.progress_updated.connect(relay.on_progress, Qt.ConnectionType.DirectConnection)
+        worker.stats_updated.connect(relay.on_stats, Qt.ConnectionType.DirectConnection)
+        worker.status_message.connect(relay.on_status, Qt.ConnectionType.DirectConnection)
+        worker.error_occurred.connect(relay.on_error)
+        worker.result_ready.connect(relay.on_result)
+        worker.finished.connect(relay.on_finished)
+        relay.error_occurred.connect(self._on_error)
+        relay.result_ready.connect(self._on_result)
+        relay.finished.connect(self._on_finished)
+
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(relay.deleteLater)
+
+        self._active[job.job_id] = (thread, worker)
+        self.update_queued_metric()
+        self._trace_counters()
+        self.job_started.emit(job.job_id)
+        thread.start()
+
+    def update_queued_metric(self):
+        if self.metrics:
+            self.metrics.set_queued(len(self.queue.pending()))
+
+    def _claim_slot(self, job_id):
+        """Menor vaga livre; no trace, jobs da mesma vaga ficam na mesma linha."""
+        taken = set(self._slots.values())
+        slot = next(index for index in range(len(taken) + 1) if index not in taken)
+        self._slots[job_id] = slot
+        return slot
+
+    def _trace_counters(self):
+        if self.tracer:
+            self.tracer.counter("jobs", {'executando': len(self._active), 'pendentes': len(self.queue.pending()),
+                                         'limite': self._max_concurrent})
+
+    def _trace_job(self, job_id, return_code):
+        slot = self._slots.pop(job_id, None)
+        started = self._trace_starts.pop(job_id, None)
+        if not self.tracer or started is None:
+            return
+        job = self.queue.get(job_id)
+        self.tracer.complete(job.name if job else job_id, self.tracer.track(('slot', slot)), started,
+                             self.tracer.now_us(), args={'job_id': job_id, 'return_code': return_code})
+
+    def _on_progress(self, job_id, percent, eta_str):
+        job = self.queue.get(job_id)
+        if job:
+            job.progress = percent
+            job.eta = eta_str
+        self.job_progress.emit(job_id, percent, eta_str)
+
+    def _on_stats(self, job_id, stats):
+        self.job_stats.emit(job_id, stats)
+
+    def _on_status(self, job_id, message, level):
+        job = self.queue.get(job_id)
+        if job:
+            job.add_log(message, level)
+            self.queue.record_event(job_id, message, level)
+        self.job_status.emit(job_id, message, level)
+
+    @Slot(str, str, str)
+    def _on_error(self, job_id, title, message):
+        self.aggregator.flush()
+        self.job_error.emit(job_id, title, message)
+
+    @Slot(str, dict)
+    def _on_result(self, job_id, summary):
+        job = self.queue.get(job_id)
+        if job:
+            job.phases = summary.get('phases')
+        self.queue.record_result(job_id, summary)
+
+    @Slot(str, int, str, float, float)
+    def _on_finished(self, job_id, return_code, output_file, original_mb, final_mb):
+        self.aggregator.flush()
+        entry = self._active.pop(job_id, None)
+        self._trace_job(job_id, return_code)
+        self.update_queued_metric()
+        self._trace_counters()
+        job = self.queue.get(job_id)
+        if job and job.state == JobState.RUNNING:
+            job.mark_finished(return_code, original_mb, final_mb)
+            self.queue.save(job_id)
+        if entry is None:
+            return
+        self.job_finished.emit(job_id, return_code, output_file, original_mb, final_mb)
+        if return_code == 0 and job and job.settings.verify_quality:
+            self._on_status(job_id, "Verificação de qualidade agendada (segundo plano).", "INFO")
+            if self.tracer:
+                self._trace_starts[(PHASE_VERIFY, job_id)] = self.tracer.now_us()
+            self.verifier.submit(job_id, self.ffmpeg_path, job.settings.input_file, output_file)
+        self._fill_slots()
+        if not self._active:
+            self._finish_queue()
+
+    @Slot()
+    def _adjust_concurrency(self):
+        if self._adaptive is None:
+            return
+        decision = self._adaptive.update(len(self._active), len(self.queue.pending()))
+        if decision is None:
+            return
+        self._max_concurrent = decision.limit
+        if decision.changed:
+            self.concurrency_changed.emit(decision.limit, decision.paused,
+                                          f"Compressões simultâneas (Auto): {decision.describe()}")
+            self._trace_counters()
+        self._fill_slots()
+
+    @Slot(str, dict)
+    def _on_quality(self, job_id, scores):
+        self._trace_verification(job_id, ok=True)
+        job = self.queue.get(job_id)
+        if job is None:
+            return
+        job.quality = scores
+        self.queue.save(job_id)
+        self._on_status(job_id, f"Qualidade: {QualityScores.from_dict(scores).summary()}", "INFO")
+        self.job_quality.emit(job_id, scores)
+
+    @Slot(str, str)
+    def _on_quality_failed(self, job_id, message):
+        self._trace_verification(job_id, ok=False)
+        if self.queue.get(job_id) is not None:
+            self._on_status(job_id, f"Verificação de qualidade não concluída: {message}", "AVISO")
+
+    def _trace_verification(self, job_id, ok):
+        started = self._trace_starts.pop((PHASE_VERIFY, job_id), None)
+        if not self.tracer or started is None:
+            return
+        job = self.queue.get(job_id)
+        self.tracer.complete(f"{PHASE_VERIFY}: {job.name if job else job_id}",
+                             self.tracer.track(PHASE_VERIFY, "Verificação de qualidade"), started,
+                             self.tracer.now_us(), category="phase", args={'job_id': job_id, 'ok': ok})
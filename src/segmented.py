@@ -0,0 +1,358 @@
+import os
+import csv
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+from collections import deque
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
+
+from encoding import EncodeSettings, format_command, format_eta, subprocess_window_kwargs
+from progress import PROGRESS_ARGS, ProgressParser, drain_lines, parse_cpu_seconds, parse_max_rss_kb
+from checkpoint import SegmentEntry
+from eta import EtaEstimator
+from threads import usable_cores
+
+MIN_SEGMENT_SECONDS = 30
+SEGMENTS_PER_WORKER = 4
+
+
+def default_segment_workers() -> int:
+    return max(2, usable_cores() // 4)
+
+
+def partial_path(path: str) -> str:
+    """'nome.ext' -> 'nome.partial.ext': o FFmpeg escreve aqui e o arquivo só ganha o
+    nome final (os.replace) quando termina, então nada incompleto parece pronto."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.partial{ext}"
+
+
+class SegmentedEncoder:
+    """Codifica um vídeo longo em trechos paralelos e junta o resultado sem recodificar.
+
+    O vídeo é cortado em keyframes com o muxer 'segment' (cópia de stream), cada trecho
+    é codificado por um processo FFmpeg próprio, o áudio é codificado uma única vez e
+    tudo é unido com o demuxer 'concat'. Com um StreamPlan, as trilhas de áudio e
+    legendas vão para um arquivo auxiliar (copiadas ou recodificadas conforme o plano).
+
+    Com um CheckpointManifest o diretório de trabalho é persistente: cada trecho
+    concluído é registrado no manifesto e uma nova execução só codifica o que falta.
+    """
+
+    INFO = "INFO"; WARN = "AVISO"; ERROR = "ERRO"; CMD = "CMD"; FFMPEG = "FFMPEG"
+
+    def __init__(self, ffmpeg_path, input_file, output_file, settings: EncodeSettings,
+                 duration_seconds, max_workers=0, status_callback=None,
+                 progress_callback=None, is_running=None, stream_plan=None,
+                 manifest=None, max_segment_seconds=None, eta=None):
+        self.ffmpeg_path = ffmpeg_path
+        self.input_file = input_file
+        self.output_file = output_file
+        self.stream_plan = stream_plan
+        self.manifest = manifest
+        self.max_segment_seconds = max_segment_seconds
+        self.duration_seconds = duration_seconds
+        self.max_workers = max_workers if max_workers > 0 else default_segment_workers()
+        # As threads do job são divididas entre os trechos codificados ao mesmo tempo
+        if settings.threads is not None:
+            settings = replace(settings, threads=settings.threads.split(self.max_workers))
+        self.settings = settings
+        self._status = status_callback or (lambda message, level: None)
+        self._progress = progress_callback or (lambda percent, eta: None)
+        self._is_running = is_running or (lambda: True)
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._segment_done = {}
+        self._segment_length = {}
+        self._start_time = 0.0
+        self._last_progress_update = 0.0
+        self.eta = eta or EtaEstimator()
+        # CPU (usuário + sistema) somada de todos os processos FFmpeg do pipeline
+        self.cpu_seconds = 0.0
+        self.peak_rss_kb = 0
+
+    def stop(self):
+        self._stopped.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            if process.poll() is None:
+                try:
+                    process.terminate()
+                except Exception:
+                    pass
+
+    def _should_stop(self):
+        return self._stopped.is_set() or not self._is_running()
+
+    def run(self) -> int:
+        """Executa o pipeline completo. Retorna 0 (sucesso), 1 (erro) ou -1 (cancelado)."""
+        self._start_time = time.time()
+        if self.manifest is not None:
+            os.makedirs(self.manifest.directory, exist_ok=True)
+            return_code = self._run_pipeline(self.manifest.directory)
+            if return_code == 0:
+                shutil.rmtree(self.manifest.directory, ignore_errors=True)
+            return return_code
+        output_dir = os.path.dirname(os.path.abspath(self.output_file))
+        workdir = tempfile.mkdtemp(prefix=".segments_", dir=output_dir)
+        try:
+            return self._run_pipeline(workdir)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _run_pipeline(self, workdir) -> int:
+        if self.manifest is not None and self.manifest.has_split():
+            segments = self._load_segments(workdir)
+        else:
+            segments = self._split(workdir)
+        if self._should_stop():
+            return -1
+        if not segments:
+            return 1
+
+        pending = list(range(len(segments)))
+        if self.manifest is not None:
+            pending = [index for index in pending if not self.manifest.is_segment_done(index)]
+            for index in set(range(len(segments))) - set(pending):
+                self._segment_done[index] = self._segment_length[index]
+            if len(pending) < len(segments):
+                self._status(f"Retomando: {len(segments) - len(pending)} de {len(segments)} trechos já codificados.", self.INFO)
+        self._status(f"Vídeo dividido em {len(segments)} trechos; codificando {len(pending)} com até {self.max_workers} processos.", self.INFO)
+
+        audio_path = os.path.join(workdir, "streams.mkv" if self.stream_plan else "audio.m4a")
+        # Áudio num executor à parte: ao terminar, a thread não pega trechos além de max_workers
+        with ThreadPoolExecutor(max_workers=1) as audio_pool, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            audio_future = audio_pool.submit(self._encode_audio, audio_path)
+            futures = [pool.submit(self._encode_segment, index, *segments[index]) for index in pending]
+            results = [f.result() for f in futures]
+            has_audio = audio_future.result()
+
+        if self._should_stop() or -1 in results:
+            return -1
+        if any(code != 0 for code in results) or has_audio is None:
+            return 1
+
+        self._status("Unindo trechos codificados (concat, sem recodificação)...", self.INFO)
+        return self._concat(workdir, [encoded for _, encoded in segments], audio_path if has_audio else None)
+
+    def _split(self, workdir):
+        segment_time = max(MIN_SEGMENT_SECONDS, self.duration_seconds / (self.max_workers * SEGMENTS_PER_WORKER))
+        if self.max_segment_seconds:
+            segment_time = min(segment_time, max(MIN_SEGMENT_SECONDS, self.max_segment_seconds))
+        list_path = os.path.join(workdir, "segments.csv")
+        command = [
+            self.ffmpeg_path, '-y', '-i', self.input_file,
+            '-map', '0:v:0', '-c', 'copy',
+            '-f', 'segment', '-segment_time', f"{segment_time:.3f}",
+            '-reset_timestamps', '1',
+            '-segment_list', list_path, '-segment_list_type', 'csv',
+            os.path.join(workdir, "src_%05d.mkv")
+        ]
+        self._status(f"Dividindo vídeo em keyframes (~{segment_time:.0f}s por trecho)...", self.INFO)
+        self._status(f"Comando: {format_command(command)}", self.CMD)
+        return_code, tail = self._run_ffmpeg(command)
+        if return_code != 0 or not os.path.exists(list_path):
+            if not self._should_stop():
+                self._report_failure("Falha ao dividir o vídeo em trechos", return_code, tail)
+            return []
+
+        segments = []
+        with open(list_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.reader(f):
+                if len(row) < 3:
+                    continue
+                index = len(segments)
+                source = os.path.join(workdir, row[0])
+                encoded = os.path.join(workdir, f"enc_{index:05d}.mkv")
+                self._segment_length[index] = max(0.0, float(row[2]) - float(row[1]))
+                self._segment_done[index] = 0.0
+                segments.append((source, encoded))
+        if self.manifest is not None:
+            self.manifest.segments = [
+                SegmentEntry(os.path.basename(source), os.path.basename(encoded), self._segment_length[index])
+                for index, (source, encoded) in enumerate(segments)
+            ]
+            self.manifest.streams_done = None
+            self.manifest.save()
+        return segments
+
+    def _load_segments(self, workdir):
+        segments = []
+        for index, entry in enumerate(self.manifest.segments):
+            self._segment_length[index] = entry.length
+            self._segment_done[index] = 0.0
+            segments.append((os.path.join(workdir, entry.source), os.path.join(workdir, entry.encoded)))
+        return segments
+
+    def _encode_audio(self, audio_path):
+        """Codifica a trilha de áudio uma única vez. Retorna True, False (sem áudio) ou None (erro)."""
+        if self._should_stop():
+            return None
+        if self.manifest is not None and self.manifest.streams_done is not None \
+                and (not self.manifest.streams_done or os.path.exists(audio_path)):
+            return self.manifest.streams_done
+        if self.stream_plan is None:
+            stream_args = ['-map', '0:a:0?', '-vn', *self.settings.audio_args()]
+        elif self.stream_plan.has_extra_streams:
+            stream_args = [*self.stream_plan.map_args(include_video=False),
+                           *self.stream_plan.audio_codec_args(self.settings.audio_bitrate), '-c:s', 'copy']
+        else:
+            self._status("Entrada sem trilhas de áudio ou legendas; saída terá somente vídeo.", self.INFO)
+            return False
+        partial = partial_path(audio_path)
+        command = [self.ffmpeg_path, '-y', '-i', self.input_file, *stream_args, partial]
+        return_code, tail = self._run_ffmpeg(command)
+        if return_code == 0 and os.path.exists(partial) and os.path.getsize(partial) > 0:
+            os.replace(partial, audio_path)
+            self._record_streams(True)
+            return True
+        if any("does not contain any stream" in line for line in tail):
+            self._status("Entrada sem trilha de áudio; saída terá somente vídeo.", self.INFO)
+            self._record_streams(False)
+            return False
+        if not self._should_stop():
+            self._report_failure("Falha ao codificar o áudio", return_code, tail)
+        return None
+
+    def _encode_segment(self, index, source, encoded):
+        if self._should_stop():
+            return -1
+        partial = partial_path(encoded)
+        command = [
+            self.ffmpeg_path, '-y', '-i', source,
+            '-map', '0:v:0',
+            *self.settings.video_args(),
+            '-an', partial
+        ]
+        return_code, tail = self._run_ffmpeg(command, on_time=lambda seconds: self._on_segment_time(index, seconds))
+        if self._should_stop():
+            return -1
+        if return_code != 0:
+            self._report_failure(f"Falha ao codificar o trecho {index + 1}", return_code, tail)
+            return 1
+        os.replace(partial, encoded)
+        if self.manifest is not None:
+            with self._lock:
+                self.manifest.segments[index].done = True
+                self.manifest.save()
+        self._on_segment_time(index, self._segment_length.get(index, 0.0))
+        return 0
+
+    def _record_streams(self, has_streams):
+        if self.manifest is not None:
+            with self._lock:
+                self.manifest.streams_done = has_streams
+                self.manifest.save()
+
+    def _concat(self, workdir, encoded_segments, audio_path) -> int:
+        list_path = os.path.join(workdir, "concat.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in encoded_segments:
+                escaped = path.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        command = [self.ffmpeg_path, '-y', '-f', 'concat', '-safe', '0', '-i', list_path]
+        if audio_path and self.stream_plan:
+            command.extend(['-i', audio_path, '-map', '0:v:0', '-map', '1'])
+        elif audio_path:
+            command.extend(['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0'])
+        command.extend(['-c', 'copy'])
+        if audio_path and self.stream_plan:
+            command.extend(self.stream_plan.subtitle_codec_args())
+        partial = partial_path(self.output_file)
+        command.extend(['-movflags', '+faststart', partial])
+        self._status(f"Comando: {format_command(command)}", self.CMD)
+
+        return_code, tail = self._run_ffmpeg(command)
+        if self._should_stop() or return_code != 0:
+            if os.path.exists(partial):
+                os.remove(partial)
+            if self._should_stop():
+                return -1
+            self._report_failure("Falha ao unir os trechos", return_code, tail)
+            return 1
+        os.replace(partial, self.output_file)
+        return 0
+
+    def _run_ffmpeg(self, command, on_time=None):
+        """Executa o FFmpeg, repassando o tempo codificado. Retorna (código, últimas linhas do stderr)."""
+        tail = deque(maxlen=20)
+        if on_time:
+            command = [command[0], *PROGRESS_ARGS, *command[1:]]
+        else:
+            command = [command[0], '-benchmark', *command[1:]]
+        try:
+            process = subprocess.Popen(
+                command,
+                stderr=subprocess.PIPE,
+                stdout=subprocess.PIPE if on_time else subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                text=True, encoding='utf-8', errors='replace', bufsize=1,
+                **subprocess_window_kwargs()
+            )
+        except Exception as e:
+            return 1, [f"{e.__class__.__name__}: {e}"]
+
+        with self._lock:
+            self._processes.add(process)
+        try:
+            stderr_thread = drain_lines(process.stderr, lambda line: self._on_stderr_line(line, tail))
+            if on_time:
+                parser = ProgressParser()
+                for line in iter(process.stdout.readline, ''):
+                    if self._should_stop():
+                        process.terminate()
+                        break
+                    snapshot = parser.feed(line)
+                    if snapshot is not None:
+                        on_time(snapshot.out_seconds)
+                process.stdout.close()
+            while True:
+                try:
+                    process.wait(timeout=0.5)
+                    break
+                except subprocess.TimeoutExpired:
+                    if self._should_stop():
+                        process.terminate()
+            stderr_thread.join(timeout=5)
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+        return process.returncode, list(tail)
+
+    def _on_stderr_line(self, line, tail):
+        tail.append(line.strip())
+        cpu_seconds = parse_cpu_seconds(line)
+        if cpu_seconds is not None:
+            with self._lock:
+                self.cpu_seconds += cpu_seconds
+        rss_kb = parse_max_rss_kb(line)
+        if rss_kb is not None:
+            with self._lock:
+                self.peak_rss_kb = max(self.peak_rss_kb, rss_kb)
+
+    def _on_segment_time(self, index, seconds):
+        with self._lock:
+            self._segment_done[index] = min(seconds, self._segment_length.get(index, seconds))
+            done = sum(self._segment_done.values())
+            total = sum(self._segment_length.values()) or self.duration_seconds
+            now = time.time()
+            if total <= 0 or now - self._last_progress_update < 0.5:
+                return
+            self._last_progress_update = now
+            # Trechos retomados entram na primeira amostra; o ETA só mede o que avança agora
+            eta_seconds = self.eta.update(now - self._start_time, done / total)
+        percent = min(100, int(100 * done / total))
+        self._progress(percent, format_eta(eta_seconds))
+
+    def _report_failure(self, title, return_code, tail):
+        self._status(f"✗ {title} (Código: {return_code}).", self.ERROR)
+        for line in tail[-5:]:
+            if line:
+                self._status(line, self.FFMPEG)
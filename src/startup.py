@@ -0,0 +1,82 @@
+"""Tempo de inicialização da interface e verificações adiadas para depois da primeira pintura.
+
+A janela aparece antes de qualquer acesso ao disco que possa demorar (arquivos recentes
+em compartilhamentos de rede, procura do FFmpeg): essas verificações rodam no pool de
+threads depois que a janela é pintada, e o relatório de tempos vai para o log de eventos.
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from capabilities import discover_ffmpeg
+from config import check_config_paths
+
+# Orçamento (ms desde o início do processo) para a janela aparecer pintada
+FIRST_PAINT_BUDGET_MS = 1500
+# Com esta variável definida, main.py imprime os marcos em JSON e encerra (usado nos testes)
+STARTUP_CHECK_ENV = 'COMPRESSOR_STARTUP_CHECK'
+
+# Marcos da inicialização, na ordem em que acontecem
+MARK_IMPORTS = "imports"
+MARK_WINDOW = "janela"
+MARK_FIRST_PAINT = "primeira pintura"
+MARK_CONTROLLER = "controlador"
+MARK_CHECKS = "verificações"
+
+
+class StartupTimer:
+    """Marcos da inicialização em milissegundos desde 'origin' (um time.perf_counter())."""
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self._marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str) -> float:
+        elapsed = (time.perf_counter() - self.origin) * 1000
+        self._marks.append((name, elapsed))
+        return elapsed
+
+    def elapsed_ms(self, name: str) -> Optional[float]:
+        for mark, elapsed in self._marks:
+            if mark == name:
+                return elapsed
+        return None
+
+    def marks(self) -> Dict[str, float]:
+        return {name: round(elapsed, 1) for name, elapsed in self._marks}
+
+    def over_budget(self) -> bool:
+        first_paint = self.elapsed_ms(MARK_FIRST_PAINT)
+        return first_paint is not None and first_paint > FIRST_PAINT_BUDGET_MS
+
+    def report(self) -> str:
+        """'Inicialização: imports 180 ms | janela 240 ms (+60) | ...'"""
+        parts = []
+        previous = 0.0
+        for name, elapsed in self._marks:
+            parts.append(f"{name} {elapsed:.0f} ms (+{elapsed - previous:.0f})" if parts else f"{name} {elapsed:.0f} ms")
+            previous = elapsed
+        return "Inicialização: " + " | ".join(parts)
+
+
+class StartupCheckSignals(QObject):
+    # {'ffmpeg_path', 'ffmpeg_auto', 'capabilities' (FFmpegCapabilities.to_dict() ou None), 'recent_files'}
+    finished = Signal(dict)
+
+
+class StartupCheckTask(QRunnable):
+    """Confere os caminhos da configuração e descobre o FFmpeg (e o que ele suporta) fora da thread da GUI."""
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__()
+        self.config = dict(config)
+        self.signals = StartupCheckSignals()
+
+    def run(self):
+        checked = check_config_paths(self.config)
+        capabilities = discover_ffmpeg(checked['ffmpeg_path'])
+        ffmpeg_path = capabilities.ffmpeg_path if capabilities else None
+        self.signals.finished.emit({**checked, 'ffmpeg_path': ffmpeg_path,
+                                    'ffmpeg_auto': bool(ffmpeg_path) and ffmpeg_path != checked['ffmpeg_path'],
+                                    'capabilities': capabilities.to_dict() if capabilities else None})
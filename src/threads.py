@@ -0,0 +1,146 @@
+"""Threads de cada processo FFmpeg a partir dos núcleos utilizáveis e dos jobs simultâneos.
+
+Sem opções, x264/x265 dimensionam as threads pelos núcleos da máquina inteira (com
+vários jobs ao mesmo tempo, cada um disputa todos os núcleos) e o libvpx-vp9 roda
+praticamente em uma ou duas threads. O plano divide os núcleos utilizáveis entre os
+processos simultâneos e traduz a cota de cada um nas opções de cada codificador.
+"""
+import math
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+# Largura mínima de um tile de coluna no VP9 e máximo de colunas/linhas (em log2) aceitos pelo libvpx
+VP9_MIN_TILE_WIDTH = 256
+VP9_MAX_TILE_COLUMNS_LOG2 = 6
+VP9_MAX_TILE_ROWS_LOG2 = 2
+# Altura usada quando a resolução de saída é desconhecida
+DEFAULT_HEIGHT = 1080
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: str = CGROUP_ROOT) -> Optional[float]:
+    """Limite de CPU do contêiner em núcleos (cgroup v2 'cpu.max' ou v1 'cfs_quota'); None = sem limite."""
+    cpu_max = _read(os.path.join(root, 'cpu.max'))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(' ')
+        if quota != 'max' and period:
+            try:
+                return int(quota) / int(period)
+            except ValueError:
+                return None
+        return None
+    quota = _read(os.path.join(root, 'cpu', 'cpu.cfs_quota_us'))
+    period = _read(os.path.join(root, 'cpu', 'cpu.cfs_period_us'))
+    try:
+        if quota and period and int(quota) > 0:
+            return int(quota) / int(period)
+    except ValueError:
+        pass
+    return None
+
+
+def usable_cores() -> int:
+    """Núcleos que este processo pode usar: afinidade de CPU limitada pela cota do cgroup."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cores = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    if limit:
+        cores = min(cores, math.ceil(limit))
+    return max(1, cores)
+
+
+def thread_budget(processes: int = 1, cores: Optional[int] = None) -> int:
+    """Threads por processo quando 'processes' codificações dividem os núcleos utilizáveis."""
+    cores = cores if cores is not None else usable_cores()
+    return max(1, cores // max(1, processes))
+
+
+def _log2_ceil(value: int) -> int:
+    return max(0, math.ceil(math.log2(value))) if value > 1 else 0
+
+
+def x265_frame_threads(budget: int, height: int) -> int:
+    """Mesma escada do x265 para frame-threads, limitada pelas linhas de CTU (64 px) do quadro."""
+    by_cores = 6 if budget >= 32 else 5 if budget >= 16 else 3 if budget >= 8 else 2 if budget >= 4 else 1
+    ctu_rows = math.ceil(height / 64)
+    return max(1, min(by_cores, ctu_rows // 2))
+
+
+def vp9_tiles(budget: int, width: int) -> Tuple[int, int]:
+    """(log2 das colunas, log2 das linhas) de tiles para ocupar 'budget' threads."""
+    max_columns = int(math.log2(max(1, width // VP9_MIN_TILE_WIDTH))) if width >= VP9_MIN_TILE_WIDTH else 0
+    columns = min(_log2_ceil(budget), max_columns, VP9_MAX_TILE_COLUMNS_LOG2)
+    rows = min(_log2_ceil(math.ceil(budget / (1 << columns))), VP9_MAX_TILE_ROWS_LOG2)
+    return columns, rows
+
+
+@dataclass
+class ThreadPlan:
+    """Opções de threads de um processo FFmpeg para um codec e resolução de saída."""
+    codec: str
+    width: int
+    height: int
+    budget: int
+    threads: int = 0
+    x265_pools: int = 0
+    x265_frame_threads: int = 0
+    tile_columns: int = 0
+    tile_rows: int = 0
+    row_mt: bool = False
+
+    def args(self) -> List[str]:
+        """Argumentos do FFmpeg (o x265 recebe os seus em x265_params())."""
+        if self.codec == "libvpx-vp9":
+            return ['-threads', str(self.threads), '-row-mt', '1' if self.row_mt else '0',
+                    '-tile-columns', str(self.tile_columns), '-tile-rows', str(self.tile_rows)]
+        if self.codec == "libx265":
+            return []
+        return ['-threads', str(self.threads)]
+
+    def x265_params(self) -> List[str]:
+        if self.codec != "libx265":
+            return []
+        return [f"pools={self.x265_pools}", f"frame-threads={self.x265_frame_threads}"]
+
+    def split(self, processes: int) -> 'ThreadPlan':
+        """Plano para cada um de 'processes' processos paralelos do mesmo job (trechos, amostras)."""
+        return plan_threads(self.codec, self.width, self.height, max(1, self.budget // max(1, processes)))
+
+    def describe(self) -> str:
+        if self.codec == "libx265":
+            return f"pools={self.x265_pools}, frame-threads={self.x265_frame_threads}"
+        if self.codec == "libvpx-vp9":
+            return (f"threads={self.threads}, row-mt, tiles {1 << self.tile_columns}x{1 << self.tile_rows}"
+                    if self.row_mt else f"threads={self.threads}")
+        return f"threads={self.threads}"
+
+
+def plan_threads(codec: str, width: Optional[int], height: Optional[int], budget: int) -> ThreadPlan:
+    """Opções de threads para codificar 'codec' em width x height usando até 'budget' threads."""
+    height = height or DEFAULT_HEIGHT
+    width = width or round(height * 16 / 9)
+    budget = max(1, budget)
+    plan = ThreadPlan(codec=codec, width=width, height=height, budget=budget)
+    if codec == "libx265":
+        plan.x265_pools = budget
+        plan.x265_frame_threads = x265_frame_threads(budget, height)
+    elif codec == "libvpx-vp9":
+        plan.threads = budget
+        plan.row_mt = budget > 1
+        if plan.row_mt:
+            plan.tile_columns, plan.tile_rows = vp9_tiles(budget, width)
+    else:
+        # x264: threads por quadro além de ~metade das linhas de macroblocos (16 px) só aumentam o atraso
+        plan.threads = max(1, min(budget, math.ceil(height / 16) // 2))
+    return plan
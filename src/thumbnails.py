@@ -0,0 +1,109 @@
+import logging
+import subprocess
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, Signal
+from PySide6.QtGui import QImage, QPixmap
+
+from encoding import subprocess_window_kwargs
+from probe import probe
+
+logger = logging.getLogger(__name__)
+
+MAX_THUMBNAILS = 32
+THUMBNAIL_WIDTH = 400
+THUMBNAIL_TIMEOUT = 20
+
+
+def extract_frame(ffmpeg_path: str, path: str, seek_seconds: float = 1.0) -> bytes:
+    """Extrai um quadro como PNG direto pelo stdout do FFmpeg (sem arquivo temporário)."""
+    command = [
+        ffmpeg_path, '-hide_banner', '-loglevel', 'error',
+        '-ss', f"{seek_seconds:.3f}", '-i', path,
+        '-frames:v', '1', '-vf', f"scale={THUMBNAIL_WIDTH}:-2",
+        '-f', 'image2pipe', '-c:v', 'png', 'pipe:1'
+    ]
+    result = subprocess.run(command, capture_output=True, check=False,
+                            timeout=THUMBNAIL_TIMEOUT, **subprocess_window_kwargs())
+    return result.stdout
+
+
+@dataclass
+class ThumbnailEntry:
+    image: QImage
+    duration: float = 0.0
+    pixmap: Optional[QPixmap] = None
+    pixmap_size: Optional[QSize] = None
+
+
+class ThumbnailCache:
+    """Cache LRU de miniaturas por identidade do arquivo (caminho, tamanho, mtime).
+
+    Guarda a imagem original e o último pixmap escalado, que só é refeito quando
+    o tamanho de exibição muda. Pixmaps só podem ser criados na thread da GUI.
+    """
+
+    def __init__(self, max_entries: int = MAX_THUMBNAILS):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, ThumbnailEntry]' = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[ThumbnailEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, image: QImage, duration: float = 0.0) -> ThumbnailEntry:
+        entry = ThumbnailEntry(image=image, duration=duration)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def scaled(entry: ThumbnailEntry, size: QSize) -> QPixmap:
+        if entry.pixmap is None or entry.pixmap_size != size:
+            entry.pixmap = QPixmap.fromImage(entry.image).scaled(
+                size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            entry.pixmap_size = QSize(size)
+        return entry.pixmap
+
+
+class ThumbnailSignals(QObject):
+    # chave, imagem (nula em caso de falha), duração em segundos
+    finished = Signal(str, QImage, float)
+
+
+class ThumbnailTask(QRunnable):
+    """Gera a miniatura e lê a duração num thread do QThreadPool."""
+
+    def __init__(self, ffmpeg_path: str, path: str, key: str):
+        super().__init__()
+        self.ffmpeg_path = ffmpeg_path
+        self.path = path
+        self.key = key
+        self.signals = ThumbnailSignals()
+
+    def run(self):
+        image = QImage()
+        duration = 0.0
+        try:
+            duration = probe(self.path, ffmpeg_path=self.ffmpeg_path).duration
+        except Exception:
+            pass
+        try:
+            seek = 1.0 if duration == 0 or duration > 2 else 0.0
+            data = extract_frame(self.ffmpeg_path, self.path, seek)
+            if not data and seek:
+                data = extract_frame(self.ffmpeg_path, self.path, 0.0)
+            if data:
+                image = QImage.fromData(data, "PNG")
+        except Exception as e:
+            logger.warning(f"Erro ao gerar thumbnail de {self.path}: {e}")
+        self.signals.finished.emit(self.key, image, duration)
@@ -0,0 +1,114 @@
+import os
+import glob
+import hashlib
+import logging
+from typing import List, Optional
+
+from config import get_base_path
+from encoding import EncodeSettings, parse_bitrate_kbps
+from probe import file_identity
+
+logger = logging.getLogger(__name__)
+
+TWOPASS_CACHE_DIR = 'twopass_cache'
+MAX_CACHED_ANALYSES = 20
+# Reserva para cabeçalhos/índices do MP4 ao calcular o bitrate pelo tamanho alvo
+CONTAINER_OVERHEAD = 0.02
+MIN_VIDEO_BITRATE_KBPS = 50
+
+
+class TargetSizeError(ValueError):
+    """Tamanho alvo impossível para a duração e o áudio escolhidos."""
+
+
+def compute_video_bitrate(target_size_mb: float, duration_seconds: float,
+                          audio_bitrate: str, has_audio: bool = True) -> int:
+    """Bitrate de vídeo (kbit/s) para que vídeo + áudio caibam em target_size_mb (MiB)."""
+    if not duration_seconds or duration_seconds <= 0:
+        raise TargetSizeError("Duração desconhecida; não é possível calcular o bitrate para o tamanho alvo.")
+    total_kbits = target_size_mb * 1024 * 1024 * 8 / 1000 * (1 - CONTAINER_OVERHEAD)
+    audio_kbps = parse_bitrate_kbps(audio_bitrate) if has_audio else 0
+    video_kbps = int(total_kbits / duration_seconds - audio_kbps)
+    if video_kbps < MIN_VIDEO_BITRATE_KBPS:
+        raise TargetSizeError(
+            f"Tamanho alvo de {target_size_mb:.1f} MB é pequeno demais para "
+            f"{duration_seconds:.0f}s de vídeo (bitrate de vídeo resultante: {video_kbps} kbit/s)."
+        )
+    return video_kbps
+
+
+def x265_stats_path(passlog_prefix: str) -> str:
+    return f"{passlog_prefix}.x265.log"
+
+
+def pass_args(pass_number: int, passlog_prefix: str, codec: str = "libx264") -> List[str]:
+    """'-pass N -passlogfile' do FFmpeg; o libx265 ignora essas opções e recebe a passagem
+    em -x265-params (EncodeSettings.video_args(x265_pass=...))."""
+    if codec == "libx265":
+        return []
+    return ['-pass', str(pass_number), '-passlogfile', passlog_prefix]
+
+
+def pass_video_args(settings: EncodeSettings, pass_number: int, passlog_prefix: str) -> List[str]:
+    """Argumentos de vídeo de uma das passagens, com as estatísticas em passlog_prefix."""
+    x265_pass = (pass_number, x265_stats_path(passlog_prefix)) if settings.codec == "libx265" else None
+    return [*settings.video_args(x265_pass=x265_pass), *pass_args(pass_number, passlog_prefix, settings.codec)]
+
+
+class FirstPassCache:
+    """Guarda as estatísticas da primeira passagem por entrada + codec + filtros (resolução/fps).
+
+    Refazer a compressão com outro tamanho alvo reaproveita a análise e roda só a
+    segunda passagem. Cada análise é um conjunto de arquivos '<chave>-0.log*' do
+    FFmpeg (ou '<chave>.x265.log*', do próprio libx265) mais um marcador '<chave>.done'
+    gravado quando a passagem 1 termina.
+    """
+
+    def __init__(self, base_path: Optional[str] = None, max_entries: int = MAX_CACHED_ANALYSES):
+        self.base_path = base_path if base_path is not None else get_base_path()
+        self.max_entries = max_entries
+
+    @property
+    def directory(self) -> str:
+        return os.path.join(self.base_path, TWOPASS_CACHE_DIR)
+
+    def key(self, input_file: str, settings: EncodeSettings) -> Optional[str]:
+        identity = file_identity(input_file)
+        if identity is None:
+            return None
+        raw = "|".join([identity, settings.codec, settings.preset, settings.video_filter])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+    def passlog_prefix(self, key: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, key)
+
+    def has_stats(self, key: str, codec: str = "libx264") -> bool:
+        prefix = os.path.join(self.directory, key)
+        if not os.path.exists(f"{prefix}.done"):
+            return False
+        if codec == "libx265":
+            stats = x265_stats_path(prefix)
+            return os.path.exists(stats) and os.path.getsize(stats) > 0
+        return any(os.path.getsize(path) > 0 for path in glob.glob(f"{glob.escape(prefix)}-*.log"))
+
+    def mark_done(self, key: str) -> None:
+        with open(os.path.join(self.directory, f"{key}.done"), 'w', encoding='utf-8') as f:
+            f.write("ok")
+        self.prune(keep=key)
+
+    def discard(self, key: str) -> None:
+        for path in glob.glob(os.path.join(glob.escape(self.directory), f"{key}*")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def prune(self, keep: Optional[str] = None) -> None:
+        """Remove as análises mais antigas além de max_entries (nunca a chave 'keep')."""
+        keys = [os.path.basename(marker)[:-len(".done")]
+                for marker in glob.glob(os.path.join(glob.escape(self.directory), "*.done"))]
+        keys.sort(key=lambda k: (k == keep, os.path.getmtime(os.path.join(self.directory, f"{k}.done"))),
+                  reverse=True)
+        for key in keys[self.max_entries:]:
+            self.discard(key)
@@ -0,0 +1,64 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from quality import QualityCheck
+
+# Verificações simultâneas: uma basta, já que o FFmpeg roda com prioridade baixa
+MAX_PARALLEL_CHECKS = 1
+
+
+class _QualitySignals(QObject):
+    # chave, métricas (dicionário vazio em caso de falha/cancelamento), mensagem de erro
+    finished = Signal(str, dict, str)
+
+
+class _QualityTask(QRunnable):
+    def __init__(self, key, check: QualityCheck):
+        super().__init__()
+        self.key = key
+        self.check = check
+        self.signals = _QualitySignals()
+
+    def run(self):
+        scores, error = None, ""
+        try:
+            scores = self.check.run()
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+        self.signals.finished.emit(self.key, scores.to_dict() if scores else {}, error)
+
+
+class QualityVerifier(QObject):
+    """Calcula SSIM/PSNR/VMAF depois da compressão, fora das threads de codificação.
+
+    Usa um QThreadPool próprio para não disputar vagas com a fila de jobs.
+    """
+
+    scores_ready = Signal(str, dict)
+    check_failed = Signal(str, str)
+
+    def __init__(self, max_parallel=MAX_PARALLEL_CHECKS, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_parallel)
+        self._tasks = {}
+
+    def submit(self, key, ffmpeg_path, source_file, output_file):
+        task = _QualityTask(key, QualityCheck(ffmpeg_path, source_file, output_file))
+        task.signals.finished.connect(self._on_finished)
+        self._tasks[key] = task
+        self._pool.start(task)
+
+    def is_busy(self):
+        return bool(self._tasks)
+
+    def stop_all(self):
+        for task in list(self._tasks.values()):
+            task.check.stop()
+
+    @Slot(str, dict, str)
+    def _on_finished(self, key, scores, error):
+        self._tasks.pop(key, None)
+        if scores:
+            self.scores_ready.emit(key, scores)
+        else:
+            self.check_failed.emit(key, error or "verificação cancelada ou sem métricas")
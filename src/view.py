@@ -1,19 +1,43 @@
 import os
 import sys
-import tempfile
-import subprocess
 import time
+from collections import deque
+from itertools import groupby
 from PySide6 import QtWidgets, QtCore, QtGui
 from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                                QPushButton, QLineEdit, QLabel, QFileDialog,
-                               QMessageBox, QProgressBar, QTextEdit, QGroupBox,
+                               QMessageBox, QProgressBar, QGroupBox,
                                QSizePolicy, QFormLayout, QComboBox, QButtonGroup,
-                               QScrollArea, QSlider)
-from PySide6.QtCore import Qt, Signal, QSize
-from PySide6.QtGui import QFont, QCloseEvent, QPixmap, QPainter
+                               QScrollArea, QSlider, QTableWidget, QTableWidgetItem,
+                               QSpinBox, QHeaderView, QAbstractItemView, QCheckBox,
+                               QDoubleSpinBox)
+from PySide6.QtCore import Qt, Signal, QSize, QThreadPool, QTimer
+from PySide6.QtGui import QFont, QCloseEvent, QPixmap, QPainter, QColor, QTextCharFormat, QTextCursor
 from config import load_config, save_config
 
 
+def format_stats(stats):
+    """Resumo curto das estatísticas de progresso do FFmpeg (velocidade, fps, tamanho)."""
+    parts = []
+    if stats.get('speed'):
+        parts.append(f"{stats['speed']:.2f}x")
+    if stats.get('fps'):
+        parts.append(f"{stats['fps']:.0f} fps")
+    if stats.get('total_size_mb'):
+        parts.append(f"{stats['total_size_mb']:.1f} MB")
+    if stats.get('percent') is None and stats.get('frame'):
+        parts.append(f"quadro {stats['frame']}")
+    return " | ".join(parts)
+
+
+def format_quality(scores):
+    """Texto curto das métricas de qualidade (dicionário de QualityScores.to_dict)."""
+    parts = [f"SSIM {scores['ssim']:.4f}", f"PSNR {scores['psnr']:.1f} dB"]
+    if scores.get('vmaf') is not None:
+        parts.append(f"VMAF {scores['vmaf']:.1f}")
+    return " | ".join(parts)
+
+
 class PathSelector(QtWidgets.QWidget):
     path_selected = QtCore.Signal(str)
 
@@ -134,9 +158,11 @@ class PathSelector(QtWidgets.QWidget):
 
 
 class VideoPreview(QtWidgets.QWidget):
+    MIN_HEIGHT = 180
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setMinimumHeight(180)
+        self.setMinimumHeight(self.MIN_HEIGHT)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
         self.setStyleSheet("""
             background-color: #222222;
@@ -176,71 +202,63 @@ class VideoPreview(QtWidgets.QWidget):
         """)
         self.layout.addWidget(self.metadata_label)
 
+        # Importado aqui: a pré-visualização só é criada depois da primeira pintura da janela
+        from thumbnails import ThumbnailCache
+        self.thumbnail_cache = ThumbnailCache()
+        self._pending_tasks = {}
+        self._current_key = None
+        # FFmpeg descoberto/configurado pelo controlador; sem ele, as miniaturas esperam
+        self.ffmpeg_path = None
+
     def set_video(self, path):
+        from probe import file_identity
+        from thumbnails import ThumbnailTask
         if not path or not os.path.isfile(path):
             self.clear()
             return
-            
-        try:
-            self.info_label.setText(os.path.basename(path))
-        except Exception as e:
-            print(f"Error setting video info label: {str(e)}")
-            
-            temp_dir = tempfile.gettempdir()
-            thumb_name = f"thumb_{os.path.splitext(os.path.basename(path))[0]}.jpg"
-            thumbnail_path = os.path.join(temp_dir, thumb_name)
-            
-            cmd = [
-                "ffmpeg", "-y", "-i", path,
-                "-ss", "00:00:01", "-vframes", "1",
-                "-vf", "scale=400:-1",
-                thumbnail_path
-            ]
-            
-            startupinfo = None
-            if os.name == 'nt':
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            
-            subprocess.run(cmd, startupinfo=startupinfo, stdout=subprocess.PIPE, 
-                          stderr=subprocess.PIPE, check=True)
-            
-            if os.path.exists(thumbnail_path):
-                pixmap = QPixmap(thumbnail_path)
-                if not pixmap.isNull():
-                    self.thumbnail_label.setPixmap(
-                        pixmap.scaled(self.thumbnail_container.width(), 
-                                      self.thumbnail_container.height(),
-                                      Qt.AspectRatioMode.KeepAspectRatio,
-                                      Qt.TransformationMode.SmoothTransformation))
-            
-            duration = self._get_video_duration(path)
-            if duration > 0:
-                self.metadata_label.setText(
-                    f"Duração: {time.strftime('%H:%M:%S', time.gmtime(duration))}"
-                )
-            
-        except subprocess.CalledProcessError as e:
-            self.clear()
-            print(f"Erro ao gerar thumbnail: {e.stderr.decode()}")
-        except Exception as e:
-            self.clear()
-            print(f"Erro inesperado: {str(e)}")
 
-    def _get_video_duration(self, path):
-        try:
-            cmd = [
-                "ffprobe", "-v", "error",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            return float(result.stdout.strip())
-        except:
-            return 0
+        self.info_label.setText(os.path.basename(path))
+        key = file_identity(path)
+        self._current_key = key
+        entry = self.thumbnail_cache.get(key)
+        if entry is not None:
+            self._show_entry(entry)
+            return
+
+        self.thumbnail_label.clear()
+        self.metadata_label.setText("Gerando miniatura...")
+        if key in self._pending_tasks:
+            return
+        if not self.ffmpeg_path:
+            self.metadata_label.setText("Miniatura disponível após configurar o FFmpeg")
+            return
+        task = ThumbnailTask(self.ffmpeg_path, path, key)
+        task.signals.finished.connect(self._on_thumbnail_ready)
+        self._pending_tasks[key] = task
+        QThreadPool.globalInstance().start(task)
+
+    def _on_thumbnail_ready(self, key, image, duration):
+        self._pending_tasks.pop(key, None)
+        entry = self.thumbnail_cache.put(key, image, duration) if not image.isNull() else None
+        if key != self._current_key:
+            return
+        if entry is None:
+            self.thumbnail_label.clear()
+            self.metadata_label.clear()
+            return
+        self._show_entry(entry)
+
+    def _show_entry(self, entry):
+        self.thumbnail_label.setPixmap(self.thumbnail_cache.scaled(entry, self.thumbnail_container.size()))
+        if entry.duration > 0:
+            self.metadata_label.setText(
+                f"Duração: {time.strftime('%H:%M:%S', time.gmtime(entry.duration))}"
+            )
+        else:
+            self.metadata_label.clear()
 
     def clear(self):
+        self._current_key = None
         self.thumbnail_label.clear()
         self.metadata_label.clear()
         self.info_label.setText("Arraste um vídeo aqui ou selecione abaixo")
@@ -251,24 +269,21 @@ class VideoPreview(QtWidgets.QWidget):
         """)
 
     def resizeEvent(self, event):
-        if hasattr(self.thumbnail_label, 'pixmap') and self.thumbnail_label.pixmap():
-            self.thumbnail_label.setPixmap(
-                self.thumbnail_label.pixmap().scaled(
-                    self.thumbnail_container.width(),
-                    self.thumbnail_container.height(),
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-            )
         super().resizeEvent(event)
+        entry = self.thumbnail_cache.get(self._current_key) if self._current_key else None
+        if entry is not None:
+            self.thumbnail_label.setPixmap(self.thumbnail_cache.scaled(entry, self.thumbnail_container.size()))
 
 
 class SizeComparisonChart(QtWidgets.QWidget):
+    HEIGHT = 100
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setFixedHeight(100)
+        self.setFixedHeight(self.HEIGHT)
         self.original_size = 0
         self.compressed_size = 0
+        self.quality = None
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
 
     def paintEvent(self, event):
@@ -307,6 +322,12 @@ class SizeComparisonChart(QtWidgets.QWidget):
                 compressed_text = f"Comprimido: {self.compressed_size:.2f} MB ({reduction:.1f}% menor)"
                 painter.drawText(margin + 5, 50, compressed_text)
             
+            if self.quality:
+                painter.setPen(QtGui.QColor("#2e7d32"))
+                painter.drawText(QtCore.QRect(margin + 5, 82, max_width - 10, 16),
+                                 Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                                 f"Qualidade: {format_quality(self.quality)}")
+
             if self.compressed_size > 0:
                 painter.setPen(QtGui.QPen(QtGui.QColor("#ff5722"), 1, Qt.PenStyle.DotLine))
                 y_pos = 47
@@ -315,19 +336,31 @@ class SizeComparisonChart(QtWidgets.QWidget):
     def update_sizes(self, original, compressed):
         self.original_size = original
         self.compressed_size = compressed
+        self.quality = None
+        self.update()
+
+    def update_quality(self, scores):
+        """Mostra SSIM/PSNR/VMAF da última saída ao lado dos tamanhos."""
+        self.quality = scores
         self.update()
 
 
-class LogWidget(QtWidgets.QTextEdit):
+class LogWidget(QtWidgets.QPlainTextEdit):
     INFO = "INFO"; WARN = "AVISO"; ERROR = "ERRO"; CMD = "CMD"; FFMPEG = "FFMPEG"
     LOG_COLORS = { INFO: "#000000", WARN: "#FFA500", ERROR: "#FF0000", CMD: "#0000FF", FFMPEG: "#696969" }
+    # Níveis em inglês usados pelo controlador e pelo logging
+    LEVEL_ALIASES = { "WARN": WARN, "WARNING": WARN, "ERROR": ERROR }
+    MAX_LOG_LINES = 5000
+    FLUSH_INTERVAL_MS = 100
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setReadOnly(True)
-        self.setLineWrapMode(QtWidgets.QTextEdit.LineWrapMode.NoWrap)
+        self.setUndoRedoEnabled(False)
+        self.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.NoWrap)
+        self.setMaximumBlockCount(self.MAX_LOG_LINES)
         self.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #f8f8f8;
                 border: 1px solid #dddddd;
                 border-radius: 4px;
@@ -336,16 +369,84 @@ class LogWidget(QtWidgets.QTextEdit):
                 font-size: 11px;
             }
         """)
+        self._formats = {}
+        for level, color in self.LOG_COLORS.items():
+            fmt = QTextCharFormat()
+            fmt.setForeground(QColor(color))
+            self._formats[level] = fmt
+        # Histórico retido (buffer circular) e linhas ainda não desenhadas
+        self._records = deque(maxlen=self.MAX_LOG_LINES)
+        self._pending = deque(maxlen=self.MAX_LOG_LINES)
+        self._hidden_levels = set()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
 
     @QtCore.Slot(str, str)
     def append_message(self, text, level=INFO):
-        color = self.LOG_COLORS.get(level.upper(), self.LOG_COLORS[self.INFO])
-        escaped_text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        formatted_message = f'<pre style="color:{color}; margin:0; padding:0;">{escaped_text}</pre>'
-        self.append(formatted_message)
+        level = self.LEVEL_ALIASES.get(level.upper(), level.upper())
+        if level not in self.LOG_COLORS:
+            level = self.INFO
+        record = (level, text)
+        self._records.append(record)
+        if level not in self._hidden_levels:
+            self._pending.append(record)
+            if not self._flush_timer.isActive():
+                self._flush_timer.start()
+
+    def flush(self):
+        """Desenha de uma vez as linhas acumuladas desde o último lote."""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        records = list(self._pending)
+        self._pending.clear()
+        self._insert_records(records)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def _insert_records(self, records):
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        separator = "" if self.document().isEmpty() else "\n"
+        # Linhas consecutivas do mesmo nível viram uma única inserção ('\n' separa blocos)
+        for level, group in groupby(records, key=lambda record: record[0]):
+            text = "\n".join(text for _, text in group)
+            cursor.insertText(separator + text, self._formats[level])
+            separator = "\n"
+        cursor.endEditBlock()
+
+    def set_level_visible(self, level, visible):
+        if visible:
+            self._hidden_levels.discard(level)
+        else:
+            self._hidden_levels.add(level)
+        self._rebuild()
+
+    def set_hidden_levels(self, levels):
+        self._hidden_levels = set(levels)
+        self._rebuild()
+
+    def _rebuild(self):
+        self._flush_timer.stop()
+        self._pending.clear()
+        super().clear()
+        self._insert_records([r for r in self._records if r[0] not in self._hidden_levels])
         self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
 
-    def clear_log(self): self.clear()
+    def toPlainText(self):
+        self.flush()
+        return super().toPlainText()
+
+    def clear_log(self):
+        self._flush_timer.stop()
+        self._records.clear()
+        self._pending.clear()
+        self.clear()
 
 
 class CompressorView(QWidget):
@@ -354,7 +455,20 @@ class CompressorView(QWidget):
     select_ffmpeg_signal = Signal()
     select_input_signal = Signal()
     select_output_signal = Signal()
+    add_to_queue_signal = Signal(str, str, str)
+    start_queue_signal = Signal()
+    stop_queue_signal = Signal()
+    remove_job_signal = Signal(str)
+    concurrency_changed_signal = Signal(int)
     closing = Signal()
+    # Emitido uma vez, quando a janela termina a primeira pintura
+    first_painted = Signal()
+
+    LOG_FILTERS = {
+        "Tudo": [],
+        "Sem saída do FFmpeg": [LogWidget.FFMPEG],
+        "Somente avisos e erros": [LogWidget.INFO, LogWidget.CMD, LogWidget.FFMPEG],
+    }
 
     def __init__(self):
         super().__init__()
@@ -380,24 +494,48 @@ class CompressorView(QWidget):
         main_layout = QVBoxLayout(self)
         main_layout.addWidget(self.scroll)
         main_layout.setContentsMargins(0, 0, 0, 0)
+
+        # Pré-visualização, gráfico e opções avançadas são criados sob demanda
+        self._video_preview = None
+        self._size_chart = None
+        self._advanced_panel = None
+        self._painted = False
         
         self.init_ui()
         self.setup_styles()
         self.load_settings()
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            # Depois que a pintura terminar: a janela já está na tela
+            QTimer.singleShot(0, self._on_first_paint)
+
+    def _on_first_paint(self):
+        self.first_painted.emit()
+        self.build_deferred_panels()
+
+    def build_deferred_panels(self):
+        """Cria a pré-visualização e o gráfico, adiados para depois da primeira pintura."""
+        self._ensure_video_preview()
+        self._ensure_size_chart()
+
     def load_settings(self):
         config = load_config()
         self.advanced_toggle.setChecked(config.get('advanced_options', False))
         self._toggle_advanced_options(config['advanced_options'])
         self.codec_combo.setCurrentText(config['last_codec'])
         self.resolution_combo.setCurrentText(config['last_resolution'])
+        self.concurrency_spin.setValue(config.get('max_concurrent_jobs', 0))
 
     def save_settings(self):
         save_config({
             'ffmpeg_path': self.get_ffmpeg_path(),
             'last_codec': self.get_selected_codec(),
             'last_resolution': self.get_selected_resolution(),
-            'advanced_options': self.advanced_toggle.isChecked()
+            'advanced_options': self.advanced_toggle.isChecked(),
+            'max_concurrent_jobs': self.get_max_concurrent_jobs()
         })
 
     def init_ui(self):
@@ -405,6 +543,7 @@ class CompressorView(QWidget):
         self._setup_files_group()
         self._setup_preview_group()
         self._setup_quality_buttons_group()
+        self._setup_queue_group()
         self._setup_progress_group()
         self._setup_log_group()
 
@@ -547,15 +686,28 @@ class CompressorView(QWidget):
     def _setup_preview_group(self):
         preview_group = QGroupBox("Pré-visualização")
         preview_group.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        preview_layout = QVBoxLayout(preview_group)
+        self._preview_layout = QVBoxLayout(preview_group)
+        preview_group.setMinimumHeight(VideoPreview.MIN_HEIGHT + 40)
         
-        self.video_preview = VideoPreview()
-        preview_layout.addWidget(self.video_preview)
-        
-        self.input_file_selector.path_selected.connect(self.video_preview.set_video)
+        self.input_file_selector.path_selected.connect(self._on_input_path_selected)
         
         self.layout.addWidget(preview_group)
 
+    def _ensure_video_preview(self):
+        """Cria a pré-visualização na primeira vez que é pedida."""
+        if self._video_preview is None:
+            self._video_preview = VideoPreview()
+            self._video_preview.ffmpeg_path = self.get_ffmpeg_path() or None
+            self._preview_layout.addWidget(self._video_preview)
+        return self._video_preview
+
+    @property
+    def video_preview(self):
+        return self._ensure_video_preview()
+
+    def _on_input_path_selected(self, path):
+        self.video_preview.set_video(path)
+
     def _setup_quality_buttons_group(self):
         quality_group = QGroupBox("Qualidade da Compressão")
         quality_group.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
@@ -631,13 +783,25 @@ class CompressorView(QWidget):
         self.advanced_toggle.toggled.connect(self._toggle_advanced_options)
         quality_layout.addWidget(self.advanced_toggle)
         
-        # Advanced panel
-        self.advanced_panel = QWidget()
-        advanced_layout = QFormLayout(self.advanced_panel)
+        self.layout.addWidget(quality_group)
+        self._quality_group = quality_group
+
+    @property
+    def advanced_panel(self):
+        """Painel de opções avançadas, criado na primeira vez que é aberto (ou consultado)."""
+        if self._advanced_panel is None:
+            self._advanced_panel = self._build_advanced_panel()
+            self._advanced_panel.hide()
+            self.layout.insertWidget(self.layout.indexOf(self._quality_group) + 1, self._advanced_panel)
+        return self._advanced_panel
+
+    def _build_advanced_panel(self):
+        panel = QWidget()
+        advanced_layout = QFormLayout(panel)
         advanced_layout.setLabelAlignment(Qt.AlignmentFlag.AlignRight)
         
         # CRF Slider (Fixed: Using Qt.Orientation.Horizontal)
-        self.crf_slider = QSlider(Qt.Orientation.Horizontal, self.advanced_panel)
+        self.crf_slider = QSlider(Qt.Orientation.Horizontal, panel)
         self.crf_slider.setRange(18, 32)
         self.crf_slider.setValue(23)
         advanced_layout.addRow("CRF:", self.crf_slider)
@@ -654,15 +818,75 @@ class CompressorView(QWidget):
         res_layout.addWidget(self.custom_res_h)
         
         advanced_layout.addRow("Resolução Personalizada:", res_layout)
+
+        self.segment_parallel_check = QCheckBox("Dividir em trechos e codificar em paralelo")
+        self.segment_parallel_check.setToolTip("Para vídeos longos: corta nos keyframes, codifica os trechos em "
+                                               "processos paralelos e junta sem recodificar.")
+        advanced_layout.addRow("Paralelismo:", self.segment_parallel_check)
+
+        # Tamanho alvo: troca o CRF por codificação em duas passagens com bitrate calculado
+        self.target_size_check = QCheckBox("Limitar tamanho (MB):")
+        self.target_size_spin = QDoubleSpinBox()
+        self.target_size_spin.setRange(1.0, 100000.0)
+        self.target_size_spin.setDecimals(1)
+        self.target_size_spin.setValue(25.0)
+        self.target_size_spin.setEnabled(False)
+        self.target_size_check.toggled.connect(self.target_size_spin.setEnabled)
+        self.target_size_check.toggled.connect(lambda checked: self.crf_slider.setEnabled(not checked))
+        target_layout = QHBoxLayout()
+        target_layout.addWidget(self.target_size_check)
+        target_layout.addWidget(self.target_size_spin)
+        advanced_layout.addRow("Tamanho Alvo:", target_layout)
+
+        # CRF por título: amostras em vários CRFs e escolha pelo piso de qualidade
+        self.auto_crf_check = QCheckBox("Buscar CRF pela qualidade")
+        self.quality_metric_combo = QComboBox()
+        self.quality_metric_combo.addItems(["SSIM", "PSNR"])
+        self.quality_floor_spin = QDoubleSpinBox()
+        self.quality_floor_spin.setDecimals(3)
+        self.quality_metric_combo.currentTextChanged.connect(self._on_quality_metric_changed)
+        self._on_quality_metric_changed("SSIM")
+        for widget in (self.quality_metric_combo, self.quality_floor_spin):
+            widget.setEnabled(False)
+            self.auto_crf_check.toggled.connect(widget.setEnabled)
+        auto_crf_layout = QHBoxLayout()
+        auto_crf_layout.addWidget(self.auto_crf_check)
+        auto_crf_layout.addWidget(self.quality_metric_combo)
+        auto_crf_layout.addWidget(QLabel("mínimo:"))
+        auto_crf_layout.addWidget(self.quality_floor_spin)
+        advanced_layout.addRow("CRF Automático:", auto_crf_layout)
+
+        self.verify_quality_check = QCheckBox("Medir SSIM/PSNR (e VMAF, se disponível) após comprimir")
+        self.verify_quality_check.setToolTip("Roda em segundo plano, com prioridade baixa, sem atrasar a fila.")
+        advanced_layout.addRow("Verificação:", self.verify_quality_check)
+
+        self.force_reencode_check = QCheckBox("Sempre recodificar (desativa o remux rápido)")
+        self.force_reencode_check.setToolTip("Sem esta opção, fontes que já estão no codec escolhido com bitrate "
+                                             "baixo o bastante são apenas copiadas para o MP4, sem recodificar.")
+        advanced_layout.addRow("Remux:", self.force_reencode_check)
+
+        self.resumable_check = QCheckBox("Retomável (salva progresso em trechos)")
+        self.resumable_check.setToolTip("Codifica em trechos de até um minuto gravados ao lado da saída; se o app "
+                                        "fechar ou cair, a compressão continua do último trecho concluído.")
+        advanced_layout.addRow("Checkpoint:", self.resumable_check)
         
-        self.layout.addWidget(quality_group)
-        self.layout.addWidget(self.advanced_panel)
-        self.advanced_panel.hide()
+        return panel
 
     def _toggle_advanced_options(self, checked):
-        self.advanced_panel.setVisible(checked)
+        if checked or self._advanced_panel is not None:
+            self.advanced_panel.setVisible(checked)
         self.advanced_toggle.setText("Opções Avançadas ▲" if checked else "Opções Avançadas ▼")
 
+    def set_available_codecs(self, codecs):
+        """Restringe o combo aos codecs que o FFmpeg tem, mantendo a escolha se ainda existir."""
+        current = self.codec_combo.currentText()
+        self.codec_combo.blockSignals(True)
+        self.codec_combo.clear()
+        self.codec_combo.addItems(codecs)
+        self.codec_combo.blockSignals(False)
+        if current in codecs:
+            self.codec_combo.setCurrentText(current)
+
     def get_selected_codec(self):
         return self.codec_combo.currentText()
 
@@ -670,6 +894,8 @@ class CompressorView(QWidget):
         return self.resolution_combo.currentText()
 
     def get_custom_resolution(self):
+        if self._advanced_panel is None:
+            return None
         try:
             w = int(self.custom_res_w.text())
             h = int(self.custom_res_h.text())
@@ -678,16 +904,164 @@ class CompressorView(QWidget):
             return None
 
     def get_crf_value(self):
+        if self._advanced_panel is None:
+            return None
         return self.crf_slider.value()
 
+    def get_segment_parallel(self):
+        return self._advanced_panel is not None and self.segment_parallel_check.isChecked()
+
+    def _on_quality_metric_changed(self, metric):
+        if metric == "PSNR":
+            self.quality_floor_spin.setRange(20.0, 60.0)
+            self.quality_floor_spin.setSingleStep(0.5)
+            self.quality_floor_spin.setValue(40.0)
+        else:
+            self.quality_floor_spin.setRange(0.800, 0.999)
+            self.quality_floor_spin.setSingleStep(0.005)
+            self.quality_floor_spin.setValue(0.970)
+
+    def get_quality_target(self):
+        """(métrica, piso) da busca automática de CRF, ou (None, None) se desligada."""
+        if self._advanced_panel is None or not self.auto_crf_check.isChecked():
+            return None, None
+        return self.quality_metric_combo.currentText().lower(), self.quality_floor_spin.value()
+
+    def get_force_reencode(self):
+        return self.advanced_toggle.isChecked() and self.force_reencode_check.isChecked()
+
+    def get_resumable(self):
+        return self.advanced_toggle.isChecked() and self.resumable_check.isChecked()
+
+    def get_verify_quality(self):
+        return self.advanced_toggle.isChecked() and self.verify_quality_check.isChecked()
+
+    def get_target_size_mb(self):
+        """Tamanho alvo em MB, ou None quando o modo por tamanho está desligado."""
+        if self._advanced_panel is None or not self.target_size_check.isChecked():
+            return None
+        return self.target_size_spin.value()
+
+    QUEUE_COL_FILE = 0; QUEUE_COL_STATE = 1; QUEUE_COL_PROGRESS = 2; QUEUE_COL_RESULT = 3
+
+    def _setup_queue_group(self):
+        queue_group = QGroupBox("Fila de Compressão")
+        queue_group.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+        queue_layout = QVBoxLayout(queue_group)
+        queue_layout.setSpacing(8)
+
+        self.queue_table = QTableWidget(0, 4)
+        self.queue_table.setHorizontalHeaderLabels(["Arquivo", "Estado", "Progresso", "Resultado"])
+        self.queue_table.horizontalHeader().setSectionResizeMode(self.QUEUE_COL_FILE, QHeaderView.ResizeMode.Stretch)
+        self.queue_table.verticalHeader().setVisible(False)
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.queue_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.queue_table.setMinimumHeight(120)
+        queue_layout.addWidget(self.queue_table)
+
+        queue_buttons = QHBoxLayout()
+        self.add_queue_button = QPushButton("Adicionar à Fila")
+        self.add_queue_button.clicked.connect(self._on_add_to_queue_clicked)
+        self.remove_queue_button = QPushButton("Remover")
+        self.remove_queue_button.clicked.connect(self._on_remove_job_clicked)
+        self.start_queue_button = QPushButton("Iniciar Fila")
+        self.start_queue_button.clicked.connect(self.start_queue_signal.emit)
+        self.stop_queue_button = QPushButton("Parar Fila")
+        self.stop_queue_button.clicked.connect(self.stop_queue_signal.emit)
+        self.stop_queue_button.setEnabled(False)
+
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(0, 64)
+        self.concurrency_spin.setSpecialValueText("Auto")
+        self.concurrency_spin.setToolTip("Número de compressões simultâneas (Auto = ajustado pela carga de CPU e memória)")
+        self.concurrency_spin.valueChanged.connect(self.concurrency_changed_signal.emit)
+
+        queue_buttons.addWidget(self.add_queue_button)
+        queue_buttons.addWidget(self.remove_queue_button)
+        queue_buttons.addStretch()
+        queue_buttons.addWidget(QLabel("Simultâneos:"))
+        queue_buttons.addWidget(self.concurrency_spin)
+        queue_buttons.addWidget(self.start_queue_button)
+        queue_buttons.addWidget(self.stop_queue_button)
+        queue_layout.addLayout(queue_buttons)
+
+        self.layout.addWidget(queue_group)
+
+    def _on_add_to_queue_clicked(self):
+        self.add_to_queue_signal.emit(
+            self.ffmpeg_path_selector.get_path(),
+            self.input_file_selector.get_path(),
+            self.output_file_selector.get_path()
+        )
+
+    def _on_remove_job_clicked(self):
+        job_id = self.get_selected_job_id()
+        if job_id:
+            self.remove_job_signal.emit(job_id)
+
+    def get_max_concurrent_jobs(self):
+        return self.concurrency_spin.value()
+
+    def get_selected_job_id(self):
+        row = self.queue_table.currentRow()
+        if row < 0:
+            return None
+        item = self.queue_table.item(row, self.QUEUE_COL_FILE)
+        return item.data(Qt.ItemDataRole.UserRole) if item else None
+
+    def _find_job_row(self, job_id):
+        for row in range(self.queue_table.rowCount()):
+            item = self.queue_table.item(row, self.QUEUE_COL_FILE)
+            if item and item.data(Qt.ItemDataRole.UserRole) == job_id:
+                return row
+        return -1
+
+    def add_queue_job(self, job_id, name, state):
+        row = self.queue_table.rowCount()
+        self.queue_table.insertRow(row)
+        name_item = QTableWidgetItem(name)
+        name_item.setData(Qt.ItemDataRole.UserRole, job_id)
+        self.queue_table.setItem(row, self.QUEUE_COL_FILE, name_item)
+        self.queue_table.setItem(row, self.QUEUE_COL_STATE, QTableWidgetItem(state))
+        bar = QProgressBar()
+        bar.setFormat("%p%")
+        bar.setValue(0)
+        self.queue_table.setCellWidget(row, self.QUEUE_COL_PROGRESS, bar)
+        self.queue_table.setItem(row, self.QUEUE_COL_RESULT, QTableWidgetItem(""))
+
+    def remove_queue_job(self, job_id):
+        row = self._find_job_row(job_id)
+        if row >= 0:
+            self.queue_table.removeRow(row)
+
+    def update_queue_job(self, job_id, state=None, percent=None, result=None):
+        row = self._find_job_row(job_id)
+        if row < 0:
+            return
+        if state is not None:
+            self.queue_table.item(row, self.QUEUE_COL_STATE).setText(state)
+        if percent is not None:
+            self.queue_table.cellWidget(row, self.QUEUE_COL_PROGRESS).setValue(percent)
+        if result is not None:
+            self.queue_table.item(row, self.QUEUE_COL_RESULT).setText(result)
+
+    def set_queue_busy(self, busy):
+        self.start_queue_button.setEnabled(not busy)
+        self.stop_queue_button.setEnabled(busy)
+
     def _setup_progress_group(self):
         progress_group = QGroupBox("Progresso e Controle")
         progress_group.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         progress_layout = QVBoxLayout(progress_group)
         progress_layout.setSpacing(10)
         
-        self.size_chart = SizeComparisonChart()
-        progress_layout.addWidget(self.size_chart)
+        # Espaço reservado para o gráfico, criado depois da primeira pintura
+        self._chart_slot = QVBoxLayout()
+        self._chart_slot.setContentsMargins(0, 0, 0, 0)
+        self._chart_placeholder = QWidget()
+        self._chart_placeholder.setFixedHeight(SizeComparisonChart.HEIGHT)
+        self._chart_slot.addWidget(self._chart_placeholder)
+        progress_layout.addLayout(self._chart_slot)
         
         progress_bar_layout = QHBoxLayout()
         self.progress_bar = QProgressBar()
@@ -711,6 +1085,10 @@ class CompressorView(QWidget):
         progress_bar_layout.addWidget(self.progress_bar)
         progress_bar_layout.addWidget(self.eta_label)
         progress_layout.addLayout(progress_bar_layout)
+
+        self.stats_label = QLabel("")
+        self.stats_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        progress_layout.addWidget(self.stats_label)
         
         button_layout = QHBoxLayout()
         button_layout.addStretch()
@@ -730,6 +1108,19 @@ class CompressorView(QWidget):
         progress_layout.addLayout(button_layout)
         self.layout.addWidget(progress_group)
 
+    def _ensure_size_chart(self):
+        """Troca o espaço reservado pelo gráfico na primeira vez que ele é pedido."""
+        if self._size_chart is None:
+            self._size_chart = SizeComparisonChart()
+            self._chart_slot.replaceWidget(self._chart_placeholder, self._size_chart)
+            self._chart_placeholder.deleteLater()
+            self._chart_placeholder = None
+        return self._size_chart
+
+    @property
+    def size_chart(self):
+        return self._ensure_size_chart()
+
     def _setup_log_group(self):
         log_group = QGroupBox("Log de Eventos")
         log_group.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -738,7 +1129,18 @@ class CompressorView(QWidget):
         
         self.log_area = LogWidget()
         self.log_area.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Exibir:"))
+        self.log_filter_combo = QComboBox()
+        for label, hidden in self.LOG_FILTERS.items():
+            self.log_filter_combo.addItem(label, hidden)
+        self.log_filter_combo.currentIndexChanged.connect(
+            lambda index: self.log_area.set_hidden_levels(self.log_filter_combo.itemData(index)))
+        filter_layout.addWidget(self.log_filter_combo)
+        filter_layout.addStretch()
+        log_layout.addLayout(filter_layout)
+
         log_container = QWidget()
         log_container.setLayout(QVBoxLayout())
         log_container.layout().addWidget(self.log_area)
@@ -765,6 +1167,10 @@ class CompressorView(QWidget):
 
     def set_ffmpeg_path(self, path): 
         self.ffmpeg_path_selector.set_path(path)
+        if self._video_preview is not None:
+            self._video_preview.ffmpeg_path = path or None
+            if path and self.get_input_path():
+                self._video_preview.set_video(self.get_input_path())
 
     def set_input_path(self, path): 
         self.input_file_selector.set_path(path)
@@ -790,11 +1196,22 @@ class CompressorView(QWidget):
             return "Agressiva (Menor Arquivo)"
 
     def update_progress(self, percent, eta_str):
+        if self.progress_bar.maximum() == 0:
+            self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(percent)
         self.eta_label.setText(eta_str)
 
+    def update_stats(self, stats):
+        self.stats_label.setText(format_stats(stats))
+        if stats.get('percent') is None:
+            # Sem duração/quadros conhecidos: barra indeterminada
+            self.progress_bar.setRange(0, 0)
+            self.eta_label.setText(stats.get('eta', "ETA: ..."))
+
     def reset_progress(self):
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(0)
+        self.stats_label.setText("")
         self.eta_label.setText("ETA: --:--")
         self.size_chart.update_sizes(0, 0)
 
@@ -833,6 +1250,22 @@ class CompressorView(QWidget):
             QMessageBox.StandardButton.No
         ) == QMessageBox.StandardButton.Yes
 
+    def ask_resume(self, description):
+        """Oferece retomar compressões interrompidas. Retorna 'resume', 'discard' ou 'later'."""
+        box = QMessageBox(QMessageBox.Icon.Question, 'Compressões interrompidas',
+                          f"Há compressões retomáveis que não terminaram:\n{description}\n\n"
+                          "Deseja continuar de onde pararam?", parent=self)
+        resume_button = box.addButton("Retomar", QMessageBox.ButtonRole.AcceptRole)
+        discard_button = box.addButton("Descartar", QMessageBox.ButtonRole.DestructiveRole)
+        box.addButton("Depois", QMessageBox.ButtonRole.RejectRole)
+        box.setDefaultButton(resume_button)
+        box.exec()
+        if box.clickedButton() is resume_button:
+            return 'resume'
+        if box.clickedButton() is discard_button:
+            return 'discard'
+        return 'later'
+
     def closeEvent(self, event: QCloseEvent):
         self.save_settings()
         self.closing.emit()
@@ -0,0 +1,517 @@
+"""Modo pasta monitorada (sem interface gráfica, não importa Qt).
+
+Uso, a partir de src/:
+    python -m watcher pastas.json --jobs 2
+
+pastas.json lista as pastas e o perfil de cada uma (mesmos valores do cli):
+    {"folders": [
+        {"path": "/capturas/sala1", "output": "/comprimidos/sala1",
+         "quality": "media", "codec": "h265", "resolution": "720p"}
+    ]}
+
+Arquivos novos só entram na fila depois que tamanho e mtime ficam estáveis por alguns
+segundos (a gravação terminou). A saída espelha a árvore de subpastas da origem, e os
+arquivos já processados ficam registrados para que reiniciar o daemon não refaça nada.
+"""
+import os
+import sys
+import json
+import time
+import struct
+import select
+import logging
+import argparse
+import threading
+import ctypes
+import ctypes.util
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from config import get_base_path
+from cli import (QUALITY_CHOICES, CODEC_CHOICES, JsonEventWriter, parse_resolution,
+                 resolve_ffmpeg_path, run_job)
+from engine import HeadlessEncoder
+from job_queue import JobSettings, default_concurrency
+from job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_FILE = 'watch_processed.json'
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv'}
+OUTPUT_SUFFIX = '_comprimido'
+# Tempo sem mudança de tamanho/mtime para considerar a gravação concluída
+SETTLE_SECONDS = 10.0
+TICK_SECONDS = 1.0
+# Mesmo com inotify, varre as pastas de tempos em tempos: gravações feitas por outra
+# máquina num compartilhamento de rede (SMB/NFS) não geram eventos locais
+RESCAN_SECONDS = 60.0
+POLL_RESCAN_SECONDS = 5.0
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+@dataclass
+class FolderProfile:
+    """Pasta monitorada, raiz da árvore de saída e parâmetros de compressão."""
+    path: str
+    output: str
+    quality: str = 'agressiva'
+    codec: str = 'h264'
+    resolution: str = 'original'
+    crf: Optional[int] = None
+    recursive: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FolderProfile':
+        if not data.get('path') or not data.get('output'):
+            raise ValueError("Cada pasta precisa de 'path' e 'output'.")
+        profile = cls(path=os.path.abspath(data['path']), output=os.path.abspath(data['output']),
+                      quality=data.get('quality', 'agressiva'), codec=data.get('codec', 'h264'),
+                      resolution=data.get('resolution', 'original'), crf=data.get('crf'),
+                      recursive=bool(data.get('recursive', True)))
+        if profile.quality not in QUALITY_CHOICES:
+            raise ValueError(f"Qualidade inválida em {profile.path}: {profile.quality}")
+        if profile.codec not in CODEC_CHOICES:
+            raise ValueError(f"Codec inválido em {profile.path}: {profile.codec}")
+        try:
+            parse_resolution(profile.resolution)
+        except argparse.ArgumentTypeError as e:
+            raise ValueError(f"{e} ({profile.path})")
+        return profile
+
+    def contains(self, path: str) -> bool:
+        if not is_within(path, self.path):
+            return False
+        return self.recursive or os.path.dirname(path) == self.path
+
+    def output_path(self, input_file: str) -> str:
+        """Caminho espelhado: <output>/<subpastas relativas>/<nome>_comprimido.mp4."""
+        relative_dir = os.path.relpath(os.path.dirname(input_file), self.path)
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        return os.path.normpath(os.path.join(self.output, relative_dir, f"{base_name}{OUTPUT_SUFFIX}.mp4"))
+
+    def job_settings(self, input_file: str) -> JobSettings:
+        resolution, custom_res = parse_resolution(self.resolution)
+        return JobSettings(
+            input_file=input_file,
+            output_file=self.output_path(input_file),
+            quality_preset=QUALITY_CHOICES[self.quality],
+            codec=CODEC_CHOICES[self.codec],
+            resolution=resolution,
+            custom_res=custom_res,
+            crf=self.crf
+        )
+
+
+def is_within(path: str, directory: str) -> bool:
+    try:
+        return os.path.commonpath([os.path.abspath(path), directory]) == directory
+    except ValueError:
+        # Unidades diferentes no Windows
+        return False
+
+
+def load_profiles(config_path: str) -> List[FolderProfile]:
+    with open(config_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    folders = data.get('folders') if isinstance(data, dict) else data
+    if not isinstance(folders, list) or not folders:
+        raise ValueError("O arquivo de pastas precisa de uma lista 'folders'.")
+    return [FolderProfile.from_dict(entry) for entry in folders]
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class StabilityTracker:
+    """Acompanha arquivos candidatos até que tamanho e mtime parem de mudar."""
+
+    def __init__(self, settle_seconds: float = SETTLE_SECONDS, clock=time.monotonic):
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        self._files: Dict[str, Tuple[Tuple[int, int], float]] = {}
+
+    def __contains__(self, path) -> bool:
+        return path in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def observe(self, path: str) -> None:
+        signature = file_signature(path)
+        if signature is None:
+            self._files.pop(path, None)
+            return
+        known = self._files.get(path)
+        if known is None or known[0] != signature:
+            self._files[path] = (signature, self.clock())
+
+    def pop_stable(self) -> List[str]:
+        """Remove e retorna os arquivos sem mudanças há pelo menos 'settle_seconds'."""
+        stable = []
+        now = self.clock()
+        for path in list(self._files):
+            self.observe(path)
+            entry = self._files.get(path)
+            if entry and entry[0][0] > 0 and now - entry[1] >= self.settle_seconds:
+                del self._files[path]
+                stable.append(path)
+        return stable
+
+
+class ProcessedStore:
+    """Arquivos já processados (caminho, tamanho, mtime), em JSON ao lado da configuração.
+
+    Um arquivo só é processado de novo se for substituído (tamanho ou mtime diferentes).
+    """
+
+    def __init__(self, base_path: Optional[str] = None):
+        self.base_path = base_path if base_path is not None else get_base_path()
+        self._lock = threading.Lock()
+        self._entries = self._read()
+
+    @property
+    def store_path(self) -> str:
+        return os.path.join(self.base_path, PROCESSED_FILE)
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        # Esquece arquivos que já foram apagados da pasta monitorada
+        return {path: entry for path, entry in data.items() if os.path.exists(path)}
+
+    def is_processed(self, path: str) -> bool:
+        signature = file_signature(path)
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(path))
+        return bool(entry) and signature is not None and \
+            (entry.get('size'), entry.get('mtime_ns')) == signature
+
+    def record(self, path: str, signature: Tuple[int, int], output_file: str, return_code: int) -> None:
+        with self._lock:
+            self._entries[os.path.abspath(path)] = {
+                'size': signature[0], 'mtime_ns': signature[1], 'output': output_file,
+                'return_code': return_code, 'processed_at': round(time.time(), 3)
+            }
+            try:
+                os.makedirs(self.base_path, exist_ok=True)
+                tmp_path = f"{self.store_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, self.store_path)
+            except OSError as e:
+                logger.error(f"Erro ao salvar lista de arquivos processados: {e}")
+
+
+class PollingSource:
+    """Sem notificações do sistema: pede uma varredura completa a cada 'interval' segundos."""
+    name = "polling"
+
+    def __init__(self, interval: float = POLL_RESCAN_SECONDS, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self._last_scan = None
+
+    def wait(self, timeout: float) -> Optional[List[str]]:
+        """Caminhos alterados, ou None quando é hora de varrer tudo."""
+        time.sleep(timeout)
+        now = self.clock()
+        if self._last_scan is None or now - self._last_scan >= self.interval:
+            self._last_scan = now
+            return None
+        return []
+
+    def close(self):
+        pass
+
+
+class InotifySource:
+    """Eventos do inotify (Linux) via ctypes, com inclusão automática de subpastas novas."""
+    name = "inotify"
+
+    def __init__(self, directories: List[str], recursive: bool = True):
+        libc = self._libc()
+        if libc is None:
+            raise OSError("inotify indisponível neste sistema.")
+        self._libc_handle = libc
+        self.recursive = recursive
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self._watches: Dict[int, str] = {}
+        try:
+            for directory in directories:
+                self._add_tree(directory)
+        except OSError:
+            self.close()
+            raise
+
+    @staticmethod
+    def _libc():
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        except OSError:
+            return None
+        return libc if hasattr(libc, 'inotify_init1') else None
+
+    @classmethod
+    def available(cls) -> bool:
+        return cls._libc() is not None
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc_handle.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch falhou em {directory}: {os.strerror(errno)}")
+        self._watches[wd] = directory
+
+    def _add_tree(self, directory: str) -> List[str]:
+        """Observa 'directory' (e subpastas) e retorna os arquivos que já existem nelas."""
+        self._add_watch(directory)
+        found = []
+        if not self.recursive:
+            return found
+        for root, dirs, files in os.walk(directory):
+            if root != directory:
+                self._add_watch(root)
+            found.extend(os.path.join(root, name) for name in files)
+        return found
+
+    def wait(self, timeout: float) -> Optional[List[str]]:
+        """Caminhos alterados, ou None se a fila do kernel transbordou (varrer tudo)."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(buffer):
+            wd, mask, _cookie, length = INOTIFY_EVENT.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        changed.extend(self._add_tree(path))
+                    except OSError as e:
+                        logger.warning(f"Não foi possível observar {path}: {e}")
+                continue
+            changed.append(path)
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class WatchDaemon:
+    """Monitora as pastas e entrega cada arquivo estável a um pool limitado de codificação."""
+
+    def __init__(self, ffmpeg_path, profiles: List[FolderProfile], concurrency, writer,
+                 store: Optional[ProcessedStore] = None, source=None,
+                 settle_seconds: float = SETTLE_SECONDS, rescan_seconds: float = RESCAN_SECONDS,
+                 history: Optional[JobStore] = None):
+        self.ffmpeg_path = ffmpeg_path
+        # Pastas mais específicas primeiro: uma subpasta pode ter perfil próprio
+        self.profiles = sorted(profiles, key=lambda p: len(p.path), reverse=True)
+        self.concurrency = max(1, concurrency)
+        self.writer = writer
+        self.store = store or ProcessedStore()
+        self.source = source or self._default_source()
+        self.rescan_seconds = rescan_seconds
+        self.history = history
+        self.tracker = StabilityTracker(settle_seconds)
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._encoders = {}
+        self._futures = []
+        self._next_index = 0
+
+    def _default_source(self):
+        if InotifySource.available():
+            try:
+                return InotifySource([p.path for p in self.profiles],
+                                     recursive=any(p.recursive for p in self.profiles))
+            except OSError as e:
+                logger.warning(f"inotify indisponível ({e}); usando varredura periódica.")
+        return PollingSource()
+
+    def stop(self):
+        self._stopped.set()
+
+    def profile_for(self, path: str) -> Optional[FolderProfile]:
+        return next((p for p in self.profiles if p.contains(path)), None)
+
+    def is_candidate(self, path: str) -> bool:
+        name = os.path.basename(path)
+        stem, extension = os.path.splitext(name)
+        if extension.lower() not in VIDEO_EXTENSIONS or name.startswith('.'):
+            return False
+        # Saídas deste app: parciais, trechos de checkpoint e arquivos já comprimidos
+        if '.partial.' in name or '.parts' + os.sep in path or stem.endswith(OUTPUT_SUFFIX):
+            return False
+        profile = self.profile_for(path)
+        if profile is None:
+            return False
+        return not any(p.output != p.path and is_within(path, p.output) for p in self.profiles)
+
+    def scan(self) -> List[str]:
+        found = []
+        for profile in self.profiles:
+            if not os.path.isdir(profile.path):
+                continue
+            for root, dirs, files in os.walk(profile.path):
+                found.extend(os.path.join(root, name) for name in files)
+                if not profile.recursive:
+                    break
+        return found
+
+    def track(self, paths: List[str]) -> None:
+        for path in paths:
+            path = os.path.abspath(path)
+            with self._lock:
+                busy = path in self._in_flight
+            if busy or not self.is_candidate(path):
+                continue
+            if path not in self.tracker and self.store.is_processed(path):
+                continue
+            self.tracker.observe(path)
+
+    def submit(self, pool, path: str) -> None:
+        signature = file_signature(path)
+        profile = self.profile_for(path)
+        if signature is None or profile is None:
+            return
+        settings = profile.job_settings(path)
+        os.makedirs(os.path.dirname(settings.output_file), exist_ok=True)
+        with self._lock:
+            self._in_flight.add(path)
+            index = self._next_index
+            self._next_index += 1
+        self.writer.write('detected', job=index, input=path, output=settings.output_file,
+                          folder=profile.path, size_mb=round(signature[0] / (1024 * 1024), 3))
+        self._futures.append(pool.submit(self._encode, index, path, signature, settings))
+
+    def _encode(self, index, path, signature, settings) -> int:
+        try:
+            return_code = run_job(index, self.ffmpeg_path, settings, self.writer, self._encoders,
+                                  history=self.history)
+            # Cancelado (-1) não conta como processado: volta à fila no próximo início
+            if return_code != -1 and not self._stopped.is_set():
+                self.store.record(path, signature, settings.output_file, return_code)
+            return return_code
+        finally:
+            self._encoders.pop(index, None)
+            with self._lock:
+                self._in_flight.discard(path)
+
+    def run(self) -> None:
+        self.writer.write('watch', folders=[p.path for p in self.profiles], backend=self.source.name,
+                          concurrency=self.concurrency, ffmpeg=self.ffmpeg_path)
+        last_scan = None
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            try:
+                while not self._stopped.is_set():
+                    changed = self.source.wait(TICK_SECONDS)
+                    now = time.monotonic()
+                    if changed is None or last_scan is None or now - last_scan >= self.rescan_seconds:
+                        changed = self.scan()
+                        last_scan = now
+                    self.track(changed)
+                    for path in self.tracker.pop_stable():
+                        self.submit(pool, path)
+                    self._futures = [f for f in self._futures if not f.done()]
+            except KeyboardInterrupt:
+                self.writer.write('status', level=HeadlessEncoder.WARN,
+                                  message="Interrompido; parando os jobs em andamento...")
+                self._stopped.set()
+                for future in self._futures:
+                    future.cancel()
+                for encoder in list(self._encoders.values()):
+                    encoder.stop()
+                wait(self._futures)
+            finally:
+                self.source.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="watcher", description="Comprime automaticamente vídeos novos em pastas monitoradas.")
+    parser.add_argument('config', help="Arquivo JSON com as pastas e o perfil de cada uma")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="Compressões simultâneas (0 = automático pelos núcleos)")
+    parser.add_argument('--settle', type=float, default=SETTLE_SECONDS, metavar='SEG',
+                        help="Segundos sem mudança de tamanho para considerar o arquivo completo")
+    parser.add_argument('--poll', action='store_true', help="Não usa inotify; só varredura periódica")
+    parser.add_argument('--ffmpeg', help="Caminho do executável FFmpeg")
+    parser.add_argument('--history', action='store_true',
+                        help="Registra os resultados no banco de histórico (o mesmo da interface gráfica)")
+    parser.add_argument('--quiet', action='store_true', help="Só emite progresso, avisos, erros e resultados")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    writer = JsonEventWriter(quiet=args.quiet)
+
+    ffmpeg_path = resolve_ffmpeg_path(args.ffmpeg)
+    if not ffmpeg_path:
+        writer.write('error', title="Erro de Configuração", message="FFmpeg não encontrado. Use --ffmpeg.")
+        return 1
+    try:
+        profiles = load_profiles(args.config)
+    except (OSError, ValueError) as e:
+        writer.write('error', title="Erro de Configuração", message=f"Pastas monitoradas inválidas: {e}")
+        return 1
+
+    concurrency = args.jobs if args.jobs > 0 else default_concurrency()
+    history = JobStore() if args.history else None
+    daemon = WatchDaemon(ffmpeg_path, profiles, concurrency, writer,
+                         source=PollingSource() if args.poll else None, settle_seconds=args.settle,
+                         history=history)
+    try:
+        daemon.run()
+    finally:
+        if history is not None:
+            history.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())